@@ -17,6 +17,7 @@ limitations under the License.
 
 #include "absl/status/status.h"  // from @com_google_absl
 #include "absl/strings/str_format.h"  // from @com_google_absl
+#include "absl/time/clock.h"  // from @com_google_absl
 #include "tensorflow/lite/c/common.h"
 #include "tensorflow/lite/delegates/interpreter_utils.h"
 #include "tensorflow/lite/experimental/acceleration/configuration/flatbuffer_to_proto.h"
@@ -271,9 +272,9 @@ absl::Status TfLiteInterpreterWrapper::InvokeWithFallback(
   }
   // Assume InvokeWithoutFallback() is guarded under caller's synchronization.
   // Assume the inference is cancelled successfully if Invoke() returns
-  // kTfLiteError and the cancel flag is `true`.
-  if (status == kTfLiteError && cancel_flag_.Get()) {
-    return absl::CancelledError("Invoke() cancelled.");
+  // kTfLiteError and the cancel flag is `true` or the deadline has passed.
+  if (status == kTfLiteError) {
+    RETURN_IF_ERROR(GetCancellationStatus());
   }
   if (delegate_) {
     // Mark that an error occurred so that later invocations immediately
@@ -295,9 +296,9 @@ absl::Status TfLiteInterpreterWrapper::InvokeWithoutFallback() {
   if (status != kTfLiteOk) {
     // Assume InvokeWithoutFallback() is guarded under caller's synchronization.
     // Assume the inference is cancelled successfully if Invoke() returns
-    // kTfLiteError and the cancel flag is `true`.
-    if (status == kTfLiteError && cancel_flag_.Get()) {
-      return absl::CancelledError("Invoke() cancelled.");
+    // kTfLiteError and the cancel flag is `true` or the deadline has passed.
+    if (status == kTfLiteError) {
+      RETURN_IF_ERROR(GetCancellationStatus());
     }
     return absl::InternalError("Invoke() failed.");
   }
@@ -306,11 +307,27 @@ absl::Status TfLiteInterpreterWrapper::InvokeWithoutFallback() {
 
 void TfLiteInterpreterWrapper::Cancel() { cancel_flag_.Set(true); }
 
+void TfLiteInterpreterWrapper::SetDeadline(absl::Time deadline) {
+  cancel_flag_.SetDeadline(deadline);
+}
+
+absl::Status TfLiteInterpreterWrapper::GetCancellationStatus() const {
+  // The deadline is checked first, as Cancel() may also be called after it
+  // has passed.
+  if (cancel_flag_.DeadlineExceeded()) {
+    return absl::DeadlineExceededError("Invoke() exceeded its deadline.");
+  }
+  if (cancel_flag_.Get()) {
+    return absl::CancelledError("Invoke() cancelled.");
+  }
+  return absl::OkStatus();
+}
+
 void TfLiteInterpreterWrapper::SetTfLiteCancellation() {
   // Create a cancellation check function and set to the TFLite interpreter.
   auto check_cancel_flag = [](void* data) {
     auto* cancel_flag = reinterpret_cast<CancelFlag*>(data);
-    return cancel_flag->Get();
+    return cancel_flag->ShouldCancel();
   };
   interpreter_->SetCancellationFunction(reinterpret_cast<void*>(&cancel_flag_),
                                         check_cancel_flag);
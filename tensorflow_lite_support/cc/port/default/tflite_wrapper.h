@@ -20,6 +20,8 @@ limitations under the License.
 #include <utility>
 
 #include "absl/status/status.h"  // from @com_google_absl
+#include "absl/synchronization/mutex.h"  // from @com_google_absl
+#include "absl/time/time.h"  // from @com_google_absl
 #include "flatbuffers/flatbuffers.h"  // from @flatbuffers
 #include "tensorflow/lite/c/common.h"
 #include "tensorflow/lite/experimental/acceleration/configuration/configuration.pb.h"
@@ -152,10 +154,20 @@ class TfLiteInterpreterWrapper {
   // right before the underlying Invoke() is called, so these two methods can be
   // called again on the same instance after a call to Cancel().
   //
-  // Note that this is the only method that can be called from another thread
-  // without locking.
+  // Note that this method and SetDeadline() are the only methods that can be
+  // called from another thread without locking.
   void Cancel();
 
+  // Cancels the TFLite **CPU** inference once `deadline` has passed, in which
+  // case InvokeWithFallback() and InvokeWithoutFallback() return a
+  // `DeadlineExceededError`. Unlike the cancel flag, the deadline is not reset
+  // by these methods: it applies to all the invocations until it is changed.
+  // Pass `absl::InfiniteFuture()` to remove the deadline, which is the
+  // default.
+  //
+  // Has the same limitations as Cancel() regarding delegates.
+  void SetDeadline(absl::Time deadline);
+
   // Accesses the underlying interpreter for other methods.
   tflite::Interpreter& operator*() { return *interpreter_; }
   tflite::Interpreter* operator->() { return interpreter_.get(); }
@@ -261,6 +273,30 @@ class TfLiteInterpreterWrapper {
       absl::MutexLock cancel_lock(&cancel_mutex);
       cancel_flag = value;
     }
+
+    // The time after which the TFLite interpreter invocation is cancelled.
+    absl::Time deadline ABSL_GUARDED_BY(cancel_mutex) = absl::InfiniteFuture();
+
+    // Sets `deadline` to `value`.
+    void SetDeadline(absl::Time value) ABSL_LOCKS_EXCLUDED(cancel_mutex) {
+      absl::MutexLock cancel_lock(&cancel_mutex);
+      deadline = value;
+    }
+
+    // Returns whether `deadline` has passed.
+    bool DeadlineExceeded() const ABSL_LOCKS_EXCLUDED(cancel_mutex) {
+      absl::MutexLock cancel_lock(&cancel_mutex);
+      return deadline != absl::InfiniteFuture() && absl::Now() >= deadline;
+    }
+
+    // Returns whether the invocation must be cancelled, i.e. whether
+    // `cancel_flag` is set or `deadline` has passed. Called by the TFLite
+    // interpreter before each op.
+    bool ShouldCancel() const ABSL_LOCKS_EXCLUDED(cancel_mutex) {
+      absl::MutexLock cancel_lock(&cancel_mutex);
+      return cancel_flag ||
+             (deadline != absl::InfiniteFuture() && absl::Now() >= deadline);
+    }
   };
   CancelFlag cancel_flag_;
 
@@ -269,6 +305,10 @@ class TfLiteInterpreterWrapper {
   // Sets up the TFLite invocation cancellation by
   // tflite::Interpreter::SetCancellationFunction().
   void SetTfLiteCancellation();
+
+  // Returns a `DeadlineExceededError` if the deadline has passed, or a
+  // `CancelledError` if the cancel flag is set, and an OK status otherwise.
+  absl::Status GetCancellationStatus() const;
 };
 
 }  // namespace support
@@ -16,10 +16,14 @@ limitations under the License.
 #ifndef TENSORFLOW_LITE_SUPPORT_CC_TASK_CORE_BASE_TASK_API_H_
 #define TENSORFLOW_LITE_SUPPORT_CC_TASK_CORE_BASE_TASK_API_H_
 
+#include <string>
 #include <utility>
 
 #include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/str_cat.h"  // from @com_google_absl
 #include "absl/strings/string_view.h"  // from @com_google_absl
+#include "absl/time/clock.h"  // from @com_google_absl
+#include "absl/time/time.h"  // from @com_google_absl
 #include "tensorflow/lite/c/common.h"
 #include "tensorflow_lite_support/cc/common.h"
 #include "tensorflow_lite_support/cc/port/status_macros.h"
@@ -31,6 +35,16 @@ namespace tflite {
 namespace task {
 namespace core {
 
+// Time spent in each stage of an inference.
+struct InferenceTiming {
+  // Time spent populating the input tensors from the inputs.
+  absl::Duration preprocess;
+  // Time spent running the TF Lite interpreter.
+  absl::Duration invoke;
+  // Time spent creating the output from the output tensors.
+  absl::Duration postprocess;
+};
+
 class BaseUntypedTaskApi {
  public:
   explicit BaseUntypedTaskApi(std::unique_ptr<TfLiteEngine> engine)
@@ -42,6 +56,94 @@ class BaseUntypedTaskApi {
     return engine_->metadata_extractor();
   }
 
+  // Enables or disables recording the time spent in each stage of the
+  // inferences, see GetLastInferenceTiming(). Disabled by default.
+  //
+  // If `profile_ops` is true, the ops run by the TF Lite interpreter are also
+  // profiled, see GetOpProfile(). Profiling the ops slows down the inferences.
+  void SetInferenceTimingEnabled(bool enabled, bool profile_ops = false) {
+    inference_timing_enabled_ = enabled;
+    last_inference_timing_ = InferenceTiming();
+    engine_->SetOpProfilingEnabled(enabled && profile_ops);
+  }
+
+  // Returns the time spent in each stage of the last inference, if inference
+  // timing is enabled.
+  const InferenceTiming& GetLastInferenceTiming() const {
+    return last_inference_timing_;
+  }
+
+  // Returns the per-op profile of all the inferences since op profiling was
+  // enabled, as formatted by the TF Lite profile summarizer, or an empty
+  // string if op profiling is disabled.
+  std::string GetOpProfile() { return engine_->GetOpProfile(); }
+
+  // Returns the time spent loading the model, up to and including the first
+  // inference or warmup iteration.
+  const LoadTiming& GetLoadTiming() const { return engine_->load_timing(); }
+
+  // Runs the TF Lite interpreter `num_iterations` times on zero-filled inputs,
+  // so that the lazy initialization of the delegates and kernels, and the
+  // first-run cache misses, are not paid by the first real inference.
+  //
+  // The inputs are shaped from the model's input tensors, so no task-specific
+  // preprocessing is run, and the outputs are discarded.
+  absl::Status Warmup(int num_iterations = 1) {
+    if (num_iterations < 1) {
+      return tflite::support::CreateStatusWithPayload(
+          absl::StatusCode::kInvalidArgument,
+          absl::StrCat("Expected num_iterations > 0, found: ", num_iterations),
+          tflite::support::TfLiteSupportStatus::kInvalidArgumentError);
+    }
+    RETURN_IF_ERROR(engine_->FillInputsWithZeros());
+    auto set_inputs_nop =
+        [](tflite::task::core::TfLiteEngine::Interpreter* interpreter)
+        -> absl::Status {
+      // NOP since inputs are already filled with zeros.
+      return absl::OkStatus();
+    };
+    for (int i = 0; i < num_iterations; ++i) {
+      absl::Time start = absl::Now();
+      absl::Status status =
+          engine_->interpreter_wrapper()->InvokeWithFallback(set_inputs_nop);
+      engine_->RecordFirstInvoke(absl::Now() - start);
+      if (!status.ok()) {
+        return status.GetPayload(tflite::support::kTfLiteSupportPayload)
+                       .has_value()
+                   ? status
+                   : tflite::support::CreateStatusWithPayload(
+                         status.code(), status.message());
+      }
+    }
+    return absl::OkStatus();
+  }
+
+  // Cancels the current running TFLite invocation on CPU.
+  //
+  // Usually called on a different thread than the one inference is running on.
+  // Calling Cancel() will cause the underlying TFLite interpreter to return an
+  // error, which will turn into a `CANCELLED` status and empty results. Calling
+  // Cancel() at the other time will not take any effect on the current or
+  // following invocation. It is perfectly fine to run inference again on the
+  // same instance after a cancelled invocation. If the TFLite inference is
+  // partially delegated on CPU, logs a warning message and only cancels the
+  // invocation running on CPU. Other invocation which depends on the output of
+  // the CPU invocation will not be executed.
+  void Cancel() { engine_->Cancel(); }
+
+  // Cancels the TFLite invocations on CPU once `deadline` has passed, which
+  // turns them into a `DEADLINE_EXCEEDED` status and empty results, until the
+  // deadline is changed. Pass `absl::InfiniteFuture()`, the default, to
+  // remove the deadline.
+  //
+  // Only the invoke stage is interrupted: an inference whose preprocessing
+  // ends after the deadline fails as soon as the invocation starts. Has the
+  // same limitations as Cancel() regarding delegates, and can also be called
+  // from a different thread than the one inference is running on.
+  void SetInferenceDeadline(absl::Time deadline) {
+    engine_->SetInvokeDeadline(deadline);
+  }
+
  protected:
   // TODO(b/200258103): It's a short term solution. In the future we will forbid
   // Tasks exposing the underlying TfLiteEngine. Please try not rely on this
@@ -50,8 +152,65 @@ class BaseUntypedTaskApi {
   // Returns a raw pointer to the underlying TfLiteEngine.
   TfLiteEngine* GetTfLiteEngine() { return engine_.get(); }
 
+  // Records the time spent in each stage of an inference as the last inference
+  // timing of the task, and the invoke stage of the first inference as part of
+  // the load timing. No-op if inference timing is disabled and the first
+  // inference already ran.
+  class InferenceTimer {
+   public:
+    explicit InferenceTimer(BaseUntypedTaskApi* task)
+        : task_(task->inference_timing_enabled_ ||
+                        !task->engine_->load_timing().first_invoke_recorded
+                    ? task
+                    : nullptr) {
+      if (task_ != nullptr) {
+        task_->last_inference_timing_ = InferenceTiming();
+        stage_start_ = absl::Now();
+      }
+    }
+
+    // Ends the preprocess stage, and starts the invoke stage.
+    void EndPreprocess() {
+      if (task_ != nullptr) {
+        EndStage(&task_->last_inference_timing_.preprocess);
+        task_->engine_->StartOpProfiling();
+      }
+    }
+
+    // Ends the invoke stage, and starts the postprocess stage.
+    void EndInvoke() {
+      if (task_ != nullptr) {
+        EndStage(&task_->last_inference_timing_.invoke);
+        task_->engine_->RecordFirstInvoke(
+            task_->last_inference_timing_.invoke);
+        task_->engine_->StopOpProfiling();
+        // Summarizing the op profile is not part of the postprocess stage.
+        stage_start_ = absl::Now();
+      }
+    }
+
+    // Ends the postprocess stage.
+    void EndPostprocess() {
+      if (task_ != nullptr) {
+        EndStage(&task_->last_inference_timing_.postprocess);
+      }
+    }
+
+   private:
+    void EndStage(absl::Duration* stage_duration) {
+      absl::Time now = absl::Now();
+      *stage_duration = now - stage_start_;
+      stage_start_ = now;
+    }
+
+    BaseUntypedTaskApi* task_;
+    absl::Time stage_start_;
+  };
+
  private:
   std::unique_ptr<TfLiteEngine> engine_;
+  bool inference_timing_enabled_ = false;
+  InferenceTiming last_inference_timing_;
 };
 
 template <class OutputType, class... InputTypes>
@@ -81,19 +240,6 @@ class BaseTaskApi : public BaseUntypedTaskApi {
     return interpreter->tensor(interpreter->outputs()[index])->dims;
   }
 
-  // Cancels the current running TFLite invocation on CPU.
-  //
-  // Usually called on a different thread than the one inference is running on.
-  // Calling Cancel() will cause the underlying TFLite interpreter to return an
-  // error, which will turn into a `CANCELLED` status and empty results. Calling
-  // Cancel() at the other time will not take any effect on the current or
-  // following invocation. It is perfectly fine to run inference again on the
-  // same instance after a cancelled invocation. If the TFLite inference is
-  // partially delegated on CPU, logs a warning message and only cancels the
-  // invocation running on CPU. Other invocation which depends on the output of
-  // the CPU invocation will not be executed.
-  void Cancel() { GetTfLiteEngine()->Cancel(); }
-
  protected:
   // Subclasses need to populate input_tensors from api_inputs.
   virtual absl::Status Preprocess(
@@ -123,8 +269,11 @@ class BaseTaskApi : public BaseUntypedTaskApi {
         GetTfLiteEngine()->interpreter_wrapper();
     // Note: AllocateTensors() is already performed by the interpreter wrapper
     // at InitInterpreter time (see TfLiteEngine).
+    InferenceTimer timer(this);
     RETURN_IF_ERROR(Preprocess(GetInputTensors(), args...));
+    timer.EndPreprocess();
     absl::Status status = interpreter_wrapper->InvokeWithoutFallback();
+    timer.EndInvoke();
     if (!status.ok()) {
       return status.GetPayload(tflite::support::kTfLiteSupportPayload)
                      .has_value()
@@ -132,7 +281,10 @@ class BaseTaskApi : public BaseUntypedTaskApi {
                  : tflite::support::CreateStatusWithPayload(status.code(),
                                                             status.message());
     }
-    return Postprocess(GetOutputTensors(), args...);
+    tflite::support::StatusOr<OutputType> output =
+        Postprocess(GetOutputTensors(), args...);
+    timer.EndPostprocess();
+    return output;
   }
 
   // Performs inference using tflite::support::TfLiteInterpreterWrapper
@@ -143,7 +295,9 @@ class BaseTaskApi : public BaseUntypedTaskApi {
         GetTfLiteEngine()->interpreter_wrapper();
     // Note: AllocateTensors() is already performed by the interpreter wrapper
     // at InitInterpreter time (see TfLiteEngine).
+    InferenceTimer timer(this);
     RETURN_IF_ERROR(Preprocess(GetInputTensors(), args...));
+    timer.EndPreprocess();
     auto set_inputs_nop =
         [](tflite::task::core::TfLiteEngine::Interpreter* interpreter)
         -> absl::Status {
@@ -152,6 +306,7 @@ class BaseTaskApi : public BaseUntypedTaskApi {
     };
     absl::Status status =
         interpreter_wrapper->InvokeWithFallback(set_inputs_nop);
+    timer.EndInvoke();
     if (!status.ok()) {
       return status.GetPayload(tflite::support::kTfLiteSupportPayload)
                      .has_value()
@@ -159,7 +314,10 @@ class BaseTaskApi : public BaseUntypedTaskApi {
                  : tflite::support::CreateStatusWithPayload(status.code(),
                                                             status.message());
     }
-    return Postprocess(GetOutputTensors(), args...);
+    tflite::support::StatusOr<OutputType> output =
+        Postprocess(GetOutputTensors(), args...);
+    timer.EndPostprocess();
+    return output;
   }
 };
 
@@ -95,14 +95,20 @@ absl::Status ExternalFileHandler::MapExternalFile() {
   }
   if (external_file_.file_name().empty() &&
       !external_file_.has_file_descriptor_meta()) {
+    if (external_file_.has_file_pointer_meta()) {
+      return ValidateFilePointer();
+    }
     return CreateStatusWithPayload(
         StatusCode::kInvalidArgument,
-        "ExternalFile must specify at least one of 'file_content', 'file_name' "
-        "or 'file_descriptor_meta'.",
+        "ExternalFile must specify at least one of 'file_content', "
+        "'file_name', 'file_descriptor_meta' or 'file_pointer_meta'.",
         TfLiteSupportStatus::kInvalidArgumentError);
   }
   // Obtain file descriptor, offset and size.
   int fd = -1;
+  // The offset and size default to 0, i.e. to the whole file.
+  buffer_offset_ = external_file_.file_descriptor_meta().offset();
+  buffer_size_ = external_file_.file_descriptor_meta().length();
   if (!external_file_.file_name().empty()) {
     owned_fd_ = open(external_file_.file_name().c_str(), O_RDONLY);
     if (owned_fd_ < 0) {
@@ -142,8 +148,6 @@ absl::Status ExternalFileHandler::MapExternalFile() {
           absl::StrFormat("Provided file descriptor is invalid: %d < 0", fd),
           TfLiteSupportStatus::kInvalidArgumentError);
     }
-    buffer_offset_ = external_file_.file_descriptor_meta().offset();
-    buffer_size_ = external_file_.file_descriptor_meta().length();
   }
   // Get actual file size. Always use 0 as offset to lseek(2) to get the actual
   // file size, as SEEK_END returns the size of the file *plus* offset.
@@ -193,9 +197,32 @@ absl::Status ExternalFileHandler::MapExternalFile() {
 #endif
 }
 
+absl::Status ExternalFileHandler::ValidateFilePointer() const {
+  const FilePointerMeta& pointer_meta = external_file_.file_pointer_meta();
+  if (pointer_meta.pointer() == 0) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument, "Provided file pointer is null.",
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  if (pointer_meta.length() <= 0) {
+    return CreateStatusWithPayload(
+        StatusCode::kInvalidArgument,
+        absl::StrFormat("Provided file pointer length is invalid: %d <= 0",
+                        pointer_meta.length()),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  return absl::OkStatus();
+}
+
 absl::string_view ExternalFileHandler::GetFileContent() {
   if (!external_file_.file_content().empty()) {
     return external_file_.file_content();
+  } else if (buffer_ == nullptr && external_file_.has_file_pointer_meta()) {
+    // The buffer is only mapped from a file name or descriptor.
+    return absl::string_view(
+        reinterpret_cast<const char*>(
+            external_file_.file_pointer_meta().pointer()),
+        external_file_.file_pointer_meta().length());
   } else {
     return absl::string_view(static_cast<const char*>(buffer_) +
                                  buffer_offset_ - buffer_aligned_offset_,
@@ -205,7 +232,7 @@ absl::string_view ExternalFileHandler::GetFileContent() {
 
 ExternalFileHandler::~ExternalFileHandler() {
 #ifndef _WIN32
-  if (buffer_ != MAP_FAILED) {
+  if (buffer_ != nullptr && buffer_ != MAP_FAILED) {
     munmap(buffer_, buffer_aligned_size_);
   }
 #endif
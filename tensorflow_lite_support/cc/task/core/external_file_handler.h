@@ -62,6 +62,10 @@ class ExternalFileHandler {
   // contents are already loaded in memory.
   absl::Status MapExternalFile();
 
+  // Checks that the memory buffer of the ExternalFile, if provided by pointer,
+  // is not empty.
+  absl::Status ValidateFilePointer() const;
+
   // Reference to the input ExternalFile.
   const ExternalFile& external_file_;
 
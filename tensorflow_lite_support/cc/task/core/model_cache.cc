@@ -0,0 +1,148 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "tensorflow_lite_support/cc/task/core/model_cache.h"
+
+#include <sys/stat.h>
+
+#include <cstdint>
+
+#include "absl/hash/hash.h"  // from @com_google_absl
+#include "absl/strings/str_cat.h"  // from @com_google_absl
+#include "absl/strings/string_view.h"  // from @com_google_absl
+#include "tensorflow_lite_support/cc/port/status_macros.h"
+
+namespace tflite {
+namespace task {
+namespace core {
+
+namespace {
+
+using ::tflite::support::StatusOr;
+
+// Returns the modification time of a file in nanoseconds, as rewrites within
+// the same second must not be missed.
+int64_t GetModificationTimeNs(const struct stat& file_stat) {
+#ifdef __APPLE__
+  const struct timespec& mtime = file_stat.st_mtimespec;
+#else
+  const struct timespec& mtime = file_stat.st_mtim;
+#endif
+  return static_cast<int64_t>(mtime.tv_sec) * 1000000000 + mtime.tv_nsec;
+}
+
+// Sets the key and version of the model file in the cache. Returns false if
+// the model file can't be cached.
+bool GetCacheKey(const ExternalFile& external_file, std::string* key,
+                 std::string* version) {
+  if (external_file.has_file_content()) {
+    const std::string& content = external_file.file_content();
+    *key = absl::StrCat("content:", content.size(), ":",
+                        absl::Hash<absl::string_view>{}(content));
+    version->clear();
+    return true;
+  }
+  if (external_file.has_file_name()) {
+    struct stat file_stat;
+    if (stat(external_file.file_name().c_str(), &file_stat) != 0) {
+      return false;
+    }
+    // Different regions of a bundle file are different models.
+    *key = absl::StrCat("file:", external_file.file_name(), ":",
+                        external_file.file_descriptor_meta().offset(), ":",
+                        external_file.file_descriptor_meta().length());
+    // Files are usually updated by replacing them, which changes their inode,
+    // or by rewriting them, which changes their size or modification time.
+    *version = absl::StrCat(file_stat.st_dev, ":", file_stat.st_ino, ":",
+                            file_stat.st_size, ":",
+                            GetModificationTimeNs(file_stat));
+    return true;
+  }
+  return false;
+}
+
+// Returns whether the cached model is the one of `external_file`, i.e. whether
+// the key doesn't collide with another file content.
+bool IsSameModel(const SharedModelFile& model_file,
+                 const ExternalFile& external_file) {
+  return !external_file.has_file_content() ||
+         model_file.external_file->file_content() ==
+             external_file.file_content();
+}
+
+}  // namespace
+
+/* static */
+ModelCache* ModelCache::GetDefault() {
+  static ModelCache* const kDefaultCache = new ModelCache();
+  return kDefaultCache;
+}
+
+StatusOr<std::shared_ptr<const SharedModelFile>> ModelCache::GetOrLoad(
+    const ExternalFile& external_file, const Loader& load) {
+  std::string key;
+  std::string version;
+  if (!GetCacheKey(external_file, &key, &version)) {
+    return load(external_file);
+  }
+  {
+    absl::MutexLock lock(&mutex_);
+    auto it = entries_.find(key);
+    if (it != entries_.end() && it->second.version == version &&
+        IsSameModel(*it->second.model_file, external_file)) {
+      return it->second.model_file;
+    }
+  }
+
+  // The model is loaded without holding the lock, so that loading a large
+  // model doesn't block the tasks using other models.
+  ASSIGN_OR_RETURN(std::shared_ptr<const SharedModelFile> model_file,
+                   load(external_file));
+  absl::MutexLock lock(&mutex_);
+  Entry& entry = entries_[key];
+  // If another thread loaded the same model concurrently, its model is kept
+  // in the cache, but the loaded model is still returned, as the caller may
+  // already reference it.
+  if (entry.model_file == nullptr || entry.version != version ||
+      !IsSameModel(*entry.model_file, external_file)) {
+    entry.model_file = model_file;
+    entry.version = version;
+  }
+  return model_file;
+}
+
+int ModelCache::Evict(bool unused_only) {
+  absl::MutexLock lock(&mutex_);
+  int num_evicted = 0;
+  for (auto it = entries_.begin(); it != entries_.end();) {
+    // Only the cache references the unused models.
+    if (!unused_only || it->second.model_file.use_count() == 1) {
+      entries_.erase(it++);
+      ++num_evicted;
+    } else {
+      ++it;
+    }
+  }
+  return num_evicted;
+}
+
+int ModelCache::size() const {
+  absl::MutexLock lock(&mutex_);
+  return entries_.size();
+}
+
+}  // namespace core
+}  // namespace task
+}  // namespace tflite
@@ -0,0 +1,105 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef TENSORFLOW_LITE_SUPPORT_CC_TASK_CORE_MODEL_CACHE_H_
+#define TENSORFLOW_LITE_SUPPORT_CC_TASK_CORE_MODEL_CACHE_H_
+
+#include <functional>
+#include <memory>
+#include <string>
+
+#include "absl/base/thread_annotations.h"  // from @com_google_absl
+#include "absl/container/flat_hash_map.h"  // from @com_google_absl
+#include "absl/synchronization/mutex.h"  // from @com_google_absl
+#include "tensorflow_lite_support/cc/port/statusor.h"
+#include "tensorflow_lite_support/cc/task/core/external_file_handler.h"
+#include "tensorflow_lite_support/cc/task/core/proto/external_file_proto_inc.h"
+#include "tensorflow_lite_support/metadata/cc/metadata_extractor.h"
+
+namespace tflite {
+namespace task {
+namespace core {
+
+// A model file read or memory-mapped and verified once, and shared by all the
+// TfLiteEngine built from it.
+struct SharedModelFile {
+  // The model file, which must outlive `file_handler`.
+  std::unique_ptr<ExternalFile> external_file;
+  // The handler holding the model file content in memory.
+  std::unique_ptr<ExternalFileHandler> file_handler;
+  // The TF Lite Metadata extractor built from the model.
+  std::shared_ptr<const tflite::metadata::ModelMetadataExtractor>
+      metadata_extractor;
+};
+
+// Registry of the verified model files, so that a model used by several tasks
+// is only read and verified once, and held once in memory.
+//
+// Models loaded from a file name are keyed by their path, offset and length,
+// and reloaded when the file changes on disk (i.e. when its inode, size or
+// modification time change). Models loaded from a file content are keyed by a
+// hash of the content. Models loaded from a file descriptor or a memory buffer
+// are not cached.
+//
+// The cache holds a reference to each model until it is evicted, and each
+// TfLiteEngine built from a cached model holds another one, so evicting or
+// reloading a model never invalidates the tasks using it.
+//
+// This class is thread-safe.
+class ModelCache {
+ public:
+  // Reads, verifies and builds a model file.
+  using Loader =
+      std::function<tflite::support::StatusOr<std::shared_ptr<SharedModelFile>>(
+          const ExternalFile& external_file)>;
+
+  ModelCache() = default;
+  // ModelCache is neither copyable nor movable.
+  ModelCache(const ModelCache&) = delete;
+  ModelCache& operator=(const ModelCache&) = delete;
+
+  // Returns the process-wide cache.
+  static ModelCache* GetDefault();
+
+  // Returns the cached model for `external_file` if it is up to date, or loads
+  // it with `load`, caches it and returns it otherwise.
+  tflite::support::StatusOr<std::shared_ptr<const SharedModelFile>> GetOrLoad(
+      const ExternalFile& external_file, const Loader& load);
+
+  // Removes the cached models, or only those not used by any TfLiteEngine if
+  // `unused_only` is true, and returns the number of removed models. The
+  // models still used by TfLiteEngine are released with their last engine.
+  int Evict(bool unused_only = false);
+
+  // Returns the number of cached models.
+  int size() const;
+
+ private:
+  struct Entry {
+    std::shared_ptr<const SharedModelFile> model_file;
+    // Identifies the version of the model file on disk. Empty for models
+    // loaded from a file content.
+    std::string version;
+  };
+
+  mutable absl::Mutex mutex_;
+  absl::flat_hash_map<std::string, Entry> entries_ ABSL_GUARDED_BY(mutex_);
+};
+
+}  // namespace core
+}  // namespace task
+}  // namespace tflite
+
+#endif  // TENSORFLOW_LITE_SUPPORT_CC_TASK_CORE_MODEL_CACHE_H_
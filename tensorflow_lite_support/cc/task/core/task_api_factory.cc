@@ -29,9 +29,16 @@ absl::Status TaskAPIFactory::SetMiniBenchmarkFileNameFromBaseOptions(
         tflite::support::TfLiteSupportStatus::kInvalidArgumentError);
   }
   if (base_options->model_file().has_file_name()) {
-    compute_settings.mutable_settings_to_test_locally()
-        ->mutable_model_file()
-        ->set_filename(base_options->model_file().file_name());
+    auto* mutable_model_file =
+        compute_settings.mutable_settings_to_test_locally()
+            ->mutable_model_file();
+    mutable_model_file->set_filename(base_options->model_file().file_name());
+    if (base_options->model_file().has_file_descriptor_meta()) {
+      const task::core::FileDescriptorMeta& fd_meta =
+          base_options->model_file().file_descriptor_meta();
+      mutable_model_file->set_offset(fd_meta.offset());
+      mutable_model_file->set_length(fd_meta.length());
+    }
   } else if (base_options->model_file().has_file_descriptor_meta()) {
     const task::core::FileDescriptorMeta& fd_meta =
         base_options->model_file().file_descriptor_meta();
@@ -148,8 +148,13 @@ class TaskAPIFactory {
       RETURN_IF_ERROR(SetMiniBenchmarkFileNameFromBaseOptions(compute_settings,
                                                               base_options));
     }
-    RETURN_IF_ERROR(engine->BuildModelFromExternalFileProto(
-        &base_options->model_file(), compute_settings));
+    if (base_options->share_model()) {
+      RETURN_IF_ERROR(
+          engine->BuildModelFromModelCache(base_options->model_file()));
+    } else {
+      RETURN_IF_ERROR(engine->BuildModelFromExternalFileProto(
+          &base_options->model_file(), compute_settings));
+    }
     return CreateFromTfLiteEngine<T>(std::move(engine), compute_settings);
   }
 
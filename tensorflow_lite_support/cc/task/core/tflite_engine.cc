@@ -19,14 +19,17 @@ limitations under the License.
 #include <unistd.h>
 #endif
 
+#include <cstring>
 #include <memory>
 
 #include "absl/strings/match.h"  // from @com_google_absl
 #include "absl/strings/str_cat.h"  // from @com_google_absl
+#include "absl/time/clock.h"  // from @com_google_absl
 #include "tensorflow/lite/builtin_ops.h"
 #include "tensorflow/lite/core/shims/cc/kernels/register.h"
 #include "tensorflow/lite/core/shims/cc/tools/verifier.h"
 #include "tensorflow/lite/stderr_reporter.h"
+#include "tensorflow/lite/string_util.h"
 #include "tensorflow_lite_support/cc/common.h"
 #include "tensorflow_lite_support/cc/port/configuration_proto_inc.h"
 #include "tensorflow_lite_support/cc/port/status_macros.h"
@@ -51,12 +54,38 @@ namespace core {
 static std::ios_base::Init s_iostream_initializer;
 #endif
 
+// Maximum number of op events recorded by each profiled `Invoke()` call.
+constexpr int kMaxProfiledOpEvents = 1024;
+
 using ::absl::StatusCode;
 using ::tflite::proto::ComputeSettings;
 using ::tflite::support::CreateStatusWithPayload;
 using ::tflite::support::InterpreterCreationResources;
 using ::tflite::support::TfLiteSupportStatus;
 
+namespace {
+// Forwards the op lookups to another resolver, but provides none of its default
+// delegates (i.e. XNNPACK), so that the graph runs on the builtin CPU kernels.
+class OpResolverWithoutDefaultDelegates : public tflite::OpResolver {
+ public:
+  explicit OpResolverWithoutDefaultDelegates(const tflite::OpResolver* resolver)
+      : resolver_(resolver) {}
+
+  const TfLiteRegistration* FindOp(tflite::BuiltinOperator op,
+                                   int version) const override {
+    return resolver_->FindOp(op, version);
+  }
+
+  const TfLiteRegistration* FindOp(const char* op,
+                                   int version) const override {
+    return resolver_->FindOp(op, version);
+  }
+
+ private:
+  const tflite::OpResolver* resolver_;
+};
+}  // namespace
+
 bool TfLiteEngine::Verifier::Verify(const char* data, int length,
                                     tflite::ErrorReporter* reporter) {
   return tflite_shims::Verify(data, length, reporter);
@@ -94,8 +123,18 @@ void TfLiteEngine::VerifyAndBuildModelFromBuffer(
       buffer_data, buffer_size, extra_verifier, &error_reporter_);
 }
 
+absl::Status TfLiteEngine::CreateModelFileHandler(
+    const ExternalFile* external_file) {
+  absl::Time start = absl::Now();
+  ASSIGN_OR_RETURN(model_file_handler_,
+                   ExternalFileHandler::CreateFromExternalFile(external_file));
+  load_timing_.model_read = absl::Now() - start;
+  return absl::OkStatus();
+}
+
 absl::Status TfLiteEngine::InitializeFromModelFileHandler(
     const tflite::proto::ComputeSettings& compute_settings) {
+  absl::Time start = absl::Now();
   const char* buffer_data = model_file_handler_->GetFileContent().data();
   size_t buffer_size = model_file_handler_->GetFileContent().size();
   VerifyAndBuildModelFromBuffer(buffer_data, buffer_size, &verifier_);
@@ -130,6 +169,7 @@ absl::Status TfLiteEngine::InitializeFromModelFileHandler(
       model_metadata_extractor_,
       tflite::metadata::ModelMetadataExtractor::CreateFromModelBuffer(
           buffer_data, buffer_size));
+  load_timing_.model_verification = absl::Now() - start;
 
   return absl::OkStatus();
 }
@@ -143,9 +183,7 @@ absl::Status TfLiteEngine::BuildModelFromFlatBuffer(
   }
   external_file_ = std::make_unique<ExternalFile>();
   external_file_->set_file_content(std::string(buffer_data, buffer_size));
-  ASSIGN_OR_RETURN(
-      model_file_handler_,
-      ExternalFileHandler::CreateFromExternalFile(external_file_.get()));
+  RETURN_IF_ERROR(CreateModelFileHandler(external_file_.get()));
   return InitializeFromModelFileHandler(compute_settings);
 }
 
@@ -160,9 +198,7 @@ absl::Status TfLiteEngine::BuildModelFromFile(
     external_file_ = std::make_unique<ExternalFile>();
   }
   external_file_->set_file_name(file_name);
-  ASSIGN_OR_RETURN(
-      model_file_handler_,
-      ExternalFileHandler::CreateFromExternalFile(external_file_.get()));
+  RETURN_IF_ERROR(CreateModelFileHandler(external_file_.get()));
   return InitializeFromModelFileHandler(compute_settings);
 }
 
@@ -177,9 +213,7 @@ absl::Status TfLiteEngine::BuildModelFromFileDescriptor(
     external_file_ = std::make_unique<ExternalFile>();
   }
   external_file_->mutable_file_descriptor_meta()->set_fd(file_descriptor);
-  ASSIGN_OR_RETURN(
-      model_file_handler_,
-      ExternalFileHandler::CreateFromExternalFile(external_file_.get()));
+  RETURN_IF_ERROR(CreateModelFileHandler(external_file_.get()));
   return InitializeFromModelFileHandler(compute_settings);
 }
 
@@ -190,8 +224,7 @@ absl::Status TfLiteEngine::BuildModelFromExternalFileProto(
     return CreateStatusWithPayload(StatusCode::kInternal,
                                    "Model already built");
   }
-  ASSIGN_OR_RETURN(model_file_handler_,
-                   ExternalFileHandler::CreateFromExternalFile(external_file));
+  RETURN_IF_ERROR(CreateModelFileHandler(external_file));
   return InitializeFromModelFileHandler(compute_settings);
 }
 
@@ -202,14 +235,56 @@ absl::Status TfLiteEngine::BuildModelFromExternalFileProto(
                                    "Model already built");
   }
   external_file_ = std::move(external_file);
-  ASSIGN_OR_RETURN(
-      model_file_handler_,
-      ExternalFileHandler::CreateFromExternalFile(external_file_.get()));
+  RETURN_IF_ERROR(CreateModelFileHandler(external_file_.get()));
   // Dummy proto. InitializeFromModelFileHandler doesn't use this proto.
   tflite::proto::ComputeSettings compute_settings;
   return InitializeFromModelFileHandler(compute_settings);
 }
 
+absl::Status TfLiteEngine::BuildModelFromModelCache(
+    const ExternalFile& external_file, ModelCache* model_cache) {
+  if (model_) {
+    return CreateStatusWithPayload(StatusCode::kInternal,
+                                   "Model already built");
+  }
+  absl::Time start = absl::Now();
+  auto load = [this](const ExternalFile& external_file)
+      -> tflite::support::StatusOr<std::shared_ptr<SharedModelFile>> {
+    RETURN_IF_ERROR(BuildModelFromExternalFileProto(
+        std::make_unique<ExternalFile>(external_file)));
+    // Hands the verified model file over to the cache. The model built from
+    // its content is kept by this engine.
+    auto model_file = std::make_shared<SharedModelFile>();
+    model_file->external_file = std::move(external_file_);
+    model_file->file_handler = std::move(model_file_handler_);
+    model_file->metadata_extractor = model_metadata_extractor_;
+    return model_file;
+  };
+  ASSIGN_OR_RETURN(shared_model_file_,
+                   model_cache->GetOrLoad(external_file, load));
+  if (model_ != nullptr) {
+    // This engine loaded the model file, and already recorded its load timing.
+    return absl::OkStatus();
+  }
+
+  // The model file is already verified, so the model is only built from it.
+  load_timing_.model_read = absl::Now() - start;
+  start = absl::Now();
+  absl::string_view content =
+      shared_model_file_->file_handler->GetFileContent();
+  model_ = tflite_shims::FlatBufferModel::BuildFromBuffer(
+      content.data(), content.size(), &error_reporter_);
+  if (model_ == nullptr) {
+    return CreateStatusWithPayload(
+        StatusCode::kInternal,
+        absl::StrCat("Could not build model from the cached model file: ",
+                     error_reporter_.message()));
+  }
+  model_metadata_extractor_ = shared_model_file_->metadata_extractor;
+  load_timing_.model_verification = absl::Now() - start;
+  return absl::OkStatus();
+}
+
 absl::Status TfLiteEngine::InitInterpreter(int num_threads) {
   tflite::proto::ComputeSettings compute_settings;
   compute_settings.mutable_tflite_settings()
@@ -240,11 +315,21 @@ absl::Status TfLiteEngine::InitInterpreter(
         "TF Lite FlatBufferModel is null. Please make sure to call one of the "
         "BuildModelFrom methods before calling InitInterpreter.");
   }
+  const bool disable_default_delegates =
+      compute_settings.tflite_settings().disable_default_delegates();
   auto initializer =
-      [this](const InterpreterCreationResources& resources,
-             std::unique_ptr<Interpreter, InterpreterDeleter>* interpreter_out)
+      [this, disable_default_delegates](
+          const InterpreterCreationResources& resources,
+          std::unique_ptr<Interpreter, InterpreterDeleter>* interpreter_out)
       -> absl::Status {
-    tflite_shims::InterpreterBuilder interpreter_builder(*model_, *resolver_);
+    OpResolverWithoutDefaultDelegates resolver_without_default_delegates(
+        resolver_.get());
+    const tflite::OpResolver& resolver =
+        disable_default_delegates
+            ? static_cast<const tflite::OpResolver&>(
+                  resolver_without_default_delegates)
+            : *resolver_;
+    tflite_shims::InterpreterBuilder interpreter_builder(*model_, resolver);
     resources.ApplyTo(&interpreter_builder);
     if (interpreter_builder(interpreter_out) != kTfLiteOk) {
       return CreateStatusWithPayload(
@@ -259,8 +344,10 @@ absl::Status TfLiteEngine::InitInterpreter(
     return absl::OkStatus();
   };
 
+  absl::Time start = absl::Now();
   absl::Status status =
       interpreter_.InitializeWithFallback(initializer, compute_settings);
+  load_timing_.interpreter_build = absl::Now() - start;
   if (!status.ok()) {
     if (absl::StrContains(error_reporter_.previous_message(),
                           "Encountered unresolved custom op")) {
@@ -280,6 +367,83 @@ absl::Status TfLiteEngine::InitInterpreter(
   return status;
 }
 
+void TfLiteEngine::SetOpProfilingEnabled(bool enabled) {
+  if (!enabled) {
+    if (op_profiler_ != nullptr && interpreter() != nullptr) {
+      interpreter()->SetProfiler(nullptr);
+    }
+    op_profiler_.reset();
+    op_profile_summarizer_.reset();
+  } else if (op_profiler_ == nullptr) {
+    op_profiler_ = absl::make_unique<tflite::profiling::BufferedProfiler>(
+        kMaxProfiledOpEvents);
+    op_profile_summarizer_ =
+        absl::make_unique<tflite::profiling::ProfileSummarizer>();
+  }
+}
+
+void TfLiteEngine::StartOpProfiling() {
+  if (op_profiler_ == nullptr) {
+    return;
+  }
+  // The interpreter may be recreated, e.g. when falling back to CPU, so the
+  // profiler is attached again before each invocation.
+  interpreter()->SetProfiler(op_profiler_.get());
+  op_profiler_->Reset();
+  op_profiler_->StartProfiling();
+}
+
+void TfLiteEngine::StopOpProfiling() {
+  if (op_profiler_ == nullptr) {
+    return;
+  }
+  op_profiler_->StopProfiling();
+  op_profile_summarizer_->ProcessProfiles(op_profiler_->GetProfileEvents(),
+                                          *interpreter());
+}
+
+std::string TfLiteEngine::GetOpProfile() {
+  if (op_profile_summarizer_ == nullptr) {
+    return "";
+  }
+  return op_profile_summarizer_->GetOutputString();
+}
+
+void TfLiteEngine::RecordFirstInvoke(absl::Duration duration) {
+  if (load_timing_.first_invoke_recorded) {
+    return;
+  }
+  load_timing_.first_invoke = duration;
+  load_timing_.first_invoke_recorded = true;
+}
+
+absl::Status TfLiteEngine::FillInputsWithZeros() {
+  if (interpreter() == nullptr) {
+    return CreateStatusWithPayload(
+        StatusCode::kInternal,
+        "TF Lite interpreter is null. Please make sure to call InitInterpreter "
+        "before filling the inputs.");
+  }
+  for (TfLiteTensor* tensor : GetInputs()) {
+    if (tensor->type != kTfLiteString) {
+      if (tensor->data.raw != nullptr) {
+        memset(tensor->data.raw, 0, tensor->bytes);
+      }
+      continue;
+    }
+    int num_elements = 1;
+    for (int i = 0; i < tensor->dims->size; ++i) {
+      num_elements *= tensor->dims->data[i];
+    }
+    tflite::DynamicBuffer buffer;
+    for (int i = 0; i < num_elements; ++i) {
+      buffer.AddString("", 0);
+    }
+    buffer.WriteToTensor(tensor, /*new_shape=*/nullptr);
+  }
+  return absl::OkStatus();
+}
+
 }  // namespace core
 }  // namespace task
 }  // namespace tflite
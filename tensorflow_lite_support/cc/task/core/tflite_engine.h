@@ -21,15 +21,19 @@ limitations under the License.
 #include "absl/memory/memory.h"  // from @com_google_absl
 #include "absl/status/status.h"  // from @com_google_absl
 #include "absl/strings/string_view.h"  // from @com_google_absl
+#include "absl/time/time.h"  // from @com_google_absl
 #include "tensorflow/lite/core/api/op_resolver.h"
 #include "tensorflow/lite/core/shims/c/common.h"
 #include "tensorflow/lite/core/shims/cc/interpreter.h"
 #include "tensorflow/lite/core/shims/cc/kernels/register.h"
 #include "tensorflow/lite/core/shims/cc/model.h"
+#include "tensorflow/lite/profiling/buffered_profiler.h"
+#include "tensorflow/lite/profiling/profile_summarizer.h"
 #include "tensorflow_lite_support/cc/port/configuration_proto_inc.h"
 #include "tensorflow_lite_support/cc/port/tflite_wrapper.h"
 #include "tensorflow_lite_support/cc/task/core/error_reporter.h"
 #include "tensorflow_lite_support/cc/task/core/external_file_handler.h"
+#include "tensorflow_lite_support/cc/task/core/model_cache.h"
 #include "tensorflow_lite_support/cc/task/core/proto/external_file_proto_inc.h"
 #include "tensorflow_lite_support/metadata/cc/metadata_extractor.h"
 
@@ -41,6 +45,22 @@ namespace tflite {
 namespace task {
 namespace core {
 
+// Time spent in each stage of loading a model, up to its first inference.
+struct LoadTiming {
+  // Time spent reading or memory-mapping the model file.
+  absl::Duration model_read;
+  // Time spent verifying the model FlatBuffer, and building the model and its
+  // metadata extractor.
+  absl::Duration model_verification;
+  // Time spent building the interpreter, applying the delegates and allocating
+  // the tensors.
+  absl::Duration interpreter_build;
+  // Time spent in the first `Invoke()` call, which lazily prepares some
+  // delegates and kernels. Only set if `first_invoke_recorded` is true.
+  absl::Duration first_invoke;
+  bool first_invoke_recorded = false;
+};
+
 // TfLiteEngine encapsulates logic for TFLite model initialization, inference
 // and error reporting.
 class TfLiteEngine {
@@ -128,12 +148,22 @@ class TfLiteEngine {
   absl::Status BuildModelFromExternalFileProto(
       std::unique_ptr<ExternalFile> external_file);
 
+  // Builds the TFLite model from the provided ExternalFile proto, sharing the
+  // model file with the other engines built from the same file through
+  // `model_cache`. The model file is only read and verified by the first of
+  // these engines, see `ModelCache`.
+  absl::Status BuildModelFromModelCache(
+      const ExternalFile& external_file,
+      ModelCache* model_cache = ModelCache::GetDefault());
+
   // Initializes interpreter with encapsulated model.
   // Note: setting num_threads to -1 has for effect to let TFLite runtime set
   // the value.
   absl::Status InitInterpreter(int num_threads = 1);
 
   // Initializes interpreter with acceleration configurations.
+  // If `tflite_settings.disable_default_delegates` is true, the default
+  // delegates of the op resolver (i.e. XNNPACK) are not applied.
   absl::Status InitInterpreter(
       const tflite::proto::ComputeSettings& compute_settings);
 
@@ -149,6 +179,44 @@ class TfLiteEngine {
   // running.
   void Cancel() { interpreter_.Cancel(); }
 
+  // Cancels the `Invoke()` calls once `deadline` has passed, until the
+  // deadline is changed. Pass `absl::InfiniteFuture()` to remove the deadline.
+  // This method can be called from a different thread than the one where
+  // `Invoke()` is running.
+  void SetInvokeDeadline(absl::Time deadline) {
+    interpreter_.SetDeadline(deadline);
+  }
+
+  // Enables or disables profiling the ops run by the `Invoke()` calls between
+  // `StartOpProfiling()` and `StopOpProfiling()`. Disabling it discards the
+  // profile gathered so far.
+  void SetOpProfilingEnabled(bool enabled);
+
+  // Starts recording the ops run by the interpreter. No-op if op profiling is
+  // disabled.
+  void StartOpProfiling();
+
+  // Stops recording the ops run by the interpreter, and adds them to the op
+  // profile. No-op if op profiling is disabled.
+  void StopOpProfiling();
+
+  // Returns the per-op profile of all the `Invoke()` calls recorded since op
+  // profiling was enabled, as formatted by the TF Lite profile summarizer, or
+  // an empty string if op profiling is disabled.
+  std::string GetOpProfile();
+
+  // Returns the time spent loading the model, see `LoadTiming`.
+  const LoadTiming& load_timing() const { return load_timing_; }
+
+  // Records the duration of the first `Invoke()` call as part of the load
+  // timing. No-op if it is already recorded.
+  void RecordFirstInvoke(absl::Duration duration);
+
+  // Fills the input tensors with zeros, or with empty strings for string
+  // tensors, so that the interpreter can be invoked without real inputs, e.g.
+  // to warm it up.
+  absl::Status FillInputsWithZeros();
+
  protected:
   // Custom error reporter capturing and printing to stderr low-level TF Lite
   // error messages.
@@ -180,6 +248,10 @@ class TfLiteEngine {
       const tflite::proto::ComputeSettings& compute_settings =
           tflite::proto::ComputeSettings());
 
+  // Sets 'model_file_handler_' to a handler reading or mapping the provided
+  // ExternalFile proto, and records the time it takes.
+  absl::Status CreateModelFileHandler(const ExternalFile* external_file);
+
   // ExternalFile and corresponding ExternalFileHandler for models loaded from
   // disk or file descriptor.
   // Make sure ExternalFile proto outlives the model and the interpreter.
@@ -192,16 +264,30 @@ class TfLiteEngine {
   // Interpreter wrapper built from the model.
   InterpreterWrapper interpreter_;
 
-  // TFLite Metadata extractor built from the model.
-  std::unique_ptr<tflite::metadata::ModelMetadataExtractor>
+  // TFLite Metadata extractor built from the model, which may be shared with
+  // other engines.
+  std::shared_ptr<const tflite::metadata::ModelMetadataExtractor>
       model_metadata_extractor_;
 
+  // Model file shared with other engines, if built from a model cache. The
+  // model is built from its content, so it must outlive the model and the
+  // interpreter.
+  std::shared_ptr<const SharedModelFile> shared_model_file_;
+
   // Mechanism used by TF Lite to map Ops referenced in the FlatBuffer model to
   // actual implementation. Defaults to TF Lite BuiltinOpResolver.
   std::unique_ptr<tflite::OpResolver> resolver_;
 
   // Extra verifier for FlatBuffer input data.
   Verifier verifier_;
+
+  // Profiler of the ops run by the interpreter, and summary of the recorded
+  // ops. Only set if op profiling is enabled.
+  std::unique_ptr<tflite::profiling::BufferedProfiler> op_profiler_;
+  std::unique_ptr<tflite::profiling::ProfileSummarizer> op_profile_summarizer_;
+
+  // Time spent loading the model.
+  LoadTiming load_timing_;
 };
 
 }  // namespace core
@@ -17,9 +17,14 @@ limitations under the License.
 
 #include <algorithm>
 #include <cstdint>
+#include <cstring>
+#include <deque>
+#include <functional>
 #include <initializer_list>
 #include <limits>
 #include <memory>
+#include <thread>  // NOLINT(build/c++11)
+#include <tuple>
 #include <vector>
 
 #include "tensorflow_lite_support/scann_ondevice/cc/core/partitioner.h"
@@ -31,6 +36,8 @@ limitations under the License.
 #include "absl/status/status.h"  // from @com_google_absl
 #include "absl/strings/str_format.h"  // from @com_google_absl
 #include "absl/strings/string_view.h"  // from @com_google_absl
+#include "absl/synchronization/blocking_counter.h"  // from @com_google_absl
+#include "absl/synchronization/mutex.h"  // from @com_google_absl
 #include "absl/types/span.h"  // from @com_google_absl
 #include "tensorflow_lite_support/cc/common.h"
 #include "tensorflow_lite_support/cc/port/status_macros.h"
@@ -50,9 +57,9 @@ namespace {
 
 constexpr int kNoNeighborId = -1;
 
-using ::tflite::scann_ondevice::core::AsymmetricHashFindNeighbors;
+using ::tflite::scann_ondevice::core::AsymmetricHashFindNeighborsWithFilter;
 using ::tflite::scann_ondevice::core::DistanceMeasure;
-using ::tflite::scann_ondevice::core::FloatFindNeighbors;
+using ::tflite::scann_ondevice::core::FloatFindNeighborsWithFilter;
 using ::tflite::scann_ondevice::core::QueryInfo;
 using ::tflite::scann_ondevice::core::ScannOnDeviceConfig;
 using ::tflite::scann_ondevice::core::TopN;
@@ -75,6 +82,42 @@ absl::Status SanityCheckOptions(const SearchOptions& options) {
                         options.max_results()),
         TfLiteSupportStatus::kInvalidArgumentError);
   }
+  if (options.has_index_file() && options.index_file_shards_size() > 0) {
+    return CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        "SearchOptions.index_file and SearchOptions.index_file_shards are "
+        "mutually exclusive.",
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  if (options.has_num_leaves_to_search() &&
+      options.num_leaves_to_search() < 1) {
+    return CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        absl::StrFormat("SearchOptions.num_leaves_to_search must be > 0, found "
+                        "%d.",
+                        options.num_leaves_to_search()),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  if (options.num_threads() == 0 || options.num_threads() < -1) {
+    return CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        absl::StrFormat("SearchOptions.num_threads must be > 0 or -1, found "
+                        "%d.",
+                        options.num_threads()),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  return absl::OkStatus();
+}
+
+absl::Status SanityCheckAttributeFilter(const SearchOptions& options,
+                                        const IndexConfig& config) {
+  if (options.has_attribute_filter() && !config.has_attributes()) {
+    return CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        "SearchOptions.attribute_filter is set but the index doesn't contain "
+        "any attributes.",
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
   return absl::OkStatus();
 }
 
@@ -170,6 +213,62 @@ absl::Status ConvertEmbeddingToEigenMatrix(const Embedding& embedding,
 
 }  // namespace
 
+class EmbeddingSearcher::ThreadPool {
+ public:
+  explicit ThreadPool(int num_threads) {
+    threads_.reserve(num_threads);
+    for (int i = 0; i < num_threads; ++i) {
+      threads_.emplace_back([this] { Work(); });
+    }
+  }
+
+  // Waits for the scheduled tasks to complete, and joins the threads.
+  ~ThreadPool() {
+    {
+      absl::MutexLock lock(&mutex_);
+      done_ = true;
+    }
+    for (auto& thread : threads_) {
+      thread.join();
+    }
+  }
+
+  void Schedule(std::function<void()> task) {
+    absl::MutexLock lock(&mutex_);
+    tasks_.push_back(std::move(task));
+  }
+
+ private:
+  void Work() {
+    while (true) {
+      std::function<void()> task;
+      {
+        absl::MutexLock lock(&mutex_);
+        mutex_.Await(absl::Condition(this, &ThreadPool::HasTaskOrDone));
+        if (tasks_.empty()) {
+          return;
+        }
+        task = std::move(tasks_.front());
+        tasks_.pop_front();
+      }
+      task();
+    }
+  }
+
+  bool HasTaskOrDone() const ABSL_EXCLUSIVE_LOCKS_REQUIRED(mutex_) {
+    return done_ || !tasks_.empty();
+  }
+
+  absl::Mutex mutex_;
+  std::deque<std::function<void()>> tasks_ ABSL_GUARDED_BY(mutex_);
+  bool done_ ABSL_GUARDED_BY(mutex_) = false;
+  std::vector<std::thread> threads_;
+};
+
+EmbeddingSearcher::EmbeddingSearcher() = default;
+
+EmbeddingSearcher::~EmbeddingSearcher() = default;
+
 /* static */
 StatusOr<std::unique_ptr<EmbeddingSearcher>> EmbeddingSearcher::Create(
     std::unique_ptr<SearchOptions> search_options,
@@ -187,45 +286,83 @@ StatusOr<SearchResult> EmbeddingSearcher::Search(const Embedding& embedding) {
   Eigen::MatrixXf query;
   RETURN_IF_ERROR(ConvertEmbeddingToEigenMatrix(embedding, &query));
 
-  // Identify partitions to search.
-  std::vector<std::vector<int>> leaves_to_search(
-      1, std::vector<int>(num_leaves_to_search_, -1));
-  if (!partitioner_->Partition(query, &leaves_to_search)) {
-    return CreateStatusWithPayload(absl::StatusCode::kInternal,
-                                   "Partitioning failed.",
-                                   TfLiteSupportStatus::kError);
+  // Prepare per-shard search results.
+  std::vector<TopN> top_n;
+  top_n.reserve(shards_.size());
+  for (int i = 0; i < shards_.size(); ++i) {
+    top_n.emplace_back(
+        options_->max_results(),
+        std::make_pair(std::numeric_limits<float>::max(), kNoNeighborId));
   }
 
-  // Prepare search results.
-  std::vector<TopN> top_n;
-  top_n.emplace_back(
-      options_->max_results(),
-      std::make_pair(std::numeric_limits<float>::max(), kNoNeighborId));
-  // Perform search.
-  if (quantizer_) {
-    RETURN_IF_ERROR(
-        QuantizedSearch(query, leaves_to_search[0], absl::MakeSpan(top_n)));
-  } else {
-    RETURN_IF_ERROR(
-        LinearSearch(query, leaves_to_search[0], absl::MakeSpan(top_n)));
+  // Perform search. Shards are distributed round-robin over the threads, the
+  // calling thread being used as one of them.
+  std::vector<absl::Status> statuses(shards_.size());
+  auto search_shards = [&](int first_shard) {
+    for (int i = first_shard; i < shards_.size(); i += num_threads_) {
+      statuses[i] = SearchShard(*shards_[i], query,
+                                absl::MakeSpan(&top_n[i], 1));
+    }
+  };
+  absl::BlockingCounter pending_threads(num_threads_ - 1);
+  for (int t = 1; t < num_threads_; ++t) {
+    thread_pool_->Schedule([&, t] {
+      search_shards(t);
+      pending_threads.DecrementCount();
+    });
+  }
+  search_shards(0);
+  pending_threads.Wait();
+  for (const auto& status : statuses) {
+    RETURN_IF_ERROR(status);
+  }
+
+  // Merge per-shard results, as (distance, shard, id) tuples.
+  std::vector<std::tuple<float, int, int>> neighbors;
+  for (int i = 0; i < shards_.size(); ++i) {
+    for (const auto& [distance, id] : top_n[i].Take()) {
+      if (id == kNoNeighborId) {
+        break;
+      }
+      neighbors.emplace_back(distance, i, id);
+    }
+  }
+  std::sort(neighbors.begin(), neighbors.end());
+  if (neighbors.size() > options_->max_results()) {
+    neighbors.resize(options_->max_results());
   }
 
   // Build results.
   SearchResult search_result;
-  for (const auto& [distance, id] : top_n[0].Take()) {
-    if (id == kNoNeighborId) {
-      break;
-    }
-    ASSIGN_OR_RETURN(auto metadata, index_->GetMetadataAtIndex(id));
+  for (const auto& [distance, shard, id] : neighbors) {
     NearestNeighbor* nearest_neighbor = search_result.add_nearest_neighbors();
     nearest_neighbor->set_distance(distance);
-    nearest_neighbor->set_metadata(std::string(metadata));
+    if (options_->lazy_metadata()) {
+      nearest_neighbor->set_index((static_cast<int64_t>(shard) << 32) | id);
+    } else {
+      ASSIGN_OR_RETURN(auto metadata,
+                       shards_[shard]->index->GetMetadataAtIndex(id));
+      nearest_neighbor->set_metadata(std::string(metadata));
+    }
   }
   return search_result;
 }
 
+StatusOr<absl::string_view> EmbeddingSearcher::GetMetadata(int64_t index) {
+  // The shard is stored in the upper 32 bits, the id in the lower 32 bits.
+  const int64_t shard = index >> 32;
+  if (index < 0 || shard >= shards_.size()) {
+    return CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        absl::StrFormat("Invalid nearest neighbor index: %d.", index),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  return shards_[shard]->index->GetMetadataAtIndex(
+      static_cast<uint32_t>(index & 0xFFFFFFFF));
+}
+
 StatusOr<absl::string_view> EmbeddingSearcher::GetUserInfo() {
-  return index_->GetUserInfo();
+  return shards_[0]->index->GetUserInfo();
 }
 
 absl::Status EmbeddingSearcher::Init(
@@ -233,14 +370,29 @@ absl::Status EmbeddingSearcher::Init(
     std::optional<absl::string_view> optional_index_file_content) {
   RETURN_IF_ERROR(SanityCheckOptions(*options));
   options_ = std::move(options);
-
-  // Initialize index.
-  absl::string_view index_file_content;
-  if (options_->has_index_file()) {
+  num_threads_ = options_->num_threads() == -1
+                     ? options_->index_file_shards_size()
+                     : options_->num_threads();
+  num_threads_ = std::max(num_threads_, 1);
+
+  // Initialize index shards.
+  if (options_->index_file_shards_size() > 0) {
+    for (const auto& index_file : options_->index_file_shards()) {
+      auto shard = std::make_unique<Shard>();
+      ASSIGN_OR_RETURN(shard->index_file_handler,
+                       ExternalFileHandler::CreateFromExternalFile(&index_file));
+      RETURN_IF_ERROR(
+          InitShard(shard->index_file_handler->GetFileContent(), shard.get()));
+      shards_.push_back(std::move(shard));
+    }
+  } else if (options_->has_index_file()) {
+    auto shard = std::make_unique<Shard>();
     ASSIGN_OR_RETURN(
-        index_file_handler_,
+        shard->index_file_handler,
         ExternalFileHandler::CreateFromExternalFile(&options_->index_file()));
-    index_file_content = index_file_handler_->GetFileContent();
+    RETURN_IF_ERROR(
+        InitShard(shard->index_file_handler->GetFileContent(), shard.get()));
+    shards_.push_back(std::move(shard));
   } else {
     if (!optional_index_file_content) {
       absl::Status status = CreateStatusWithPayload(
@@ -249,62 +401,172 @@ absl::Status EmbeddingSearcher::Init(
       LOG(ERROR) << "EmbeddingSearcher: " << status;
       return status;
     }
-    index_file_content = *optional_index_file_content;
+    auto shard = std::make_unique<Shard>();
+    RETURN_IF_ERROR(InitShard(*optional_index_file_content, shard.get()));
+    shards_.push_back(std::move(shard));
+  }
+  // There is no use for more threads than shards.
+  num_threads_ = std::min(num_threads_, static_cast<int>(shards_.size()));
+  if (num_threads_ > 1) {
+    thread_pool_ = std::make_unique<ThreadPool>(num_threads_ - 1);
   }
-  ASSIGN_OR_RETURN(index_,
+
+  // Results from different shards must be comparable.
+  for (const auto& shard : shards_) {
+    if (shard->index_config.embedding_dim() !=
+            shards_[0]->index_config.embedding_dim() ||
+        shard->distance_measure != shards_[0]->distance_measure) {
+      return CreateStatusWithPayload(
+          absl::StatusCode::kInvalidArgument,
+          "All index shards must have the same embedding dimension and "
+          "distance measure.",
+          TfLiteSupportStatus::kInvalidArgumentError);
+    }
+  }
+
+  if (options_->has_attribute_filter()) {
+    use_attribute_filter_ = true;
+    allowed_values_.assign(options_->attribute_filter().allowed_values().begin(),
+                           options_->attribute_filter().allowed_values().end());
+    std::sort(allowed_values_.begin(), allowed_values_.end());
+  }
+
+  return absl::OkStatus();
+}
+
+absl::Status EmbeddingSearcher::InitShard(absl::string_view index_file_content,
+                                          Shard* shard) {
+  ASSIGN_OR_RETURN(shard->index,
                    Index::CreateFromIndexBuffer(index_file_content.data(),
                                                 index_file_content.size()));
-  ASSIGN_OR_RETURN(index_config_, index_->GetIndexConfig());
-  RETURN_IF_ERROR(SanityCheckIndexConfig(index_config_));
+  ASSIGN_OR_RETURN(shard->index_config, shard->index->GetIndexConfig());
+  const IndexConfig& index_config = shard->index_config;
+  RETURN_IF_ERROR(SanityCheckIndexConfig(index_config));
+  RETURN_IF_ERROR(SanityCheckAttributeFilter(*options_, index_config));
   // Get distance measure once and for all.
-  ASSIGN_OR_RETURN(distance_measure_,
-                   GetDistanceMeasure(index_config_.scann_config()));
+  ASSIGN_OR_RETURN(shard->distance_measure,
+                   GetDistanceMeasure(index_config.scann_config()));
 
   // Initialize partitioner.
-  if (index_config_.scann_config().has_partitioner()) {
-    partitioner_ = tflite::scann_ondevice::core::Partitioner::Create(
-        index_config_.scann_config().partitioner());
-    num_leaves_to_search_ = std::min(
+  if (index_config.scann_config().has_partitioner()) {
+    shard->partitioner = tflite::scann_ondevice::core::Partitioner::Create(
+        index_config.scann_config().partitioner());
+    shard->num_leaves_to_search = std::min(
         static_cast<int>(ceilf(
-            partitioner_->NumPartitions() *
-            index_config_.scann_config().partitioner().search_fraction())),
-        partitioner_->NumPartitions());
+            shard->partitioner->NumPartitions() *
+            index_config.scann_config().partitioner().search_fraction())),
+        shard->partitioner->NumPartitions());
   } else {
-    partitioner_ = absl::make_unique<tflite::scann_ondevice::core::NoOpPartitioner>();
-    num_leaves_to_search_ = partitioner_->NumPartitions();
+    shard->partitioner =
+        absl::make_unique<tflite::scann_ondevice::core::NoOpPartitioner>();
+    shard->num_leaves_to_search = shard->partitioner->NumPartitions();
+  }
+  if (options_->has_num_leaves_to_search()) {
+    shard->num_leaves_to_search =
+        std::min(options_->num_leaves_to_search(),
+                 shard->partitioner->NumPartitions());
   }
 
   // Initialize product quantizer if needed.
-  if (index_config_.scann_config().has_indexer()) {
-    quantizer_ = tflite::scann_ondevice::core::AsymmetricHashQuerier::Create(
-        index_config_.scann_config().indexer().asymmetric_hashing());
+  if (index_config.scann_config().has_indexer()) {
+    shard->quantizer =
+        tflite::scann_ondevice::core::AsymmetricHashQuerier::Create(
+            index_config.scann_config().indexer().asymmetric_hashing());
+  }
+
+  return absl::OkStatus();
+}
+
+absl::Status EmbeddingSearcher::SearchShard(const Shard& shard,
+                                            Eigen::Ref<Eigen::MatrixXf> query,
+                                            absl::Span<TopN> top_n) {
+  // Identify partitions to search.
+  std::vector<std::vector<int>> leaves_to_search(
+      1, std::vector<int>(shard.num_leaves_to_search, -1));
+  if (!shard.partitioner->Partition(query, &leaves_to_search)) {
+    return CreateStatusWithPayload(absl::StatusCode::kInternal,
+                                   "Partitioning failed.",
+                                   TfLiteSupportStatus::kError);
+  }
+
+  if (shard.quantizer) {
+    return QuantizedSearch(shard, query, leaves_to_search[0], top_n);
+  } else {
+    return LinearSearch(shard, query, leaves_to_search[0], top_n);
   }
+}
 
+bool EmbeddingSearcher::MatchesAttributeFilter(uint64_t attribute) const {
+  const AttributeFilter& filter = options_->attribute_filter();
+  if (!allowed_values_.empty() &&
+      !std::binary_search(allowed_values_.begin(), allowed_values_.end(),
+                          attribute)) {
+    return false;
+  }
+  if ((attribute & filter.all_of_bits()) != filter.all_of_bits()) {
+    return false;
+  }
+  if (filter.any_of_bits() != 0 && (attribute & filter.any_of_bits()) == 0) {
+    return false;
+  }
+  return (attribute & filter.none_of_bits()) == 0;
+}
+
+absl::Status EmbeddingSearcher::LoadLeafAttributes(
+    const Shard& shard, int leaf_id, int partition_size,
+    std::vector<uint64_t>* attributes) {
+  if (!use_attribute_filter_) {
+    return absl::OkStatus();
+  }
+  ASSIGN_OR_RETURN(auto raw_attributes,
+                   shard.index->GetAttributesAtIndex(leaf_id));
+  if (raw_attributes.size() != partition_size * sizeof(uint64_t)) {
+    return CreateStatusWithPayload(
+        absl::StatusCode::kInternal,
+        absl::StrFormat("Invalid index: found %d bytes of attributes for a "
+                        "partition of %d embeddings.",
+                        raw_attributes.size(), partition_size),
+        TfLiteSupportStatus::kError);
+  }
+  // Copy the attributes as the underlying buffer is not guaranteed to be
+  // suitably aligned for uint64_t.
+  attributes->resize(partition_size);
+  std::memcpy(attributes->data(), raw_attributes.data(), raw_attributes.size());
   return absl::OkStatus();
 }
 
 absl::Status EmbeddingSearcher::QuantizedSearch(
-    Eigen::Ref<Eigen::MatrixXf> query, std::vector<int> leaves_to_search,
-    absl::Span<TopN> top_n) {
-  int dim = index_config_.embedding_dim();
+    const Shard& shard, Eigen::Ref<Eigen::MatrixXf> query,
+    std::vector<int> leaves_to_search, absl::Span<TopN> top_n) {
+  int dim = shard.index_config.embedding_dim();
   // Prepare QueryInfo used for all leaves.
   QueryInfo query_info;
-  if (!quantizer_->Process(query, &query_info)) {
+  if (!shard.quantizer->Process(query, &query_info)) {
     return CreateStatusWithPayload(absl::StatusCode::kInternal,
                                    "Query quantization failed.",
                                    TfLiteSupportStatus::kError);
   }
   for (int leaf_id : leaves_to_search) {
     // Load partition into Eigen matrix.
-    ASSIGN_OR_RETURN(auto partition, index_->GetPartitionAtIndex(leaf_id));
+    ASSIGN_OR_RETURN(auto partition,
+                     shard.index->GetPartitionAtIndex(leaf_id));
     int partition_size = partition.size() / dim;
     Eigen::Map<const Matrix8u> database(
         reinterpret_cast<const uint8_t*>(partition.data()), dim,
         partition_size);
+    // Load attributes, if needed.
+    std::vector<uint64_t> attributes;
+    RETURN_IF_ERROR(
+        LoadLeafAttributes(shard, leaf_id, partition_size, &attributes));
     // Perform search.
-    int global_offset = index_config_.global_partition_offsets(leaf_id);
-    if (!AsymmetricHashFindNeighbors(query_info, database, global_offset,
-                                     top_n)) {
+    int global_offset = shard.index_config.global_partition_offsets(leaf_id);
+    if (!AsymmetricHashFindNeighborsWithFilter(
+            query_info, database, global_offset,
+            [&](int i) {
+              return !use_attribute_filter_ ||
+                     MatchesAttributeFilter(attributes[i]);
+            },
+            top_n)) {
       return CreateStatusWithPayload(absl::StatusCode::kInternal,
                                      "Nearest neighbor search failed.",
                                      TfLiteSupportStatus::kError);
@@ -313,20 +575,31 @@ absl::Status EmbeddingSearcher::QuantizedSearch(
   return absl::OkStatus();
 }
 
-absl::Status EmbeddingSearcher::LinearSearch(Eigen::Ref<Eigen::MatrixXf> query,
+absl::Status EmbeddingSearcher::LinearSearch(const Shard& shard,
+                                             Eigen::Ref<Eigen::MatrixXf> query,
                                              std::vector<int> leaves_to_search,
                                              absl::Span<TopN> top_n) {
-  int dim = index_config_.embedding_dim();
+  int dim = shard.index_config.embedding_dim();
   for (int leaf_id : leaves_to_search) {
     // Load partition into Eigen matrix.
-    ASSIGN_OR_RETURN(auto partition, index_->GetPartitionAtIndex(leaf_id));
+    ASSIGN_OR_RETURN(auto partition,
+                     shard.index->GetPartitionAtIndex(leaf_id));
     int partition_size = partition.size() / (dim * sizeof(float));
     Eigen::Map<const Eigen::MatrixXf> database(
         reinterpret_cast<const float*>(partition.data()), dim, partition_size);
+    // Load attributes, if needed.
+    std::vector<uint64_t> attributes;
+    RETURN_IF_ERROR(
+        LoadLeafAttributes(shard, leaf_id, partition_size, &attributes));
     // Perform search.
-    int global_offset = index_config_.global_partition_offsets(leaf_id);
-    if (!FloatFindNeighbors(query, database, global_offset, distance_measure_,
-                            top_n)) {
+    int global_offset = shard.index_config.global_partition_offsets(leaf_id);
+    if (!FloatFindNeighborsWithFilter(
+            query, database, global_offset, shard.distance_measure,
+            [&](int i) {
+              return !use_attribute_filter_ ||
+                     MatchesAttributeFilter(attributes[i]);
+            },
+            top_n)) {
       return CreateStatusWithPayload(absl::StatusCode::kInternal,
                                      "Nearest neighbor search failed.",
                                      TfLiteSupportStatus::kError);
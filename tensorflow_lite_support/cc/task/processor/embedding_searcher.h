@@ -42,16 +42,17 @@ namespace processor {
 // A utility class for performing nearest-neighbor search on embedding results.
 class EmbeddingSearcher {
  public:
-  EmbeddingSearcher() = default;
-  virtual ~EmbeddingSearcher() = default;
+  EmbeddingSearcher();
+  virtual ~EmbeddingSearcher();
   // Neither copyable or movable.
   EmbeddingSearcher(const EmbeddingSearcher&) = delete;
   EmbeddingSearcher& operator=(const EmbeddingSearcher&) = delete;
 
   /** The factory method for EmbeddingSearcher.
    *  @param search_options              The search options.
-   *  @param optional_index_file_content Required when index_file option is not
-   *                                     provided in search_options.
+   *  @param optional_index_file_content Required when neither index_file nor
+   *                                     index_file_shards options are provided
+   *                                     in search_options.
    */
   static tflite::support::StatusOr<std::unique_ptr<EmbeddingSearcher>> Create(
       std::unique_ptr<SearchOptions> search_options,
@@ -59,38 +60,87 @@ class EmbeddingSearcher {
           std::nullopt);
 
   // Performs a nearest-neighbor search in the index on the provided embedding.
+  // If `SearchOptions.lazy_metadata` is true, the metadata of the nearest
+  // neighbors is left unset and their `index` is set instead.
   absl::StatusOr<SearchResult> Search(
       const ::tflite::task::processor::Embedding& embedding);
 
+  // Fetches the metadata of the nearest neighbor identified by `index`, as
+  // returned in `NearestNeighbor.index` when `SearchOptions.lazy_metadata` is
+  // true.
+  tflite::support::StatusOr<absl::string_view> GetMetadata(int64_t index);
+
   // Provides access to the opaque user info stored in the index file (if any),
   // in raw binary form. Returns an empty string if the index doesn't contain
-  // user info.
+  // user info. If the index is sharded, the user info of the first shard is
+  // returned.
   tflite::support::StatusOr<absl::string_view> GetUserInfo();
 
  private:
+  // A fixed-size pool of threads, on which the index shards are searched.
+  class ThreadPool;
+
+  // The state associated with one index file. A searcher is made of a single
+  // shard, unless `SearchOptions.index_file_shards` is used.
+  struct Shard {
+    // Index management.
+    std::unique_ptr<tflite::task::core::ExternalFileHandler> index_file_handler;
+    std::unique_ptr<tflite::scann_ondevice::Index> index;
+    tflite::scann_ondevice::IndexConfig index_config;
+
+    // ScaNN management.
+    int num_leaves_to_search;
+    tflite::scann_ondevice::core::DistanceMeasure distance_measure;
+    std::unique_ptr<tflite::scann_ondevice::core::PartitionerInterface>
+        partitioner;
+    std::shared_ptr<tflite::scann_ondevice::core::AsymmetricHashQuerier>
+        quantizer;
+  };
+
   absl::Status Init(
       std::unique_ptr<SearchOptions> options,
       std::optional<absl::string_view> optional_index_file_content);
 
-  absl::Status QuantizedSearch(Eigen::Ref<Eigen::MatrixXf> query,
+  // Initializes the provided shard from the index file contents, which must
+  // outlive this object.
+  absl::Status InitShard(absl::string_view index_file_content, Shard* shard);
+
+  // Performs a nearest-neighbor search in a single shard.
+  absl::Status SearchShard(const Shard& shard,
+                           Eigen::Ref<Eigen::MatrixXf> query,
+                           absl::Span<tflite::scann_ondevice::core::TopN> top_n);
+
+  // Returns true if the provided attribute value satisfies the
+  // `attribute_filter` set in the search options.
+  bool MatchesAttributeFilter(uint64_t attribute) const;
+
+  // Loads the attributes of the provided leaf, if attribute filtering is
+  // enabled. Otherwise, leaves `attributes` empty.
+  absl::Status LoadLeafAttributes(const Shard& shard, int leaf_id,
+                                  int partition_size,
+                                  std::vector<uint64_t>* attributes);
+
+  absl::Status QuantizedSearch(const Shard& shard,
+                               Eigen::Ref<Eigen::MatrixXf> query,
                                std::vector<int> leaves_to_search,
                                absl::Span<tflite::scann_ondevice::core::TopN> top_n);
-  absl::Status LinearSearch(Eigen::Ref<Eigen::MatrixXf> query,
+  absl::Status LinearSearch(const Shard& shard,
+                            Eigen::Ref<Eigen::MatrixXf> query,
                             std::vector<int> leaves_to_search,
                             absl::Span<tflite::scann_ondevice::core::TopN> top_n);
 
   std::unique_ptr<SearchOptions> options_;
 
-  // Index management.
-  std::unique_ptr<tflite::task::core::ExternalFileHandler> index_file_handler_;
-  std::unique_ptr<tflite::scann_ondevice::Index> index_;
-  tflite::scann_ondevice::IndexConfig index_config_;
+  // Index shards, searched in parallel using up to `num_threads_` threads:
+  // the calling thread and the `num_threads_ - 1` threads of `thread_pool_`,
+  // which are created once and for all with the searcher.
+  std::vector<std::unique_ptr<Shard>> shards_;
+  int num_threads_;
+  std::unique_ptr<ThreadPool> thread_pool_;
 
-  // ScaNN management.
-  int num_leaves_to_search_;
-  tflite::scann_ondevice::core::DistanceMeasure distance_measure_;
-  std::unique_ptr<tflite::scann_ondevice::core::PartitionerInterface> partitioner_;
-  std::shared_ptr<tflite::scann_ondevice::core::AsymmetricHashQuerier> quantizer_;
+  // Attribute filtering. `allowed_values_` is kept sorted for fast lookups.
+  bool use_attribute_filter_ = false;
+  std::vector<uint64_t> allowed_values_;
 };
 
 }  // namespace processor
@@ -0,0 +1,234 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "tensorflow_lite_support/cc/task/processor/embedding_similarity.h"
+
+#include <algorithm>
+#include <cstdint>
+#include <functional>
+#include <numeric>
+#include <thread>  // NOLINT(build/c++11)
+#include <vector>
+
+#include "Eigen/Core"  // from @eigen
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/str_format.h"  // from @com_google_absl
+#include "absl/types/span.h"  // from @com_google_absl
+#include "tensorflow_lite_support/cc/common.h"
+#include "tensorflow_lite_support/cc/port/status_macros.h"
+
+namespace tflite {
+namespace task {
+namespace processor {
+
+namespace {
+
+using ::tflite::support::CreateStatusWithPayload;
+using ::tflite::support::TfLiteSupportStatus;
+
+using RowMajorMatrixXf =
+    Eigen::Matrix<float, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor>;
+
+// Number of rows of `a` processed at once. Each block yields a
+// [kRowBlockSize, m] matrix of similarities.
+constexpr int kRowBlockSize = 64;
+
+absl::Status SanityCheckInputs(size_t a_size, size_t b_size, int dim) {
+  if (dim <= 0) {
+    return CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        absl::StrFormat("Embedding dimension must be > 0, found %d.", dim),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  if (a_size % dim != 0 || b_size % dim != 0) {
+    return CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        absl::StrFormat("Input sizes (%d and %d) must be multiples of the "
+                        "embedding dimension (%d).",
+                        a_size, b_size, dim),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  return absl::OkStatus();
+}
+
+// Converts `num_rows` rows of `data` to float and L2-normalizes them.
+template <typename T>
+absl::Status NormalizeRows(const T* data, int num_rows, int dim,
+                           RowMajorMatrixXf* output) {
+  *output = Eigen::Map<const Eigen::Matrix<T, Eigen::Dynamic, Eigen::Dynamic,
+                                            Eigen::RowMajor>>(data, num_rows,
+                                                              dim)
+                .template cast<float>();
+  Eigen::VectorXf norms = output->rowwise().norm();
+  if ((norms.array() <= 0.0f).any()) {
+    return CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        "Cannot compute cosine similarity on feature vector with 0 norm",
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  output->array().colwise() /= norms.array();
+  return absl::OkStatus();
+}
+
+// Calls `fn(first_row, num_rows)` on each block of `kRowBlockSize` rows in
+// [0, total_rows). Blocks are distributed round-robin over the threads, the
+// calling thread being used as one of them.
+absl::Status ParallelForRowBlocks(
+    int total_rows, int num_threads,
+    const std::function<absl::Status(int, int)>& fn) {
+  const int num_blocks = (total_rows + kRowBlockSize - 1) / kRowBlockSize;
+  if (num_threads == -1) {
+    num_threads = std::thread::hardware_concurrency();
+  }
+  num_threads = std::max(1, std::min(num_threads, num_blocks));
+  std::vector<absl::Status> statuses(num_threads);
+  auto process_blocks = [&](int t) {
+    for (int block = t; block < num_blocks; block += num_threads) {
+      const int first_row = block * kRowBlockSize;
+      statuses[t] =
+          fn(first_row, std::min(kRowBlockSize, total_rows - first_row));
+      if (!statuses[t].ok()) {
+        return;
+      }
+    }
+  };
+  std::vector<std::thread> threads;
+  threads.reserve(num_threads - 1);
+  for (int t = 1; t < num_threads; ++t) {
+    threads.emplace_back(process_blocks, t);
+  }
+  process_blocks(0);
+  for (auto& thread : threads) {
+    thread.join();
+  }
+  for (const auto& status : statuses) {
+    RETURN_IF_ERROR(status);
+  }
+  return absl::OkStatus();
+}
+
+}  // namespace
+
+template <typename T>
+absl::Status CosineSimilarityMatrix(absl::Span<const T> a,
+                                    absl::Span<const T> b, int dim,
+                                    int num_threads, absl::Span<float> output) {
+  RETURN_IF_ERROR(SanityCheckInputs(a.size(), b.size(), dim));
+  const int n = a.size() / dim;
+  const int m = b.size() / dim;
+  if (output.size() != static_cast<size_t>(n) * m) {
+    return CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        absl::StrFormat("Expected output of size %d, found %d.",
+                        static_cast<size_t>(n) * m, output.size()),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  if (n == 0 || m == 0) {
+    return absl::OkStatus();
+  }
+  RowMajorMatrixXf b_normalized;
+  RETURN_IF_ERROR(NormalizeRows(b.data(), m, dim, &b_normalized));
+  return ParallelForRowBlocks(
+      n, num_threads, [&](int first_row, int num_rows) -> absl::Status {
+        RowMajorMatrixXf a_block;
+        RETURN_IF_ERROR(NormalizeRows(
+            a.data() + static_cast<size_t>(first_row) * dim, num_rows, dim,
+            &a_block));
+        Eigen::Map<RowMajorMatrixXf> output_block(
+            output.data() + static_cast<size_t>(first_row) * m, num_rows, m);
+        output_block.noalias() = a_block * b_normalized.transpose();
+        return absl::OkStatus();
+      });
+}
+
+template <typename T>
+absl::Status TopKCosineSimilarity(absl::Span<const T> a, absl::Span<const T> b,
+                                  int dim, int k, int num_threads,
+                                  absl::Span<int64_t> indices,
+                                  absl::Span<float> scores) {
+  RETURN_IF_ERROR(SanityCheckInputs(a.size(), b.size(), dim));
+  if (k < 1) {
+    return CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        absl::StrFormat("k must be > 0, found %d.", k),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  const int n = a.size() / dim;
+  const int m = b.size() / dim;
+  k = std::min(k, m);
+  if (indices.size() != static_cast<size_t>(n) * k ||
+      scores.size() != static_cast<size_t>(n) * k) {
+    return CreateStatusWithPayload(
+        absl::StatusCode::kInvalidArgument,
+        absl::StrFormat("Expected outputs of size %d, found %d and %d.",
+                        static_cast<size_t>(n) * k, indices.size(),
+                        scores.size()),
+        TfLiteSupportStatus::kInvalidArgumentError);
+  }
+  if (n == 0 || m == 0) {
+    return absl::OkStatus();
+  }
+  RowMajorMatrixXf b_normalized;
+  RETURN_IF_ERROR(NormalizeRows(b.data(), m, dim, &b_normalized));
+  return ParallelForRowBlocks(
+      n, num_threads, [&](int first_row, int num_rows) -> absl::Status {
+        RowMajorMatrixXf a_block;
+        RETURN_IF_ERROR(NormalizeRows(
+            a.data() + static_cast<size_t>(first_row) * dim, num_rows, dim,
+            &a_block));
+        RowMajorMatrixXf similarities(num_rows, m);
+        similarities.noalias() = a_block * b_normalized.transpose();
+        std::vector<int> order(m);
+        for (int i = 0; i < num_rows; ++i) {
+          const float* row = similarities.row(i).data();
+          // Sort by decreasing similarity, breaking ties by increasing index.
+          auto compare = [row](int lhs, int rhs) {
+            return row[lhs] > row[rhs] || (row[lhs] == row[rhs] && lhs < rhs);
+          };
+          std::iota(order.begin(), order.end(), 0);
+          std::partial_sort(order.begin(), order.begin() + k, order.end(),
+                            compare);
+          const size_t offset = static_cast<size_t>(first_row + i) * k;
+          for (int j = 0; j < k; ++j) {
+            indices[offset + j] = order[j];
+            scores[offset + j] = row[order[j]];
+          }
+        }
+        return absl::OkStatus();
+      });
+}
+
+template absl::Status CosineSimilarityMatrix<float>(absl::Span<const float>,
+                                                    absl::Span<const float>,
+                                                    int, int,
+                                                    absl::Span<float>);
+template absl::Status CosineSimilarityMatrix<int8_t>(absl::Span<const int8_t>,
+                                                     absl::Span<const int8_t>,
+                                                     int, int,
+                                                     absl::Span<float>);
+template absl::Status TopKCosineSimilarity<float>(absl::Span<const float>,
+                                                  absl::Span<const float>, int,
+                                                  int, int,
+                                                  absl::Span<int64_t>,
+                                                  absl::Span<float>);
+template absl::Status TopKCosineSimilarity<int8_t>(absl::Span<const int8_t>,
+                                                   absl::Span<const int8_t>,
+                                                   int, int, int,
+                                                   absl::Span<int64_t>,
+                                                   absl::Span<float>);
+
+}  // namespace processor
+}  // namespace task
+}  // namespace tflite
@@ -0,0 +1,63 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef TENSORFLOW_LITE_SUPPORT_CC_TASK_PROCESSOR_EMBEDDING_SIMILARITY_H_
+#define TENSORFLOW_LITE_SUPPORT_CC_TASK_PROCESSOR_EMBEDDING_SIMILARITY_H_
+
+#include <cstdint>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/types/span.h"  // from @com_google_absl
+
+namespace tflite {
+namespace task {
+namespace processor {
+
+// Batch cosine similarity [1] between two sets of embeddings, i.e. without
+// going through `FeatureVector` protos.
+//
+// Embeddings are provided as row-major matrices of shape [n, dim] and [m, dim]
+// respectively. `T` is either `float`, or `int8_t` for quantized embeddings
+// (see `EmbeddingOptions.quantize`). Rows are L2-normalized on the fly, then
+// similarities are computed by blocks of rows through a SIMD-enabled matrix
+// product, using up to `num_threads` threads (-1 means one thread per core).
+//
+// Fails if the input sizes are inconsistent, or if any embedding has an L2-norm
+// of 0.
+//
+// [1]: https://en.wikipedia.org/wiki/Cosine_similarity
+
+// Computes the full [n, m] similarity matrix, written in row-major order to
+// `output`.
+template <typename T>
+absl::Status CosineSimilarityMatrix(absl::Span<const T> a,
+                                    absl::Span<const T> b, int dim,
+                                    int num_threads, absl::Span<float> output);
+
+// Computes the `k` most similar rows of `b` for each row of `a`, without
+// materializing the full similarity matrix. `indices` and `scores` are written
+// in row-major order with shape [n, min(k, m)], sorted by decreasing
+// similarity.
+template <typename T>
+absl::Status TopKCosineSimilarity(absl::Span<const T> a, absl::Span<const T> b,
+                                  int dim, int k, int num_threads,
+                                  absl::Span<int64_t> indices,
+                                  absl::Span<float> scores);
+
+}  // namespace processor
+}  // namespace task
+}  // namespace tflite
+
+#endif  // TENSORFLOW_LITE_SUPPORT_CC_TASK_PROCESSOR_EMBEDDING_SIMILARITY_H_
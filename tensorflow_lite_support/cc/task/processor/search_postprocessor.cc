@@ -120,12 +120,16 @@ StatusOr<absl::string_view> SearchPostprocessor::GetUserInfo() {
   return embedding_searcher_->GetUserInfo();
 }
 
+StatusOr<absl::string_view> SearchPostprocessor::GetMetadata(int64_t index) {
+  return embedding_searcher_->GetMetadata(index);
+}
+
 absl::Status SearchPostprocessor::Init(
     std::unique_ptr<EmbeddingPostprocessor> embedding_postprocessor,
     std::unique_ptr<SearchOptions> options) {
   embedding_postprocessor_ = std::move(embedding_postprocessor);
 
-  if (options->has_index_file()) {
+  if (options->has_index_file() || options->index_file_shards_size() > 0) {
     ASSIGN_OR_RETURN(embedding_searcher_,
                      EmbeddingSearcher::Create(std::move(options)));
   } else {
@@ -60,6 +60,11 @@ class SearchPostprocessor : public Postprocessor {
   // user info.
   tflite::support::StatusOr<absl::string_view> GetUserInfo();
 
+  // Fetches the metadata of the nearest neighbor identified by `index`, as
+  // returned in `NearestNeighbor.index` when `SearchOptions.lazy_metadata` is
+  // true.
+  tflite::support::StatusOr<absl::string_view> GetMetadata(int64_t index);
+
  private:
   using Postprocessor::Postprocessor;
 
@@ -173,7 +173,12 @@ std::vector<QaAnswer> BertQuestionAnswerer::Answer(
     const std::string& context, const std::string& question) {
   // The BertQuestionAnswererer implementation for Preprocess() and
   // Postprocess() never returns errors: just call value().
-  return Infer(context, question).value();
+  return AnswerWithStatus(context, question).value();
+}
+
+StatusOr<std::vector<QaAnswer>> BertQuestionAnswerer::AnswerWithStatus(
+    const std::string& context, const std::string& question) {
+  return Infer(context, question);
 }
 
 absl::Status BertQuestionAnswerer::Preprocess(
@@ -116,6 +116,12 @@ class BertQuestionAnswerer : public QuestionAnswerer {
   std::vector<QaAnswer> Answer(const std::string& context,
                                const std::string& question) override;
 
+  // Same as Answer(), but returns an error status if the inference failed,
+  // e.g. because it was cancelled or exceeded its deadline, see
+  // BaseUntypedTaskApi::Cancel() and SetInferenceDeadline().
+  tflite::support::StatusOr<std::vector<QaAnswer>> AnswerWithStatus(
+      const std::string& context, const std::string& question);
+
  private:
   absl::Status Preprocess(const std::vector<TfLiteTensor*>& input_tensors,
                           const std::string& lowercased_context,
@@ -147,6 +147,10 @@ StatusOr<absl::string_view> TextSearcher::GetUserInfo() {
   return postprocessor_->GetUserInfo();
 }
 
+StatusOr<absl::string_view> TextSearcher::GetMetadata(int64_t index) {
+  return postprocessor_->GetMetadata(index);
+}
+
 absl::Status TextSearcher::Preprocess(
     const std::vector<TfLiteTensor*>& /*input_tensors*/,
     const std::string& input) {
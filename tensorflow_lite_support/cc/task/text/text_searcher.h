@@ -16,6 +16,7 @@ limitations under the License.
 #ifndef TENSORFLOW_LITE_SUPPORT_CC_TASK_TEXT_TEXT_SEARCHER_H_
 #define TENSORFLOW_LITE_SUPPORT_CC_TASK_TEXT_TEXT_SEARCHER_H_
 
+#include <cstdint>
 #include <memory>
 #include <vector>
 
@@ -85,6 +86,11 @@ class TextSearcher
   // user info.
   tflite::support::StatusOr<absl::string_view> GetUserInfo();
 
+  // Fetches the metadata of the nearest neighbor identified by `index`, as
+  // returned in `NearestNeighbor.index` when `SearchOptions.lazy_metadata` is
+  // true.
+  tflite::support::StatusOr<absl::string_view> GetMetadata(int64_t index);
+
  protected:
   // The options used to build this TextSearcher.
   std::unique_ptr<TextSearcherOptions> options_;
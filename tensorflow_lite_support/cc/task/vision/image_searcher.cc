@@ -108,6 +108,10 @@ StatusOr<absl::string_view> ImageSearcher::GetUserInfo() {
   return postprocessor_->GetUserInfo();
 }
 
+StatusOr<absl::string_view> ImageSearcher::GetMetadata(int64_t index) {
+  return postprocessor_->GetMetadata(index);
+}
+
 StatusOr<SearchResult> ImageSearcher::Postprocess(
     const std::vector<const TfLiteTensor*>& /*output_tensors*/,
     const FrameBuffer& /*frame_buffer*/, const BoundingBox& /*roi*/) {
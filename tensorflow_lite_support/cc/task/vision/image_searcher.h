@@ -16,6 +16,7 @@ limitations under the License.
 #ifndef TENSORFLOW_LITE_SUPPORT_CC_TASK_VISION_IMAGE_SEARCHER_H_
 #define TENSORFLOW_LITE_SUPPORT_CC_TASK_VISION_IMAGE_SEARCHER_H_
 
+#include <cstdint>
 #include <memory>
 #include <vector>
 
@@ -100,6 +101,11 @@ class ImageSearcher
   // user info.
   tflite::support::StatusOr<absl::string_view> GetUserInfo();
 
+  // Fetches the metadata of the nearest neighbor identified by `index`, as
+  // returned in `NearestNeighbor.index` when `SearchOptions.lazy_metadata` is
+  // true.
+  tflite::support::StatusOr<absl::string_view> GetMetadata(int64_t index);
+
  protected:
   // The options used to build this ImageSearcher.
   std::unique_ptr<ImageSearcherOptions> options_;
@@ -15,12 +15,16 @@ limitations under the License.
 
 #include "tensorflow_lite_support/cc/task/processor/embedding_searcher.h"
 
+#include <cstdint>
 #include <memory>
 #include <string>
+#include <vector>
 
 #include "absl/flags/flag.h"  // from @com_google_absl
 #include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/str_format.h"  // from @com_google_absl
 #include "absl/strings/string_view.h"  // from @com_google_absl
+#include "absl/types/span.h"  // from @com_google_absl
 #include "tensorflow/lite/core/shims/cc/shims_test_util.h"
 #include "tensorflow_lite_support/cc/common.h"
 #include "tensorflow_lite_support/cc/port/status_matchers.h"
@@ -33,15 +37,22 @@ limitations under the License.
 #include "tensorflow_lite_support/cc/test/test_utils.h"
 #include "tensorflow_lite_support/metadata/cc/metadata_extractor.h"
 #include "tensorflow_lite_support/metadata/metadata_schema_generated.h"
+#include "tensorflow_lite_support/scann_ondevice/cc/core/serialized_searcher.pb.h"
+#include "tensorflow_lite_support/scann_ondevice/cc/index_builder.h"
 
 namespace tflite {
 namespace task {
 namespace processor {
 namespace {
 
+using ::testing::ElementsAre;
 using ::testing::HasSubstr;
+using ::testing::TestWithParam;
+using ::testing::Values;
 using ::tflite::TensorMetadata;
 using ::tflite::metadata::ModelMetadataExtractor;
+using ::tflite::scann_ondevice::CreateIndexBuffer;
+using ::tflite::scann_ondevice::core::ScannOnDeviceConfig;
 using ::tflite::support::StatusOr;
 using ::tflite::support::TfLiteSupportStatus;
 using ::tflite::task::processor::NearestNeighbor;
@@ -111,6 +122,44 @@ StatusOr<std::string> GetFileContent(const std::string& file_path) {
   return std::string(file_content);
 }
 
+constexpr int kNumEmbeddingsWithAttributes = 12;
+
+/** Returns the content of an index built with attributes.
+ *
+ * For each value `v` in `values`, the index contains the 2-dimensional float
+ * embedding (v, 0), with metadata "v" and attribute v % 3.
+ */
+StatusOr<std::string> CreateIndexContentWithAttributes(
+    const std::vector<int>& values) {
+  ScannOnDeviceConfig config = ParseTextProtoOrDie<ScannOnDeviceConfig>(R"pb(
+    query_distance: SQUARED_L2_DISTANCE
+  )pb");
+  std::vector<float> float_database;
+  std::vector<std::string> metadata;
+  std::vector<uint64_t> attributes;
+  for (int v : values) {
+    float_database.push_back(v);
+    float_database.push_back(0);
+    metadata.push_back(absl::StrFormat("%d", v));
+    attributes.push_back(v % 3);
+  }
+  return CreateIndexBuffer({.config = config,
+                            .embedding_dim = 2,
+                            .float_database = absl::Span<float>(float_database),
+                            .metadata = absl::Span<std::string>(metadata),
+                            .attributes = absl::Span<uint64_t>(attributes)},
+                           /*compression=*/false);
+}
+
+/** Same as above, with values 0 to kNumEmbeddingsWithAttributes - 1. */
+StatusOr<std::string> CreateIndexContentWithAttributes() {
+  std::vector<int> values;
+  for (int i = 0; i < kNumEmbeddingsWithAttributes; ++i) {
+    values.push_back(i);
+  }
+  return CreateIndexContentWithAttributes(values);
+}
+
 // Checks that the two provided `SearchResult`  protos are equal, with a
 // tolerancy on floating-point scores to account for numerical instabilities.
 void ExpectApproximatelyEqual(const SearchResult& actual,
@@ -176,6 +225,53 @@ TEST_F(CreateFromOptionsTest, FailsWithInvalidMaxResults) {
               HasSubstr("SearchOptions.max_results must be > 0, found -1"));
 }
 
+TEST_F(CreateFromOptionsTest, FailsWithInvalidNumLeavesToSearch) {
+  auto options = std::make_unique<SearchOptions>();
+  options->mutable_index_file()->set_file_name(
+      JoinPath("./" /*test src dir*/, kTestDataDirectory, kIndex));
+  options->set_num_leaves_to_search(0);
+
+  StatusOr<std::unique_ptr<EmbeddingSearcher>> embedding_searcher =
+      EmbeddingSearcher::Create(std::move(options));
+
+  EXPECT_EQ(embedding_searcher.status().code(),
+            absl::StatusCode::kInvalidArgument);
+  EXPECT_THAT(
+      embedding_searcher.status().message(),
+      HasSubstr("SearchOptions.num_leaves_to_search must be > 0, found 0"));
+}
+
+TEST_F(CreateFromOptionsTest, FailsWithAttributeFilterAndNoAttributes) {
+  auto options = std::make_unique<SearchOptions>();
+  options->mutable_index_file()->set_file_name(
+      JoinPath("./" /*test src dir*/, kTestDataDirectory, kIndex));
+  options->mutable_attribute_filter()->add_allowed_values(1);
+
+  StatusOr<std::unique_ptr<EmbeddingSearcher>> embedding_searcher =
+      EmbeddingSearcher::Create(std::move(options));
+
+  EXPECT_EQ(embedding_searcher.status().code(),
+            absl::StatusCode::kInvalidArgument);
+  EXPECT_THAT(embedding_searcher.status().message(),
+              HasSubstr("the index doesn't contain any attributes"));
+}
+
+TEST_F(CreateFromOptionsTest, FailsWithBothIndexFileAndIndexFileShards) {
+  auto options = std::make_unique<SearchOptions>();
+  options->mutable_index_file()->set_file_name(
+      JoinPath("./" /*test src dir*/, kTestDataDirectory, kIndex));
+  options->add_index_file_shards()->set_file_name(
+      JoinPath("./" /*test src dir*/, kTestDataDirectory, kIndex));
+
+  StatusOr<std::unique_ptr<EmbeddingSearcher>> embedding_searcher =
+      EmbeddingSearcher::Create(std::move(options));
+
+  EXPECT_EQ(embedding_searcher.status().code(),
+            absl::StatusCode::kInvalidArgument);
+  EXPECT_THAT(embedding_searcher.status().message(),
+              HasSubstr("mutually exclusive"));
+}
+
 TEST(SearchTest, SucceedsWithStandaloneIndex) {
   // Create Searcher.
   auto options = std::make_unique<SearchOptions>();
@@ -267,6 +363,147 @@ TEST(SearchTest, SucceedsWithMaxResults) {
       )pb"));
 }
 
+TEST(SearchTest, SucceedsWithLazyMetadata) {
+  // Create Searcher.
+  auto options = std::make_unique<SearchOptions>();
+  options->mutable_index_file()->set_file_name(
+      JoinPath("./" /*test src dir*/, kTestDataDirectory, kIndex));
+  options->set_lazy_metadata(true);
+  SUPPORT_ASSERT_OK_AND_ASSIGN(std::unique_ptr<EmbeddingSearcher> embedding_searcher,
+                       EmbeddingSearcher::Create(std::move(options)));
+
+  // Load the embedding proto associated with burger.jpg.
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      std::string embedding_file_content,
+      GetFileContent(JoinPath("./" /*test src dir*/,
+                              kTestDataDirectory, kBurgerJpgEmbeddingProto)));
+  Embedding embedding = ParseTextProtoOrDie<Embedding>(embedding_file_content);
+
+  // Perform search.
+  SUPPORT_ASSERT_OK_AND_ASSIGN(const SearchResult& result,
+                       embedding_searcher->Search(embedding));
+
+  // Check that metadata is left unset, then fetch it on demand.
+  ASSERT_EQ(result.nearest_neighbors_size(), 5);
+  std::vector<std::string> metadata;
+  for (const auto& nearest_neighbor : result.nearest_neighbors()) {
+    EXPECT_FALSE(nearest_neighbor.has_metadata());
+    EXPECT_TRUE(nearest_neighbor.has_index());
+    SUPPORT_ASSERT_OK_AND_ASSIGN(
+        absl::string_view value,
+        embedding_searcher->GetMetadata(nearest_neighbor.index()));
+    metadata.emplace_back(value);
+  }
+  EXPECT_THAT(metadata, ElementsAre("burger", "car", "bird", "dog", "cat"));
+}
+
+TEST(SearchTest, FailsWithInvalidNearestNeighborIndex) {
+  // Create Searcher.
+  auto options = std::make_unique<SearchOptions>();
+  options->mutable_index_file()->set_file_name(
+      JoinPath("./" /*test src dir*/, kTestDataDirectory, kIndex));
+  options->set_lazy_metadata(true);
+  SUPPORT_ASSERT_OK_AND_ASSIGN(std::unique_ptr<EmbeddingSearcher> embedding_searcher,
+                       EmbeddingSearcher::Create(std::move(options)));
+
+  StatusOr<absl::string_view> metadata =
+      embedding_searcher->GetMetadata(int64_t{1} << 32);
+
+  EXPECT_EQ(metadata.status().code(), absl::StatusCode::kInvalidArgument);
+  EXPECT_THAT(metadata.status().message(),
+              HasSubstr("Invalid nearest neighbor index"));
+}
+
+TEST(SearchTest, SucceedsWithAllowedValuesAttributeFilter) {
+  SUPPORT_ASSERT_OK_AND_ASSIGN(std::string index_file_content,
+                               CreateIndexContentWithAttributes());
+  auto options = std::make_unique<SearchOptions>();
+  options->set_max_results(3);
+  options->mutable_attribute_filter()->add_allowed_values(1);
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      std::unique_ptr<EmbeddingSearcher> embedding_searcher,
+      EmbeddingSearcher::Create(std::move(options), index_file_content));
+
+  Embedding embedding = ParseTextProtoOrDie<Embedding>(R"pb(
+    feature_vector { value_float: 0 value_float: 0 }
+  )pb");
+  SUPPORT_ASSERT_OK_AND_ASSIGN(const SearchResult& result,
+                               embedding_searcher->Search(embedding));
+
+  // Only embeddings with i % 3 == 1 are kept.
+  ExpectApproximatelyEqual(
+      result, ParseTextProtoOrDie<SearchResult>(R"pb(
+        nearest_neighbors { metadata: "1" distance: 1.0 }
+        nearest_neighbors { metadata: "4" distance: 16.0 }
+        nearest_neighbors { metadata: "7" distance: 49.0 }
+      )pb"));
+}
+
+TEST(SearchTest, SucceedsWithBitmaskAttributeFilter) {
+  SUPPORT_ASSERT_OK_AND_ASSIGN(std::string index_file_content,
+                               CreateIndexContentWithAttributes());
+  auto options = std::make_unique<SearchOptions>();
+  options->set_max_results(3);
+  options->mutable_attribute_filter()->set_none_of_bits(1);
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      std::unique_ptr<EmbeddingSearcher> embedding_searcher,
+      EmbeddingSearcher::Create(std::move(options), index_file_content));
+
+  Embedding embedding = ParseTextProtoOrDie<Embedding>(R"pb(
+    feature_vector { value_float: 0 value_float: 0 }
+  )pb");
+  SUPPORT_ASSERT_OK_AND_ASSIGN(const SearchResult& result,
+                               embedding_searcher->Search(embedding));
+
+  // Only embeddings with attribute 0 or 2 (i.e. lowest bit unset) are kept.
+  ExpectApproximatelyEqual(
+      result, ParseTextProtoOrDie<SearchResult>(R"pb(
+        nearest_neighbors { metadata: "0" distance: 0.0 }
+        nearest_neighbors { metadata: "2" distance: 4.0 }
+        nearest_neighbors { metadata: "3" distance: 9.0 }
+      )pb"));
+}
+
+class ShardedSearchTest : public TestWithParam<int /*num_threads*/> {};
+
+TEST_P(ShardedSearchTest, SucceedsWithIndexFileShards) {
+  // Even values go in the first shard, odd values in the second one.
+  std::vector<int> even_values, odd_values;
+  for (int i = 0; i < kNumEmbeddingsWithAttributes; ++i) {
+    (i % 2 ? odd_values : even_values).push_back(i);
+  }
+  SUPPORT_ASSERT_OK_AND_ASSIGN(std::string even_shard,
+                               CreateIndexContentWithAttributes(even_values));
+  SUPPORT_ASSERT_OK_AND_ASSIGN(std::string odd_shard,
+                               CreateIndexContentWithAttributes(odd_values));
+  auto options = std::make_unique<SearchOptions>();
+  options->set_max_results(4);
+  options->set_num_threads(GetParam());
+  options->add_index_file_shards()->set_file_content(even_shard);
+  options->add_index_file_shards()->set_file_content(odd_shard);
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      std::unique_ptr<EmbeddingSearcher> embedding_searcher,
+      EmbeddingSearcher::Create(std::move(options)));
+
+  Embedding embedding = ParseTextProtoOrDie<Embedding>(R"pb(
+    feature_vector { value_float: 0 value_float: 0 }
+  )pb");
+  SUPPORT_ASSERT_OK_AND_ASSIGN(const SearchResult& result,
+                               embedding_searcher->Search(embedding));
+
+  // Results from both shards are merged.
+  ExpectApproximatelyEqual(
+      result, ParseTextProtoOrDie<SearchResult>(R"pb(
+        nearest_neighbors { metadata: "0" distance: 0.0 }
+        nearest_neighbors { metadata: "1" distance: 1.0 }
+        nearest_neighbors { metadata: "2" distance: 4.0 }
+        nearest_neighbors { metadata: "3" distance: 9.0 }
+      )pb"));
+}
+
+INSTANTIATE_TEST_SUITE_P(ShardedSearchTest, ShardedSearchTest,
+                         Values(-1, 1, 2));
+
 }  // namespace
 }  // namespace processor
 }  // namespace task
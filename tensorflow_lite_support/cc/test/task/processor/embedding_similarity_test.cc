@@ -0,0 +1,137 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "tensorflow_lite_support/cc/task/processor/embedding_similarity.h"
+
+#include <cmath>
+#include <cstdint>
+#include <vector>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/types/span.h"  // from @com_google_absl
+#include "tensorflow_lite_support/cc/port/gmock.h"
+#include "tensorflow_lite_support/cc/port/gtest.h"
+#include "tensorflow_lite_support/cc/port/status_matchers.h"
+
+namespace tflite {
+namespace task {
+namespace processor {
+namespace {
+
+using ::testing::ElementsAre;
+using ::testing::FloatNear;
+using ::testing::HasSubstr;
+using ::testing::Pointwise;
+
+constexpr float kPrecision = 1e-6;
+
+// 3 embeddings of dimension 2.
+const std::vector<float> kFloatA = {1, 0, 0, 1, 1, 1};
+// 4 embeddings of dimension 2.
+const std::vector<float> kFloatB = {1, 0, -1, 0, 0, 2, 3, 3};
+
+TEST(CosineSimilarityMatrixTest, SucceedsWithFloat) {
+  std::vector<float> output(3 * 4);
+  SUPPORT_ASSERT_OK(CosineSimilarityMatrix<float>(
+      kFloatA, kFloatB, /*dim=*/2, /*num_threads=*/1, absl::MakeSpan(output)));
+
+  const float s = 1 / std::sqrt(2.0f);
+  const std::vector<float> expected = {1.0f, -1.0f, 0.0f, s,  //
+                                       0.0f, 0.0f,  1.0f, s,  //
+                                       s,    -s,    s,    1.0f};
+  EXPECT_THAT(output, Pointwise(FloatNear(kPrecision), expected));
+}
+
+TEST(CosineSimilarityMatrixTest, SucceedsWithQuantized) {
+  std::vector<int8_t> a = {127, 0, -128, 0};
+  std::vector<int8_t> b = {10, 0, 0, -3};
+  std::vector<float> output(2 * 2);
+  SUPPORT_ASSERT_OK(CosineSimilarityMatrix<int8_t>(
+      a, b, /*dim=*/2, /*num_threads=*/1, absl::MakeSpan(output)));
+
+  const std::vector<float> expected = {1.0f, 0.0f, -1.0f, 0.0f};
+  EXPECT_THAT(output, Pointwise(FloatNear(kPrecision), expected));
+}
+
+TEST(CosineSimilarityMatrixTest, SucceedsWithMultipleThreads) {
+  // Enough rows to span several row blocks.
+  constexpr int kNumRows = 1000;
+  constexpr int kDim = 8;
+  std::vector<float> a(kNumRows * kDim);
+  for (int i = 0; i < a.size(); ++i) {
+    a[i] = (i * 7919) % 101 + 1;
+  }
+  std::vector<float> expected(kNumRows * kNumRows);
+  SUPPORT_ASSERT_OK(CosineSimilarityMatrix<float>(
+      a, a, kDim, /*num_threads=*/1, absl::MakeSpan(expected)));
+
+  std::vector<float> output(kNumRows * kNumRows);
+  SUPPORT_ASSERT_OK(CosineSimilarityMatrix<float>(a, a, kDim,
+                                                  /*num_threads=*/4,
+                                                  absl::MakeSpan(output)));
+
+  EXPECT_EQ(output, expected);
+}
+
+TEST(CosineSimilarityMatrixTest, FailsWithZeroNorm) {
+  std::vector<float> a = {0, 0};
+  std::vector<float> output(4);
+
+  absl::Status status = CosineSimilarityMatrix<float>(
+      a, kFloatB, /*dim=*/2, /*num_threads=*/1, absl::MakeSpan(output));
+
+  EXPECT_EQ(status.code(), absl::StatusCode::kInvalidArgument);
+  EXPECT_THAT(status.message(), HasSubstr("0 norm"));
+}
+
+TEST(CosineSimilarityMatrixTest, FailsWithInconsistentDimension) {
+  std::vector<float> output(3 * 4);
+
+  absl::Status status = CosineSimilarityMatrix<float>(
+      kFloatA, kFloatB, /*dim=*/4, /*num_threads=*/1, absl::MakeSpan(output));
+
+  EXPECT_EQ(status.code(), absl::StatusCode::kInvalidArgument);
+  EXPECT_THAT(status.message(), HasSubstr("multiples of the embedding"));
+}
+
+TEST(TopKCosineSimilarityTest, Succeeds) {
+  std::vector<int64_t> indices(3 * 2);
+  std::vector<float> scores(3 * 2);
+  SUPPORT_ASSERT_OK(TopKCosineSimilarity<float>(
+      kFloatA, kFloatB, /*dim=*/2, /*k=*/2, /*num_threads=*/1,
+      absl::MakeSpan(indices), absl::MakeSpan(scores)));
+
+  const float s = 1 / std::sqrt(2.0f);
+  EXPECT_THAT(indices, ElementsAre(0, 3,  //
+                                   2, 3,  //
+                                   3, 0));
+  const std::vector<float> expected_scores = {1.0f, s, 1.0f, s, 1.0f, s};
+  EXPECT_THAT(scores, Pointwise(FloatNear(kPrecision), expected_scores));
+}
+
+TEST(TopKCosineSimilarityTest, SucceedsWithKLargerThanM) {
+  std::vector<int64_t> indices(3 * 4);
+  std::vector<float> scores(3 * 4);
+  SUPPORT_ASSERT_OK(TopKCosineSimilarity<float>(
+      kFloatA, kFloatB, /*dim=*/2, /*k=*/10, /*num_threads=*/1,
+      absl::MakeSpan(indices), absl::MakeSpan(scores)));
+
+  EXPECT_THAT(absl::MakeSpan(indices).subspan(0, 4), ElementsAre(0, 3, 2, 1));
+}
+
+}  // namespace
+}  // namespace processor
+}  // namespace task
+}  // namespace tflite
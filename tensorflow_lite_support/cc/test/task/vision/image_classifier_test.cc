@@ -29,6 +29,7 @@ limitations under the License.
 #include "tensorflow_lite_support/cc/port/gtest.h"
 #include "tensorflow_lite_support/cc/port/status_macros.h"
 #include "tensorflow_lite_support/cc/port/status_matchers.h"
+#include "tensorflow_lite_support/cc/task/core/model_cache.h"
 #include "tensorflow_lite_support/cc/task/core/task_api_factory.h"
 #include "tensorflow_lite_support/cc/task/core/task_utils.h"
 #include "tensorflow_lite_support/cc/task/core/tflite_engine.h"
@@ -54,6 +55,7 @@ using ::tflite::support::StatusOr;
 using ::tflite::support::TfLiteSupportStatus;
 using ::tflite::task::JoinPath;
 using ::tflite::task::ParseTextProtoOrDie;
+using ::tflite::task::core::ModelCache;
 using ::tflite::task::core::PopulateTensor;
 using ::tflite::task::core::TaskAPIFactory;
 using ::tflite::task::core::TfLiteEngine;
@@ -241,6 +243,31 @@ TEST_F(CreateFromOptionsTest, SucceedsWithNumberOfThreads) {
   SUPPORT_ASSERT_OK(ImageClassifier::CreateFromOptions(options));
 }
 
+TEST_F(CreateFromOptionsTest, SharesModelWithShareModel) {
+  ModelCache* model_cache = ModelCache::GetDefault();
+  model_cache->Evict();
+  ImageClassifierOptions options;
+  options.mutable_base_options()->set_share_model(true);
+  options.mutable_base_options()->mutable_model_file()->set_file_name(
+      JoinPath("./" /*test src dir*/, kTestDataDirectory,
+               kMobileNetFloatWithMetadata));
+
+  SUPPORT_ASSERT_OK_AND_ASSIGN(std::unique_ptr<ImageClassifier> classifier,
+                               ImageClassifier::CreateFromOptions(options));
+  SUPPORT_ASSERT_OK_AND_ASSIGN(
+      std::unique_ptr<ImageClassifier> other_classifier,
+      ImageClassifier::CreateFromOptions(options));
+
+  EXPECT_EQ(model_cache->size(), 1);
+  EXPECT_EQ(classifier->GetMetadataExtractor(),
+            other_classifier->GetMetadataExtractor());
+  // The model is used by the classifiers.
+  EXPECT_EQ(model_cache->Evict(/*unused_only=*/true), 0);
+  classifier.reset();
+  other_classifier.reset();
+  EXPECT_EQ(model_cache->Evict(/*unused_only=*/true), 1);
+}
+
 using NumThreadsTest = testing::TestWithParam<int>;
 
 INSTANTIATE_TEST_SUITE_P(Default, NumThreadsTest, testing::Values(0, -2));
@@ -42,6 +42,8 @@ PYBIND11_MODULE(_pywrap_flatbuffers, m) {
                              contents.length());
       });
   m.def("generate_text_file", &flatbuffers::GenerateTextFile);
+  // The parser is only read by GenerateText, so the GIL can be released to
+  // let threads share a parser and generate text concurrently.
   m.def(
       "generate_text",
       [](const flatbuffers::Parser& parser,
@@ -52,7 +54,8 @@ PYBIND11_MODULE(_pywrap_flatbuffers, m) {
           return "";
         }
         return text;
-      });
+      },
+      pybind11::call_guard<pybind11::gil_scoped_release>());
 }
 
 }  // namespace support
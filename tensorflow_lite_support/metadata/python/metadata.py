@@ -14,13 +14,18 @@
 # ==============================================================================
 """TensorFlow Lite metadata tools."""
 
+import collections
 import copy
 import inspect
 import io
+import mmap
 import os
 import shutil
+import struct
 import sys
-import tempfile
+import threading
+import time
+import uuid
 import warnings
 import zipfile
 
@@ -37,10 +42,28 @@ try:
   import tensorflow as tf  # pylint: disable=g-import-not-at-top
   _open_file = tf.io.gfile.GFile
   _exists_file = tf.io.gfile.exists
+  _remove_file = tf.io.gfile.remove
+
+  def _replace_file(src, dst):
+    tf.io.gfile.rename(src, dst, overwrite=True)
+
+  def _get_file_size(filename):
+    return tf.io.gfile.stat(filename).length
 except ImportError as e:
   # If TensorFlow package doesn't exist, fall back to original open and exists.
   _open_file = open
   _exists_file = os.path.exists
+  _remove_file = os.remove
+  _replace_file = os.replace
+  _get_file_size = os.path.getsize
+
+# Size of the chunks in which associated files are copied into the model.
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+# An associated file to be packed into the model. Either `buffer` holds the
+# file content, or the file is streamed from `path` when populating the model.
+_AssociatedFile = collections.namedtuple("_AssociatedFile",
+                                         ["buffer", "path", "compress_type"])
 
 
 def _maybe_open_as_binary(filename, mode):
@@ -152,38 +175,46 @@ class MetadataPopulator(object):
   Note that existing metadata buffer (if applied) will be overridden by the new
   metadata buffer.
   """
-  # As Zip API is used to concatenate associated files after tflite model file,
-  # the populating operation is developed based on a model file. For in-memory
-  # model buffer, we create a tempfile to serve the populating operation.
-  # Creating the deleting such a tempfile is handled by the class,
-  # _MetadataPopulatorWithBuffer.
+  # The model is read once into memory, or memory mapped, and the populating
+  # operation streams the updated model to its destination: only the
+  # flatbuffer section of the model is rewritten, and the weights and
+  # associated files are copied over as byte ranges.
 
   METADATA_FIELD_NAME = "TFLITE_METADATA"
   TFLITE_FILE_IDENTIFIER = b"TFL3"
   METADATA_FILE_IDENTIFIER = b"M001"
 
-  def __init__(self, model_file):
+  def __init__(self, model_file, use_mmap=False):
     """Constructor for MetadataPopulator.
 
     Args:
       model_file: valid path to a TensorFlow Lite model file.
+      use_mmap: if True, memory-maps the model file instead of reading it. See
+        `with_model_file`.
 
     Raises:
       IOError: File not found.
       ValueError: the model does not have the expected flatbuffer identifer.
     """
-    _assert_model_file_identifier(model_file)
+    _assert_file_exist(model_file)
     self._model_file = model_file
+    self._use_mmap = use_mmap
+    self._model_buf = None
+    _assert_model_buffer_identifier(self._load_model_buffer())
     self._metadata_buf = None
-    # _associated_files is a dict of file name and file buffer.
+    # _associated_files is a dict of file name and _AssociatedFile.
     self._associated_files = {}
 
   @classmethod
-  def with_model_file(cls, model_file):
+  def with_model_file(cls, model_file, use_mmap=False):
     """Creates a MetadataPopulator object that populates data to a model file.
 
     Args:
       model_file: valid path to a TensorFlow Lite model file.
+      use_mmap: if True, memory-maps the model file instead of reading it, so
+        that populating metadata into a multi-GB model, such as a model storing
+        its weights outside of the flatbuffer, doesn't load the weights in
+        memory. Only supported for local files.
 
     Returns:
       MetadataPopulator object.
@@ -192,7 +223,7 @@ class MetadataPopulator(object):
       IOError: File not found.
       ValueError: the model does not have the expected flatbuffer identifer.
     """
-    return cls(model_file)
+    return cls(model_file, use_mmap)
 
   # TODO(b/141468993): investigate if type check can be applied to model_buf for
   # FB.
@@ -215,10 +246,10 @@ class MetadataPopulator(object):
     """Gets the buffer of the model with packed metadata and associated files.
 
     Returns:
-      Model buffer (in bytearray).
+      Model buffer (in bytearray), or a read-only memory map of the model file
+      if the populator was created with `use_mmap`.
     """
-    with _open_file(self._model_file, "rb") as f:
-      return f.read()
+    return self._load_model_buffer()
 
   def get_packed_associated_file_list(self):
     """Gets a list of associated files packed to the model file.
@@ -226,11 +257,7 @@ class MetadataPopulator(object):
     Returns:
       List of packed associated files.
     """
-    if not _is_zipfile(self._model_file):
-      return []
-
-    with _open_as_zipfile(self._model_file, "r") as zf:
-      return zf.namelist()
+    return _get_packed_associated_file_list(self._load_model_buffer())
 
   def get_recorded_associated_file_list(self):
     """Gets a list of associated files recorded in metadata of the model file.
@@ -253,25 +280,37 @@ class MetadataPopulator(object):
         for file in self._get_recorded_associated_file_object_list(metadata)
     ]
 
-  def load_associated_file_buffers(self, associated_files):
+  def load_associated_file_buffers(self, associated_files,
+                                   compress_type=zipfile.ZIP_STORED):
     """Loads the associated file buffers (in bytearray) to be populated.
 
     Args:
       associated_files: a dictionary of associated file names and corresponding
         file buffers, such as {"file.txt": b"file content"}. If pass in file
           paths for the file name, only the basename will be populated.
+      compress_type: the zip compression method of the files, such as
+        `zipfile.ZIP_DEFLATED`. Note that the TFLite Support C++ libraries,
+        including the Task Library, can only read uncompressed files.
     """
 
     self._associated_files.update({
-        os.path.basename(name): buffers
+        os.path.basename(name): _AssociatedFile(buffers, None, compress_type)
         for name, buffers in associated_files.items()
     })
 
-  def load_associated_files(self, associated_files):
+  def load_associated_files(self, associated_files,
+                            compress_type=zipfile.ZIP_STORED):
     """Loads associated files that to be concatenated after the model file.
 
+    The files are not read here. They are streamed into the model in chunks
+    when calling `populate()`, so that large files, such as ScaNN indices,
+    are never fully loaded in memory.
+
     Args:
       associated_files: list of file paths.
+      compress_type: the zip compression method of the files, such as
+        `zipfile.ZIP_DEFLATED`. Note that the TFLite Support C++ libraries,
+        including the Task Library, can only read uncompressed files.
 
     Raises:
       IOError:
@@ -279,8 +318,8 @@ class MetadataPopulator(object):
     """
     for af_name in associated_files:
       _assert_file_exist(af_name)
-      with _open_file(af_name, "rb") as af:
-        self.load_associated_file_buffers({af_name: af.read()})
+      self._associated_files[os.path.basename(af_name)] = _AssociatedFile(
+          None, af_name, compress_type)
 
   def load_metadata_buffer(self, metadata_buf):
     """Loads the metadata buffer (in bytearray) to be populated.
@@ -359,10 +398,26 @@ class MetadataPopulator(object):
             {f: zf.read(f) for f in zf.namelist()})
 
   def populate(self):
-    """Populates loaded metadata and associated files into the model file."""
+    """Populates loaded metadata and associated files into the model file.
+
+    The updated model is written in one pass to a temporary file next to the
+    model file, which then replaces the model file, so that the model file is
+    never left partially written.
+    """
     self._assert_validate()
-    self._populate_metadata_buffer()
-    self._populate_associated_files()
+    temp_file = "{0}.{1}.tmp".format(self._model_file, uuid.uuid4().hex)
+    try:
+      with _open_file(temp_file, "wb") as f:
+        self._write_model(_WriteOnlyFile(f))
+      # The updated model is only read back if needed, see _load_model_buffer().
+      # A memory mapped model file must be unmapped before being replaced.
+      if isinstance(self._model_buf, mmap.mmap):
+        self._model_buf.close()
+      self._model_buf = None
+      _replace_file(temp_file, self._model_file)
+    finally:
+      if _exists_file(temp_file):
+        _remove_file(temp_file)
 
   def _assert_validate(self):
     """Validates the metadata and associated files to be populated.
@@ -375,7 +430,7 @@ class MetadataPopulator(object):
     # Gets files that are recorded in metadata.
     recorded_files = self.get_recorded_associated_file_list()
 
-    # Gets files that have been packed to self._model_file.
+    # Gets files that have been packed to the model.
     packed_files = self.get_packed_associated_file_list()
 
     # Gets the file name of those associated files to be populated.
@@ -396,23 +451,6 @@ class MetadataPopulator(object):
             "File, '{0}', does not exist in the metadata. But packing it to "
             "tflite model is still allowed.".format(f))
 
-  def _copy_archived_files(self, src_zip, file_list, dst_zip):
-    """Copy archieved files in file_list from src_zip ro dst_zip."""
-
-    if not _is_zipfile(src_zip):
-      raise ValueError("File, '{0}', is not a zipfile.".format(src_zip))
-
-    with _open_as_zipfile(src_zip, "r") as src_zf, \
-         _open_as_zipfile(dst_zip, "a") as dst_zf:
-      src_list = src_zf.namelist()
-      for f in file_list:
-        if f not in src_list:
-          raise ValueError(
-              "File, '{0}', does not exist in the zipfile, {1}.".format(
-                  f, src_zip))
-        file_buffer = src_zf.read(f)
-        dst_zf.writestr(f, file_buffer)
-
   def _get_associated_files_from_process_units(self, table, field_name):
     """Gets the files that are attached the process units field of a table.
 
@@ -515,92 +553,103 @@ class MetadataPopulator(object):
 
     return recorded_files
 
-  def _populate_associated_files(self):
+  def _write_model(self, output):
+    """Writes the model with the loaded metadata and associated files."""
+    self._populate_metadata_buffer(output)
+    self._populate_associated_files(output)
+
+  def _populate_associated_files(self, output):
     """Concatenates associated files after TensorFlow Lite model file.
 
-    If the MetadataPopulator object is created using the method,
-    with_model_file(model_file), the model file will be updated.
+    Associated files that have already been packed into the model are copied
+    over from the original model, followed by the newly loaded files. For
+    example, suppose we have
+    self._model_buf = old_tflite_file | label1.txt | label2.txt
+    Then after trigger populate() to add label3.txt, the model becomes
+    new_tflite_file | label1.txt | label2.txt | label3.txt
+
+    Files are copied in chunks, and keep the compression method they were
+    packed or loaded with.
+
+    Args:
+      output: the file-like holding the updated model flatbuffer, to which the
+        associated files are appended.
     """
-    # Opens up the model file in "appending" mode.
-    # If self._model_file already has pack files, zipfile will concatenate
-    # addition files after self._model_file. For example, suppose we have
-    # self._model_file = old_tflite_file | label1.txt | label2.txt
-    # Then after trigger populate() to add label3.txt, self._model_file becomes
-    # self._model_file = old_tflite_file | label1.txt | label2.txt | label3.txt
-    with tempfile.SpooledTemporaryFile() as temp:
-      # (1) Copy content from model file of to temp file.
-      with _open_file(self._model_file, "rb") as f:
-        shutil.copyfileobj(f, temp)
-
-      # (2) Append of to a temp file as a zip.
-      with _open_as_zipfile(temp, "a") as zf:
-        for file_name, file_buffer in self._associated_files.items():
-          zf.writestr(file_name, file_buffer)
-
-      # (3) Copy temp file to model file.
-      temp.seek(0)
-      with _open_file(self._model_file, "wb") as f:
-        shutil.copyfileobj(temp, f)
-
-  def _populate_metadata_buffer(self):
-    """Populates the metadata buffer (in bytearray) into the model file.
-
-    Inserts metadata_buf into the metadata field of schema.Model. If the
-    MetadataPopulator object is created using the method,
-    with_model_file(model_file), the model file will be updated.
+    packed_files = self.get_packed_associated_file_list()
+    if not packed_files and not self._associated_files:
+      return
+
+    # The zip entries are written right after the model flatbuffer, and their
+    # offsets are relative to the beginning of output.
+    with zipfile.ZipFile(output, "w") as dst_zf:
+      if packed_files:
+        with _BufferFile(self._load_model_buffer()) as model_file, \
+            _open_as_zipfile(model_file) as src_zf:
+          for info in src_zf.infolist():
+            with src_zf.open(info) as src:
+              _write_zip_entry(dst_zf, info.filename, src, info.file_size,
+                               info.compress_type, info.date_time)
+      for file_name, associated_file in self._associated_files.items():
+        if associated_file.path is None:
+          _write_zip_entry(dst_zf, file_name,
+                           io.BytesIO(associated_file.buffer),
+                           len(associated_file.buffer),
+                           associated_file.compress_type)
+        else:
+          with _open_file(associated_file.path, "rb") as src:
+            _write_zip_entry(dst_zf, file_name, src,
+                             _get_file_size(associated_file.path),
+                             associated_file.compress_type)
+
+  def _populate_metadata_buffer(self, output):
+    """Populates the metadata buffer (in bytearray) into the model.
+
+    Inserts metadata_buf into the metadata field of schema.Model, and writes
+    the updated model flatbuffer, without the packed associated files, to
+    `output`.
 
     Existing metadata buffer (if applied) will be overridden by the new metadata
     buffer.
-    """
-
-    with _open_file(self._model_file, "rb") as f:
-      model_buf = f.read()
-
-    model = _schema_fb.ModelT.InitFromObj(
-        _schema_fb.Model.GetRootAsModel(model_buf, 0))
-    buffer_field = _schema_fb.BufferT()
-    buffer_field.data = self._metadata_buf
-
-    is_populated = False
-    if not model.metadata:
-      model.metadata = []
-    else:
-      # Check if metadata has already been populated.
-      for meta in model.metadata:
-        if meta.name.decode("utf-8") == self.METADATA_FIELD_NAME:
-          is_populated = True
-          model.buffers[meta.buffer] = buffer_field
-
-    if not is_populated:
-      if not model.buffers:
-        model.buffers = []
-      model.buffers.append(buffer_field)
-      # Creates a new metadata field.
-      metadata_field = _schema_fb.MetadataT()
-      metadata_field.name = self.METADATA_FIELD_NAME
-      metadata_field.buffer = len(model.buffers) - 1
-      model.metadata.append(metadata_field)
-
-    # Packs model back to a flatbuffer binaray file.
-    b = flatbuffers.Builder(0)
-    b.Finish(model.Pack(b), self.TFLITE_FILE_IDENTIFIER)
-    model_buf = b.Output()
 
-    # Saves the updated model buffer to model file.
-    # Gets files that have been packed to self._model_file.
-    packed_files = self.get_packed_associated_file_list()
-    if packed_files:
-      # Writes the updated model buffer and associated files into a new model
-      # file (in memory). Then overwrites the original model file.
-      with tempfile.SpooledTemporaryFile() as temp:
-        temp.write(model_buf)
-        self._copy_archived_files(self._model_file, packed_files, temp)
-        temp.seek(0)
-        with _open_file(self._model_file, "wb") as f:
-          shutil.copyfileobj(temp, f)
-    else:
-      with _open_file(self._model_file, "wb") as f:
-        f.write(model_buf)
+    Args:
+      output: the file-like to write the updated model flatbuffer to.
+    """
+    # The model, including the weights stored outside of the flatbuffer if
+    # any, ends where the first packed associated file starts.
+    model_buf = memoryview(self._load_model_buffer())
+    if self.get_packed_associated_file_list():
+      with _BufferFile(self._load_model_buffer()) as model_file, \
+          _open_as_zipfile(model_file) as zf:
+        model_buf = model_buf[:min(info.header_offset
+                                   for info in zf.infolist())]
+
+    # Tries to patch the metadata into the model in place first, which avoids
+    # unpacking and repacking the whole model, including its weights.
+    updated_model_chunks = _get_patched_model_chunks(model_buf,
+                                                     self._metadata_buf)
+    if updated_model_chunks is None:
+      if _get_external_data_offset_positions(model_buf):
+        raise ValueError(
+            "The model stores buffers outside of the flatbuffer and uses "
+            "fields unknown to this version of the TFLite schema, so metadata "
+            "cannot be populated into it.")
+      updated_model_chunks = [
+          _repack_metadata_buffer(bytes(model_buf), self._metadata_buf)
+      ]
+    for chunk in updated_model_chunks:
+      output.write(chunk)
+
+  def _load_model_buffer(self):
+    """Returns the model buffer, reading the model file only if needed."""
+    if self._model_buf is None:
+      if self._use_mmap:
+        with open(self._model_file, "rb") as f:
+          # The mapping stays valid after the file is closed.
+          self._model_buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+      else:
+        with _open_file(self._model_file, "rb") as f:
+          self._model_buf = f.read()
+    return self._model_buf
 
   def _use_basename_for_associated_files_in_metadata(self, metadata):
     """Removes any associated file local directory (if exists)."""
@@ -621,9 +670,7 @@ class MetadataPopulator(object):
                            model_meta.SubgraphMetadataLength()))
 
     # Verify if the number of tensor metadata matches the number of tensors.
-    with _open_file(self._model_file, "rb") as f:
-      model_buf = f.read()
-    model = _schema_fb.Model.GetRootAsModel(model_buf, 0)
+    model = _schema_fb.Model.GetRootAsModel(self._load_model_buffer(), 0)
 
     num_input_tensors = model.Subgraphs(0).InputsLength()
     num_input_meta = model_meta.SubgraphMetadata(0).InputTensorMetadataLength()
@@ -645,12 +692,9 @@ class MetadataPopulator(object):
 class _MetadataPopulatorWithBuffer(MetadataPopulator):
   """Subclass of MetadtaPopulator that populates metadata to a model buffer.
 
-  This class is used to populate metadata into a in-memory model buffer. As we
-  use Zip API to concatenate associated files after tflite model file, the
-  populating operation is developed based on a model file. For in-memory model
-  buffer, we create a tempfile to serve the populating operation. This class is
-  then used to generate this tempfile, and delete the file when the
-  MetadataPopulator object is deleted.
+  This class is used to populate metadata into a in-memory model buffer. The
+  populating operation is entirely done in memory, and the updated model buffer
+  is returned by `get_model_buffer()`.
   """
 
   def __init__(self, model_buf):
@@ -665,22 +709,23 @@ class _MetadataPopulatorWithBuffer(MetadataPopulator):
     """
     if not model_buf:
       raise ValueError("model_buf cannot be empty.")
+    _assert_model_buffer_identifier(model_buf)
+
+    # pylint: disable=super-init-not-called
+    self._model_file = None
+    self._use_mmap = False
+    # Converting to bytes doesn't copy model_buf if it is already bytes, and
+    # lets io.BytesIO share the buffer instead of copying it.
+    self._model_buf = bytes(model_buf)
+    self._metadata_buf = None
+    self._associated_files = {}
 
-    with tempfile.NamedTemporaryFile() as temp:
-      model_file = temp.name
-
-    with _open_file(model_file, "wb") as f:
-      f.write(model_buf)
-
-    super().__init__(model_file)
-
-  def __del__(self):
-    """Destructor of _MetadataPopulatorWithBuffer.
-
-    Deletes the tempfile.
-    """
-    if os.path.exists(self._model_file):
-      os.remove(self._model_file)
+  def populate(self):
+    """Populates loaded metadata and associated files into the model buffer."""
+    self._assert_validate()
+    with io.BytesIO() as output:
+      self._write_model(output)
+      self._model_buf = output.getvalue()
 
 
 class MetadataDisplayer(object):
@@ -701,11 +746,16 @@ class MetadataDisplayer(object):
     self._associated_file_list = associated_file_list
 
   @classmethod
-  def with_model_file(cls, model_file):
+  def with_model_file(cls, model_file, use_mmap=False):
     """Creates a MetadataDisplayer object for the model file.
 
     Args:
       model_file: valid path to a TensorFlow Lite model file.
+      use_mmap: if True, memory-maps the model file instead of reading it.
+        Only the metadata buffer and the zip central directory are then read
+        when creating the displayer, and associated files are extracted on
+        demand, regardless of the size of the model weights. Only supported
+        for local files.
 
     Returns:
       MetadataDisplayer object.
@@ -715,6 +765,11 @@ class MetadataDisplayer(object):
       ValueError: The model does not have metadata.
     """
     _assert_file_exist(model_file)
+    if use_mmap:
+      with open(model_file, "rb") as f:
+        # The mapping stays valid after the file is closed.
+        model_buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+      return cls.with_model_buffer(model_buffer)
     with _open_file(model_file, "rb") as f:
       return cls.with_model_buffer(f.read())
 
@@ -723,7 +778,8 @@ class MetadataDisplayer(object):
     """Creates a MetadataDisplayer object for a file buffer.
 
     Args:
-      model_buffer: TensorFlow Lite model buffer in bytearray.
+      model_buffer: TensorFlow Lite model buffer in bytearray, or a memory
+        mapped model file.
 
     Returns:
       MetadataDisplayer object.
@@ -752,7 +808,8 @@ class MetadataDisplayer(object):
       raise ValueError(
           "The file, {}, does not exist in the model.".format(filename))
 
-    with _open_as_zipfile(io.BytesIO(self._model_buffer)) as zf:
+    with _BufferFile(self._model_buffer) as model_file, \
+         _open_as_zipfile(model_file) as zf:
       return zf.read(filename)
 
   def get_metadata_buffer(self):
@@ -781,12 +838,34 @@ class MetadataDisplayer(object):
     Returns:
       List of packed associated files.
     """
+    return _get_packed_associated_file_list(model_buf)
 
-    try:
-      with _open_as_zipfile(io.BytesIO(model_buf)) as zf:
-        return zf.namelist()
-    except zipfile.BadZipFile:
-      return []
+
+# The metadata schema parser is shared by the whole process, as parsing the
+# schema is much slower than converting a metadata buffer.
+_metadata_schema_parser = None
+_metadata_schema_parser_lock = threading.Lock()
+
+
+def _get_metadata_schema_parser():
+  """Returns the metadata schema parser, parsing the schema on first use.
+
+  Raises:
+    ValueError: error occured when parsing the metadata schema file.
+  """
+  global _metadata_schema_parser
+  with _metadata_schema_parser_lock:
+    if _metadata_schema_parser is None:
+      opt = _pywrap_flatbuffers.IDLOptions()
+      opt.strict_json = True
+      parser = _pywrap_flatbuffers.Parser(opt)
+      with _open_file(_FLATC_TFLITE_METADATA_SCHEMA_FILE) as f:
+        metadata_schema_content = f.read()
+      if not parser.parse(metadata_schema_content):
+        raise ValueError("Cannot parse metadata schema. Reason: " +
+                         parser.error)
+      _metadata_schema_parser = parser
+    return _metadata_schema_parser
 
 
 # Create an individual method for getting the metadata json file, so that it can
@@ -794,6 +873,9 @@ class MetadataDisplayer(object):
 def convert_to_json(metadata_buffer):
   """Converts the metadata into a json string.
 
+  The metadata schema is parsed once per process, and the conversion can run
+  concurrently from multiple threads.
+
   Args:
     metadata_buffer: valid metadata buffer in bytes.
 
@@ -803,15 +885,28 @@ def convert_to_json(metadata_buffer):
   Raises:
     ValueError: error occured when parsing the metadata schema file.
   """
+  return _pywrap_flatbuffers.generate_text(_get_metadata_schema_parser(),
+                                           metadata_buffer)
+
 
-  opt = _pywrap_flatbuffers.IDLOptions()
-  opt.strict_json = True
-  parser = _pywrap_flatbuffers.Parser(opt)
-  with _open_file(_FLATC_TFLITE_METADATA_SCHEMA_FILE) as f:
-    metadata_schema_content = f.read()
-  if not parser.parse(metadata_schema_content):
-    raise ValueError("Cannot parse metadata schema. Reason: " + parser.error)
-  return _pywrap_flatbuffers.generate_text(parser, metadata_buffer)
+def convert_many_to_json(metadata_buffers):
+  """Converts a list of metadata buffers into json strings.
+
+  Args:
+    metadata_buffers: list of valid metadata buffers in bytes.
+
+  Returns:
+    List of the metadata in JSON format, in the same order as
+    metadata_buffers.
+
+  Raises:
+    ValueError: error occured when parsing the metadata schema file.
+  """
+  parser = _get_metadata_schema_parser()
+  return [
+      _pywrap_flatbuffers.generate_text(parser, metadata_buffer)
+      for metadata_buffer in metadata_buffers
+  ]
 
 
 def _assert_file_exist(filename):
@@ -820,13 +915,6 @@ def _assert_file_exist(filename):
     raise IOError("File, '{0}', does not exist.".format(filename))
 
 
-def _assert_model_file_identifier(model_file):
-  """Checks if a model file has the expected TFLite schema identifier."""
-  _assert_file_exist(model_file)
-  with _open_file(model_file, "rb") as f:
-    _assert_model_buffer_identifier(f.read())
-
-
 def _assert_model_buffer_identifier(model_buf):
   if not _schema_fb.Model.ModelBufferHasIdentifier(model_buf, 0):
     raise ValueError(
@@ -843,6 +931,109 @@ def _assert_metadata_buffer_identifier(metadata_buf):
         " be a valid TFLite Metadata.")
 
 
+class _WriteOnlyFile(object):
+  """File-like that can only be written sequentially.
+
+  Files opened for writing with tf.io.gfile can't seek, but don't raise the
+  errors zipfile expects in that case. Hiding seek() makes zipfile stream the
+  zip entries instead. tf.io.gfile also only writes bytes, so memoryviews, such
+  as the chunks of a memory mapped model, are copied to bytes chunk by chunk.
+  """
+
+  def __init__(self, f):
+    self._file = f
+    self._position = 0
+
+  def write(self, data):
+    if isinstance(data, memoryview):
+      data = data.cast("B")
+      for start in range(0, len(data), _COPY_CHUNK_SIZE):
+        self._file.write(bytes(data[start:start + _COPY_CHUNK_SIZE]))
+    else:
+      self._file.write(data)
+    self._position += len(data)
+    return len(data)
+
+  def tell(self):
+    return self._position
+
+  def flush(self):
+    self._file.flush()
+
+
+def _write_zip_entry(zf, name, src, file_size, compress_type, date_time=None):
+  """Writes a file into a zip file, copying it from src in chunks.
+
+  Args:
+    zf: the destination ZipFile, opened for writing.
+    name: name of the file in the zip file.
+    src: file-like to read the file content from.
+    file_size: size of the file, used to decide whether ZIP64 is needed.
+    compress_type: the zip compression method of the file.
+    date_time: modification time of the file. Defaults to now.
+  """
+  if date_time is None:
+    date_time = time.localtime(time.time())[:6]
+  zinfo = zipfile.ZipInfo(name, date_time)
+  zinfo.compress_type = compress_type
+  zinfo.external_attr = 0o600 << 16
+  zinfo.file_size = file_size
+  with zf.open(zinfo, "w") as dst:
+    shutil.copyfileobj(src, dst, _COPY_CHUNK_SIZE)
+
+
+class _BufferFile(io.RawIOBase):
+  """Read-only file-like over a buffer, such as a memory mapped model file.
+
+  Unlike io.BytesIO, it never copies the buffer, so that zipfile only reads the
+  parts of the buffer it needs.
+  """
+
+  def __init__(self, buf):
+    super().__init__()
+    self._buffer = memoryview(buf).cast("B")
+    self._position = 0
+
+  def readable(self):
+    return True
+
+  def seekable(self):
+    return True
+
+  def readinto(self, b):
+    data = self._buffer[self._position:self._position + len(b)]
+    b[:len(data)] = data
+    self._position += len(data)
+    return len(data)
+
+  def seek(self, offset, whence=io.SEEK_SET):
+    if whence == io.SEEK_CUR:
+      offset += self._position
+    elif whence == io.SEEK_END:
+      offset += len(self._buffer)
+    if offset < 0:
+      raise OSError("Negative seek position {0}.".format(offset))
+    self._position = offset
+    return self._position
+
+  def tell(self):
+    return self._position
+
+  def close(self):
+    self._buffer.release()
+    super().close()
+
+
+def _get_packed_associated_file_list(model_buf):
+  """Gets a list of associated files packed to the model buffer."""
+  with _BufferFile(model_buf) as model_file:
+    if not zipfile.is_zipfile(model_file):
+      return []
+
+    with _open_as_zipfile(model_file, "r") as zf:
+      return zf.namelist()
+
+
 def get_metadata_buffer(model_buf):
   """Returns the metadata in the model file as a buffer.
 
@@ -859,7 +1050,455 @@ def get_metadata_buffer(model_buf):
     meta = tflite_model.Metadata(i)
     if meta.Name().decode("utf-8") == MetadataPopulator.METADATA_FIELD_NAME:
       buffer_index = meta.Buffer()
+      # The metadata of models larger than 2 GB may be stored outside of the
+      # flatbuffer, like their weights.
+      external_range = _get_external_buffer_range(model_buf, buffer_index)
+      if external_range is not None:
+        offset, size = external_range
+        return bytes(memoryview(model_buf)[offset:offset + size])
       metadata = tflite_model.Buffers(buffer_index)
       return metadata.DataAsNumpy().tobytes()
 
   return None
+
+
+def _repack_metadata_buffer(model_buf, metadata_buf):
+  """Populates the metadata buffer into the model by repacking the model.
+
+  Unpacks the whole model into the `ModelT` object API and packs it back with
+  the metadata, which works for any model but is slow and memory hungry for
+  large models. See `_patch_metadata_buffer`.
+
+  Args:
+    model_buf: the TFLite model flatbuffer.
+    metadata_buf: the metadata flatbuffer.
+
+  Returns:
+    The updated model buffer.
+  """
+  model = _schema_fb.ModelT.InitFromObj(
+      _schema_fb.Model.GetRootAsModel(model_buf, 0))
+  buffer_field = _schema_fb.BufferT()
+  buffer_field.data = metadata_buf
+
+  is_populated = False
+  if not model.metadata:
+    model.metadata = []
+  else:
+    # Check if metadata has already been populated.
+    for meta in model.metadata:
+      if meta.name.decode("utf-8") == MetadataPopulator.METADATA_FIELD_NAME:
+        is_populated = True
+        model.buffers[meta.buffer] = buffer_field
+
+  if not is_populated:
+    if not model.buffers:
+      model.buffers = []
+    model.buffers.append(buffer_field)
+    # Creates a new metadata field.
+    metadata_field = _schema_fb.MetadataT()
+    metadata_field.name = MetadataPopulator.METADATA_FIELD_NAME
+    metadata_field.buffer = len(model.buffers) - 1
+    model.metadata.append(metadata_field)
+
+  # Packs model back to a flatbuffer binaray file.
+  b = flatbuffers.Builder(0)
+  b.Finish(model.Pack(b), MetadataPopulator.TFLITE_FILE_IDENTIFIER)
+  return b.Output()
+
+
+# Field ids of the tables of the TFLite schema that are read or rewritten when
+# patching the metadata in place. See tensorflow/lite/schema/schema.fbs.
+_MODEL_VERSION_FIELD = 0
+_MODEL_SUBGRAPHS_FIELD = 2
+_MODEL_BUFFERS_FIELD = 4
+_MODEL_METADATA_FIELD = 6
+_MODEL_NUM_FIELDS = 8
+_SUBGRAPH_OPERATORS_FIELD = 3
+_OPERATOR_LARGE_CUSTOM_OPTIONS_OFFSET_FIELD = 9
+_BUFFER_OFFSET_FIELD = 1
+_BUFFER_SIZE_FIELD = 2
+_METADATA_NAME_FIELD = 0
+_METADATA_BUFFER_FIELD = 1
+
+# Alignment of the original model in the patched model buffer, which is the
+# largest alignment required by the TFLite flatbuffers (see `force_align` in
+# the schema).
+_PATCHED_MODEL_ALIGNMENT = 16
+
+# Written after the file identifier of a patched model, followed by the
+# position of the original model, so that the prefix can be replaced rather
+# than stacked when the metadata is populated again.
+_PATCHED_MODEL_MARKER = b"TFLITE_METADATA_PATCH\0\0\0"
+
+
+def _read_uint32(buf, pos):
+  return struct.unpack_from("<I", buf, pos)[0]
+
+
+def _get_table_field_positions(buf, table_pos, num_fields):
+  """Returns the positions of the fields of a flatbuffer table.
+
+  Args:
+    buf: the flatbuffer.
+    table_pos: position of the table in `buf`.
+    num_fields: number of fields in the table schema.
+
+  Returns:
+    A list with the position of each field in `buf`, or `None` for the fields
+    that are not set. Returns `None` if the table has more fields than
+    `num_fields`, i.e. it was written with a newer schema.
+  """
+  vtable_pos = table_pos - struct.unpack_from("<i", buf, table_pos)[0]
+  vtable_size = struct.unpack_from("<H", buf, vtable_pos)[0]
+  field_offsets = struct.unpack_from("<%dH" % ((vtable_size - 4) // 2), buf,
+                                     vtable_pos + 4)
+  if len(field_offsets) > num_fields:
+    return None
+  positions = [
+      table_pos + offset if offset else None for offset in field_offsets
+  ]
+  return positions + [None] * (num_fields - len(positions))
+
+
+def _get_table_field_position(buf, table_pos, field_id):
+  """Returns the position of a field of a flatbuffer table, or `None`."""
+  vtable_pos = table_pos - struct.unpack_from("<i", buf, table_pos)[0]
+  vtable_size = struct.unpack_from("<H", buf, vtable_pos)[0]
+  if 4 + 2 * field_id >= vtable_size:
+    return None
+  offset = struct.unpack_from("<H", buf, vtable_pos + 4 + 2 * field_id)[0]
+  return table_pos + offset if offset else None
+
+
+def _get_external_data_offset_positions(model_buf):
+  """Returns the positions of the offsets to data stored outside the flatbuffer.
+
+  Models larger than 2 GB store their weights and large custom options after
+  the flatbuffer, and reference them by their absolute offset in the file,
+  which is only valid if greater than 1.
+
+  Args:
+    model_buf: the TFLite model, without any packed files.
+
+  Returns:
+    The positions of the `Buffer.offset` and
+    `Operator.large_custom_options_offset` fields pointing outside of the
+    flatbuffer.
+  """
+  root_pos = _read_uint32(model_buf, 0)
+  offset_positions = []
+  for buffer_pos in _get_vector_table_positions(
+      model_buf,
+      _get_table_field_position(model_buf, root_pos, _MODEL_BUFFERS_FIELD)):
+    offset_positions.append(
+        _get_table_field_position(model_buf, buffer_pos, _BUFFER_OFFSET_FIELD))
+  for subgraph_pos in _get_vector_table_positions(
+      model_buf,
+      _get_table_field_position(model_buf, root_pos, _MODEL_SUBGRAPHS_FIELD)):
+    for operator_pos in _get_vector_table_positions(
+        model_buf,
+        _get_table_field_position(model_buf, subgraph_pos,
+                                  _SUBGRAPH_OPERATORS_FIELD)):
+      offset_positions.append(
+          _get_table_field_position(
+              model_buf, operator_pos,
+              _OPERATOR_LARGE_CUSTOM_OPTIONS_OFFSET_FIELD))
+  return [
+      pos for pos in offset_positions
+      if pos is not None and struct.unpack_from("<Q", model_buf, pos)[0] > 1
+  ]
+
+
+def _get_external_buffer_range(model_buf, buffer_index):
+  """Returns the (offset, size) of a buffer stored outside the flatbuffer.
+
+  Args:
+    model_buf: the TFLite model.
+    buffer_index: index of the buffer in `Model.buffers`.
+
+  Returns:
+    The absolute offset and the size of the buffer data, or `None` if the data
+    is stored in the flatbuffer.
+  """
+  root_pos = _read_uint32(model_buf, 0)
+  buffer_pos = _get_vector_table_positions(
+      model_buf,
+      _get_table_field_position(model_buf, root_pos,
+                                _MODEL_BUFFERS_FIELD))[buffer_index]
+  offset_pos = _get_table_field_position(model_buf, buffer_pos,
+                                         _BUFFER_OFFSET_FIELD)
+  size_pos = _get_table_field_position(model_buf, buffer_pos,
+                                       _BUFFER_SIZE_FIELD)
+  if offset_pos is None or size_pos is None:
+    return None
+  offset = struct.unpack_from("<Q", model_buf, offset_pos)[0]
+  if offset <= 1:
+    return None
+  return offset, struct.unpack_from("<Q", model_buf, size_pos)[0]
+
+
+def _get_vector_table_positions(buf, field_pos):
+  """Returns the positions of the tables of a vector of tables field."""
+  if field_pos is None:
+    return []
+  vector_pos = field_pos + _read_uint32(buf, field_pos)
+  element_positions = range(vector_pos + 4,
+                            vector_pos + 4 + 4 * _read_uint32(buf, vector_pos),
+                            4)
+  return [pos + _read_uint32(buf, pos) for pos in element_positions]
+
+
+def _get_patched_model_position(model_buf):
+  """Returns the position of the original model in a patched model.
+
+  The position written by `_get_patched_model_chunks` is only trusted if the
+  root table still references the tables of the original model, i.e. the
+  model wasn't modified by other means since.
+
+  Args:
+    model_buf: the TFLite model, without any packed files.
+
+  Returns:
+    The position of the original model, or 0 if the model wasn't patched.
+  """
+  marker_end = 8 + len(_PATCHED_MODEL_MARKER)
+  if (len(model_buf) < marker_end + 4 or
+      bytes(model_buf[8:marker_end]) != _PATCHED_MODEL_MARKER):
+    return 0
+  model_pos = _read_uint32(model_buf, marker_end)
+  root_pos = _read_uint32(model_buf, 0)
+  if (model_pos % _PATCHED_MODEL_ALIGNMENT or root_pos >= model_pos or
+      model_pos + 8 > len(model_buf)):
+    return 0
+
+  original_buf = memoryview(model_buf)[model_pos:]
+  model_fields = _get_table_field_positions(model_buf, root_pos,
+                                            _MODEL_NUM_FIELDS)
+  original_fields = _get_table_field_positions(original_buf,
+                                               _read_uint32(original_buf, 0),
+                                               _MODEL_NUM_FIELDS)
+  if model_fields is None or original_fields is None:
+    return 0
+  for field_id, (field_pos, original_field_pos) in enumerate(
+      zip(model_fields, original_fields)):
+    if field_id in (_MODEL_VERSION_FIELD, _MODEL_METADATA_FIELD):
+      continue
+    if (field_pos is None) != (original_field_pos is None):
+      return 0
+    if field_id == _MODEL_BUFFERS_FIELD or field_pos is None:
+      continue
+    if (field_pos + _read_uint32(model_buf, field_pos) !=
+        model_pos + original_field_pos +
+        _read_uint32(original_buf, original_field_pos)):
+      return 0
+
+  # Only the metadata buffer may differ from the buffers of the original model.
+  buffers = _get_vector_table_positions(model_buf,
+                                        model_fields[_MODEL_BUFFERS_FIELD])
+  original_buffers = _get_vector_table_positions(
+      original_buf, original_fields[_MODEL_BUFFERS_FIELD])
+  if len(buffers) - len(original_buffers) not in (0, 1):
+    return 0
+  num_replaced_buffers = sum(
+      buffer_pos != model_pos + original_buffer_pos
+      for buffer_pos, original_buffer_pos in zip(buffers, original_buffers))
+  if num_replaced_buffers + len(buffers) - len(original_buffers) != 1:
+    return 0
+  return model_pos
+
+
+def _patch_metadata_buffer(model_buf, metadata_buf):
+  """Populates the metadata buffer into the model without unpacking it.
+
+  See `_get_patched_model_chunks`.
+
+  Args:
+    model_buf: the TFLite model, without any packed files.
+    metadata_buf: the metadata flatbuffer, or `None` to populate an empty
+      metadata buffer.
+
+  Returns:
+    The updated model buffer, or `None` if the model can't be patched in place.
+  """
+  chunks = _get_patched_model_chunks(model_buf, metadata_buf)
+  return bytearray().join(chunks) if chunks is not None else None
+
+
+def _get_patched_model_chunks(model_buf, metadata_buf):
+  """Populates the metadata buffer into the model without unpacking it.
+
+  Flatbuffer offsets only point forward, so the original model can be kept
+  byte for byte as long as everything that references it is placed before it.
+  This function writes a new root table, new `buffers` and `metadata` vectors,
+  and the new metadata buffer, then appends the original model. Weights are
+  copied as a single byte range and never deserialized.
+
+  Models larger than 2 GB store their weights after the flatbuffer, at absolute
+  offsets in the file. Only the flatbuffer section of such models is copied and
+  its offsets shifted by the size of the new prefix, and the weights follow
+  unchanged, so that the model is never repacked into a single flatbuffer.
+
+  If the model already has metadata, the `TFLITE_METADATA` entry is pointed to
+  the new buffer and the previous metadata remains as unreferenced bytes. If
+  the model was itself patched by this function, its prefix is dropped and the
+  original model is patched instead, so that populating metadata repeatedly
+  doesn't grow the model.
+
+  Args:
+    model_buf: the TFLite model, without any packed files.
+    metadata_buf: the metadata flatbuffer, or `None` to populate an empty
+      metadata buffer.
+
+  Returns:
+    The chunks of the updated model, to be written one after the other, or
+    `None` if the model uses fields unknown to this version of the schema,
+    which can't be patched in place. The weights are returned as a slice of
+    `model_buf` rather than copied.
+  """
+  base_pos = _get_patched_model_position(model_buf)
+  if base_pos:
+    model_buf = memoryview(model_buf)[base_pos:]
+  root_pos = _read_uint32(model_buf, 0)
+  model_fields = _get_table_field_positions(model_buf, root_pos,
+                                            _MODEL_NUM_FIELDS)
+  if model_fields is None:
+    return None
+
+  buffers = _get_vector_table_positions(model_buf,
+                                        model_fields[_MODEL_BUFFERS_FIELD])
+
+  metadata = _get_vector_table_positions(model_buf,
+                                         model_fields[_MODEL_METADATA_FIELD])
+  metadata_buffer_index = None
+  for metadata_pos in metadata:
+    metadata_fields = _get_table_field_positions(model_buf, metadata_pos, 2)
+    if metadata_fields is None or metadata_fields[_METADATA_NAME_FIELD] is None:
+      return None
+    name_pos = metadata_fields[_METADATA_NAME_FIELD]
+    name_pos += _read_uint32(model_buf, name_pos)
+    name = bytes(model_buf[name_pos + 4:name_pos + 4 +
+                           _read_uint32(model_buf, name_pos)])
+    if name == MetadataPopulator.METADATA_FIELD_NAME.encode("utf-8"):
+      buffer_pos = metadata_fields[_METADATA_BUFFER_FIELD]
+      metadata_buffer_index = (
+          _read_uint32(model_buf, buffer_pos) if buffer_pos is not None else 0)
+      if metadata_buffer_index >= len(buffers):
+        return None
+
+  # Offsets to fix up once the size of the prefix, i.e. the position of the
+  # original model, is known. Targets are either the name of a new object or
+  # a position in the original model.
+  out = bytearray(8)
+  out.extend(_PATCHED_MODEL_MARKER)
+  out.extend(b"\0" * 4)
+  fixups = []
+  targets = {}
+
+  def align(alignment):
+    out.extend(b"\0" * (-len(out) % alignment))
+
+  def add_offset(target):
+    fixups.append((len(out), target))
+    out.extend(b"\0" * 4)
+
+  def add_table(name, field_targets):
+    # Writes a table made of uoffset and uint32 fields preceded by its vtable.
+    # Each field target is a fixup target, the bytes of a scalar, or None.
+    present = [target for target in field_targets if target is not None]
+    vtable_pos = len(out)
+    out.extend(
+        struct.pack("<HH", 4 + 2 * len(field_targets), 4 + 4 * len(present)))
+    field_offset = 4
+    for target in field_targets:
+      out.extend(struct.pack("<H", field_offset if target is not None else 0))
+      if target is not None:
+        field_offset += 4
+    align(4)
+    targets[name] = len(out)
+    out.extend(struct.pack("<i", len(out) - vtable_pos))
+    for target in present:
+      if isinstance(target, bytes):
+        out.extend(target)
+      else:
+        add_offset(target)
+
+  def add_vector(name, element_targets):
+    targets[name] = len(out)
+    out.extend(struct.pack("<I", len(element_targets)))
+    for target in element_targets:
+      add_offset(target)
+
+  # Root table. The version is copied as is, the other fields are offsets.
+  root_fields = []
+  for field_id, field_pos in enumerate(model_fields):
+    if field_id == _MODEL_VERSION_FIELD:
+      root_fields.append(
+          bytes(model_buf[field_pos:field_pos + 4])
+          if field_pos is not None else None)
+    elif field_id == _MODEL_BUFFERS_FIELD:
+      root_fields.append("buffers")
+    elif field_id == _MODEL_METADATA_FIELD:
+      root_fields.append("metadata")
+    elif field_pos is not None:
+      root_fields.append(field_pos + _read_uint32(model_buf, field_pos))
+    else:
+      root_fields.append(None)
+  add_table("root", root_fields)
+
+  buffer_targets = list(buffers)
+  metadata_targets = list(metadata)
+  if metadata_buffer_index is None:
+    metadata_buffer_index = len(buffer_targets)
+    buffer_targets.append("metadata_buffer")
+    metadata_targets.append("metadata_entry")
+  else:
+    buffer_targets[metadata_buffer_index] = "metadata_buffer"
+  add_vector("buffers", buffer_targets)
+  add_vector("metadata", metadata_targets)
+
+  if "metadata_entry" in metadata_targets:
+    add_table("metadata_entry",
+              ["metadata_name",
+               struct.pack("<I", metadata_buffer_index)])
+    name = MetadataPopulator.METADATA_FIELD_NAME.encode("utf-8")
+    targets["metadata_name"] = len(out)
+    out.extend(struct.pack("<I", len(name)) + name + b"\0")
+    align(4)
+
+  # Like `BufferT`, no data is written if there is no metadata buffer.
+  add_table("metadata_buffer",
+            ["metadata_data" if metadata_buf is not None else None])
+  if metadata_buf is not None:
+    # Aligns the metadata bytes, not the length prefix, the same way
+    # flatbuffers.Builder does with `force_align: 16`.
+    out.extend(b"\0" * (-(len(out) + 4) % _PATCHED_MODEL_ALIGNMENT))
+    targets["metadata_data"] = len(out)
+    out.extend(struct.pack("<I", len(metadata_buf)))
+    out.extend(metadata_buf)
+  align(_PATCHED_MODEL_ALIGNMENT)
+
+  model_pos = len(out)
+  for pos, target in fixups:
+    target_pos = targets[target] if isinstance(target, str) else (model_pos +
+                                                                  target)
+    struct.pack_into("<I", out, pos, target_pos - pos)
+  struct.pack_into("<I", out, 0, targets["root"])
+  out[4:8] = model_buf[4:8]
+  struct.pack_into("<I", out, 8 + len(_PATCHED_MODEL_MARKER), model_pos)
+
+  offset_positions = _get_external_data_offset_positions(model_buf)
+  if not offset_positions:
+    return [out, model_buf]
+
+  # The data outside of the flatbuffer moves by the size of the prefix, which
+  # is a multiple of the alignment of the model, so it stays aligned. The
+  # offsets of a patched model already include the size of its prefix.
+  data_pos = min(
+      struct.unpack_from("<Q", model_buf, pos)[0]
+      for pos in offset_positions) - base_pos
+  flatbuffer = bytearray(model_buf[:data_pos])
+  for pos in offset_positions:
+    offset = struct.unpack_from("<Q", flatbuffer, pos)[0]
+    struct.pack_into("<Q", flatbuffer, pos, offset - base_pos + model_pos)
+  return [out, flatbuffer, memoryview(model_buf)[data_pos:]]
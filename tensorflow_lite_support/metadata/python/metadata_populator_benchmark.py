@@ -0,0 +1,120 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmarks populating metadata into large models.
+
+Compares the time and the peak memory of patching the metadata into the model
+in place against unpacking and repacking the whole model, on a synthetic model
+or on a given model file.
+"""
+
+import time
+import tracemalloc
+
+from absl import app
+from absl import flags
+import flatbuffers
+import numpy as np
+
+from tensorflow_lite_support.metadata import metadata_schema_py_generated as _metadata_fb
+from tensorflow_lite_support.metadata import schema_py_generated as _schema_fb
+from tensorflow_lite_support.metadata.python import metadata
+
+# pylint: disable=protected-access
+_patch_metadata_buffer = metadata._patch_metadata_buffer
+_repack_metadata_buffer = metadata._repack_metadata_buffer
+# pylint: enable=protected-access
+
+FLAGS = flags.FLAGS
+flags.DEFINE_string(
+    'model_path', None,
+    'Path to the TFLite model file. If not set, a synthetic model is used.')
+flags.DEFINE_integer('num_buffers', 100,
+                     'Number of weight buffers of the synthetic model.')
+flags.DEFINE_integer('buffer_size_kb', 3 * 1024,
+                     'Size of each weight buffer of the synthetic model.')
+flags.DEFINE_integer('metadata_size_kb', 4, 'Size of the metadata.')
+flags.DEFINE_integer('num_runs', 3, 'Number of runs for each path.')
+
+
+def _create_model_buf(num_buffers, buffer_size):
+  """Creates a model with `num_buffers` weight buffers of the given size."""
+  model = _schema_fb.ModelT()
+  model.version = 3
+  model.subgraphs = [_schema_fb.SubGraphT()]
+  model.buffers = [_schema_fb.BufferT()]
+  for i in range(num_buffers):
+    weights = _schema_fb.BufferT()
+    weights.data = np.full(buffer_size, i % 256, dtype=np.uint8)
+    model.buffers.append(weights)
+  b = flatbuffers.Builder(0)
+  b.Finish(model.Pack(b), metadata.MetadataPopulator.TFLITE_FILE_IDENTIFIER)
+  return bytes(b.Output())
+
+
+def _create_metadata_buf(size):
+  """Creates a metadata flatbuffer of about `size` bytes."""
+  model_meta = _metadata_fb.ModelMetadataT()
+  model_meta.name = 'benchmark'
+  model_meta.description = 'x' * size
+  b = flatbuffers.Builder(0)
+  b.Finish(
+      model_meta.Pack(b), metadata.MetadataPopulator.METADATA_FILE_IDENTIFIER)
+  return bytes(b.Output())
+
+
+def _measure(populate_fn, model_buf, metadata_buf, num_runs):
+  """Returns the best time in seconds and the peak memory in bytes."""
+  best_time = float('inf')
+  peak_memory = 0
+  for _ in range(num_runs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    output = populate_fn(model_buf, metadata_buf)
+    best_time = min(best_time, time.perf_counter() - start)
+    peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    if metadata.get_metadata_buffer(output) != metadata_buf:
+      raise RuntimeError('The metadata was not populated correctly.')
+    del output
+  return best_time, peak_memory
+
+
+def main(_):
+  if FLAGS.model_path:
+    with open(FLAGS.model_path, 'rb') as f:
+      model_buf = f.read()
+  else:
+    model_buf = _create_model_buf(FLAGS.num_buffers,
+                                  FLAGS.buffer_size_kb * 1024)
+  metadata_buf = _create_metadata_buf(FLAGS.metadata_size_kb * 1024)
+
+  def patch(model_buf, metadata_buf):
+    output = _patch_metadata_buffer(model_buf, metadata_buf)
+    if output is None:
+      raise ValueError('The model cannot be patched in place.')
+    return output
+
+  print('Model size: {0:.1f} MB'.format(len(model_buf) / 2**20))
+  print('{0:<10}{1:>12}{2:>20}'.format('Path', 'Time (s)', 'Peak memory (MB)'))
+  for name, populate_fn in [('patch', patch),
+                            ('repack', _repack_metadata_buffer)]:
+    best_time, peak_memory = _measure(populate_fn, model_buf, metadata_buf,
+                                      FLAGS.num_runs)
+    print('{0:<10}{1:>12.3f}{2:>20.1f}'.format(name, best_time,
+                                               peak_memory / 2**20))
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -15,8 +15,6 @@
 """Object oriented generic metadata writer for modular task API."""
 
 import collections
-import os
-import tempfile
 from typing import Optional, List
 
 from tensorflow_lite_support.metadata import metadata_schema_py_generated as _metadata_fb
@@ -122,6 +120,7 @@ class Writer:
   def __init__(self, model_buffer: bytearray, model_name: str,
                model_description: str):
     self._model_buffer = model_buffer
+    self._model_signature = writer_utils.ModelSignature(model_buffer)
     self._general_md = metadata_info.GeneralMd(
         name=model_name, description=model_description)
     self._input_mds = []
@@ -129,13 +128,10 @@ class Writer:
     self._associate_files = []
 
   def __enter__(self):
-    self._temp_folder = tempfile.TemporaryDirectory()
     return self
 
   def __exit__(self, unused_exc_type, unused_exc_val, unused_exc_tb):
-    self._temp_folder.cleanup()
-    # Delete the attribute so that it errors out outside the `with` statement.
-    delattr(self, '_temp_folder')
+    pass
 
   def populate(self,
                tflite_path: Optional[str] = None,
@@ -160,7 +156,8 @@ class Writer:
         general_md=self._general_md,
         input_md=self._input_mds,
         output_md=self._output_mds,
-        associated_files=self._associate_files)
+        associated_files=self._associate_files,
+        model_signature=self._model_signature)
 
     if tflite_path:
       tflite_content = writer.populate()
@@ -174,18 +171,16 @@ class Writer:
 
     return (tflite_content, metadata_json_content)
 
-  def _export_labels(self, filename: str, index_to_label: List[str]):
-    filepath = os.path.join(self._temp_folder.name, filename)
-    with open(filepath, 'w') as f:
-      f.write('\n'.join(index_to_label))
-    self._associate_files.append(filepath)
-    return filepath
+  def _export_labels(self, filename: str, index_to_label: List[str]) -> bytes:
+    """Exports the labels in memory and returns the label file content."""
+    self._associate_files.append(filename)
+    return '\n'.join(index_to_label).encode('utf-8')
 
   def _input_tensor_type(self, idx):
-    return writer_utils.get_input_tensor_types(self._model_buffer)[idx]
+    return self._model_signature.inputs[idx].type
 
   def _output_tensor_type(self, idx):
-    return writer_utils.get_output_tensor_types(self._model_buffer)[idx]
+    return self._model_signature.outputs[idx].type
 
   _INPUT_AUDIO_NAME = 'audio'
   _INPUT_AUDIO_DESCRIPTION = 'Input audio clip to be processed.'
@@ -285,25 +280,25 @@ class Writer:
     self._output_mds.append(output_md)
     return self
 
-  def _export_calibration_file(self, filename: str,
-                               calibrations: List[CalibrationParameter]):
-    """Store calibration parameters in a csv file."""
-    filepath = os.path.join(self._temp_folder.name, filename)
-    with open(filepath, 'w') as f:
-      for idx, item in enumerate(calibrations):
-        if idx != 0:
-          f.write('\n')
-        if item:
-          scale, slope, offset, min_score = item
-          if all(x is not None for x in item):
-            f.write(f'{scale},{slope},{offset},{min_score}')
-          elif all(x is not None for x in item[:3]):
-            f.write(f'{scale},{slope},{offset}')
-          else:
-            raise ValueError('scale, slope and offset values can not be set to '
-                             'None.')
-          self._associate_files.append(filepath)
-    return filepath
+  def _export_calibration_file(
+      self, filename: str, calibrations: List[CalibrationParameter]) -> bytes:
+    """Exports the calibration parameters in memory as a csv file content."""
+    lines = []
+    for item in calibrations:
+      if not item:
+        lines.append('')
+        continue
+      scale, slope, offset, min_score = item
+      if all(x is not None for x in item):
+        lines.append(f'{scale},{slope},{offset},{min_score}')
+      elif all(x is not None for x in item[:3]):
+        lines.append(f'{scale},{slope},{offset}')
+      else:
+        raise ValueError('scale, slope and offset values can not be set to '
+                         'None.')
+    if any(lines):
+      self._associate_files.append(filename)
+    return '\n'.join(lines).encode('utf-8')
 
   _OUTPUT_CLASSIFICATION_NAME = 'score'
   _OUTPUT_CLASSIFICATION_DESCRIPTION = 'Score of the labels respectively'
@@ -335,11 +330,13 @@ class Writer:
     """
     calibration_md = None
     if score_calibration:
+      calibration_filename = 'score_calibration.txt'
       calibration_md = metadata_info.ScoreCalibrationMd(
           score_transformation_type=score_calibration.transformation_type,
           default_score=score_calibration.default_score,
-          file_path=self._export_calibration_file('score_calibration.txt',
-                                                  score_calibration.parameters))
+          file_path=calibration_filename,
+          file_content=self._export_calibration_file(
+              calibration_filename, score_calibration.parameters))
 
     idx = len(self._output_mds)
 
@@ -347,8 +344,9 @@ class Writer:
     for item in labels._labels:  # pylint: disable=protected-access
       label_files.append(
           metadata_info.LabelFileMd(
-              self._export_labels(item.filename, item.names),
-              locale=item.locale))
+              item.filename,
+              locale=item.locale,
+              file_content=self._export_labels(item.filename, item.names)))
 
     output_md = metadata_info.ClassificationTensorMd(
         name=name,
@@ -39,7 +39,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
       model_buffer: bytearray,
       general_md: Optional[metadata_info.GeneralMd] = None,
       input_md: Optional[metadata_info.InputAudioTensorMd] = None,
-      output_md: Optional[metadata_info.ClassificationTensorMd] = None):
+      output_md: Optional[metadata_info.ClassificationTensorMd] = None,
+      model_signature: Optional[writer_utils.ModelSignature] = None):
     """Creates MetadataWriter based on general/input/output information.
 
     Args:
@@ -50,6 +51,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
         metadata will be generated.
       output_md: output classification tensor informaton. If not specified,
         default output metadata will be generated.
+      model_signature: signature of the model, if already parsed from
+        `model_buffer`.
 
     Returns:
       A MetadataWriter object.
@@ -58,8 +61,12 @@ class MetadataWriter(metadata_writer.MetadataWriter):
       output_md = metadata_info.ClassificationTensorMd(
           name=_OUTPUT_NAME, description=_OUTPUT_DESCRIPTION)
 
-    return cls.create_from_metadata_info_for_multihead(model_buffer, general_md,
-                                                       input_md, [output_md])
+    return cls.create_from_metadata_info_for_multihead(
+        model_buffer,
+        general_md,
+        input_md,
+        [output_md],
+        model_signature=model_signature)
 
   @classmethod
   def create_from_metadata_info_for_multihead(
@@ -68,7 +75,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
       general_md: Optional[metadata_info.GeneralMd] = None,
       input_md: Optional[metadata_info.InputAudioTensorMd] = None,
       output_md_list: Optional[List[
-          metadata_info.ClassificationTensorMd]] = None):
+          metadata_info.ClassificationTensorMd]] = None,
+      model_signature: Optional[writer_utils.ModelSignature] = None):
     """Creates a MetadataWriter instance for multihead models.
 
     Args:
@@ -82,6 +90,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
         `tensor_name` in each `ClassificationTensorMd` instance is not
         specified, elements in `output_md_list` need to have one-to-one mapping
         with the output tensors [1] in the TFLite model.
+      model_signature: signature of the model, if already parsed from
+        `model_buffer`.
       [1]:
         https://github.com/tensorflow/tflite-support/blob/b2a509716a2d71dfff706468680a729cc1604cff/tensorflow_lite_support/metadata/metadata_schema.fbs#L605-L612
 
@@ -107,7 +117,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
         general_md=general_md,
         input_md=[input_md],
         output_md=output_md_list,
-        associated_files=associated_files)
+        associated_files=associated_files,
+        model_signature=model_signature)
 
   @classmethod
   def create_for_inference(
@@ -151,6 +162,7 @@ class MetadataWriter(metadata_writer.MetadataWriter):
       raise ValueError(
           "channels should be positive, but got {}.".format(channels))
 
+    model_signature = writer_utils.get_model_signature(model_buffer)
     input_md = metadata_info.InputAudioTensorMd(_INPUT_NAME, _INPUT_DESCRIPTION,
                                                 sample_rate, channels)
 
@@ -161,8 +173,11 @@ class MetadataWriter(metadata_writer.MetadataWriter):
             metadata_info.LabelFileMd(file_path=file_path)
             for file_path in label_file_paths
         ],
-        tensor_type=writer_utils.get_output_tensor_types(model_buffer)[0],
+        tensor_type=model_signature.outputs[0].type,
         score_calibration_md=score_calibration_md)
 
     return cls.create_from_metadata_info(
-        model_buffer, input_md=input_md, output_md=output_md)
+        model_buffer,
+        input_md=input_md,
+        output_md=output_md,
+        model_signature=model_signature)
@@ -0,0 +1,314 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Writes metadata into many models in parallel.
+
+The models are listed in a JSON manifest, along with the metadata writer and
+the `create_for_inference` arguments of each model:
+
+  {
+    "models": [
+      {
+        "model_path": "mobilenet_v2.tflite",
+        "output_path": "mobilenet_v2_with_metadata.tflite",
+        "writer": "image_classifier",
+        "input_norm_mean": [127.5],
+        "input_norm_std": [127.5],
+        "label_file_paths": ["labels.txt"]
+      }
+    ]
+  }
+
+Relative paths are resolved against the directory of the manifest. If
+`output_path` is omitted, the model file is updated in place. The supported
+writers and their arguments are:
+
+  * image_classifier, object_detector, image_segmenter: `input_norm_mean`,
+    `input_norm_std`, `label_file_paths`.
+  * audio_classifier: `sample_rate`, `channels`, `label_file_paths`.
+  * nl_classifier: `delim_regex_pattern`, `vocab_file_path`,
+    `label_file_paths`.
+  * bert_nl_classifier: `vocab_file_path` for a BERT tokenizer, or
+    `sentence_piece_model_path` and optionally `vocab_file_path` for a
+    SentencePiece tokenizer, and `label_file_paths`.
+
+Models are written by a pool of processes. Each process loads the associated
+files, such as label and vocabulary files, once and reuses them for all the
+models sharing them. Outputs are written atomically, so that a failed model
+never leaves a partially written file.
+"""
+
+import concurrent.futures
+import dataclasses
+import functools
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+import uuid
+
+from absl import app
+from absl import flags
+
+from tensorflow_lite_support.metadata.python.metadata_writers import audio_classifier
+from tensorflow_lite_support.metadata.python.metadata_writers import bert_nl_classifier
+from tensorflow_lite_support.metadata.python.metadata_writers import image_classifier
+from tensorflow_lite_support.metadata.python.metadata_writers import image_segmenter
+from tensorflow_lite_support.metadata.python.metadata_writers import metadata_info
+from tensorflow_lite_support.metadata.python.metadata_writers import metadata_writer
+from tensorflow_lite_support.metadata.python.metadata_writers import nl_classifier
+from tensorflow_lite_support.metadata.python.metadata_writers import object_detector
+
+try:
+  # If exists, optionally use TensorFlow to open and check files. Used to
+  # support more than local file systems.
+  import tensorflow as tf  # pylint: disable=g-import-not-at-top
+  _open_file = tf.io.gfile.GFile
+  _exists_file = tf.io.gfile.exists
+  _remove_file = tf.io.gfile.remove
+
+  def _replace_file(src, dst):
+    tf.io.gfile.rename(src, dst, overwrite=True)
+
+  def _get_file_version(filename):
+    stat = tf.io.gfile.stat(filename)
+    return stat.mtime_nsec, stat.length
+except ImportError:
+  # If TensorFlow package doesn't exist, fall back to original open and exists.
+  _open_file = open
+  _exists_file = os.path.exists
+  _remove_file = os.remove
+  _replace_file = os.replace
+
+  def _get_file_version(filename):
+    stat = os.stat(filename)
+    return stat.st_mtime_ns, stat.st_size
+
+FLAGS = flags.FLAGS
+flags.DEFINE_string('manifest_path', None, 'Path to the JSON manifest.')
+flags.DEFINE_integer(
+    'num_workers', None,
+    'Number of worker processes. Defaults to the number of CPUs.')
+flags.DEFINE_string('report_path', None,
+                    'Optional path to write the JSON report to.')
+
+_ModelConfig = Dict[str, Any]
+
+# Manifest keys holding paths, resolved against the manifest directory.
+_PATH_KEYS = ('model_path', 'output_path', 'vocab_file_path',
+              'sentence_piece_model_path')
+_PATH_LIST_KEYS = ('label_file_paths',)
+
+# Maximum number of associated files kept in memory by each worker process.
+_ASSOCIATED_FILE_CACHE_SIZE = 64
+
+
+def _create_image_writer(
+    writer_module) -> Callable[[bytes, _ModelConfig],
+                               metadata_writer.MetadataWriter]:
+  """Returns the writer factory of the image classifier, detector or segmenter."""
+
+  def create_writer(model_buffer, config):
+    return writer_module.MetadataWriter.create_for_inference(
+        model_buffer, config['input_norm_mean'], config['input_norm_std'],
+        config.get('label_file_paths', []))
+
+  return create_writer
+
+
+def _create_audio_classifier_writer(model_buffer, config):
+  return audio_classifier.MetadataWriter.create_for_inference(
+      model_buffer, config['sample_rate'], config['channels'],
+      config.get('label_file_paths', []))
+
+
+def _create_nl_classifier_writer(model_buffer, config):
+  tokenizer_md = None
+  if 'delim_regex_pattern' in config:
+    tokenizer_md = metadata_info.RegexTokenizerMd(config['delim_regex_pattern'],
+                                                  config['vocab_file_path'])
+  return nl_classifier.MetadataWriter.create_for_inference(
+      model_buffer, tokenizer_md, config.get('label_file_paths', []))
+
+
+def _create_bert_nl_classifier_writer(model_buffer, config):
+  if 'sentence_piece_model_path' in config:
+    tokenizer_md = metadata_info.SentencePieceTokenizerMd(
+        config['sentence_piece_model_path'], config.get('vocab_file_path'))
+  else:
+    tokenizer_md = metadata_info.BertTokenizerMd(config['vocab_file_path'])
+  return bert_nl_classifier.MetadataWriter.create_for_inference(
+      model_buffer, tokenizer_md, config.get('label_file_paths', []))
+
+
+_WRITER_FACTORIES = {
+    'image_classifier': _create_image_writer(image_classifier),
+    'object_detector': _create_image_writer(object_detector),
+    'image_segmenter': _create_image_writer(image_segmenter),
+    'audio_classifier': _create_audio_classifier_writer,
+    'nl_classifier': _create_nl_classifier_writer,
+    'bert_nl_classifier': _create_bert_nl_classifier_writer,
+}
+
+
+@dataclasses.dataclass
+class WriteResult:
+  """Result of writing the metadata of a model.
+
+  Attributes:
+    model_path: path to the model.
+    output_path: path to the model with metadata.
+    elapsed_seconds: time spent writing the metadata, including reading and
+      writing the model.
+    error: the error message if writing the metadata failed, None otherwise.
+  """
+  model_path: str
+  output_path: str
+  elapsed_seconds: float
+  error: Optional[str] = None
+
+
+def load_manifest(manifest_path: str) -> List[_ModelConfig]:
+  """Loads the model configs listed in a manifest.
+
+  Args:
+    manifest_path: path to the JSON manifest.
+
+  Returns:
+    The model configs, with paths resolved against the manifest directory.
+
+  Raises:
+    ValueError: if the manifest doesn't list any model.
+  """
+  manifest_dir = os.path.dirname(manifest_path)
+  with _open_file(manifest_path, 'r') as f:
+    configs = json.load(f).get('models', [])
+  if not configs:
+    raise ValueError(f'No model found in manifest: {manifest_path}.')
+
+  for config in configs:
+    for key in _PATH_KEYS:
+      if key in config:
+        config[key] = os.path.join(manifest_dir, config[key])
+    for key in _PATH_LIST_KEYS:
+      if key in config:
+        config[key] = [os.path.join(manifest_dir, p) for p in config[key]]
+  return configs
+
+
+def _read_associated_file(file_path: str) -> bytes:
+  # Keyed by the file version too, so that a file modified while the worker
+  # process runs is read again.
+  return _read_associated_file_version(file_path,
+                                       *_get_file_version(file_path))
+
+
+@functools.lru_cache(maxsize=_ASSOCIATED_FILE_CACHE_SIZE)
+def _read_associated_file_version(file_path: str, mtime_ns: int,
+                                  size: int) -> bytes:
+  del mtime_ns, size  # Only used as cache keys.
+  with _open_file(file_path, 'rb') as f:
+    return f.read()
+
+
+def _get_associated_file_paths(config: _ModelConfig) -> List[str]:
+  file_paths = list(config.get('label_file_paths', []))
+  for key in ('vocab_file_path', 'sentence_piece_model_path'):
+    if config.get(key):
+      file_paths.append(config[key])
+  return file_paths
+
+
+def write_metadata(config: _ModelConfig) -> WriteResult:
+  """Writes the metadata of a model.
+
+  Args:
+    config: the model config, as listed in the manifest.
+
+  Returns:
+    The result of writing the metadata. Errors are reported in the result
+    instead of being raised.
+  """
+  model_path = config.get('model_path', '')
+  output_path = config.get('output_path', model_path)
+  start = time.perf_counter()
+  try:
+    writer_name = config.get('writer')
+    if writer_name not in _WRITER_FACTORIES:
+      raise ValueError(f'Unsupported writer: {writer_name}. Supported writers '
+                       f'are: {", ".join(sorted(_WRITER_FACTORIES))}.')
+    with _open_file(model_path, 'rb') as f:
+      model_buffer = f.read()
+    writer = _WRITER_FACTORIES[writer_name](model_buffer, config)
+    populated_model_buffer = writer.populate(associated_file_buffers={
+        path: _read_associated_file(path)
+        for path in _get_associated_file_paths(config)
+    })
+
+    temp_path = f'{output_path}.{uuid.uuid4().hex}.tmp'
+    try:
+      with _open_file(temp_path, 'wb') as f:
+        f.write(populated_model_buffer)
+      _replace_file(temp_path, output_path)
+    finally:
+      if _exists_file(temp_path):
+        _remove_file(temp_path)
+    error = None
+  except Exception as e:  # pylint: disable=broad-except
+    error = f'{type(e).__name__}: {e}'
+  return WriteResult(model_path, output_path, time.perf_counter() - start,
+                     error)
+
+
+def write_metadata_in_batch(
+    configs: List[_ModelConfig],
+    num_workers: Optional[int] = None) -> List[WriteResult]:
+  """Writes the metadata of many models in parallel.
+
+  Args:
+    configs: the model configs, as listed in the manifest.
+    num_workers: number of worker processes. Defaults to the number of CPUs.
+
+  Returns:
+    The result of each model, in the same order as configs.
+  """
+  with concurrent.futures.ProcessPoolExecutor(num_workers) as executor:
+    return list(executor.map(write_metadata, configs))
+
+
+def main(_):
+  start = time.perf_counter()
+  results = write_metadata_in_batch(
+      load_manifest(FLAGS.manifest_path), FLAGS.num_workers)
+
+  num_failures = 0
+  for result in results:
+    if result.error is None:
+      print(f'OK      {result.elapsed_seconds:8.2f}s  {result.output_path}')
+    else:
+      num_failures += 1
+      print(f'FAILED  {result.elapsed_seconds:8.2f}s  {result.model_path}: '
+            f'{result.error}')
+  print(f'Wrote metadata into {len(results) - num_failures} of {len(results)} '
+        f'models in {time.perf_counter() - start:.2f}s.')
+
+  if FLAGS.report_path:
+    with _open_file(FLAGS.report_path, 'w') as f:
+      json.dump([dataclasses.asdict(result) for result in results], f, indent=2)
+  return 1 if num_failures else 0
+
+
+if __name__ == '__main__':
+  flags.mark_flag_as_required('manifest_path')
+  app.run(main)
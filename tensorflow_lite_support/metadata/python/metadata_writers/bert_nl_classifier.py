@@ -41,7 +41,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
       model_buffer: bytearray,
       general_md: Optional[metadata_info.GeneralMd] = None,
       input_md: Optional[metadata_info.BertInputTensorsMd] = None,
-      output_md: Optional[metadata_info.ClassificationTensorMd] = None):
+      output_md: Optional[metadata_info.ClassificationTensorMd] = None,
+      model_signature: Optional[writer_utils.ModelSignature] = None):
     """Creates MetadataWriter based on general/input/output information.
 
     Args:
@@ -52,19 +53,26 @@ class MetadataWriter(metadata_writer.MetadataWriter):
         metadata will be generated.
       output_md: output classification tensor informaton. If not specified,
         default output metadata will be generated.
+      model_signature: signature of the model, if already parsed from
+        `model_buffer`.
 
     Returns:
       A MetadataWriter object.
     """
+    if model_signature is None:
+      model_signature = writer_utils.get_model_signature(model_buffer)
+
     if general_md is None:
       general_md = metadata_info.GeneralMd(
           name=_MODEL_NAME, description=_MODEL_DESCRIPTION)
 
     if input_md is None:
-      input_md = metadata_info.BertInputTensorsMd(model_buffer,
-                                                  _DEFAULT_ID_NAME,
-                                                  _DEFAULT_MASK_NAME,
-                                                  _DEFAULT_SEGMENT_ID_NAME)
+      input_md = metadata_info.BertInputTensorsMd(
+          model_buffer,
+          _DEFAULT_ID_NAME,
+          _DEFAULT_MASK_NAME,
+          _DEFAULT_SEGMENT_ID_NAME,
+          model_signature=model_signature)
 
     if output_md is None:
       output_md = metadata_info.ClassificationTensorMd(
@@ -81,7 +89,10 @@ class MetadataWriter(metadata_writer.MetadataWriter):
         associated_files=[
             file.file_path for file in output_md.associated_files
         ] + input_md.get_tokenizer_associated_files(),
-        input_process_units=input_md.create_input_process_unit_metadata())
+        input_process_units=input_md.create_input_process_unit_metadata(),
+        associated_file_buffers=writer_utils.get_associated_file_buffers(
+            output_md.associated_files),
+        model_signature=model_signature)
 
   @classmethod
   def create_for_inference(
@@ -131,12 +142,14 @@ class MetadataWriter(metadata_writer.MetadataWriter):
     Returns:
       A MetadataWriter object.
     """
+    model_signature = writer_utils.get_model_signature(model_buffer)
     input_md = metadata_info.BertInputTensorsMd(
         model_buffer,
         ids_name,
         mask_name,
         segment_name,
-        tokenizer_md=tokenizer_md)
+        tokenizer_md=tokenizer_md,
+        model_signature=model_signature)
     output_md = metadata_info.ClassificationTensorMd(
         name=_OUTPUT_NAME,
         description=_OUTPUT_DESCRIPTION,
@@ -144,7 +157,10 @@ class MetadataWriter(metadata_writer.MetadataWriter):
             metadata_info.LabelFileMd(file_path=file_path)
             for file_path in label_file_paths
         ],
-        tensor_type=writer_utils.get_output_tensor_types(model_buffer)[0])
+        tensor_type=model_signature.outputs[0].type)
 
     return cls.create_from_metadata_info(
-        model_buffer, input_md=input_md, output_md=output_md)
+        model_buffer,
+        input_md=input_md,
+        output_md=output_md,
+        model_signature=model_signature)
@@ -39,7 +39,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
       model_buffer: bytearray,
       general_md: Optional[metadata_info.GeneralMd] = None,
       input_md: Optional[metadata_info.InputImageTensorMd] = None,
-      output_md: Optional[metadata_info.ClassificationTensorMd] = None):
+      output_md: Optional[metadata_info.ClassificationTensorMd] = None,
+      model_signature: Optional[writer_utils.ModelSignature] = None):
     """Creates MetadataWriter based on general/input/output information.
 
     Args:
@@ -50,6 +51,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
         metadata will be generated.
       output_md: output classification tensor informaton, if not specified,
         default output metadata will be generated.
+      model_signature: signature of the model, if already parsed from
+        `model_buffer`.
 
     Returns:
       A MetadataWriter object.
@@ -79,7 +82,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
         output_md=[output_md],
         associated_files=[
             file.file_path for file in output_md.associated_files
-        ])
+        ],
+        model_signature=model_signature)
 
   @classmethod
   def create_for_inference(
@@ -116,13 +120,14 @@ class MetadataWriter(metadata_writer.MetadataWriter):
     Returns:
       A MetadataWriter object.
     """
+    model_signature = writer_utils.get_model_signature(model_buffer)
     input_md = metadata_info.InputImageTensorMd(
         name=INPUT_NAME,
         description=INPUT_DESCRIPTION,
         norm_mean=input_norm_mean,
         norm_std=input_norm_std,
         color_space_type=_metadata_fb.ColorSpaceType.RGB,
-        tensor_type=writer_utils.get_input_tensor_types(model_buffer)[0])
+        tensor_type=model_signature.inputs[0].type)
 
     output_md = metadata_info.ClassificationTensorMd(
         name=OUTPUT_NAME,
@@ -131,8 +136,11 @@ class MetadataWriter(metadata_writer.MetadataWriter):
             metadata_info.LabelFileMd(file_path=file_path)
             for file_path in label_file_paths
         ],
-        tensor_type=writer_utils.get_output_tensor_types(model_buffer)[0],
+        tensor_type=model_signature.outputs[0].type,
         score_calibration_md=score_calibration_md)
 
     return cls.create_from_metadata_info(
-        model_buffer, input_md=input_md, output_md=output_md)
+        model_buffer,
+        input_md=input_md,
+        output_md=output_md,
+        model_signature=model_signature)
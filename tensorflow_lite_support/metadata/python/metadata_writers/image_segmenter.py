@@ -67,7 +67,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
       model_buffer: bytearray,
       general_md: Optional[metadata_info.GeneralMd] = None,
       input_md: Optional[metadata_info.InputImageTensorMd] = None,
-      output_md: Optional[metadata_info.TensorMd] = None):
+      output_md: Optional[metadata_info.TensorMd] = None,
+      model_signature: Optional[writer_utils.ModelSignature] = None):
     """Creates MetadataWriter based on general/input/outputs information.
 
     Args:
@@ -79,6 +80,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
         where mask_width and mask_height are the dimensions of the segmentation
         masks produced by the model, and num_classes is the number of classes
         supported by the model.
+      model_signature: signature of the model, if already parsed from
+        `model_buffer`.
 
     Returns:
       A MetadataWriter object.
@@ -108,7 +111,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
         output_metadata=[_create_segmentation_masks_metadata(output_md)],
         associated_files=[
             file.file_path for file in output_md.associated_files
-        ])
+        ],
+        model_signature=model_signature)
 
   @classmethod
   def create_for_inference(cls, model_buffer: bytearray,
@@ -137,13 +141,14 @@ class MetadataWriter(metadata_writer.MetadataWriter):
     Returns:
       A MetadataWriter object.
     """
+    model_signature = writer_utils.get_model_signature(model_buffer)
     input_md = metadata_info.InputImageTensorMd(
         name=_INPUT_NAME,
         description=_INPUT_DESCRIPTION,
         norm_mean=input_norm_mean,
         norm_std=input_norm_std,
         color_space_type=_metadata_fb.ColorSpaceType.RGB,
-        tensor_type=writer_utils.get_input_tensor_types(model_buffer)[0])
+        tensor_type=model_signature.inputs[0].type)
 
     output_md = metadata_info.TensorMd(
         name=_OUTPUT_NAME,
@@ -154,4 +159,7 @@ class MetadataWriter(metadata_writer.MetadataWriter):
         ])
 
     return cls.create_from_metadata_info(
-        model_buffer, input_md=input_md, output_md=output_md)
+        model_buffer,
+        input_md=input_md,
+        output_md=output_md,
+        model_signature=model_signature)
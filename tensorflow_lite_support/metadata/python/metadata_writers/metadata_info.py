@@ -16,8 +16,9 @@
 
 import collections
 import csv
+import io
 import os
-from typing import List, Optional, Type, Union
+from typing import Iterable, List, Optional, Type, Union
 
 from tensorflow_lite_support.metadata import metadata_schema_py_generated as _metadata_fb
 from tensorflow_lite_support.metadata import schema_py_generated as _schema_fb
@@ -74,10 +75,13 @@ class AssociatedFileMd:
   """A container for common associated file metadata information.
 
   Attributes:
-    file_path: path to the associated file.
+    file_path: path to the associated file. If `file_content` is set, only the
+      basename is used, as the name of the file in the model.
     description: description of the associated file.
     file_type: file type of the associated file [1].
     locale: locale of the associated file [2].
+    file_content: optional content of the associated file, so that it is
+      populated from memory instead of being read from `file_path`.
     [1]:
       https://github.com/tensorflow/tflite-support/blob/b80289c4cd1224d0e1836c7654e82f070f9eefaa/tensorflow_lite_support/metadata/metadata_schema.fbs#L77
     [2]:
@@ -90,11 +94,13 @@ class AssociatedFileMd:
       description: Optional[str] = None,
       file_type: Optional[_metadata_fb.AssociatedFileType] = _metadata_fb
       .AssociatedFileType.UNKNOWN,
-      locale: Optional[str] = None):
+      locale: Optional[str] = None,
+      file_content: Optional[bytes] = None):
     self.file_path = file_path
     self.description = description
     self.file_type = file_type
     self.locale = locale
+    self.file_content = file_content
 
   def create_metadata(self) -> _metadata_fb.AssociatedFileT:
     """Creates the associated file metadata.
@@ -117,17 +123,22 @@ class LabelFileMd(AssociatedFileMd):
                              "recognize.")
   _FILE_TYPE = _metadata_fb.AssociatedFileType.TENSOR_AXIS_LABELS
 
-  def __init__(self, file_path: str, locale: Optional[str] = None):
+  def __init__(self,
+               file_path: str,
+               locale: Optional[str] = None,
+               file_content: Optional[bytes] = None):
     """Creates a LabelFileMd object.
 
     Args:
       file_path: file_path of the label file.
       locale: locale of the label file [1].
+      file_content: optional content of the label file. If set, the label file
+        is not read from `file_path`.
       [1]:
       https://github.com/tensorflow/tflite-support/blob/b80289c4cd1224d0e1836c7654e82f070f9eefaa/tensorflow_lite_support/metadata/metadata_schema.fbs#L154
     """
     super().__init__(file_path, self._LABEL_FILE_DESCRIPTION, self._FILE_TYPE,
-                     locale)
+                     locale, file_content)
 
 
 class RegexTokenizerMd:
@@ -264,7 +275,9 @@ class ScoreCalibrationMd:
 
   def __init__(self,
                score_transformation_type: _metadata_fb.ScoreTransformationType,
-               default_score: float, file_path: str):
+               default_score: float,
+               file_path: str,
+               file_content: Optional[bytes] = None):
     """Creates a ScoreCalibrationMd object.
 
     Args:
@@ -274,6 +287,8 @@ class ScoreCalibrationMd:
         score is below min_score or if no parameters were specified for a given
         index.
       file_path: file_path of the score calibration file [1].
+      file_content: optional content of the score calibration file. If set,
+        the file is not read from `file_path`.
       [1]:
         https://github.com/tensorflow/tflite-support/blob/5e0cdf5460788c481f5cd18aab8728ec36cf9733/tensorflow_lite_support/metadata/metadata_schema.fbs#L122
 
@@ -283,20 +298,15 @@ class ScoreCalibrationMd:
     self._score_transformation_type = score_transformation_type
     self._default_score = default_score
     self._file_path = file_path
+    self._file_content = file_content
 
     # Sanity check the score calibration file.
-    with open(self._file_path) as calibration_file:
-      csv_reader = csv.reader(calibration_file, delimiter=",")
-      for row in csv_reader:
-        if row and len(row) != 3 and len(row) != 4:
-          raise ValueError(
-              f"Expected empty lines or 3 or 4 parameters per line in score"
-              f" calibration file, but got {len(row)}.")
-
-        if row and float(row[0]) < 0:
-          raise ValueError(
-              f"Expected scale to be a non-negative value, but got "
-              f"{float(row[0])}.")
+    if file_content is None:
+      with open(self._file_path) as calibration_file:
+        _check_score_calibration_rows(calibration_file)
+    else:
+      _check_score_calibration_rows(
+          io.StringIO(file_content.decode("utf-8"), newline=""))
 
   def create_metadata(self) -> _metadata_fb.ProcessUnitT:
     """Creates the score calibration metadata based on the information.
@@ -314,9 +324,11 @@ class ScoreCalibrationMd:
     return score_calibration
 
   def create_score_calibration_file_md(self) -> AssociatedFileMd:
-    return AssociatedFileMd(self._file_path,
-                            self._SCORE_CALIBRATION_FILE_DESCRIPTION,
-                            self._FILE_TYPE)
+    return AssociatedFileMd(
+        self._file_path,
+        self._SCORE_CALIBRATION_FILE_DESCRIPTION,
+        self._FILE_TYPE,
+        file_content=self._file_content)
 
 
 class TensorMd:
@@ -721,7 +733,8 @@ class BertInputTensorsMd:
                mask_md: Optional[TensorMd] = None,
                segment_ids_md: Optional[TensorMd] = None,
                tokenizer_md: Union[None, BertTokenizerMd,
-                                   SentencePieceTokenizerMd] = None):
+                                   SentencePieceTokenizerMd] = None,
+               model_signature: Optional[writer_utils.ModelSignature] = None):
     """Initializes a BertInputTensorsMd object.
 
     `ids_name`, `mask_name`, and `segment_name` correspond to the `Tensor.name`
@@ -749,14 +762,17 @@ class BertInputTensorsMd:
         https://github.com/tensorflow/tflite-support/blob/b80289c4cd1224d0e1836c7654e82f070f9eefaa/tensorflow_lite_support/metadata/metadata_schema.fbs#L473
         [3]:
         https://github.com/tensorflow/tflite-support/blob/b80289c4cd1224d0e1836c7654e82f070f9eefaa/tensorflow_lite_support/metadata/metadata_schema.fbs#L475
+      model_signature: signature of the model, if already parsed from
+        `model_buffer`.
     """
 
     self._input_names = [ids_name, mask_name, segment_name]
 
     # Get the input tensor names in order from the model. Later, we need to
     # order the input metadata according to this tensor order.
-    self._ordered_input_names = writer_utils.get_input_tensor_names(
-        model_buffer)
+    if model_signature is None:
+      model_signature = writer_utils.get_model_signature(model_buffer)
+    self._ordered_input_names = model_signature.input_names
 
     # Verify that self._ordered_input_names (read from the model) and
     # self._input_name (collected from users) are aligned.
@@ -815,3 +831,24 @@ class BertInputTensorsMd:
           self._tokenizer_md.create_metadata().options)
     else:
       return []
+
+
+def _check_score_calibration_rows(calibration_file: Iterable[str]):
+  """Sanity checks the rows of a score calibration file.
+
+  Args:
+    calibration_file: the lines of the score calibration file.
+
+  Raises:
+    ValueError: if the score_calibration file is malformed.
+  """
+  csv_reader = csv.reader(calibration_file, delimiter=",")
+  for row in csv_reader:
+    if row and len(row) != 3 and len(row) != 4:
+      raise ValueError(
+          f"Expected empty lines or 3 or 4 parameters per line in score"
+          f" calibration file, but got {len(row)}.")
+
+    if row and float(row[0]) < 0:
+      raise ValueError(f"Expected scale to be a non-negative value, but got "
+                       f"{float(row[0])}.")
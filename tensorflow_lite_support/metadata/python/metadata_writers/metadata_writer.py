@@ -15,11 +15,10 @@
 """Helper class to write metadata into TFLite models."""
 
 import collections
-from typing import List, Optional, Type
+from typing import Dict, List, Optional, Type
 
 import flatbuffers
 from tensorflow_lite_support.metadata import metadata_schema_py_generated as _metadata_fb
-from tensorflow_lite_support.metadata import schema_py_generated as _schema_fb
 from tensorflow_lite_support.metadata.python import metadata as _metadata
 from tensorflow_lite_support.metadata.python.metadata_writers import metadata_info
 from tensorflow_lite_support.metadata.python.metadata_writers import writer_utils
@@ -31,17 +30,23 @@ class MetadataWriter:
   def __init__(self,
                model_buffer: bytearray,
                metadata_buffer: Optional[bytearray] = None,
-               associated_files: Optional[List[str]] = None):
+               associated_files: Optional[List[str]] = None,
+               associated_file_buffers: Optional[Dict[str, bytes]] = None):
     """Constructs the MetadataWriter.
 
     Args:
       model_buffer: valid buffer of the model file.
       metadata_buffer: valid buffer of the metadata.
       associated_files: path to the associated files to be populated.
+      associated_file_buffers: contents of the associated files held in
+        memory, keyed by their path in `associated_files`. These files are not
+        read from disk.
     """
     self._model_buffer = model_buffer
     self._metadata_buffer = metadata_buffer
     self._associated_files = associated_files if associated_files else []
+    self._associated_file_buffers = (
+        associated_file_buffers if associated_file_buffers else {})
     self._populated_model_buffer = None
 
   @classmethod
@@ -51,7 +56,8 @@ class MetadataWriter:
       general_md: Optional[metadata_info.GeneralMd] = None,
       input_md: Optional[List[Type[metadata_info.TensorMd]]] = None,
       output_md: Optional[List[Type[metadata_info.TensorMd]]] = None,
-      associated_files: Optional[List[str]] = None):
+      associated_files: Optional[List[str]] = None,
+      model_signature: Optional[writer_utils.ModelSignature] = None):
     """Creates MetadataWriter based on the metadata information.
 
     Args:
@@ -60,6 +66,8 @@ class MetadataWriter:
       input_md: metadata information of the input tensors.
       output_md: metadata information of the output tensors.
       associated_files: path to the associated files to be populated.
+      model_signature: signature of the model, if already parsed from
+        `model_buffer`.
 
     Returns:
       A MetadataWriter Object.
@@ -77,17 +85,28 @@ class MetadataWriter:
       output_md = []
 
     # Order the input/output metadata according to tensor orders from the model.
-    input_md = _order_tensor_metadata(
-        input_md, writer_utils.get_input_tensor_names(model_buffer))
-    output_md = _order_tensor_metadata(
-        output_md, writer_utils.get_output_tensor_names(model_buffer))
+    if model_signature is None:
+      model_signature = writer_utils.get_model_signature(model_buffer)
+    input_md = _order_tensor_metadata(input_md, model_signature.input_names)
+    output_md = _order_tensor_metadata(output_md, model_signature.output_names)
+
+    # Associated files that are held in memory, such as exported labels.
+    associated_file_buffers = {}
+    for m in input_md + output_md:
+      associated_file_buffers.update(
+          writer_utils.get_associated_file_buffers(m.associated_files))
 
     model_metadata = general_md.create_metadata()
     input_metadata = [m.create_metadata() for m in input_md]
     output_metadata = [m.create_metadata() for m in output_md]
-    return cls.create_from_metadata(model_buffer, model_metadata,
-                                    input_metadata, output_metadata,
-                                    associated_files)
+    return cls.create_from_metadata(
+        model_buffer,
+        model_metadata,
+        input_metadata,
+        output_metadata,
+        associated_files,
+        associated_file_buffers=associated_file_buffers,
+        model_signature=model_signature)
 
   @classmethod
   def create_from_metadata(
@@ -98,7 +117,9 @@ class MetadataWriter:
       output_metadata: Optional[List[_metadata_fb.TensorMetadataT]] = None,
       associated_files: Optional[List[str]] = None,
       input_process_units: Optional[List[_metadata_fb.ProcessUnitT]] = None,
-      output_process_units: Optional[List[_metadata_fb.ProcessUnitT]] = None):
+      output_process_units: Optional[List[_metadata_fb.ProcessUnitT]] = None,
+      associated_file_buffers: Optional[Dict[str, bytes]] = None,
+      model_signature: Optional[writer_utils.ModelSignature] = None):
     """Creates MetadataWriter based on the metadata Flatbuffers Python Objects.
 
     Args:
@@ -110,6 +131,10 @@ class MetadataWriter:
       associated_files: path to the associated files to be populated.
       input_process_units: a lits of metadata of the input process units [4].
       output_process_units: a lits of metadata of the output process units [5].
+      associated_file_buffers: contents of the associated files held in
+        memory, keyed by their path in `associated_files`.
+      model_signature: signature of the model, if already parsed from
+        `model_buffer`.
       [1]:
         https://github.com/tensorflow/tflite-support/blob/b80289c4cd1224d0e1836c7654e82f070f9eefaa/tensorflow_lite_support/metadata/metadata_schema.fbs#L640-L681
       [2]:
@@ -125,25 +150,21 @@ class MetadataWriter:
     """
     # Create empty tensor metadata when input_metadata/output_metadata are None
     # to bypass MetadataPopulator verification.
+    if model_signature is None:
+      model_signature = writer_utils.get_model_signature(model_buffer)
     if not input_metadata:
-      model = _schema_fb.Model.GetRootAsModel(model_buffer, 0)
-      num_input_tensors = model.Subgraphs(0).InputsLength()
       input_metadata = [
-          _metadata_fb.TensorMetadataT() for i in range(num_input_tensors)
+          _metadata_fb.TensorMetadataT() for _ in model_signature.inputs
       ]
 
     if not output_metadata:
-      model = _schema_fb.Model.GetRootAsModel(model_buffer, 0)
-      num_output_tensors = model.Subgraphs(0).OutputsLength()
       output_metadata = [
-          _metadata_fb.TensorMetadataT() for i in range(num_output_tensors)
+          _metadata_fb.TensorMetadataT() for _ in model_signature.outputs
       ]
 
-    _fill_default_tensor_names(
-        input_metadata, writer_utils.get_input_tensor_names(model_buffer))
+    _fill_default_tensor_names(input_metadata, model_signature.input_names)
 
-    _fill_default_tensor_names(
-        output_metadata, writer_utils.get_output_tensor_names(model_buffer))
+    _fill_default_tensor_names(output_metadata, model_signature.output_names)
 
     subgraph_metadata = _metadata_fb.SubGraphMetadataT()
     subgraph_metadata.inputTensorMetadata = input_metadata
@@ -159,11 +180,20 @@ class MetadataWriter:
     b.Finish(
         model_metadata.Pack(b),
         _metadata.MetadataPopulator.METADATA_FILE_IDENTIFIER)
-    return cls(model_buffer, b.Output(), associated_files)
+    return cls(model_buffer, b.Output(), associated_files,
+               associated_file_buffers)
 
-  def populate(self) -> bytearray:
+  def populate(
+      self,
+      associated_file_buffers: Optional[Dict[str, bytes]] = None
+  ) -> bytearray:
     """Populates the metadata and label file to the model file.
 
+    Args:
+      associated_file_buffers: optional contents of associated files, keyed by
+        their path in `associated_files`, for instance to share files loaded
+        once across many models. Other associated files are read from disk.
+
     Returns:
       A new model buffer with the metadata and associated files.
     """
@@ -175,7 +205,16 @@ class MetadataWriter:
     if self._model_buffer is not None:
       populator.load_metadata_buffer(self._metadata_buffer)
     if self._associated_files:
-      populator.load_associated_files(self._associated_files)
+      associated_file_buffers = dict(self._associated_file_buffers,
+                                     **(associated_file_buffers or {}))
+      populator.load_associated_files([
+          f for f in self._associated_files if f not in associated_file_buffers
+      ])
+      populator.load_associated_file_buffers({
+          f: associated_file_buffers[f]
+          for f in self._associated_files
+          if f in associated_file_buffers
+      })
     populator.populate()
     self._populated_model_buffer = populator.get_model_buffer()
     return self._populated_model_buffer
@@ -38,7 +38,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
       model_buffer: bytearray,
       general_md: Optional[metadata_info.GeneralMd] = None,
       input_md: Optional[metadata_info.InputTextTensorMd] = None,
-      output_md: Optional[metadata_info.ClassificationTensorMd] = None):
+      output_md: Optional[metadata_info.ClassificationTensorMd] = None,
+      model_signature: Optional[writer_utils.ModelSignature] = None):
     """Creates MetadataWriter based on general/input/output information.
 
     Args:
@@ -49,6 +50,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
         metadata will be generated.
       output_md: output classification tensor information, if not specified,
         default output metadata will be generated.
+      model_signature: signature of the model, if already parsed from
+        `model_buffer`.
 
     Returns:
       A MetadataWriter object.
@@ -81,7 +84,8 @@ class MetadataWriter(metadata_writer.MetadataWriter):
         output_md=[output_md],
         associated_files=[
             file.file_path for file in output_md.associated_files
-        ] + tokenizer_files)
+        ] + tokenizer_files,
+        model_signature=model_signature)
 
   @classmethod
   def create_for_inference(
@@ -116,6 +120,7 @@ class MetadataWriter(metadata_writer.MetadataWriter):
     Returns:
       A MetadataWriter object.
     """
+    model_signature = writer_utils.get_model_signature(model_buffer)
     input_md = metadata_info.InputTextTensorMd(
         name=_INPUT_NAME,
         description=_INPUT_DESCRIPTION,
@@ -128,7 +133,10 @@ class MetadataWriter(metadata_writer.MetadataWriter):
             metadata_info.LabelFileMd(file_path=file_path)
             for file_path in label_file_paths
         ],
-        tensor_type=writer_utils.get_output_tensor_types(model_buffer)[0])
+        tensor_type=model_signature.outputs[0].type)
 
     return cls.create_from_metadata_info(
-        model_buffer, input_md=input_md, output_md=output_md)
+        model_buffer,
+        input_md=input_md,
+        output_md=output_md,
+        model_signature=model_signature)
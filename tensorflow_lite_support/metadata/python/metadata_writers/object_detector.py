@@ -229,7 +229,14 @@ class MetadataWriter(metadata_writer.MetadataWriter):
     associated_files = []
     _extend_new_files(associated_files, output_category_md.associated_files)
     _extend_new_files(associated_files, output_score_md.associated_files)
-    return cls(model_buffer, b.Output(), associated_files=associated_files)
+    associated_file_buffers = writer_utils.get_associated_file_buffers(
+        (output_category_md.associated_files or []) +
+        (output_score_md.associated_files or []))
+    return cls(
+        model_buffer,
+        b.Output(),
+        associated_files=associated_files,
+        associated_file_buffers=associated_file_buffers)
 
   @classmethod
   def create_for_inference(
@@ -266,13 +273,14 @@ class MetadataWriter(metadata_writer.MetadataWriter):
     Returns:
       A MetadataWriter object.
     """
+    model_signature = writer_utils.get_model_signature(model_buffer)
     input_md = metadata_info.InputImageTensorMd(
         name=_INPUT_NAME,
         description=_INPUT_DESCRIPTION,
         norm_mean=input_norm_mean,
         norm_std=input_norm_std,
         color_space_type=_metadata_fb.ColorSpaceType.RGB,
-        tensor_type=writer_utils.get_input_tensor_types(model_buffer)[0])
+        tensor_type=model_signature.inputs[0].type)
 
     output_category_md = metadata_info.CategoryTensorMd(
         name=_OUTPUT_CATRGORY_NAME,
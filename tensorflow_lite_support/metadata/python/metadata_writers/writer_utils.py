@@ -15,8 +15,9 @@
 """Helper methods for writing metadata into TFLite models."""
 
 import array
+import collections
 import functools
-from typing import List, Union, Optional
+from typing import Dict, List, Optional, Tuple, Union
 
 from tensorflow_lite_support.metadata import metadata_schema_py_generated as _metadata_fb
 from tensorflow_lite_support.metadata import schema_py_generated as _schema_fb
@@ -36,53 +37,117 @@ def compute_flat_size(tensor_shape: Optional["array.array[int]"]) -> int:
   return functools.reduce(lambda x, y: x * y, tensor_shape)
 
 
+TensorSignature = collections.namedtuple(
+    "TensorSignature", ["name", "type", "shape"])
+TensorSignature.__doc__ = """Signature of an input or output tensor.
+
+Attributes:
+  name: name of the tensor.
+  type: type of the tensor, as a `TensorType` value of the model schema.
+  shape: shape of the tensor, as returned by `Tensor.ShapeAsNumpy()`.
+"""
+
+
+class ModelSignature:
+  """Names, types and shapes of the model inputs and outputs.
+
+  The model is parsed once when the signature is created, so that writers
+  inspecting several properties of the tensors don't walk the subgraph again
+  for each of them. Writers pass the signature along to the `MetadataWriter`
+  methods they call, rather than the model being parsed again.
+  """
+
+  def __init__(self, model_buffer: bytearray):
+    """Parses the signature of the model.
+
+    Args:
+      model_buffer: valid buffer of the model file.
+    """
+    subgraph = _get_subgraph(model_buffer)
+    self._inputs = tuple(
+        _get_tensor_signature(subgraph.Tensors(subgraph.Inputs(i)))
+        for i in range(subgraph.InputsLength()))
+    self._outputs = tuple(
+        _get_tensor_signature(subgraph.Tensors(subgraph.Outputs(i)))
+        for i in range(subgraph.OutputsLength()))
+
+  @property
+  def inputs(self) -> Tuple[TensorSignature, ...]:
+    return self._inputs
+
+  @property
+  def outputs(self) -> Tuple[TensorSignature, ...]:
+    return self._outputs
+
+  @property
+  def input_names(self) -> List[str]:
+    return [tensor.name for tensor in self._inputs]
+
+  @property
+  def output_names(self) -> List[str]:
+    return [tensor.name for tensor in self._outputs]
+
+  @property
+  def input_types(self) -> List[_schema_fb.TensorType]:
+    return [tensor.type for tensor in self._inputs]
+
+  @property
+  def output_types(self) -> List[_schema_fb.TensorType]:
+    return [tensor.type for tensor in self._outputs]
+
+
+def get_model_signature(model_buffer: bytearray) -> ModelSignature:
+  """Gets the signature of the model.
+
+  Args:
+    model_buffer: valid buffer of the model file.
+
+  Returns:
+    The signature of the model.
+  """
+  return ModelSignature(model_buffer)
+
+
 def get_input_tensor_names(model_buffer: bytearray) -> List[str]:
   """Gets a list of the input tensor names."""
-  subgraph = _get_subgraph(model_buffer)
-  tensor_names = []
-  for i in range(subgraph.InputsLength()):
-    index = subgraph.Inputs(i)
-    tensor_names.append(subgraph.Tensors(index).Name().decode("utf-8"))
-  return tensor_names
+  return get_model_signature(model_buffer).input_names
 
 
 def get_output_tensor_names(model_buffer: bytearray) -> List[str]:
   """Gets a list of the output tensor names."""
-  subgraph = _get_subgraph(model_buffer)
-  tensor_names = []
-  for i in range(subgraph.OutputsLength()):
-    index = subgraph.Outputs(i)
-    tensor_names.append(subgraph.Tensors(index).Name().decode("utf-8"))
-  return tensor_names
+  return get_model_signature(model_buffer).output_names
 
 
 def get_input_tensor_types(
     model_buffer: bytearray) -> List[_schema_fb.TensorType]:
   """Gets a list of the input tensor types."""
-  subgraph = _get_subgraph(model_buffer)
-  tensor_types = []
-  for i in range(subgraph.InputsLength()):
-    index = subgraph.Inputs(i)
-    tensor_types.append(subgraph.Tensors(index).Type())
-  return tensor_types
+  return get_model_signature(model_buffer).input_types
 
 
 def get_output_tensor_types(
     model_buffer: bytearray) -> List[_schema_fb.TensorType]:
   """Gets a list of the output tensor types."""
-  subgraph = _get_subgraph(model_buffer)
-  tensor_types = []
-  for i in range(subgraph.OutputsLength()):
-    index = subgraph.Outputs(i)
-    tensor_types.append(subgraph.Tensors(index).Type())
-  return tensor_types
+  return get_model_signature(model_buffer).output_types
+
 
+def get_input_tensor_shape(
+    model_buffer: bytearray,
+    tensor_index: int,
+    model_signature: Optional[ModelSignature] = None) -> array.array:
+  """Gets the shape of the specified input tensor.
 
-def get_input_tensor_shape(model_buffer: bytearray,
-                           tensor_index: int) -> array.array:
-  """Gets the shape of the specified input tensor."""
-  subgraph = _get_subgraph(model_buffer)
-  return subgraph.Tensors(subgraph.Inputs(tensor_index)).ShapeAsNumpy()
+  Args:
+    model_buffer: valid buffer of the model file.
+    tensor_index: index of the input tensor.
+    model_signature: signature of the model, if already parsed from
+      `model_buffer`.
+
+  Returns:
+    The shape of the input tensor.
+  """
+  if model_signature is None:
+    model_signature = get_model_signature(model_buffer)
+  return model_signature.inputs[tensor_index].shape
 
 
 def load_file(file_path: str, mode: str = "rb") -> Union[str, bytes]:
@@ -118,6 +183,23 @@ def save_file(file_bytes: Union[bytes, bytearray],
     file.write(file_bytes)
 
 
+def get_associated_file_buffers(associated_file_mds) -> Dict[str, bytes]:
+  """Gets the contents of the associated files that are held in memory.
+
+  Args:
+    associated_file_mds: a list of `metadata_info.AssociatedFileMd` objects.
+
+  Returns:
+    A dict mapping the path of each associated file which has a `file_content`
+    to its content.
+  """
+  return {
+      file_md.file_path: file_md.file_content
+      for file_md in associated_file_mds or []
+      if file_md.file_content is not None
+  }
+
+
 def get_tokenizer_associated_files(
     tokenizer_options: Union[None, _metadata_fb.BertTokenizerOptionsT,
                              _metadata_fb.SentencePieceTokenizerOptionsT,
@@ -180,3 +262,11 @@ def _get_subgraph(model_buffer: bytearray) -> _schema_fb.SubGraph:
   # multiple subgraphs yet, but models with mini-benchmark may have multiple
   # subgraphs for acceleration evaluation purpose.
   return model.Subgraphs(0)
+
+
+def _get_tensor_signature(tensor: _schema_fb.Tensor) -> TensorSignature:
+  """Gets the signature of a tensor of the model."""
+  return TensorSignature(
+      name=tensor.Name().decode("utf-8"),
+      type=tensor.Type(),
+      shape=tensor.ShapeAsNumpy())
@@ -0,0 +1,404 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Fingerprints and diffs TFLite models with metadata.
+
+A fingerprint holds separate content hashes for the model, its weights, its
+metadata and each of its associated files, so that a model registry can tell
+whether two model files differ in their graph or weights, or only in their
+metadata, and deduplicate the models sharing the same weights.
+
+The hashes do not depend on the layout of the model file: populating the same
+metadata and associated files into a model always yields the same fingerprint,
+whether the metadata was patched in place or the model was repacked. The
+weights are hashed straight from the model buffer, or from a memory mapped
+model file, without unpacking the model.
+
+Usage:
+
+  model_fingerprint model_a.tflite model_b.tflite [--diff]
+"""
+
+import concurrent.futures
+import dataclasses
+import hashlib
+import json
+import mmap
+import struct
+import zipfile
+from typing import Any, Dict, List, Optional
+
+from absl import app
+from absl import flags
+import flatbuffers
+
+from tensorflow_lite_support.metadata import schema_py_generated as _schema_fb
+from tensorflow_lite_support.metadata.python import metadata as _metadata
+
+# pylint: disable=protected-access
+_BufferFile = _metadata._BufferFile
+_get_table_field_position = _metadata._get_table_field_position
+_get_vector_table_positions = _metadata._get_vector_table_positions
+_read_uint32 = _metadata._read_uint32
+_MODEL_BUFFERS_FIELD = _metadata._MODEL_BUFFERS_FIELD
+_BUFFER_OFFSET_FIELD = _metadata._BUFFER_OFFSET_FIELD
+_BUFFER_SIZE_FIELD = _metadata._BUFFER_SIZE_FIELD
+# pylint: enable=protected-access
+
+FLAGS = flags.FLAGS
+flags.DEFINE_bool(
+    'diff', False,
+    'Compares two models instead of printing their fingerprints.')
+flags.DEFINE_integer(
+    'num_workers', None,
+    'Number of worker processes. Defaults to the number of CPUs.')
+
+# Field id of `Buffer.data` in the TFLite schema.
+_BUFFER_DATA_FIELD = 0
+
+# Size of the chunks in which the model parts are hashed.
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclasses.dataclass
+class ModelFingerprint:
+  """Content hashes of the parts of a model, as SHA-256 hex digests.
+
+  Attributes:
+    model_hash: hash of the model flatbuffer without the metadata buffer, i.e.
+      of its operators, subgraphs, signatures and weights.
+    weights_hash: hash of the data of all the model buffers, except the
+      metadata buffer.
+    metadata_hash: hash of the metadata buffer, or None if the model doesn't
+      have metadata.
+    associated_file_hashes: hash of each associated file packed into the
+      model, keyed by file name.
+  """
+  model_hash: str
+  weights_hash: str
+  metadata_hash: Optional[str]
+  associated_file_hashes: Dict[str, str]
+
+
+@dataclasses.dataclass
+class MetadataDifference:
+  """A value that differs between the metadata of two models.
+
+  Attributes:
+    path: path of the value in the metadata JSON, such as
+      `subgraph_metadata[0].input_tensor_metadata[0].name`.
+    value_a: the value in the first model, or None if it is not set.
+    value_b: the value in the second model, or None if it is not set.
+  """
+  path: str
+  value_a: Any
+  value_b: Any
+
+
+def _update_hash(hasher, buf):
+  """Hashes a buffer in chunks, so that memory mapped pages are read lazily."""
+  with memoryview(buf) as view:
+    hasher.update(struct.pack('<Q', len(view)))
+    for start in range(0, len(view), _HASH_CHUNK_SIZE):
+      hasher.update(view[start:start + _HASH_CHUNK_SIZE])
+
+
+def _get_buffer_data(model_buf, buffer_pos):
+  """Returns the data of a `Buffer` table, without copying it.
+
+  Args:
+    model_buf: the TFLite model.
+    buffer_pos: position of the `Buffer` table in `model_buf`.
+
+  Returns:
+    A memoryview over the buffer data, which is stored either in the
+    flatbuffer or after it for models larger than 2 GB.
+  """
+  offset_pos = _get_table_field_position(model_buf, buffer_pos,
+                                         _BUFFER_OFFSET_FIELD)
+  offset = (
+      struct.unpack_from('<Q', model_buf, offset_pos)[0]
+      if offset_pos is not None else 0)
+  if offset > 1:
+    size_pos = _get_table_field_position(model_buf, buffer_pos,
+                                         _BUFFER_SIZE_FIELD)
+    size = struct.unpack_from('<Q', model_buf, size_pos)[0]
+    return memoryview(model_buf)[offset:offset + size]
+
+  data_pos = _get_table_field_position(model_buf, buffer_pos,
+                                       _BUFFER_DATA_FIELD)
+  if data_pos is None:
+    return memoryview(b'')
+  vector_pos = data_pos + _read_uint32(model_buf, data_pos)
+  size = _read_uint32(model_buf, vector_pos)
+  return memoryview(model_buf)[vector_pos + 4:vector_pos + 4 + size]
+
+
+def _get_metadata_buffer_index(model):
+  """Returns the index of the metadata buffer in the model, or None."""
+  for i in range(model.MetadataLength()):
+    meta = model.Metadata(i)
+    if meta.Name().decode('utf-8') == (
+        _metadata.MetadataPopulator.METADATA_FIELD_NAME):
+      return meta.Buffer()
+  return None
+
+
+def _get_weights_hash(model_buf, metadata_buffer_index):
+  """Hashes the data of the model buffers, except the metadata buffer."""
+  hasher = hashlib.sha256()
+  root_pos = _read_uint32(model_buf, 0)
+  buffer_positions = _get_vector_table_positions(
+      model_buf,
+      _get_table_field_position(model_buf, root_pos, _MODEL_BUFFERS_FIELD))
+  for i, buffer_pos in enumerate(buffer_positions):
+    if i == metadata_buffer_index:
+      continue
+    with _get_buffer_data(model_buf, buffer_pos) as data:
+      _update_hash(hasher, data)
+  return hasher.hexdigest()
+
+
+def _update_hash_with_table(hasher, table):
+  """Hashes a table of the object API, packed in a fresh flatbuffer.
+
+  Packing the table on its own makes its hash independent of where it is
+  stored in the model.
+
+  Args:
+    hasher: the hashlib object to update.
+    table: the table, such as a `SubGraphT`.
+  """
+  builder = flatbuffers.Builder(0)
+  builder.Finish(table.Pack(builder))
+  _update_hash(hasher, builder.Output())
+
+
+def _get_model_hash(model_buf, model, metadata_buffer_index, weights_hash):
+  """Hashes the model flatbuffer, except the metadata buffer.
+
+  Only the subgraphs, operator codes and signatures are unpacked, the weights
+  are accounted for by `weights_hash`.
+
+  Args:
+    model_buf: the TFLite model.
+    model: the root `Model` table of `model_buf`.
+    metadata_buffer_index: index of the metadata buffer, or None.
+    weights_hash: the hash of the model weights.
+
+  Returns:
+    The SHA-256 hex digest of the model.
+  """
+  hasher = hashlib.sha256()
+  hasher.update(struct.pack('<I', model.Version()))
+  _update_hash(hasher, model.Description() or b'')
+
+  for i in range(model.OperatorCodesLength()):
+    _update_hash_with_table(
+        hasher, _schema_fb.OperatorCodeT.InitFromObj(model.OperatorCodes(i)))
+
+  for i in range(model.SubgraphsLength()):
+    subgraph = _schema_fb.SubGraphT.InitFromObj(model.Subgraphs(i))
+    for operator in subgraph.operators or []:
+      # The large custom options of models larger than 2 GB are referenced by
+      # their offset in the file, which is replaced with their content.
+      offset = getattr(operator, 'largeCustomOptionsOffset', 0)
+      if offset > 1:
+        with memoryview(model_buf) as view:
+          _update_hash(
+              hasher, view[offset:offset + operator.largeCustomOptionsSize])
+        operator.largeCustomOptionsOffset = 0
+    _update_hash_with_table(hasher, subgraph)
+
+  if hasattr(model, 'SignatureDefsLength'):
+    for i in range(model.SignatureDefsLength()):
+      _update_hash_with_table(
+          hasher, _schema_fb.SignatureDefT.InitFromObj(model.SignatureDefs(i)))
+
+  for i in range(model.MetadataLength()):
+    meta = model.Metadata(i)
+    if meta.Buffer() != metadata_buffer_index:
+      _update_hash(hasher, meta.Name())
+      hasher.update(struct.pack('<I', meta.Buffer()))
+
+  hasher.update(weights_hash.encode('utf-8'))
+  return hasher.hexdigest()
+
+
+def _get_associated_file_hashes(model_buf):
+  """Hashes each associated file packed into the model."""
+  file_hashes = {}
+  with _BufferFile(model_buf) as model_file:
+    if not zipfile.is_zipfile(model_file):
+      return file_hashes
+    with zipfile.ZipFile(model_file) as zf:
+      for info in zf.infolist():
+        hasher = hashlib.sha256()
+        with zf.open(info) as f:
+          while True:
+            chunk = f.read(_HASH_CHUNK_SIZE)
+            if not chunk:
+              break
+            hasher.update(chunk)
+        file_hashes[info.filename] = hasher.hexdigest()
+  return file_hashes
+
+
+def get_fingerprint(model_buf) -> ModelFingerprint:
+  """Computes the fingerprint of a model.
+
+  Args:
+    model_buf: the TFLite model buffer, or a memory mapped model file.
+
+  Returns:
+    The fingerprint of the model.
+  """
+  _metadata._assert_model_buffer_identifier(model_buf)  # pylint: disable=protected-access
+  model = _schema_fb.Model.GetRootAsModel(model_buf, 0)
+  metadata_buffer_index = _get_metadata_buffer_index(model)
+  weights_hash = _get_weights_hash(model_buf, metadata_buffer_index)
+
+  metadata_hash = None
+  metadata_buf = _metadata.get_metadata_buffer(model_buf)
+  if metadata_buf is not None:
+    metadata_hash = hashlib.sha256(metadata_buf).hexdigest()
+
+  return ModelFingerprint(
+      model_hash=_get_model_hash(model_buf, model, metadata_buffer_index,
+                                 weights_hash),
+      weights_hash=weights_hash,
+      metadata_hash=metadata_hash,
+      associated_file_hashes=_get_associated_file_hashes(model_buf))
+
+
+def get_file_fingerprint(model_file: str) -> ModelFingerprint:
+  """Computes the fingerprint of a model file.
+
+  The model file is memory mapped, so that only the pages being hashed are
+  read, regardless of the size of the model.
+
+  Args:
+    model_file: path to a local TFLite model file.
+
+  Returns:
+    The fingerprint of the model.
+  """
+  with open(model_file, 'rb') as f, mmap.mmap(
+      f.fileno(), 0, access=mmap.ACCESS_READ) as model_buf:
+    return get_fingerprint(model_buf)
+
+
+def compare_fingerprints(fingerprint_a: ModelFingerprint,
+                         fingerprint_b: ModelFingerprint) -> List[str]:
+  """Returns the names of the parts that differ between two models.
+
+  Args:
+    fingerprint_a: fingerprint of the first model.
+    fingerprint_b: fingerprint of the second model.
+
+  Returns:
+    The differing parts among `model`, `weights`, `metadata` and
+    `associated_files`, in this order. Models whose `model` part is the same
+    only differ in their metadata or associated files.
+  """
+  parts = []
+  if fingerprint_a.model_hash != fingerprint_b.model_hash:
+    parts.append('model')
+  if fingerprint_a.weights_hash != fingerprint_b.weights_hash:
+    parts.append('weights')
+  if fingerprint_a.metadata_hash != fingerprint_b.metadata_hash:
+    parts.append('metadata')
+  if (fingerprint_a.associated_file_hashes !=
+      fingerprint_b.associated_file_hashes):
+    parts.append('associated_files')
+  return parts
+
+
+def _diff_values(path, value_a, value_b, differences):
+  """Appends the differences between two JSON values to `differences`."""
+  if isinstance(value_a, dict) and isinstance(value_b, dict):
+    for key in sorted(set(value_a) | set(value_b)):
+      _diff_values(f'{path}.{key}' if path else key, value_a.get(key),
+                   value_b.get(key), differences)
+  elif isinstance(value_a, list) and isinstance(value_b, list):
+    for i in range(max(len(value_a), len(value_b))):
+      _diff_values(f'{path}[{i}]', value_a[i] if i < len(value_a) else None,
+                   value_b[i] if i < len(value_b) else None, differences)
+  elif value_a != value_b:
+    differences.append(MetadataDifference(path, value_a, value_b))
+
+
+def diff_metadata_json(json_a: Optional[str],
+                       json_b: Optional[str]) -> List[MetadataDifference]:
+  """Compares the metadata JSON of two models.
+
+  Args:
+    json_a: metadata JSON of the first model, as returned by
+      `metadata.convert_to_json`, or None if the model doesn't have metadata.
+    json_b: metadata JSON of the second model, or None.
+
+  Returns:
+    The values that differ between the two models, sorted by path.
+  """
+  differences = []
+  _diff_values('', json.loads(json_a) if json_a else {},
+               json.loads(json_b) if json_b else {}, differences)
+  return differences
+
+
+def diff_metadata(model_buf_a, model_buf_b) -> List[MetadataDifference]:
+  """Compares the metadata of two models.
+
+  Args:
+    model_buf_a: the first TFLite model buffer, or a memory mapped model file.
+    model_buf_b: the second TFLite model buffer, or a memory mapped model file.
+
+  Returns:
+    The values that differ between the metadata of the two models, sorted by
+    path.
+  """
+  metadata_json = []
+  for model_buf in (model_buf_a, model_buf_b):
+    metadata_buf = _metadata.get_metadata_buffer(model_buf)
+    metadata_json.append(
+        _metadata.convert_to_json(metadata_buf) if metadata_buf else None)
+  return diff_metadata_json(*metadata_json)
+
+
+def main(argv):
+  model_files = argv[1:]
+  if FLAGS.diff:
+    if len(model_files) != 2:
+      raise app.UsageError('--diff compares exactly two models.')
+    fingerprints = [get_file_fingerprint(f) for f in model_files]
+    print('Differing parts: {}'.format(', '.join(
+        compare_fingerprints(*fingerprints)) or 'none'))
+    with open(model_files[0], 'rb') as fa, open(model_files[1], 'rb') as fb, \
+        mmap.mmap(fa.fileno(), 0, access=mmap.ACCESS_READ) as model_buf_a, \
+        mmap.mmap(fb.fileno(), 0, access=mmap.ACCESS_READ) as model_buf_b:
+      differences = diff_metadata(model_buf_a, model_buf_b)
+    for difference in differences:
+      print(f'{difference.path}: {json.dumps(difference.value_a)} -> '
+            f'{json.dumps(difference.value_b)}')
+    return 0
+
+  with concurrent.futures.ProcessPoolExecutor(FLAGS.num_workers) as executor:
+    for model_file, fingerprint in zip(
+        model_files, executor.map(get_file_fingerprint, model_files)):
+      print(json.dumps(dict(path=model_file, **dataclasses.asdict(fingerprint))))
+  return 0
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -15,7 +15,10 @@
 """Tests for tensorflow_lite_support.metadata.metadata."""
 
 import enum
+import io
 import os
+import time
+import zipfile
 
 from absl.testing import parameterized
 import six
@@ -278,6 +281,67 @@ class MetadataPopulatorTest(MetadataTest):
     model_buf_from_getter = populator.get_model_buffer()
     self.assertEqual(model_buf_from_file, model_buf_from_getter)
 
+  def testPopulateModelFileLeavesNoTemporaryFile(self):
+    model_dir = os.path.dirname(self._model_file)
+    files_before_population = set(os.listdir(model_dir))
+    populator = _metadata.MetadataPopulator.with_model_file(self._model_file)
+    populator.load_metadata_file(self._metadata_file)
+    populator.load_associated_files([self._file1, self._file2])
+    populator.populate()
+
+    self.assertEqual(set(os.listdir(model_dir)), files_before_population)
+    self.assertEqual(
+        _read_file(self._model_file), populator.get_model_buffer())
+
+  def testPopulateModelFileWithMmap(self):
+    populator = _metadata.MetadataPopulator.with_model_file(
+        self._model_file, use_mmap=True)
+    populator.load_metadata_file(self._metadata_file)
+    populator.load_associated_files([self._file1, self._file2])
+    populator.populate()
+
+    self.assertEqual(
+        _read_file(self._model_file), bytes(populator.get_model_buffer()))
+    self.assertEqual(
+        set(populator.get_packed_associated_file_list()),
+        set(self.expected_recorded_files))
+
+  def testPopulateModelBufferDoesNotModifyInputBuffer(self):
+    model_buf = bytes(self._model_buf)
+    populator = _metadata.MetadataPopulator.with_model_buffer(model_buf)
+    populator.load_metadata_file(self._metadata_file)
+    populator.load_associated_files([self._file1, self._file2])
+    populator.populate()
+
+    self.assertEqual(model_buf, self._model_buf)
+    self.assertEqual(
+        set(populator.get_packed_associated_file_list()),
+        set(self.expected_recorded_files))
+
+  def testPopulateCompressedAssociatedFile(self):
+    populator = _metadata.MetadataPopulator.with_model_file(self._model_file)
+    populator.load_metadata_file(self._metadata_file)
+    populator.load_associated_files([self._file1])
+    populator.load_associated_files([self._file2],
+                                    compress_type=zipfile.ZIP_DEFLATED)
+    populator.populate()
+
+    # Populating the model again keeps the compression of packed files.
+    populator = _metadata.MetadataPopulator.with_model_file(self._model_file)
+    populator.load_metadata_file(self._metadata_file)
+    populator.populate()
+
+    with zipfile.ZipFile(io.BytesIO(populator.get_model_buffer())) as zf:
+      self.assertEqual(
+          zf.getinfo(os.path.basename(self._file1)).compress_type,
+          zipfile.ZIP_STORED)
+      self.assertEqual(
+          zf.getinfo(os.path.basename(self._file2)).compress_type,
+          zipfile.ZIP_DEFLATED)
+      self.assertEqual(
+          zf.read(os.path.basename(self._file2)), self._file2_content)
+    self._assert_golden_metadata(self._model_file)
+
   def testPopulateInvalidAssociatedFile(self):
     populator = _metadata.MetadataPopulator.with_model_buffer(self._model_buf)
     with self.assertRaises(IOError) as error:
@@ -470,6 +534,125 @@ class MetadataPopulatorTest(MetadataTest):
     model_buf_from_getter = populator.get_model_buffer()
     self.assertEqual(model_buf_from_file, model_buf_from_getter)
 
+  def testPopulateMetadataInPlaceKeepsModelContent(self):
+    model = _schema_fb.ModelT.InitFromObj(
+        _schema_fb.Model.GetRootAsModel(self._model_buf, 0))
+    model.version = 3
+    model.description = "model with weights"
+    weights = _schema_fb.BufferT()
+    weights.data = list(range(64))
+    model.buffers.append(weights)
+    b = flatbuffers.Builder(0)
+    b.Finish(model.Pack(b), _metadata.MetadataPopulator.TFLITE_FILE_IDENTIFIER)
+    model_buf = b.Output()
+    metadata_buf = _read_file(self._metadata_file)
+
+    populated_buf = _metadata._patch_metadata_buffer(model_buf, metadata_buf)  # pylint: disable=protected-access
+    self.assertIsNotNone(populated_buf)
+    populated = _schema_fb.ModelT.InitFromObj(
+        _schema_fb.Model.GetRootAsModel(populated_buf, 0))
+    self.assertEqual(populated.version, 3)
+    self.assertEqual(populated.description, b"model with weights")
+    self.assertEqual(list(populated.subgraphs[0].inputs), [0, 1])
+    self.assertEqual(list(populated.subgraphs[0].outputs), [2])
+    self.assertLen(populated.buffers, 5)
+    self.assertEqual(bytes(populated.buffers[3].data), bytes(range(64)))
+    self.assertLen(populated.metadata, 3)
+    self.assertEqual(
+        _metadata.get_metadata_buffer(populated_buf), metadata_buf)
+
+    # Populating metadata again replaces the existing metadata buffer.
+    new_metadata_buf = _read_file(self._metadata_file_with_version)
+    repopulated_buf = _metadata._patch_metadata_buffer(  # pylint: disable=protected-access
+        populated_buf, new_metadata_buf)
+    repopulated = _schema_fb.ModelT.InitFromObj(
+        _schema_fb.Model.GetRootAsModel(repopulated_buf, 0))
+    self.assertLen(repopulated.buffers, 5)
+    self.assertEqual(bytes(repopulated.buffers[3].data), bytes(range(64)))
+    self.assertLen(repopulated.metadata, 3)
+    self.assertEqual(
+        _metadata.get_metadata_buffer(repopulated_buf), new_metadata_buf)
+
+  def testRepeatedPopulateMetadataKeepsModelSize(self):
+    model_sizes = []
+    metadata_bufs = []
+    for i in range(3):
+      populator = _metadata.MetadataPopulator.with_model_file(self._model_file)
+      populator.load_metadata_file(self._metadata_file)
+      if i == 0:
+        populator.load_associated_files([self._file1, self._file2])
+      populator.populate()
+      model_sizes.append(os.path.getsize(self._model_file))
+      metadata_bufs.append(
+          _metadata.get_metadata_buffer(_read_file(self._model_file)))
+
+    self.assertLen(set(model_sizes), 1)
+    self.assertLen(set(metadata_bufs), 1)
+    self.assertEqual(
+        set(populator.get_packed_associated_file_list()),
+        {os.path.basename(self._file1),
+         os.path.basename(self._file2)})
+
+  def testPopulateMetadataInPlaceKeepsExternalBuffers(self):
+    # Models larger than 2 GB store their weights after the flatbuffer.
+    weights = _schema_fb.BufferT()
+    if not hasattr(weights, "offset"):
+      self.skipTest("The TFLite schema doesn't support external buffers.")
+    model = _schema_fb.ModelT.InitFromObj(
+        _schema_fb.Model.GetRootAsModel(self._model_buf, 0))
+    model.buffers.append(weights)
+    weights.size = 64
+
+    def pack_model():
+      b = flatbuffers.Builder(0)
+      b.Finish(model.Pack(b),
+               _metadata.MetadataPopulator.TFLITE_FILE_IDENTIFIER)
+      return bytes(b.Output())
+
+    # Packs the model twice, as the weights offset depends on the size of the
+    # flatbuffer, which doesn't depend on the value of the offset.
+    weights.offset = 2
+    flatbuffer = pack_model()
+    weights.offset = len(flatbuffer) + (-len(flatbuffer) % 16)
+    flatbuffer = pack_model()
+    model_buf = flatbuffer.ljust(weights.offset, b"\0") + bytes(range(64))
+    metadata_buf = _read_file(self._metadata_file)
+
+    populated_buf = _metadata._patch_metadata_buffer(model_buf, metadata_buf)  # pylint: disable=protected-access
+    self.assertIsNotNone(populated_buf)
+    populated = _schema_fb.ModelT.InitFromObj(
+        _schema_fb.Model.GetRootAsModel(populated_buf, 0))
+    populated_weights = populated.buffers[len(model.buffers) - 1]
+    self.assertEqual(populated_weights.offset % 16, 0)
+    self.assertEqual(
+        populated_buf[populated_weights.offset:populated_weights.offset +
+                      populated_weights.size], bytes(range(64)))
+    self.assertEqual(
+        _metadata.get_metadata_buffer(populated_buf), metadata_buf)
+
+    # Populating metadata again replaces the prefix of the patched model.
+    repopulated_buf = _metadata._patch_metadata_buffer(  # pylint: disable=protected-access
+        populated_buf, metadata_buf)
+    self.assertEqual(repopulated_buf, populated_buf)
+
+  def testWriteOnlyFileWritesMemoryviewsAsBytes(self):
+    # Files opened with tf.io.gfile only accept bytes.
+    chunks = []
+
+    class BytesOnlyFile(object):
+
+      def write(self, data):
+        if not isinstance(data, bytes):
+          raise TypeError("Expected bytes, found: {0}.".format(type(data)))
+        chunks.append(data)
+
+    output = _metadata._WriteOnlyFile(BytesOnlyFile())  # pylint: disable=protected-access
+    self.assertEqual(output.write(b"model"), 5)
+    self.assertEqual(output.write(memoryview(self._model_buf)),
+                     len(self._model_buf))
+    self.assertEqual(output.tell(), len(self._model_buf) + 5)
+    self.assertEqual(b"".join(chunks), b"model" + bytes(self._model_buf))
+
   def testPopulateInvalidMetadataFile(self):
     populator = _metadata.MetadataPopulator.with_model_buffer(self._model_buf)
     with self.assertRaises(IOError) as error:
@@ -842,6 +1025,23 @@ class MetadataDisplayerTest(MetadataTest):
         .format(expected_packed_files[0], expected_packed_files[1]))
     self.assertEqual(set(packed_files), set(expected_packed_files))
 
+  def testLoadModelFileWithMmap(self):
+    displayer = _metadata.MetadataDisplayer.with_model_file(
+        self._model_with_meta_file)
+    mmap_displayer = _metadata.MetadataDisplayer.with_model_file(
+        self._model_with_meta_file, use_mmap=True)
+
+    self.assertEqual(mmap_displayer.get_metadata_buffer(),
+                     displayer.get_metadata_buffer())
+    self.assertEqual(mmap_displayer.get_metadata_json(),
+                     displayer.get_metadata_json())
+    self.assertEqual(
+        set(mmap_displayer.get_packed_associated_file_list()),
+        set(displayer.get_packed_associated_file_list()))
+    self.assertEqual(
+        mmap_displayer.get_associated_file_buffer(
+            os.path.basename(self._file2)), self._file2_content)
+
 
 class MetadataUtilTest(MetadataTest):
 
@@ -855,6 +1055,64 @@ class MetadataUtilTest(MetadataTest):
     expected = _read_file(golden_json_file_path, "r")
     self.assertEqual(metadata_json, expected)
 
+  def test_convert_many_to_json_should_succeed(self):
+    metadata_buf = _read_file(self._metadata_file_with_version)
+    metadata_jsons = _metadata.convert_many_to_json(
+        [metadata_buf, metadata_buf])
+
+    golden_json_file_path = resource_loader.get_path_to_datafile(
+        "testdata/golden_json.json")
+    expected = _read_file(golden_json_file_path, "r")
+    self.assertEqual(metadata_jsons, [expected, expected])
+    self.assertEmpty(_metadata.convert_many_to_json([]))
+
+
+class ConvertToJsonBenchmark(tf.test.Benchmark):
+  """Benchmarks converting metadata to JSON.
+
+  Run with:
+    bazel run -c opt \\
+      tensorflow_lite_support/metadata/python/tests:metadata_test \\
+      -- --benchmarks=ConvertToJsonBenchmark
+  """
+
+  _NUM_ITERS = 1000
+
+  def _create_metadata_buffer(self):
+    tensor_meta = _metadata_fb.TensorMetadataT()
+    tensor_meta.name = "tensor"
+    tensor_meta.description = "Tensor of the benchmark model."
+    subgraph = _metadata_fb.SubGraphMetadataT()
+    subgraph.inputTensorMetadata = [tensor_meta] * 4
+    subgraph.outputTensorMetadata = [tensor_meta] * 4
+    model_meta = _metadata_fb.ModelMetadataT()
+    model_meta.name = "benchmark_model"
+    model_meta.description = "Model used to benchmark JSON conversion."
+    model_meta.subgraphMetadata = [subgraph]
+    b = flatbuffers.Builder(0)
+    b.Finish(
+        model_meta.Pack(b),
+        _metadata.MetadataPopulator.METADATA_FILE_IDENTIFIER)
+    return bytes(b.Output())
+
+  def benchmark_convert_to_json(self):
+    metadata_buf = self._create_metadata_buffer()
+    # Excludes parsing the schema, which only happens once per process.
+    _metadata.convert_to_json(metadata_buf)
+    start = time.perf_counter()
+    for _ in range(self._NUM_ITERS):
+      _metadata.convert_to_json(metadata_buf)
+    wall_time = (time.perf_counter() - start) / self._NUM_ITERS
+    self.report_benchmark(iters=self._NUM_ITERS, wall_time=wall_time)
+
+  def benchmark_convert_many_to_json(self):
+    metadata_bufs = [self._create_metadata_buffer()] * self._NUM_ITERS
+    _metadata.convert_to_json(metadata_bufs[0])
+    start = time.perf_counter()
+    _metadata.convert_many_to_json(metadata_bufs)
+    wall_time = (time.perf_counter() - start) / self._NUM_ITERS
+    self.report_benchmark(iters=self._NUM_ITERS, wall_time=wall_time)
+
 
 if __name__ == "__main__":
   tf.test.main()
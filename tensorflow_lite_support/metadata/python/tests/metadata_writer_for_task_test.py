@@ -15,8 +15,8 @@
 """Tests for tensorflow_lite_support.metadata.metadata_writer_for_task."""
 
 import os
-import sys
 import tensorflow as tf
+from tensorflow_lite_support.metadata.python import metadata as _metadata
 from tensorflow_lite_support.metadata.python import metadata_writer_for_task as mt
 from tensorflow_lite_support.metadata.python.tests.metadata_writers import test_utils
 
@@ -70,17 +70,17 @@ class MetadataWriterForTaskTest(tf.test.TestCase):
         model_name='test_model',
         model_description='test_description')
 
-    # Calling `add_classification_output` outside the `with` block fails.
-    with self.assertRaisesRegex(AttributeError, '_temp_folder'):
-      writer.add_classification_output(mt.Labels().add(['cat', 'dog']))
-
-    writer.__enter__()
+    # Labels are exported in memory, so the writer also works outside of a
+    # `with` block.
     writer.add_classification_output(mt.Labels().add(['cat', 'dog']))
-    writer.__exit__(*sys.exc_info())
+    tflite_content, _ = writer.populate(
+        os.path.join(self.create_tempdir(), 'model.tflite'))
 
-    # Calling `add_classification_output` after `with` block closes also fails.
-    with self.assertRaisesRegex(AttributeError, '_temp_folder'):
-      writer.add_classification_output(mt.Labels().add(['cat', 'dog']))
+    displayer = _metadata.MetadataDisplayer.with_model_buffer(tflite_content)
+    self.assertEqual(displayer.get_packed_associated_file_list(),
+                     ['labels.txt'])
+    self.assertEqual(
+        displayer.get_associated_file_buffer('labels.txt'), b'cat\ndog')
 
   def test_initialize_and_populate(self):
     with mt.Writer(
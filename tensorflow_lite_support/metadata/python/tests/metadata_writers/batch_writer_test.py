@@ -0,0 +1,98 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for batch_writer."""
+
+import json
+import os
+
+import tensorflow as tf
+
+from tensorflow_lite_support.metadata.python import metadata as _metadata
+from tensorflow_lite_support.metadata.python.metadata_writers import batch_writer
+from tensorflow_lite_support.metadata.python.tests.metadata_writers import test_utils
+
+_MODEL = "../testdata/image_classifier/mobilenet_v2_1.0_224_quant.tflite"
+_LABEL_FILE = "../testdata/image_classifier/labels.txt"
+_NORM_MEAN = 127.5
+_NORM_STD = 127.5
+
+
+class BatchWriterTest(tf.test.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._temp_dir = self.create_tempdir().full_path
+    self._manifest_path = os.path.join(self._temp_dir, "manifest.json")
+    model_config = {
+        "model_path": test_utils.get_resource_path(_MODEL),
+        "writer": "image_classifier",
+        "input_norm_mean": [_NORM_MEAN],
+        "input_norm_std": [_NORM_STD],
+        "label_file_paths": [test_utils.get_resource_path(_LABEL_FILE)],
+    }
+    manifest = {
+        "models": [
+            dict(model_config, output_path="model_1.tflite"),
+            dict(model_config, output_path="model_2.tflite"),
+            dict(
+                model_config,
+                output_path="model_3.tflite",
+                writer="unknown_writer"),
+        ]
+    }
+    with open(self._manifest_path, "w") as f:
+      json.dump(manifest, f)
+
+  def test_load_manifest_resolves_relative_paths(self):
+    configs = batch_writer.load_manifest(self._manifest_path)
+
+    self.assertLen(configs, 3)
+    self.assertEqual(configs[0]["output_path"],
+                     os.path.join(self._temp_dir, "model_1.tflite"))
+    self.assertEqual(configs[0]["model_path"],
+                     test_utils.get_resource_path(_MODEL))
+
+  def test_write_metadata_in_batch_should_succeed(self):
+    configs = batch_writer.load_manifest(self._manifest_path)
+    results = batch_writer.write_metadata_in_batch(configs, num_workers=2)
+
+    self.assertEqual([result.error is None for result in results],
+                     [True, True, False])
+    self.assertIn("Unsupported writer: unknown_writer", results[2].error)
+    for result in results[:2]:
+      displayer = _metadata.MetadataDisplayer.with_model_file(
+          result.output_path)
+      self.assertEqual(displayer.get_packed_associated_file_list(),
+                       ["labels.txt"])
+    self.assertFalse(
+        os.path.exists(os.path.join(self._temp_dir, "model_3.tflite")))
+    self.assertCountEqual(
+        os.listdir(self._temp_dir),
+        ["manifest.json", "model_1.tflite", "model_2.tflite"])
+
+  def test_read_associated_file_rereads_modified_file(self):
+    label_file = os.path.join(self._temp_dir, "labels.txt")
+    with open(label_file, "w") as f:
+      f.write("a\nb\n")
+    self.assertEqual(batch_writer._read_associated_file(label_file), b"a\nb\n")
+
+    with open(label_file, "w") as f:
+      f.write("a\nb\nc\n")
+    self.assertEqual(
+        batch_writer._read_associated_file(label_file), b"a\nb\nc\n")
+
+
+if __name__ == "__main__":
+  tf.test.main()
@@ -14,11 +14,14 @@
 # ==============================================================================
 """Tests for bert_nl_classifier.MetadataWriter."""
 
+from unittest import mock
+
 import tensorflow as tf
 
 from tensorflow_lite_support.metadata.python import metadata as _metadata
 from tensorflow_lite_support.metadata.python.metadata_writers import bert_nl_classifier
 from tensorflow_lite_support.metadata.python.metadata_writers import metadata_info
+from tensorflow_lite_support.metadata.python.metadata_writers import writer_utils
 from tensorflow_lite_support.metadata.python.tests.metadata_writers import test_utils
 
 _TEST_DIR = "tensorflow_lite_support/metadata/python/tests/testdata/bert_nl_classifier/"
@@ -57,6 +60,16 @@ class MetadataWriterTest(tf.test.TestCase):
 
     self.assertEqual(metadata_json, expected_json)
 
+  def test_create_for_inference_parses_model_once(self):
+    with mock.patch.object(
+        writer_utils, "ModelSignature",
+        wraps=writer_utils.ModelSignature) as model_signature:
+      bert_nl_classifier.MetadataWriter.create_for_inference(
+          test_utils.load_file(_MODEL),
+          metadata_info.BertTokenizerMd(_VOCAB_FILE), [_LABEL_FILE])
+
+    self.assertEqual(model_signature.call_count, 1)
+
   def test_create_from_metadata_info_by_default_should_succeed(self):
     writer = bert_nl_classifier.MetadataWriter.create_from_metadata_info(
         test_utils.load_file(_MODEL))
@@ -14,6 +14,8 @@
 # ==============================================================================
 """Tests for ImageClassifier.MetadataWriter."""
 
+from unittest import mock
+
 from absl.testing import parameterized
 
 import tensorflow as tf
@@ -21,6 +23,7 @@ import tensorflow as tf
 from tensorflow_lite_support.metadata import metadata_schema_py_generated as _metadata_fb
 from tensorflow_lite_support.metadata.python.metadata_writers import image_classifier
 from tensorflow_lite_support.metadata.python.metadata_writers import metadata_info
+from tensorflow_lite_support.metadata.python.metadata_writers import writer_utils
 from tensorflow_lite_support.metadata.python.tests.metadata_writers import test_utils
 
 _FLOAT_MODEL = "../testdata/image_classifier/mobilenet_v2_1.0_224.tflite"
@@ -78,6 +81,16 @@ class MetadataWriterTest(tf.test.TestCase, parameterized.TestCase):
     expected_json = test_utils.load_file(_JSON_DEFAULT, "r")
     self.assertEqual(metadata_json, expected_json)
 
+  def test_create_for_inference_parses_model_once(self):
+    with mock.patch.object(
+        writer_utils, "ModelSignature",
+        wraps=writer_utils.ModelSignature) as model_signature:
+      image_classifier.MetadataWriter.create_for_inference(
+          test_utils.load_file(_QUANT_MODEL), [_NORM_MEAN], [_NORM_STD],
+          [_LABEL_FILE])
+
+    self.assertEqual(model_signature.call_count, 1)
+
 
 if __name__ == "__main__":
   tf.test.main()
@@ -454,6 +454,30 @@ class ScoreCalibrationMdTest(tf.test.TestCase):
                                        self._DEFAULT_VALUE,
                                        malformed_calibration_file)
 
+  def test_create_score_calibration_file_md_with_file_content(self):
+    file_content = b"1.0,2.0,3.0,4.0"
+    score_calibration_md = metadata_info.ScoreCalibrationMd(
+        _metadata_fb.ScoreTransformationType.LOG,
+        self._DEFAULT_VALUE,
+        "score_calibration.txt",
+        file_content=file_content)
+    score_calibration_file_md = (
+        score_calibration_md.create_score_calibration_file_md())
+
+    self.assertEqual(score_calibration_file_md.file_path,
+                     "score_calibration.txt")
+    self.assertEqual(score_calibration_file_md.file_content, file_content)
+
+  def test_create_score_calibration_file_content_fails_with_negative_scale(
+      self):
+    with self.assertRaisesRegex(
+        ValueError, "Expected scale to be a non-negative value, but got -1.0."):
+      metadata_info.ScoreCalibrationMd(
+          _metadata_fb.ScoreTransformationType.LOG,
+          self._DEFAULT_VALUE,
+          "score_calibration.txt",
+          file_content=b"-1.0,0.2,0.1")
+
 
 def _create_dummy_model_metadata_with_tensor(
     tensor_metadata: _metadata_fb.TensorMetadataT) -> bytes:
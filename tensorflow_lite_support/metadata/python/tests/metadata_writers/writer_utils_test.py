@@ -15,6 +15,8 @@
 """Tests for wrtier util methods."""
 
 import array
+from unittest import mock
+
 import tensorflow as tf
 
 from tensorflow_lite_support.metadata import schema_py_generated as _schema_fb
@@ -78,6 +80,29 @@ class WriterUtilsTest(tf.test.TestCase):
         test_utils.load_file(_MODEL_NAME), _IMAGE_TENSOR_INDEX)
     self.assertEqual(list(tensor_shape), list(_EXPECTED_INPUT_IMAGE_SHAPE))
 
+  def test_model_signature(self):
+    signature = writer_utils.ModelSignature(test_utils.load_file(_MODEL_NAME))
+
+    self.assertEqual(signature.input_names, [_EXOECTED_INPUT_TENSOR_NAMES])
+    self.assertEqual(signature.output_names,
+                     list(_EXOECTED_OUTPUT_TENSOR_NAMES))
+    self.assertEqual(signature.input_types, [_EXPECTED_INPUT_TYPES])
+    self.assertEqual(signature.output_types, list(_EXPECTED_OUTPUT_TYPES))
+    self.assertEqual(
+        list(signature.inputs[_IMAGE_TENSOR_INDEX].shape),
+        list(_EXPECTED_INPUT_IMAGE_SHAPE))
+
+  def test_get_input_tensor_shape_with_model_signature(self):
+    model_buffer = test_utils.load_file(_MODEL_NAME)
+    signature = writer_utils.ModelSignature(model_buffer)
+
+    with mock.patch.object(writer_utils, "ModelSignature") as model_signature:
+      tensor_shape = writer_utils.get_input_tensor_shape(
+          model_buffer, _IMAGE_TENSOR_INDEX, signature)
+
+    model_signature.assert_not_called()
+    self.assertEqual(list(tensor_shape), list(_EXPECTED_INPUT_IMAGE_SHAPE))
+
   def test_save_and_load_file(self):
     expected_file_bytes = b"This is a test file."
     file_path = self.create_tempfile().full_path
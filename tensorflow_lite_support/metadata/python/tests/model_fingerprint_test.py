@@ -0,0 +1,149 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for tensorflow_lite_support.metadata.python.model_fingerprint."""
+
+import hashlib
+
+import tensorflow as tf
+
+import flatbuffers
+from tensorflow.python.platform import resource_loader
+from tensorflow_lite_support.metadata import metadata_schema_py_generated as _metadata_fb
+from tensorflow_lite_support.metadata.python import metadata as _metadata
+from tensorflow_lite_support.metadata.python import model_fingerprint
+
+_MODEL = "testdata/mobilenet_v2_1.0_224_quant.tflite"
+_LABEL_FILE_CONTENT = b"cat\ndog"
+
+
+def _read_file(file_name):
+  with open(file_name, "rb") as f:
+    return f.read()
+
+
+def _create_metadata_buf(model_name):
+  model_meta = _metadata_fb.ModelMetadataT()
+  model_meta.name = model_name
+  subgraph = _metadata_fb.SubGraphMetadataT()
+  subgraph.inputTensorMetadata = [_metadata_fb.TensorMetadataT()]
+  subgraph.outputTensorMetadata = [_metadata_fb.TensorMetadataT()]
+  model_meta.subgraphMetadata = [subgraph]
+  b = flatbuffers.Builder(0)
+  b.Finish(
+      model_meta.Pack(b),
+      _metadata.MetadataPopulator.METADATA_FILE_IDENTIFIER)
+  return b.Output()
+
+
+def _populate(model_buf, model_name, label_file_content=_LABEL_FILE_CONTENT):
+  populator = _metadata.MetadataPopulator.with_model_buffer(model_buf)
+  populator.load_metadata_buffer(_create_metadata_buf(model_name))
+  populator.load_associated_file_buffers({"labels.txt": label_file_content})
+  populator.populate()
+  return populator.get_model_buffer()
+
+
+class ModelFingerprintTest(tf.test.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._model_buf = _read_file(
+        resource_loader.get_path_to_datafile(_MODEL))
+
+  def testFingerprintOfModelWithoutMetadata(self):
+    fingerprint = model_fingerprint.get_fingerprint(self._model_buf)
+
+    self.assertIsNone(fingerprint.metadata_hash)
+    self.assertEqual(fingerprint.associated_file_hashes, {})
+
+  def testPopulatingMetadataKeepsModelHash(self):
+    original = model_fingerprint.get_fingerprint(self._model_buf)
+    model_buf = _populate(self._model_buf, "model")
+    populated = model_fingerprint.get_fingerprint(model_buf)
+
+    self.assertEqual(populated.model_hash, original.model_hash)
+    self.assertEqual(populated.weights_hash, original.weights_hash)
+    self.assertEqual(
+        populated.metadata_hash,
+        hashlib.sha256(_metadata.get_metadata_buffer(model_buf)).hexdigest())
+    self.assertEqual(populated.associated_file_hashes,
+                     {"labels.txt": hashlib.sha256(
+                         _LABEL_FILE_CONTENT).hexdigest()})
+
+  def testFingerprintDoesNotDependOnModelLayout(self):
+    metadata_buf = _create_metadata_buf("model")
+    patched_buf = _metadata._patch_metadata_buffer(self._model_buf,
+                                                   metadata_buf)
+    repacked_buf = _metadata._repack_metadata_buffer(self._model_buf,
+                                                     metadata_buf)
+
+    self.assertNotEqual(bytes(patched_buf), bytes(repacked_buf))
+    self.assertEqual(
+        model_fingerprint.get_fingerprint(patched_buf),
+        model_fingerprint.get_fingerprint(repacked_buf))
+
+  def testCompareFingerprints(self):
+    fingerprint = model_fingerprint.get_fingerprint(
+        _populate(self._model_buf, "model"))
+    renamed = model_fingerprint.get_fingerprint(
+        _populate(self._model_buf, "renamed_model"))
+    relabeled = model_fingerprint.get_fingerprint(
+        _populate(self._model_buf, "model", b"bird"))
+
+    self.assertEqual(
+        model_fingerprint.compare_fingerprints(fingerprint, fingerprint), [])
+    self.assertEqual(
+        model_fingerprint.compare_fingerprints(fingerprint, renamed),
+        ["metadata"])
+    self.assertEqual(
+        model_fingerprint.compare_fingerprints(fingerprint, relabeled),
+        ["associated_files"])
+
+  def testGetFileFingerprint(self):
+    model_buf = _populate(self._model_buf, "model")
+    model_file = self.create_tempfile(content=model_buf).full_path
+
+    self.assertEqual(
+        model_fingerprint.get_file_fingerprint(model_file),
+        model_fingerprint.get_fingerprint(model_buf))
+
+  def testDiffMetadata(self):
+    differences = model_fingerprint.diff_metadata(
+        _populate(self._model_buf, "model"),
+        _populate(self._model_buf, "renamed_model"))
+
+    self.assertEqual(differences, [
+        model_fingerprint.MetadataDifference("name", "model", "renamed_model")
+    ])
+
+  def testDiffMetadataJson(self):
+    differences = model_fingerprint.diff_metadata_json(
+        '{"name": "a", "subgraph_metadata": [{"input_tensor_metadata": '
+        '[{"name": "x"}, {"name": "y"}]}]}',
+        '{"name": "a", "subgraph_metadata": [{"input_tensor_metadata": '
+        '[{"name": "z"}]}], "version": "v1"}')
+
+    self.assertEqual(differences, [
+        model_fingerprint.MetadataDifference(
+            "subgraph_metadata[0].input_tensor_metadata[0].name", "x", "z"),
+        model_fingerprint.MetadataDifference(
+            "subgraph_metadata[0].input_tensor_metadata[1]", {"name": "y"},
+            None),
+        model_fingerprint.MetadataDifference("version", None, "v1"),
+    ])
+
+
+if __name__ == "__main__":
+  tf.test.main()
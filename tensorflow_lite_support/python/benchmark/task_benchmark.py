@@ -0,0 +1,368 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmarks the latency and the throughput of the Task Library Python APIs.
+
+Each task is benchmarked with the model and the inputs of its tests, for each
+number of interpreter threads. `task_benchmark_main` runs the benchmarks from
+the command line and reports the results as JSON:
+
+  tflite_task_benchmark --testdata_dir=tensorflow_lite_support/cc/test/testdata \
+      --tasks=image_classifier,bert_question_answerer --num_threads=1,4 \
+      --output_file=/tmp/benchmark.json
+
+Each benchmark runs in a new process by default, so that the model load time
+and the peak memory of a task do not depend on the tasks benchmarked before.
+"""
+
+import dataclasses
+import functools
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from tensorflow_lite_support.python.task.audio import audio_classifier
+from tensorflow_lite_support.python.task.audio import audio_embedder
+from tensorflow_lite_support.python.task.audio.core import tensor_audio
+from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.processor.proto import clu_pb2
+from tensorflow_lite_support.python.task.text import bert_clu_annotator
+from tensorflow_lite_support.python.task.text import bert_nl_classifier
+from tensorflow_lite_support.python.task.text import bert_question_answerer
+from tensorflow_lite_support.python.task.text import nl_classifier
+from tensorflow_lite_support.python.task.text import text_embedder
+from tensorflow_lite_support.python.task.text import text_searcher
+from tensorflow_lite_support.python.task.vision import image_classifier
+from tensorflow_lite_support.python.task.vision import image_embedder
+from tensorflow_lite_support.python.task.vision import image_searcher
+from tensorflow_lite_support.python.task.vision import image_segmenter
+from tensorflow_lite_support.python.task.vision import object_detector
+from tensorflow_lite_support.python.task.vision.core import tensor_image
+
+_BaseOptions = base_options_module.BaseOptions
+
+_MOVIE_REVIEW = ('This is the best movie I’ve seen in recent years. Strongly '
+                 'recommend it!')
+_QA_CONTEXT = (
+    'The role of teacher is often formal and ongoing, carried out at a school '
+    'or other place of formal education. In many countries, a person who '
+    'wishes to become a teacher must first obtain specified professional '
+    'qualifications or credentials from a university or college. These '
+    'professional qualifications may include the study of pedagogy, the '
+    'science of teaching. Teachers, like other professionals, may have to '
+    'continue their education after they qualify, a process known as '
+    'continuing professional development. Teachers may use a lesson plan to '
+    'facilitate student learning, providing a course of study which is called '
+    'the curriculum.')
+_QA_QUESTION = 'What is a course of study called?'
+_CLU_UTTERANCES = [
+    'I would like to book a reservation at your hotel',
+    'What date would you like to make that reservation for?',
+    'I need the reservation for the 14th of May',
+]
+
+@dataclasses.dataclass(frozen=True)
+class _TaskBenchmark:
+  """Describes how to benchmark a task.
+
+  Attributes:
+    model_file: file name of the test model.
+    create: creates the task from its base options.
+    create_inputs: creates the arguments of an inference, from the task and a
+      function returning the path of a test file.
+    infer: runs an inference of the task.
+  """
+  model_file: str
+  create: Callable[[_BaseOptions], Any]
+  create_inputs: Callable[[Any, Callable[[str], str]], Tuple[Any, ...]]
+  infer: Callable[..., Any]
+
+
+def _image_inputs(image_file: str):
+  return lambda task, get_path: (  # pylint: disable=g-long-lambda
+      tensor_image.TensorImage.create_from_file(get_path(image_file)),)
+
+
+def _audio_inputs(audio_file: str):
+  return lambda task, get_path: (  # pylint: disable=g-long-lambda
+      tensor_audio.TensorAudio.create_from_wav_file(
+          get_path(audio_file), task.required_input_buffer_size),)
+
+
+_TASKS = {
+    'image_classifier':
+        _TaskBenchmark(
+            model_file='mobilenet_v2_1.0_224.tflite',
+            create=lambda base_options: image_classifier.ImageClassifier.
+            create_from_options(
+                image_classifier.ImageClassifierOptions(base_options)),
+            create_inputs=_image_inputs('burger.jpg'),
+            infer=lambda task, image: task.classify(image)),
+    'object_detector':
+        _TaskBenchmark(
+            model_file='coco_ssd_mobilenet_v1_1.0_quant_2018_06_29.tflite',
+            create=lambda base_options: object_detector.ObjectDetector.
+            create_from_options(
+                object_detector.ObjectDetectorOptions(base_options)),
+            create_inputs=_image_inputs('cats_and_dogs.jpg'),
+            infer=lambda task, image: task.detect(image)),
+    'image_segmenter':
+        _TaskBenchmark(
+            model_file='deeplabv3.tflite',
+            create=lambda base_options: image_segmenter.ImageSegmenter.
+            create_from_options(
+                image_segmenter.ImageSegmenterOptions(base_options)),
+            create_inputs=_image_inputs('segmentation_input_rotation0.jpg'),
+            infer=lambda task, image: task.segment(image)),
+    'image_embedder':
+        _TaskBenchmark(
+            model_file='mobilenet_v3_small_100_224_embedder.tflite',
+            create=lambda base_options: image_embedder.ImageEmbedder.
+            create_from_options(
+                image_embedder.ImageEmbedderOptions(base_options)),
+            create_inputs=_image_inputs('burger.jpg'),
+            infer=lambda task, image: task.embed(image)),
+    'image_searcher':
+        _TaskBenchmark(
+            model_file='mobilenet_v3_small_100_224_searcher.tflite',
+            create=lambda base_options: image_searcher.ImageSearcher.
+            create_from_options(
+                image_searcher.ImageSearcherOptions(base_options)),
+            create_inputs=_image_inputs('burger.jpg'),
+            infer=lambda task, image: task.search(image)),
+    'nl_classifier':
+        _TaskBenchmark(
+            model_file='test_model_nl_classifier_with_regex_tokenizer.tflite',
+            create=lambda base_options: nl_classifier.NLClassifier.
+            create_from_options(
+                nl_classifier.NLClassifierOptions(base_options)),
+            create_inputs=lambda task, get_path: (_MOVIE_REVIEW,),
+            infer=lambda task, text: task.classify(text)),
+    'bert_nl_classifier':
+        _TaskBenchmark(
+            model_file='bert_nl_classifier.tflite',
+            create=lambda base_options: bert_nl_classifier.BertNLClassifier.
+            create_from_options(
+                bert_nl_classifier.BertNLClassifierOptions(base_options)),
+            create_inputs=lambda task, get_path: (_MOVIE_REVIEW,),
+            infer=lambda task, text: task.classify(text)),
+    'bert_question_answerer':
+        _TaskBenchmark(
+            model_file='mobilebert_with_metadata.tflite',
+            create=lambda base_options: bert_question_answerer.
+            BertQuestionAnswerer.create_from_options(
+                bert_question_answerer.BertQuestionAnswererOptions(
+                    base_options)),
+            create_inputs=lambda task, get_path: (_QA_CONTEXT, _QA_QUESTION),
+            infer=lambda task, context, question: task.answer(
+                context, question)),
+    'bert_clu_annotator':
+        _TaskBenchmark(
+            model_file='bert_clu_annotator_with_metadata.tflite',
+            create=lambda base_options: bert_clu_annotator.BertCluAnnotator.
+            create_from_options(
+                bert_clu_annotator.BertCluAnnotatorOptions(base_options)),
+            create_inputs=lambda task, get_path: (  # pylint: disable=g-long-lambda
+                clu_pb2.CluRequest(utterances=_CLU_UTTERANCES),),
+            infer=lambda task, request: task.annotate(request)),
+    'text_embedder':
+        _TaskBenchmark(
+            model_file='regex_one_embedding_with_metadata.tflite',
+            create=lambda base_options: text_embedder.TextEmbedder.
+            create_from_options(
+                text_embedder.TextEmbedderOptions(base_options)),
+            create_inputs=lambda task, get_path: (_MOVIE_REVIEW,),
+            infer=lambda task, text: task.embed(text)),
+    'text_searcher':
+        _TaskBenchmark(
+            model_file='regex_searcher.tflite',
+            create=lambda base_options: text_searcher.TextSearcher.
+            create_from_options(
+                text_searcher.TextSearcherOptions(base_options)),
+            create_inputs=lambda task, get_path: (_MOVIE_REVIEW,),
+            infer=lambda task, text: task.search(text)),
+    'audio_classifier':
+        _TaskBenchmark(
+            model_file='yamnet_audio_classifier_with_metadata.tflite',
+            create=lambda base_options: audio_classifier.AudioClassifier.
+            create_from_options(
+                audio_classifier.AudioClassifierOptions(base_options)),
+            create_inputs=_audio_inputs('speech.wav'),
+            infer=lambda task, audio: task.classify(audio)),
+    'audio_embedder':
+        _TaskBenchmark(
+            model_file='yamnet_embedding_metadata.tflite',
+            create=lambda base_options: audio_embedder.AudioEmbedder.
+            create_from_options(
+                audio_embedder.AudioEmbedderOptions(base_options)),
+            create_inputs=_audio_inputs('speech.wav'),
+            infer=lambda task, audio: task.embed(audio)),
+}
+
+TASK_NAMES = tuple(_TASKS)
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+  """Result of benchmarking a task.
+
+  Attributes:
+    task: name of the task, see `TASK_NAMES`.
+    model_file: file name of the benchmarked model.
+    num_threads: number of interpreter threads.
+    num_warmup_runs: number of inferences run before measuring the latency.
+    num_runs: number of inferences measured.
+    load_time_ms: time to create the task from the model file.
+    latency_ms: mean, p50, p90, p99, min and max latency of the inferences.
+    qps: number of inferences per second, run sequentially.
+    peak_rss_mb: peak resident memory of the process. It includes the memory
+      of the previous benchmarks if they are not isolated.
+  """
+  task: str
+  model_file: str
+  num_threads: int
+  num_warmup_runs: int
+  num_runs: int
+  load_time_ms: float
+  latency_ms: Dict[str, float]
+  qps: float
+  peak_rss_mb: float
+
+
+@functools.lru_cache(maxsize=None)
+def _index_files(testdata_dir: str) -> Dict[str, str]:
+  """Maps the names of the files in `testdata_dir` to their paths."""
+  paths = {}
+  for directory, _, files in os.walk(testdata_dir, followlinks=True):
+    for file_name in files:
+      paths.setdefault(file_name, os.path.join(directory, file_name))
+  return paths
+
+
+def _find_file(testdata_dir: str, file_name: str) -> str:
+  """Returns the path of `file_name` in `testdata_dir` or its subdirectories."""
+  path = _index_files(testdata_dir).get(file_name)
+  if path is None:
+    raise ValueError(f'No {file_name} in {testdata_dir}.')
+  return path
+
+
+def _peak_rss_mb() -> float:
+  peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # ru_maxrss is in bytes on macOS, and in kilobytes on Linux.
+  return peak_rss / 2**20 if sys.platform == 'darwin' else peak_rss / 2**10
+
+
+def _summarize_latencies(latencies: Sequence[float]) -> Dict[str, float]:
+  latencies_ms = np.array(latencies) * 1e3
+  p50, p90, p99 = np.percentile(latencies_ms, [50, 90, 99])
+  return {
+      'mean': float(np.mean(latencies_ms)),
+      'p50': float(p50),
+      'p90': float(p90),
+      'p99': float(p99),
+      'min': float(np.min(latencies_ms)),
+      'max': float(np.max(latencies_ms)),
+  }
+
+
+def run_benchmark(task_name: str, testdata_dir: str, num_threads: int,
+                  num_warmup_runs: int, num_runs: int) -> BenchmarkResult:
+  """Benchmarks a task in the current process.
+
+  Args:
+    task_name: the task to benchmark, see `TASK_NAMES`.
+    testdata_dir: directory containing the test models and inputs.
+    num_threads: number of interpreter threads.
+    num_warmup_runs: number of inferences run before measuring the latency.
+    num_runs: number of inferences measured.
+
+  Returns:
+    The benchmark result.
+
+  Raises:
+    ValueError: if the task is unknown, or a test file is not found.
+  """
+  if task_name not in _TASKS:
+    raise ValueError(
+        f'Unknown task {task_name!r}, expected one of {TASK_NAMES}.')
+  if num_runs <= 0:
+    raise ValueError('num_runs must be positive.')
+  benchmark = _TASKS[task_name]
+  get_path = lambda file_name: _find_file(testdata_dir, file_name)
+  base_options = _BaseOptions(
+      file_name=get_path(benchmark.model_file), num_threads=num_threads)
+
+  start = time.perf_counter()
+  task = benchmark.create(base_options)
+  load_time = time.perf_counter() - start
+
+  inputs = benchmark.create_inputs(task, get_path)
+  for _ in range(num_warmup_runs):
+    benchmark.infer(task, *inputs)
+  latencies = []
+  for _ in range(num_runs):
+    start = time.perf_counter()
+    benchmark.infer(task, *inputs)
+    latencies.append(time.perf_counter() - start)
+
+  return BenchmarkResult(
+      task=task_name,
+      model_file=benchmark.model_file,
+      num_threads=num_threads,
+      num_warmup_runs=num_warmup_runs,
+      num_runs=num_runs,
+      load_time_ms=load_time * 1e3,
+      latency_ms=_summarize_latencies(latencies),
+      qps=num_runs / sum(latencies),
+      peak_rss_mb=_peak_rss_mb())
+
+
+def run_benchmarks(task_names: Sequence[str],
+                   testdata_dir: str,
+                   num_threads: Sequence[int],
+                   num_warmup_runs: int,
+                   num_runs: int,
+                   isolate: bool = True) -> List[BenchmarkResult]:
+  """Benchmarks each task with each number of interpreter threads.
+
+  Args:
+    task_names: the tasks to benchmark, see `TASK_NAMES`.
+    testdata_dir: directory containing the test models and inputs.
+    num_threads: numbers of interpreter threads.
+    num_warmup_runs: number of inferences run before measuring the latency.
+    num_runs: number of inferences measured.
+    isolate: whether to run each benchmark in a new process.
+
+  Returns:
+    The benchmark results, in the order of the tasks and the thread counts.
+  """
+  results = []
+  for task_name in task_names:
+    for threads in num_threads:
+      args = (task_name, testdata_dir, threads, num_warmup_runs, num_runs)
+      if isolate:
+        # A new interpreter process, rather than a fork, does not share the
+        # memory and the loaded models of this process.
+        with multiprocessing.get_context('spawn').Pool(1) as pool:
+          results.append(pool.apply(run_benchmark, args))
+      else:
+        results.append(run_benchmark(*args))
+  return results
+
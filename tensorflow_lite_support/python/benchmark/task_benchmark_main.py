@@ -0,0 +1,87 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Command line tool benchmarking the Task Library, see `task_benchmark`."""
+
+import dataclasses
+import json
+import os
+import platform
+import sys
+from typing import Optional
+
+from absl import app
+from absl import flags
+
+from tensorflow_lite_support.python.benchmark import task_benchmark
+
+FLAGS = flags.FLAGS
+flags.DEFINE_string(
+    'testdata_dir', None,
+    'Directory containing the test models and inputs, searched recursively. '
+    'Defaults to the runfiles of the binary.')
+flags.DEFINE_list('tasks', None,
+                  'Tasks to benchmark. Defaults to all the tasks.')
+flags.DEFINE_list('num_threads', ['1', '4'],
+                  'Numbers of interpreter threads to benchmark each task with.')
+flags.DEFINE_integer('num_warmup_runs', 5,
+                     'Number of inferences run before measuring the latency.')
+flags.DEFINE_integer('num_runs', 50, 'Number of inferences measured.')
+flags.DEFINE_bool('isolate', True,
+                  'Whether to run each benchmark in a new process.')
+flags.DEFINE_string('output_file', None,
+                    'File to write the JSON report to. Defaults to stdout.')
+
+
+def _default_testdata_dir() -> Optional[str]:
+  runfiles_dir = os.environ.get('RUNFILES_DIR',
+                                os.path.abspath(sys.argv[0]) + '.runfiles')
+  return runfiles_dir if os.path.isdir(runfiles_dir) else None
+
+
+def run_main(argv):
+  """Main function of the benchmark."""
+  if len(argv) > 1:
+    raise app.UsageError('Too many command-line arguments.')
+
+  testdata_dir = FLAGS.testdata_dir or _default_testdata_dir()
+  if testdata_dir is None:
+    raise app.UsageError('--testdata_dir must be set.')
+  results = task_benchmark.run_benchmarks(
+      FLAGS.tasks or task_benchmark.TASK_NAMES,
+      testdata_dir, [int(threads) for threads in FLAGS.num_threads],
+      FLAGS.num_warmup_runs,
+      FLAGS.num_runs,
+      isolate=FLAGS.isolate)
+
+  report = json.dumps(
+      {
+          'platform': platform.platform(),
+          'python_version': platform.python_version(),
+          'results': [dataclasses.asdict(result) for result in results],
+      },
+      indent=2)
+  if FLAGS.output_file:
+    with open(FLAGS.output_file, 'w') as f:
+      f.write(report)
+  else:
+    print(report)
+
+
+def main():
+  app.run(main=run_main, argv=sys.argv)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,73 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Lazily loads the public names of a package on first access.
+
+Importing the Task Library modules loads their native extensions, and the
+metadata modules load flatbuffers and the generated schemas, which dominates
+the startup time of short-lived processes that only use a few of them. The
+pip package `__init__` files declare their public names with `attach` instead,
+so that each name is only imported when first accessed (PEP 562):
+
+  __getattr__, __dir__, __all__ = lazy_loader.attach(
+      __name__, {
+          'ImageClassifier':
+              'tensorflow_lite_support.python.task.vision.image_classifier:'
+              'ImageClassifier',
+          'processor': '.processor',
+      })
+"""
+
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def _load(package_name: str, target: str) -> Any:
+  """Imports the module or the module attribute referenced by `target`."""
+  module_name, _, attribute_name = target.partition(':')
+  module = importlib.import_module(module_name, package_name)
+  return getattr(module, attribute_name) if attribute_name else module
+
+
+def attach(
+    package_name: str, targets: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]], List[str]]:
+  """Creates the module `__getattr__` and `__dir__` loading names lazily.
+
+  Args:
+    package_name: the `__name__` of the package.
+    targets: maps each public name of the package to the module it is, such as
+      `flatbuffers`, or to a module attribute, such as
+      `tensorflow_lite_support.python.task.core.base_options:BaseOptions`.
+      Module names starting with a dot are relative to the package.
+
+  Returns:
+    The `__getattr__`, `__dir__` and `__all__` of the package.
+  """
+
+  def __getattr__(name):  # pylint: disable=invalid-name
+    if name not in targets:
+      raise AttributeError(
+          f'module {package_name!r} has no attribute {name!r}')
+    value = _load(package_name, targets[name])
+    # Caches the value in the package, so that `__getattr__` is only called
+    # once per name.
+    setattr(sys.modules[package_name], name, value)
+    return value
+
+  def __dir__():  # pylint: disable=invalid-name
+    return sorted(set(vars(sys.modules[package_name])) | set(targets))
+
+  return __getattr__, __dir__, sorted(targets)
@@ -0,0 +1,302 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Dynamic batching of the inference requests of a pool of task instances."""
+
+import asyncio
+import concurrent.futures
+import dataclasses
+import time
+from typing import Any, Callable, List, Optional, Sequence, Set, Tuple
+
+
+@dataclasses.dataclass
+class BatchingOptions:
+  """Options of the dynamic batching of the requests of a model.
+
+  Attributes:
+    max_batch_size: maximum number of requests run in a batch.
+    max_wait_ms: maximum time the oldest request of a batch waits for other
+      requests to join it. With 0, a batch only coalesces the requests already
+      queued when a task instance becomes available.
+    max_queue_size: maximum number of requests waiting for a task instance,
+      beyond which requests are rejected with `QueueFullError`. Unbounded by
+      default.
+  """
+  max_batch_size: int = 8
+  max_wait_ms: float = 2.0
+  max_queue_size: Optional[int] = None
+
+
+@dataclasses.dataclass
+class BatcherStats:
+  """Statistics of a `DynamicBatcher`.
+
+  Attributes:
+    num_requests: number of completed requests, including the failed ones.
+    num_errors: number of failed requests.
+    num_rejected: number of requests rejected because the queue was full.
+    num_batches: number of batches run.
+    queue_size: number of requests waiting for a task instance.
+    mean_batch_size: mean number of requests per batch.
+    mean_queue_time_ms: mean time the requests waited before their batch ran.
+    mean_batch_time_ms: mean time to run a batch.
+  """
+  num_requests: int
+  num_errors: int
+  num_rejected: int
+  num_batches: int
+  queue_size: int
+  mean_batch_size: float
+  mean_queue_time_ms: float
+  mean_batch_time_ms: float
+
+
+class QueueFullError(RuntimeError):
+  """Raised when a request is rejected because the batching queue is full."""
+
+
+# Requests are compared by identity, to be tracked in sets.
+@dataclasses.dataclass(eq=False)
+class _Request:
+  input: Any
+  future: 'asyncio.Future[Any]'
+  arrival_time: float
+
+
+class DynamicBatcher(object):
+  """Coalesces concurrent inference requests into batches.
+
+  Each task instance of the pool is driven by a worker, which takes the oldest
+  queued request, waits up to `max_wait_ms` for more requests to join it, up to
+  `max_batch_size`, and runs the batch on its task instance in a thread. The
+  Task Library APIs take one input per inference, so the requests of a batch
+  run back-to-back on the task instance: batching amortizes the scheduling of
+  the requests, while the task instances run their batches in parallel, as the
+  tasks release the GIL during inference.
+
+  The batcher must be used from a single event loop:
+
+    async with DynamicBatcher(tasks, lambda task, text: task.embed(text)) as b:
+      result = await b.submit('some text')
+  """
+
+  def __init__(self,
+               tasks: Sequence[Any],
+               infer: Callable[[Any, Any], Any],
+               options: Optional[BatchingOptions] = None) -> None:
+    """Initializes the batcher.
+
+    Args:
+      tasks: the pool of task instances. Each instance runs one batch at a
+        time.
+      infer: runs an inference with a task instance and the input of a
+        request, and returns its result. Called from the threads of the pool.
+      options: the batching options.
+
+    Raises:
+      ValueError: if the pool is empty or the options are invalid.
+    """
+    options = options or BatchingOptions()
+    if not tasks:
+      raise ValueError('Expected at least one task instance.')
+    if options.max_batch_size < 1:
+      raise ValueError('Expected max_batch_size >= 1, found: '
+                       f'{options.max_batch_size}.')
+    if options.max_wait_ms < 0:
+      raise ValueError('Expected max_wait_ms >= 0, found: '
+                       f'{options.max_wait_ms}.')
+    if options.max_queue_size is not None and options.max_queue_size < 1:
+      raise ValueError('Expected max_queue_size >= 1, found: '
+                       f'{options.max_queue_size}.')
+    self._tasks = list(tasks)
+    self._infer = infer
+    self._options = options
+    self._queue = None
+    self._executor = None
+    self._workers = []
+    # The batches being collected or run, whose requests are failed if the
+    # batcher closes.
+    self._collecting_batches: List[List[_Request]] = []
+    self._running_batches: Set[Tuple[_Request, ...]] = set()
+    self._closed = False
+    self._num_requests = 0
+    self._num_errors = 0
+    self._num_rejected = 0
+    self._num_batches = 0
+    self._total_queue_time = 0.0
+    self._total_batch_time = 0.0
+
+  async def __aenter__(self) -> 'DynamicBatcher':
+    await self.start()
+    return self
+
+  async def __aexit__(self, *exc_info) -> None:
+    await self.close()
+
+  @property
+  def options(self) -> BatchingOptions:
+    return self._options
+
+  @property
+  def num_tasks(self) -> int:
+    return len(self._tasks)
+
+  @property
+  def stats(self) -> BatcherStats:
+    """Returns the statistics of the requests run so far."""
+    # Avoids dividing by 0 before the first batch.
+    num_batches = max(self._num_batches, 1)
+    num_requests = max(self._num_requests, 1)
+    return BatcherStats(
+        num_requests=self._num_requests,
+        num_errors=self._num_errors,
+        num_rejected=self._num_rejected,
+        num_batches=self._num_batches,
+        queue_size=self._queue.qsize() if self._queue is not None else 0,
+        mean_batch_size=self._num_requests / num_batches,
+        mean_queue_time_ms=self._total_queue_time * 1e3 / num_requests,
+        mean_batch_time_ms=self._total_batch_time * 1e3 / num_batches)
+
+  async def start(self) -> None:
+    """Starts the workers of the task instances in the running event loop."""
+    if self._queue is not None:
+      raise RuntimeError('The batcher is already started.')
+    self._queue = asyncio.Queue(maxsize=self._options.max_queue_size or 0)
+    self._executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=len(self._tasks), thread_name_prefix='DynamicBatcher')
+    self._workers = [
+        asyncio.ensure_future(self._run_worker(task)) for task in self._tasks
+    ]
+
+  async def close(self) -> None:
+    """Stops the workers, and fails the requests not completed yet.
+
+    The batches already running on a task instance complete in the background.
+    """
+    if self._closed:
+      return
+    self._closed = True
+    pending = [
+        request for batches in (self._collecting_batches,
+                                self._running_batches) for batch in batches
+        for request in batch
+    ]
+    for worker in self._workers:
+      worker.cancel()
+    await asyncio.gather(*self._workers, return_exceptions=True)
+    while self._queue is not None and not self._queue.empty():
+      pending.append(self._queue.get_nowait())
+    for request in pending:
+      if not request.future.done():
+        request.future.set_exception(
+            RuntimeError('The batcher closed before running the request.'))
+    if self._executor is not None:
+      self._executor.shutdown(wait=False)
+
+  async def submit(self, request_input: Any) -> Any:
+    """Runs an inference on `request_input` in a batch and returns its result.
+
+    Cancelling the returned coroutine before its batch runs removes the request
+    from the batch.
+
+    Args:
+      request_input: the input of the request, passed to `infer`.
+
+    Returns:
+      The result of `infer`.
+
+    Raises:
+      QueueFullError: if `max_queue_size` requests are already queued.
+      RuntimeError: if the batcher is not started or is closed.
+      Exception: any error raised by `infer`.
+    """
+    if self._queue is None or self._closed:
+      raise RuntimeError('The batcher is not running.')
+    request = _Request(
+        input=request_input,
+        future=asyncio.get_running_loop().create_future(),
+        arrival_time=time.monotonic())
+    try:
+      self._queue.put_nowait(request)
+    except asyncio.QueueFull:
+      self._num_rejected += 1
+      raise QueueFullError(
+          f'{self._queue.qsize()} requests are already queued.') from None
+    return await request.future
+
+  async def _next_batch(self) -> List[_Request]:
+    """Waits for the next batch of requests."""
+    batch = [await self._queue.get()]
+    # The batch is tracked while it waits for more requests, so that close()
+    # fails its requests, which are no longer queued.
+    self._collecting_batches.append(batch)
+    try:
+      deadline = batch[0].arrival_time + self._options.max_wait_ms / 1e3
+      while len(batch) < self._options.max_batch_size:
+        timeout = deadline - time.monotonic()
+        try:
+          if timeout <= 0 or not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+          else:
+            batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+        except (asyncio.QueueEmpty, asyncio.TimeoutError):
+          break
+    finally:
+      self._collecting_batches.remove(batch)
+    # Skips the requests cancelled while queued.
+    return [request for request in batch if not request.future.done()]
+
+  def _run_batch(self, task: Any,
+                 inputs: List[Any]) -> List[Tuple[Any, Optional[Exception]]]:
+    """Runs the inferences of a batch, and returns their results or errors."""
+    outcomes = []
+    for request_input in inputs:
+      try:
+        outcomes.append((self._infer(task, request_input), None))
+      except Exception as e:  # pylint: disable=broad-except
+        outcomes.append((None, e))
+    return outcomes
+
+  async def _run_worker(self, task: Any) -> None:
+    """Runs the batches of requests on a task instance until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+      batch = tuple(await self._next_batch())
+      if not batch:
+        continue
+      start_time = time.monotonic()
+      self._running_batches.add(batch)
+      try:
+        outcomes = await loop.run_in_executor(
+            self._executor, self._run_batch, task,
+            [request.input for request in batch])
+      finally:
+        self._running_batches.discard(batch)
+      end_time = time.monotonic()
+
+      self._num_batches += 1
+      self._total_batch_time += end_time - start_time
+      for request, (result, error) in zip(batch, outcomes):
+        self._num_requests += 1
+        self._total_queue_time += start_time - request.arrival_time
+        if error is not None:
+          self._num_errors += 1
+        # The request may have been cancelled while running.
+        if request.future.done():
+          continue
+        if error is not None:
+          request.future.set_exception(error)
+        else:
+          request.future.set_result(result)
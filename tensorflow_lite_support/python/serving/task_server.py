@@ -0,0 +1,633 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Serves the inferences of Task Library models, with dynamic batching.
+
+The server hosts each configured model on a pool of task instances, and
+coalesces the concurrent requests of a model into batches, see
+`batching.DynamicBatcher`. `task_server_main` runs it from the command line:
+
+  tflite_task_server --model=classifier:image_classifier:/tmp/mobilenet.tflite \
+      --model=embedder:text_embedder:/tmp/embedder.tflite \
+      --model=searcher:text_searcher:/tmp/searcher.tflite \
+      --index_file=searcher:/tmp/index.ldb --port=8080 --binary_port=8081 \
+      --num_instances=2 --max_batch_size=8
+
+It serves HTTP/1.1 on `port`:
+
+  GET  /healthz                  200 if the server is serving, 503 otherwise.
+  GET  /metrics                  The statistics of each model, as JSON.
+  GET  /v1/models                The served models, as JSON.
+  POST /v1/models/<model>:infer  Runs an inference. The request is a JSON
+                                 object with a "text" string for the text
+                                 tasks, or an "image" string holding a base64
+                                 encoded image file for the vision tasks. The
+                                 response is the result protobuf as JSON.
+
+and, if `binary_port` is set, a binary protocol over TCP with less overhead.
+The requests and responses are frames starting with a big-endian header:
+
+  request:  uint32 request id, uint16 model name length, uint32 input length,
+            followed by the model name and the input, i.e. the UTF-8 text or
+            the encoded image file.
+  response: uint32 request id, uint16 status, uint32 output length, followed
+            by the output, i.e. the serialized result protobuf if the status is
+            200, or the UTF-8 error message otherwise.
+
+The statuses are HTTP status codes. The requests of a connection run
+concurrently, so their responses may come out of order. A request with an
+input larger than `max_request_bytes` gets a 413 response, after which the
+server closes the connection.
+"""
+
+import asyncio
+import base64
+import dataclasses
+import functools
+import json
+import re
+import struct
+import time
+from typing import Any, Callable, Dict, Optional, Sequence, Set, Tuple
+
+from google.protobuf import json_format
+
+from tensorflow_lite_support.python.serving import batching
+from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
+from tensorflow_lite_support.python.task.processor.proto import search_options_pb2
+from tensorflow_lite_support.python.task.text import bert_nl_classifier
+from tensorflow_lite_support.python.task.text import nl_classifier
+from tensorflow_lite_support.python.task.text import text_embedder
+from tensorflow_lite_support.python.task.text import text_searcher
+from tensorflow_lite_support.python.task.vision import image_classifier
+from tensorflow_lite_support.python.task.vision import image_embedder
+from tensorflow_lite_support.python.task.vision import image_searcher
+from tensorflow_lite_support.python.task.vision import object_detector
+from tensorflow_lite_support.python.task.vision.core import tensor_image
+
+_BaseOptions = base_options_module.BaseOptions
+_SearchOptions = search_options_pb2.SearchOptions
+
+# The header of the frames of the binary protocol, see the module docstring.
+FRAME_HEADER = struct.Struct('!IHI')
+
+_TEXT = 'text'
+_IMAGE = 'image'
+_INFER_PATH = re.compile(r'^/v1/models/([^/:]+):infer$')
+_HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    411: 'Length Required',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+    504: 'Gateway Timeout',
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class _ServedTask:
+  """Describes how to serve a task.
+
+  Attributes:
+    create: creates a task instance from its base options, and for the
+      searchers, from the keyword arguments of their options.
+    input_type: the type of the inputs, `_TEXT` or `_IMAGE`. The inputs are
+      strings for the text tasks, and encoded image files for the vision tasks.
+    infer: runs an inference of a task instance from an input and a timeout.
+    searcher: whether the task is a searcher, created with the search options
+      of its model configuration if set.
+  """
+  create: Callable[..., Any]
+  input_type: str
+  infer: Callable[[Any, Any, Optional[float]], Any]
+  searcher: bool = False
+
+
+def _decode_image(image_file: bytes) -> tensor_image.TensorImage:
+  return tensor_image.TensorImage.create_from_buffer(image_file)
+
+
+def _run_inference(served_task: _ServedTask, timeout: Optional[float],
+                   task: Any, request_input: Any) -> Any:
+  """Runs an inference of a task instance, and returns its result proto."""
+  return served_task.infer(task, request_input, timeout).to_pb2()
+
+
+_TASKS = {
+    'image_classifier':
+        _ServedTask(
+            create=lambda base_options: image_classifier.ImageClassifier.
+            create_from_options(
+                image_classifier.ImageClassifierOptions(base_options)),
+            input_type=_IMAGE,
+            infer=lambda task, image, timeout: task.classify(
+                _decode_image(image), timeout=timeout)),
+    'object_detector':
+        _ServedTask(
+            create=lambda base_options: object_detector.ObjectDetector.
+            create_from_options(
+                object_detector.ObjectDetectorOptions(base_options)),
+            input_type=_IMAGE,
+            infer=lambda task, image, timeout: task.detect(
+                _decode_image(image), timeout=timeout)),
+    'image_embedder':
+        _ServedTask(
+            create=lambda base_options: image_embedder.ImageEmbedder.
+            create_from_options(
+                image_embedder.ImageEmbedderOptions(base_options)),
+            input_type=_IMAGE,
+            infer=lambda task, image, timeout: task.embed(
+                _decode_image(image), timeout=timeout)),
+    'image_searcher':
+        _ServedTask(
+            create=lambda base_options, **options: image_searcher.ImageSearcher.
+            create_from_options(
+                image_searcher.ImageSearcherOptions(base_options, **options)),
+            input_type=_IMAGE,
+            infer=lambda task, image, timeout: task.search(
+                _decode_image(image), timeout=timeout),
+            searcher=True),
+    'nl_classifier':
+        _ServedTask(
+            create=lambda base_options: nl_classifier.NLClassifier.
+            create_from_options(
+                nl_classifier.NLClassifierOptions(base_options)),
+            input_type=_TEXT,
+            infer=lambda task, text, timeout: task.classify(
+                text, timeout=timeout)),
+    'bert_nl_classifier':
+        _ServedTask(
+            create=lambda base_options: bert_nl_classifier.BertNLClassifier.
+            create_from_options(
+                bert_nl_classifier.BertNLClassifierOptions(base_options)),
+            input_type=_TEXT,
+            infer=lambda task, text, timeout: task.classify(
+                text, timeout=timeout)),
+    'text_embedder':
+        _ServedTask(
+            create=lambda base_options: text_embedder.TextEmbedder.
+            create_from_options(
+                text_embedder.TextEmbedderOptions(base_options)),
+            input_type=_TEXT,
+            infer=lambda task, text, timeout: task.embed(
+                text, timeout=timeout)),
+    'text_searcher':
+        _ServedTask(
+            create=lambda base_options, **options: text_searcher.TextSearcher.
+            create_from_options(
+                text_searcher.TextSearcherOptions(base_options, **options)),
+            input_type=_TEXT,
+            infer=lambda task, text, timeout: task.search(
+                text, timeout=timeout),
+            searcher=True),
+}
+
+TASK_NAMES = tuple(_TASKS)
+
+
+@dataclasses.dataclass
+class ModelConfig:
+  """Configuration of a model served by a `TaskServer`.
+
+  Attributes:
+    name: name of the model in the requests.
+    task: the task of the model, see `TASK_NAMES`.
+    base_options: the base options of the task instances. The task instances
+      share the model, see `BaseOptions.share_model`.
+    num_instances: number of task instances, i.e. of batches run in parallel.
+    batching_options: the options of the dynamic batching of the requests.
+    timeout: timeout of each inference in seconds, see the `timeout` argument
+      of the task methods. None by default.
+    search_options: the search options of the searcher tasks, e.g. the index
+      file. The index stored in the model metadata is searched by default. Can
+      only be set for the searcher tasks, without `lazy_metadata`.
+  """
+  name: str
+  task: str
+  base_options: _BaseOptions
+  num_instances: int = 1
+  batching_options: batching.BatchingOptions = dataclasses.field(
+      default_factory=batching.BatchingOptions)
+  timeout: Optional[float] = None
+  search_options: Optional[_SearchOptions] = None
+
+
+@dataclasses.dataclass
+class _Model:
+  config: ModelConfig
+  served_task: _ServedTask
+  batcher: batching.DynamicBatcher
+
+
+class _RequestError(Exception):
+  """Error of a request, with the HTTP status code to respond with."""
+
+  def __init__(self, status: int, message: str) -> None:
+    super().__init__(message)
+    self.status = status
+
+
+def _error_status(error: Exception) -> int:
+  """Returns the HTTP status code of the response to a failed request."""
+  if isinstance(error, _RequestError):
+    return error.status
+  if isinstance(error, batching.QueueFullError):
+    return 503
+  if isinstance(error, inference_timing.InferenceTimeoutError):
+    return 504
+  # The task APIs raise ValueError for invalid inputs.
+  if isinstance(error, ValueError):
+    return 400
+  return 500
+
+
+def _parse_json_input(input_type: str, body: bytes) -> Any:
+  """Returns the input of a task from the body of an HTTP request."""
+  try:
+    request = json.loads(body)
+  except ValueError as e:
+    raise _RequestError(400, f'Invalid JSON request: {e}') from None
+  value = request.get(input_type) if isinstance(request, dict) else None
+  if not isinstance(value, str):
+    raise _RequestError(
+        400, f'Expected a JSON object with a {input_type!r} string.')
+  if input_type == _IMAGE:
+    try:
+      return base64.b64decode(value, validate=True)
+    except ValueError:
+      raise _RequestError(400, 'Invalid base64 encoded image.') from None
+  return value
+
+
+def _parse_binary_input(input_type: str, payload: bytes) -> Any:
+  """Returns the input of a task from the payload of a binary request."""
+  if input_type == _IMAGE:
+    return payload
+  try:
+    return payload.decode('utf-8')
+  except UnicodeDecodeError:
+    raise _RequestError(400, 'Invalid UTF-8 text.') from None
+
+
+class TaskServer(object):
+  """Serves the inferences of Task Library models over HTTP and TCP.
+
+  See the module docstring for the protocols. The server runs in an asyncio
+  event loop:
+
+    async with TaskServer(models, port=8080) as server:
+      await server.serve_forever()
+  """
+
+  def __init__(self,
+               models: Sequence[ModelConfig],
+               host: str = '127.0.0.1',
+               port: int = 0,
+               binary_port: Optional[int] = None,
+               max_request_bytes: int = 64 * 2**20) -> None:
+    """Initializes the server.
+
+    Args:
+      models: the models to serve.
+      host: the address to listen on.
+      port: the port of the HTTP server. 0 picks a free port, see `port`.
+      binary_port: the port of the binary protocol, which is disabled if None.
+        0 picks a free port, see `binary_port`.
+      max_request_bytes: maximum size of the body of the requests.
+
+    Raises:
+      ValueError: if no model is configured, or if a model is invalid.
+    """
+    if not models:
+      raise ValueError('Expected at least one model.')
+    names = set()
+    for config in models:
+      if config.task not in _TASKS:
+        raise ValueError(f'Unknown task {config.task!r} of model '
+                         f'{config.name!r}, expected one of {TASK_NAMES}.')
+      if config.name in names:
+        raise ValueError(f'Duplicate model name {config.name!r}.')
+      if config.search_options is not None and not _TASKS[config.task].searcher:
+        raise ValueError(f'Unexpected search_options for model '
+                         f'{config.name!r} of task {config.task!r}.')
+      if (config.search_options is not None and
+          config.search_options.lazy_metadata):
+        # The lazy search results can't be serialized to protobuf.
+        raise ValueError(f'Unsupported search_options.lazy_metadata for '
+                         f'model {config.name!r}.')
+      if config.num_instances < 1:
+        raise ValueError(f'Expected num_instances >= 1 for model '
+                         f'{config.name!r}, found: {config.num_instances}.')
+      names.add(config.name)
+    self._configs = list(models)
+    self._host = host
+    self._requested_port = port
+    self._requested_binary_port = binary_port
+    self._max_request_bytes = max_request_bytes
+    self._models: Dict[str, _Model] = {}
+    self._http_server = None
+    self._binary_server = None
+    # The open connections, closed when the server stops.
+    self._connections: Set[asyncio.StreamWriter] = set()
+    self._start_time = None
+    self._serving = False
+    self._stopped = None
+
+  async def __aenter__(self) -> 'TaskServer':
+    await self.start()
+    return self
+
+  async def __aexit__(self, *exc_info) -> None:
+    await self.stop()
+
+  @property
+  def port(self) -> int:
+    """The port of the HTTP server, once started."""
+    return self._http_server.sockets[0].getsockname()[1]
+
+  @property
+  def binary_port(self) -> Optional[int]:
+    """The port of the binary protocol once started, if enabled."""
+    if self._binary_server is None:
+      return None
+    return self._binary_server.sockets[0].getsockname()[1]
+
+  @property
+  def serving(self) -> bool:
+    return self._serving
+
+  async def start(self) -> None:
+    """Loads the models and starts listening."""
+    loop = asyncio.get_running_loop()
+    self._stopped = asyncio.Event()
+    try:
+      for config in self._configs:
+        served_task = _TASKS[config.task]
+        # Loading a model blocks, so it runs outside of the event loop.
+        tasks = await loop.run_in_executor(None, self._create_tasks,
+                                           served_task, config)
+        batcher = batching.DynamicBatcher(
+            tasks,
+            functools.partial(_run_inference, served_task, config.timeout),
+            config.batching_options)
+        await batcher.start()
+        self._models[config.name] = _Model(config, served_task, batcher)
+
+      self._http_server = await asyncio.start_server(
+          self._handle_http_connection, self._host, self._requested_port)
+      if self._requested_binary_port is not None:
+        self._binary_server = await asyncio.start_server(
+            self._handle_binary_connection, self._host,
+            self._requested_binary_port)
+    except Exception:
+      await self.stop()
+      raise
+    self._start_time = time.monotonic()
+    self._serving = True
+
+  async def stop(self) -> None:
+    """Stops listening, and fails the requests not completed yet."""
+    self._serving = False
+    for server in (self._http_server, self._binary_server):
+      if server is not None:
+        server.close()
+    for writer in self._connections:
+      writer.close()
+    for server in (self._http_server, self._binary_server):
+      if server is not None:
+        await server.wait_closed()
+    for model in self._models.values():
+      await model.batcher.close()
+    if self._stopped is not None:
+      self._stopped.set()
+
+  async def serve_forever(self) -> None:
+    """Serves the requests until `stop` is called."""
+    await self._stopped.wait()
+
+  @staticmethod
+  def _create_tasks(served_task: _ServedTask, config: ModelConfig):
+    base_options = dataclasses.replace(config.base_options, share_model=True)
+    options = {}
+    if config.search_options is not None:
+      options['search_options'] = config.search_options
+    return [
+        served_task.create(base_options, **options)
+        for _ in range(config.num_instances)
+    ]
+
+  async def _infer(self, model_name: str,
+                   parse_input: Callable[[str], Any]) -> Any:
+    """Runs an inference of a model in a batch, and returns its result proto."""
+    if not self._serving:
+      raise _RequestError(503, 'The server is not serving.')
+    model = self._models.get(model_name)
+    if model is None:
+      raise _RequestError(404, f'Unknown model {model_name!r}.')
+    request_input = parse_input(model.served_task.input_type)
+    return await model.batcher.submit(request_input)
+
+  def _models_info(self) -> Dict[str, Any]:
+    return {
+        'models': [{
+            'name': model.config.name,
+            'task': model.config.task,
+            'input_type': model.served_task.input_type,
+            'num_instances': model.config.num_instances,
+            'batching_options': dataclasses.asdict(
+                model.config.batching_options),
+        } for model in self._models.values()]
+    }
+
+  def _metrics(self) -> Dict[str, Any]:
+    return {
+        'uptime_s': time.monotonic() - self._start_time,
+        'models': {
+            name: dataclasses.asdict(model.batcher.stats)
+            for name, model in self._models.items()
+        },
+    }
+
+  async def _respond_http(self, method: str, path: str,
+                          body: bytes) -> Tuple[int, Any]:
+    """Returns the status and the JSON response of an HTTP request."""
+    path = path.split('?', 1)[0]
+    match = _INFER_PATH.match(path)
+    if match:
+      if method != 'POST':
+        raise _RequestError(405, f'Expected POST, found: {method}.')
+      result = await self._infer(
+          match.group(1),
+          lambda input_type: _parse_json_input(input_type, body))
+      return 200, json_format.MessageToDict(
+          result, preserving_proto_field_name=True)
+    get_handlers = {
+        '/healthz': lambda: (
+            (200, {'status': 'serving'}) if self._serving else
+            (503, {'status': 'not serving'})),
+        '/metrics': lambda: (200, self._metrics()),
+        '/v1/models': lambda: (200, self._models_info()),
+    }
+    if path not in get_handlers:
+      raise _RequestError(404, f'Unknown path {path!r}.')
+    if method != 'GET':
+      raise _RequestError(405, f'Expected GET, found: {method}.')
+    return get_handlers[path]()
+
+  async def _handle_http_connection(self, reader: asyncio.StreamReader,
+                                    writer: asyncio.StreamWriter) -> None:
+    """Serves the HTTP/1.1 requests of a connection until it is closed."""
+    self._connections.add(writer)
+    try:
+      while True:
+        request_line = await reader.readline()
+        if not request_line:
+          break
+        headers = {}
+        while True:
+          line = await reader.readline()
+          if line in (b'\r\n', b'\n', b''):
+            break
+          name, _, value = line.decode('latin-1').partition(':')
+          headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get('connection', '').lower() != 'close'
+        try:
+          request_parts = request_line.decode('latin-1').split()
+          if len(request_parts) != 3:
+            keep_alive = False
+            raise _RequestError(400, 'Invalid request line.')
+          method, path, version = request_parts
+          keep_alive &= version == 'HTTP/1.1'
+          if 'transfer-encoding' in headers:
+            keep_alive = False
+            raise _RequestError(411, 'Expected a Content-Length.')
+          try:
+            length = int(headers.get('content-length', 0))
+          except ValueError:
+            raise _RequestError(400, 'Invalid Content-Length.') from None
+          if length > self._max_request_bytes or length < 0:
+            keep_alive = False
+            raise _RequestError(413, f'Expected at most '
+                                f'{self._max_request_bytes} bytes.')
+          body = await reader.readexactly(length)
+          status, response = await self._respond_http(method, path, body)
+        except (asyncio.IncompleteReadError, ConnectionError):
+          raise
+        except Exception as e:  # pylint: disable=broad-except
+          status, response = _error_status(e), {'error': str(e)}
+
+        content = json.dumps(response).encode('utf-8')
+        writer.write(
+            (f'HTTP/1.1 {status} {_HTTP_REASONS.get(status, "")}\r\n'
+             'Content-Type: application/json\r\n'
+             f'Content-Length: {len(content)}\r\n'
+             f'Connection: {"keep-alive" if keep_alive else "close"}\r\n'
+             '\r\n').encode('latin-1') + content)
+        await writer.drain()
+        if not keep_alive:
+          break
+    # readline() raises ValueError for lines longer than the buffer limit.
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+      pass
+    finally:
+      self._connections.discard(writer)
+      writer.close()
+
+  async def _respond_binary(self, request_id: int, model_name: str,
+                            payload: bytes, writer: asyncio.StreamWriter,
+                            write_lock: asyncio.Lock) -> None:
+    """Runs a request of the binary protocol and writes its response."""
+    try:
+      result = await self._infer(
+          model_name,
+          lambda input_type: _parse_binary_input(input_type, payload))
+      status, output = 200, result.SerializeToString()
+    except Exception as e:  # pylint: disable=broad-except
+      status, output = _error_status(e), str(e).encode('utf-8')
+    await self._write_binary_response(request_id, status, output, writer,
+                                      write_lock)
+
+  async def _write_binary_response(self, request_id: int, status: int,
+                                   output: bytes, writer: asyncio.StreamWriter,
+                                   write_lock: asyncio.Lock) -> None:
+    async with write_lock:
+      writer.write(FRAME_HEADER.pack(request_id, status, len(output)) + output)
+      await writer.drain()
+
+  async def _handle_binary_connection(self, reader: asyncio.StreamReader,
+                                      writer: asyncio.StreamWriter) -> None:
+    """Serves the binary requests of a connection until it is closed."""
+    write_lock = asyncio.Lock()
+    responses = set()
+    self._connections.add(writer)
+    try:
+      while True:
+        header = await reader.readexactly(FRAME_HEADER.size)
+        request_id, name_length, payload_length = FRAME_HEADER.unpack(header)
+        if payload_length > self._max_request_bytes:
+          # The request can't be skipped without reading it, so the connection
+          # is closed after its response.
+          await self._write_binary_response(
+              request_id, 413,
+              f'Expected at most {self._max_request_bytes} bytes.'.encode(
+                  'utf-8'), writer, write_lock)
+          break
+        model_name = (await reader.readexactly(name_length)).decode(
+            'utf-8', errors='replace')
+        payload = await reader.readexactly(payload_length)
+        response = asyncio.ensure_future(
+            self._respond_binary(request_id, model_name, payload, writer,
+                                 write_lock))
+        responses.add(response)
+        response.add_done_callback(responses.discard)
+    except (asyncio.IncompleteReadError, ConnectionError):
+      pass
+    finally:
+      # Responds to the pending requests of a client closing its side first.
+      await asyncio.gather(*responses, return_exceptions=True)
+      self._connections.discard(writer)
+      writer.close()
+
+
+def parse_model_flag(value: str, base_options: _BaseOptions,
+                     **model_config) -> ModelConfig:
+  """Creates a model configuration from a --model flag value.
+
+  Args:
+    value: the flag value, as <name>:<task>:<model file>.
+    base_options: the base options of the model, except its file name.
+    **model_config: the other attributes of the `ModelConfig`.
+
+  Returns:
+    The model configuration.
+
+  Raises:
+    ValueError: if the value is invalid.
+  """
+  parts = value.split(':', 2)
+  if len(parts) != 3 or not all(parts):
+    raise ValueError(
+        f'Expected <name>:<task>:<model file>, found: {value!r}.')
+  name, task, file_name = parts
+  return ModelConfig(
+      name=name,
+      task=task,
+      base_options=dataclasses.replace(base_options, file_name=file_name),
+      **model_config)
+
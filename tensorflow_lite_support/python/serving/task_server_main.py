@@ -0,0 +1,122 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Command line tool serving Task Library models, see `task_server`."""
+
+import asyncio
+import sys
+from typing import Dict, List
+
+from absl import app
+from absl import flags
+
+from tensorflow_lite_support.python.serving import batching
+from tensorflow_lite_support.python.serving import task_server
+from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.processor.proto import search_options_pb2
+
+_BaseOptions = base_options_module.BaseOptions
+_SearchOptions = search_options_pb2.SearchOptions
+
+FLAGS = flags.FLAGS
+flags.DEFINE_multi_string(
+    'model', None,
+    'Model to serve, as <name>:<task>:<model file>, e.g. '
+    'classifier:image_classifier:/tmp/mobilenet.tflite. Can be repeated.')
+flags.DEFINE_multi_string(
+    'index_file', None,
+    'Index file of a searcher model, as <name>:<index file>, searched instead '
+    'of the index stored in the model metadata. Can be repeated.')
+flags.DEFINE_string('host', '127.0.0.1', 'Address to listen on.')
+flags.DEFINE_integer('port', 8080, 'Port of the HTTP server.')
+flags.DEFINE_integer('binary_port', None,
+                     'Port of the binary protocol. Disabled by default.')
+flags.DEFINE_integer('num_instances', 1,
+                     'Number of task instances of each model.')
+flags.DEFINE_integer('num_threads', -1,
+                     'Number of interpreter threads of each task instance.')
+flags.DEFINE_integer('max_batch_size', 8,
+                     'Maximum number of requests run in a batch.')
+flags.DEFINE_float(
+    'max_wait_ms', 2.0,
+    'Maximum time a request waits for other requests to join its batch.')
+flags.DEFINE_integer(
+    'max_queue_size', None,
+    'Maximum number of queued requests of each model, beyond which requests '
+    'are rejected. Unbounded by default.')
+flags.DEFINE_float('timeout', None,
+                   'Timeout of each inference in seconds. None by default.')
+
+
+def _parse_index_file_flags(values: List[str]) -> Dict[str, str]:
+  """Returns the index files by model name from the --index_file values."""
+  index_files = {}
+  for value in values:
+    name, _, file_name = value.partition(':')
+    if not name or not file_name:
+      raise ValueError(f'Expected <name>:<index file>, found: {value!r}.')
+    index_files[name] = file_name
+  return index_files
+
+
+async def _serve(server: task_server.TaskServer) -> None:
+  async with server:
+    addresses = [f'http://{FLAGS.host}:{server.port}']
+    if server.binary_port is not None:
+      addresses.append(f'tcp://{FLAGS.host}:{server.binary_port}')
+    print(f'Serving on {", ".join(addresses)}', flush=True)
+    await server.serve_forever()
+
+
+def run_main(argv):
+  """Main function of the server."""
+  if len(argv) > 1:
+    raise app.UsageError('Too many command-line arguments.')
+  if not FLAGS.model:
+    raise app.UsageError('--model must be set.')
+
+  batching_options = batching.BatchingOptions(
+      max_batch_size=FLAGS.max_batch_size,
+      max_wait_ms=FLAGS.max_wait_ms,
+      max_queue_size=FLAGS.max_queue_size)
+  try:
+    models = [
+        task_server.parse_model_flag(
+            value,
+            _BaseOptions(num_threads=FLAGS.num_threads),
+            num_instances=FLAGS.num_instances,
+            batching_options=batching_options,
+            timeout=FLAGS.timeout) for value in FLAGS.model
+    ]
+    index_files = _parse_index_file_flags(FLAGS.index_file or [])
+    for config in models:
+      if config.name in index_files:
+        config.search_options = _SearchOptions(
+            index_file_name=index_files.pop(config.name))
+    if index_files:
+      raise ValueError(
+          f'Unknown models of --index_file: {sorted(index_files)}.')
+    server = task_server.TaskServer(
+        models, host=FLAGS.host, port=FLAGS.port, binary_port=FLAGS.binary_port)
+  except ValueError as e:
+    raise app.UsageError(str(e)) from None
+  asyncio.run(_serve(server))
+
+
+def main():
+  app.run(main=run_main, argv=sys.argv)
+
+
+if __name__ == '__main__':
+  main()
@@ -14,12 +14,14 @@
 """Audio classifier task."""
 
 import dataclasses
+from typing import Optional, Tuple
 
 from tensorflow_lite_support.python.task.audio.core import audio_record
 from tensorflow_lite_support.python.task.audio.core import tensor_audio
 from tensorflow_lite_support.python.task.audio.core.pybinds import _pywrap_audio_buffer
 from tensorflow_lite_support.python.task.audio.pybinds import _pywrap_audio_classifier
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
 from tensorflow_lite_support.python.task.processor.proto import classification_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import classifications_pb2
 
@@ -43,15 +45,18 @@ class AudioClassifierOptions:
   classification_options: _ClassificationOptions = _ClassificationOptions()
 
 
-class AudioClassifier(object):
+class AudioClassifier(inference_timing.InferenceTimingMixin):
   """Class that performs classification on audio."""
 
   def __init__(self, options: AudioClassifierOptions,
-               classifier: _CppAudioClassifier) -> None:
+               classifier: _CppAudioClassifier,
+               pinned_buffers: Tuple[memoryview, ...] = ()) -> None:
     """Initializes the `AudioClassifier` object."""
     # Creates the object of C++ AudioClassifier class.
     self._options = options
     self._classifier = classifier
+    self._timer = inference_timing.InferenceTimer(classifier)
+    self._pinned_buffers = pinned_buffers
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "AudioClassifier":
@@ -88,9 +93,11 @@ class AudioClassifier(object):
         `AudioClassifierOptions` such as missing the model.
       RuntimeError: If other types of error occurred.
     """
+    (base_options,), pinned_buffers = base_options_module.to_pb2_and_pin(
+        options.base_options)
     classifier = _CppAudioClassifier.create_from_options(
-        options.base_options.to_pb2(), options.classification_options.to_pb2())
-    return cls(options, classifier)
+        base_options, options.classification_options.to_pb2())
+    return cls(options, classifier, pinned_buffers)
 
   def create_input_tensor_audio(self) -> tensor_audio.TensorAudio:
     """Creates a TensorAudio instance to store the audio input.
@@ -115,11 +122,15 @@ class AudioClassifier(object):
   def classify(
       self,
       audio: tensor_audio.TensorAudio,
+      timeout: Optional[float] = None,
   ) -> classifications_pb2.ClassificationResult:
     """Performs classification on the provided TensorAudio.
 
     Args:
       audio: Tensor audio, used to extract the feature vectors.
+      timeout: the maximum duration of the inference in seconds, or None for no
+        limit. See `cancel()` for the parts of the inference which can be
+        interrupted.
 
     Returns:
       classification result.
@@ -127,11 +138,14 @@ class AudioClassifier(object):
     Raises:
       ValueError: If any of the input arguments is invalid.
       RuntimeError: If failed to run audio classification.
+      InferenceTimeoutError: If the inference exceeded `timeout`.
+      InferenceCancelledError: If the inference was cancelled with `cancel()`.
     """
-    classification_result = self._classifier.classify(
-        _CppAudioBuffer(audio.buffer, audio.buffer_size, audio.format))
-    return classifications_pb2.ClassificationResult.create_from_pb2(
-        classification_result)
+    return self._timer.run(
+        classifications_pb2.ClassificationResult.create_from_pb2,
+        self._classifier.classify,
+        _CppAudioBuffer(audio.buffer, audio.buffer_size, audio.format),
+        timeout=timeout)
 
   @property
   def required_input_buffer_size(self) -> int:
@@ -14,12 +14,16 @@
 """Audio embedder task."""
 
 import dataclasses
+from typing import Optional, Tuple, Union
+
+import numpy as np
 
 from tensorflow_lite_support.python.task.audio.core import audio_record
 from tensorflow_lite_support.python.task.audio.core import tensor_audio
 from tensorflow_lite_support.python.task.audio.core.pybinds import _pywrap_audio_buffer
 from tensorflow_lite_support.python.task.audio.pybinds import _pywrap_audio_embedder
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
 from tensorflow_lite_support.python.task.processor.proto import embedding_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import embedding_pb2
 
@@ -42,14 +46,17 @@ class AudioEmbedderOptions:
   embedding_options: _EmbeddingOptions = _EmbeddingOptions()
 
 
-class AudioEmbedder(object):
+class AudioEmbedder(inference_timing.InferenceTimingMixin):
   """Class that performs dense feature vector extraction on audio."""
 
   def __init__(self, options: AudioEmbedderOptions,
-               cpp_embedder: _CppAudioEmbedder) -> None:
+               cpp_embedder: _CppAudioEmbedder,
+               pinned_buffers: Tuple[memoryview, ...] = ()) -> None:
     # Creates the object of C++ AudioEmbedder class.
     self._options = options
     self._embedder = cpp_embedder
+    self._timer = inference_timing.InferenceTimer(cpp_embedder)
+    self._pinned_buffers = pinned_buffers
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "AudioEmbedder":
@@ -86,9 +93,11 @@ class AudioEmbedder(object):
       `AudioEmbedderOptions` such as missing the model.
       RuntimeError: If other types of error occurred.
     """
+    (base_options,), pinned_buffers = base_options_module.to_pb2_and_pin(
+        options.base_options)
     embedder = _CppAudioEmbedder.create_from_options(
-        options.base_options.to_pb2(), options.embedding_options.to_pb2())
-    return cls(options, embedder)
+        base_options, options.embedding_options.to_pb2())
+    return cls(options, embedder, pinned_buffers)
 
   def create_input_tensor_audio(self) -> tensor_audio.TensorAudio:
     """Creates a TensorAudio instance to store the audio input.
@@ -111,11 +120,15 @@ class AudioEmbedder(object):
                                     self.required_input_buffer_size)
 
   def embed(self,
-            audio: tensor_audio.TensorAudio) -> embedding_pb2.EmbeddingResult:
+            audio: tensor_audio.TensorAudio,
+            timeout: Optional[float] = None) -> embedding_pb2.EmbeddingResult:
     """Performs actual feature vector extraction on the provided audio.
 
     Args:
       audio: Tensor audio, used to extract the feature vectors.
+      timeout: the maximum duration of the inference in seconds, or None for no
+        limit. See `cancel()` for the parts of the inference which can be
+        interrupted.
 
     Returns:
       embedding result.
@@ -123,16 +136,49 @@ class AudioEmbedder(object):
     Raises:
       ValueError: If any of the input arguments is invalid.
       RuntimeError: If failed to calculate the embedding vector.
+      InferenceTimeoutError: If the inference exceeded `timeout`.
+      InferenceCancelledError: If the inference was cancelled with `cancel()`.
     """
-    embedding_result = self._embedder.embed(
-        _CppAudioBuffer(audio.buffer, audio.buffer_size, audio.format))
-    return embedding_pb2.EmbeddingResult.create_from_pb2(embedding_result)
+    return self._timer.run(
+        embedding_pb2.EmbeddingResult.create_from_pb2, self._embedder.embed,
+        _CppAudioBuffer(audio.buffer, audio.buffer_size, audio.format),
+        timeout=timeout)
 
   def cosine_similarity(self, u: embedding_pb2.FeatureVector,
                         v: embedding_pb2.FeatureVector) -> float:
     """Computes cosine similarity [1] between two feature vectors."""
     return self._embedder.cosine_similarity(u.to_pb2(), v.to_pb2())
 
+  def similarity_matrix(
+      self,
+      a: np.ndarray,
+      b: np.ndarray,
+      top_k: Optional[int] = None,
+      num_threads: int = -1
+  ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """Computes cosine similarities [1] between two batches of embeddings.
+
+    Args:
+      a: [N, D] array of embeddings, either float or quantized (uint8 or int8,
+        see `EmbeddingOptions.quantize`).
+      b: [M, D] array of embeddings, of the same kind as `a`.
+      top_k: If set, only the `top_k` rows of `b` most similar to each row of
+        `a` are returned, without computing the full [N, M] matrix.
+      num_threads: Number of threads used for the computation, or -1 to use
+        one thread per CPU core.
+
+    Returns:
+      The [N, M] float32 similarity matrix if `top_k` is None. Otherwise, a
+      tuple of the [N, K] int64 indices into `b` and the [N, K] float32
+      similarities, sorted by decreasing similarity, where K is
+      min(`top_k`, M).
+
+    Raises:
+      ValueError: If the arrays have incompatible shapes or types, if `top_k` is
+        not positive, or if an embedding has a L2-norm of 0.
+    """
+    return self._embedder.similarity_matrix(a, b, top_k, num_threads)
+
   def get_embedding_dimension(self, output_index: int) -> int:
     """Gets the dimensionality of the embedding output.
 
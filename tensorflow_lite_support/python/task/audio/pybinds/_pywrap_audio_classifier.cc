@@ -21,6 +21,8 @@ limitations under the License.
 #include "tensorflow_lite_support/cc/task/processor/proto/classification_options.pb.h"
 #include "tensorflow_lite_support/cc/task/processor/proto/classifications.pb.h"
 #include "tensorflow_lite_support/cc/task/processor/proto/classifications.pb.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/inference_timing_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/model_cache_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -37,8 +39,10 @@ PYBIND11_MODULE(_pywrap_audio_classifier, m) {
   // python wrapper for C++ AudioClassifier class which shouldn't be directly
   // used by the users.
   pybind11_protobuf::ImportNativeProtoCasters();
+  core::define_model_cache_functions(m);
 
-  py::class_<AudioClassifier>(m, "AudioClassifier")
+  core::define_inference_timing_methods(
+      py::class_<AudioClassifier>(m, "AudioClassifier"))
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options,
@@ -78,7 +82,8 @@ PYBIND11_MODULE(_pywrap_audio_classifier, m) {
                  core::get_value(core_classification_result)
                      .SerializeAsString());
              return classification_result;
-           })
+           },
+           py::call_guard<py::gil_scoped_release>())
       .def("get_required_audio_format",
            [](AudioClassifier& self) -> AudioBuffer::AudioFormat {
              auto audio_format = self.GetRequiredAudioFormat();
@@ -14,10 +14,14 @@ limitations under the License.
 ==============================================================================*/
 
 #include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
 #include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
 #include "tensorflow_lite_support/cc/task/processor/proto/embedding.pb.h"
 #include "tensorflow_lite_support/cc/task/audio/audio_embedder.h"
 #include "tensorflow_lite_support/cc/task/audio/core/audio_buffer.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/inference_timing_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/model_cache_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/similarity_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -34,8 +38,10 @@ PYBIND11_MODULE(_pywrap_audio_embedder, m) {
   // python wrapper for C++ AudioEmbedder class which shouldn't be directly used
   // by the users.
   pybind11_protobuf::ImportNativeProtoCasters();
+  core::define_model_cache_functions(m);
 
-  py::class_<AudioEmbedder>(m, "AudioEmbedder")
+  core::define_inference_timing_methods(
+      py::class_<AudioEmbedder>(m, "AudioEmbedder"))
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options,
@@ -49,6 +55,10 @@ PYBIND11_MODULE(_pywrap_audio_embedder, m) {
             auto embedder = AudioEmbedder::CreateFromOptions(options);
             return core::get_value(embedder);
           })
+      .def_static("similarity_matrix", &core::similarity_matrix,
+                  pybind11::arg("a"), pybind11::arg("b"),
+                  pybind11::arg("top_k") = std::nullopt,
+                  pybind11::arg("num_threads") = -1)
       .def_static("cosine_similarity",
         [](const processor::FeatureVector& u,
            const processor::FeatureVector& v) -> double {
@@ -60,7 +70,8 @@ PYBIND11_MODULE(_pywrap_audio_embedder, m) {
            const AudioBuffer& audio_buffer) -> processor::EmbeddingResult {
           auto embedding_result = self.Embed(audio_buffer);
           return core::get_value(embedding_result);
-        })
+        },
+        py::call_guard<py::gil_scoped_release>())
       .def("get_embedding_dimension", &AudioEmbedder::GetEmbeddingDimension)
       .def("get_number_of_output_layers",
            &AudioEmbedder::GetNumberOfOutputLayers)
@@ -14,12 +14,67 @@
 """Base options for task APIs."""
 
 import dataclasses
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 
+from tensorflow_lite_support.python.task.core import memory_buffer
 from tensorflow_lite_support.python.task.core.optional_dependencies import doc_controls
 from tensorflow_lite_support.python.task.core.proto import base_options_pb2
 
 _BaseOptionsProto = base_options_pb2.BaseOptions
+_XnnpackSettingsProto = base_options_pb2.XnnpackSettings
+
+
+@dataclasses.dataclass
+class XnnpackSettings:
+  """Settings of the XNNPACK delegate, which accelerates the inference on CPU.
+
+  Attributes:
+    enabled: If false, XNNPACK is not applied, and the inference runs on the
+      builtin TF Lite CPU kernels.
+    force_fp16: If true, floating-point ops run in 16-bit precision when the
+      CPU supports it, which is faster but less accurate. Can't be combined
+      with `enable_quantized_ops`.
+    enable_quantized_ops: If true, the 8-bit quantized ops are also
+      accelerated.
+  """
+
+  enabled: Optional[bool] = True
+  force_fp16: Optional[bool] = None
+  enable_quantized_ops: Optional[bool] = None
+
+  @doc_controls.do_not_generate_docs
+  def to_pb2(self) -> _XnnpackSettingsProto:
+    """Generates a protobuf object to pass to the C++ layer."""
+    if self.force_fp16 and self.enable_quantized_ops:
+      raise ValueError(
+          "`force_fp16` and `enable_quantized_ops` are mutually exclusive.")
+    return _XnnpackSettingsProto(
+        enabled=self.enabled,
+        force_fp16=self.force_fp16,
+        enable_quantized_ops=self.enable_quantized_ops)
+
+  @classmethod
+  @doc_controls.do_not_generate_docs
+  def create_from_pb2(cls, pb2_obj: _XnnpackSettingsProto) -> "XnnpackSettings":
+    """Creates a `XnnpackSettings` object from the given protobuf object."""
+    return XnnpackSettings(
+        enabled=pb2_obj.enabled,
+        force_fp16=pb2_obj.force_fp16,
+        enable_quantized_ops=pb2_obj.enable_quantized_ops)
+
+  def __eq__(self, other: Any) -> bool:
+    """Checks if this object is equal to the given object.
+
+    Args:
+      other: The object to be compared with.
+
+    Returns:
+      True if the objects are equal.
+    """
+    if not isinstance(other, XnnpackSettings):
+      return False
+
+    return self.to_pb2().__eq__(other.to_pb2())
 
 
 @dataclasses.dataclass
@@ -28,36 +83,117 @@ class BaseOptions:
 
   Represents external files used by the Task APIs (e.g. TF Lite FlatBuffer or
   plain-text labels file). The files can be specified by one of the following
-  two ways:
+  three ways:
 
   (1) file contents loaded in `file_content`.
   (2) file path in `file_name`.
+  (3) file descriptor in `file_descriptor`.
 
   If more than one field of these fields is provided, they are used in this
   precedence order.
 
   Attributes:
-    file_name: Path to the index.
-    file_content: The index file contents as bytes.
+    file_name: Path to the model.
+    file_content: The model file contents, as `bytes`, which are copied, or as
+      any other C-contiguous buffer such as a `memoryview`, an `mmap.mmap` or a
+      NumPy array, which is used without being copied. The buffer must not be
+      modified while the tasks created from these options are alive, and it
+      stays exported meanwhile, e.g. an `mmap.mmap` can't be closed.
+    file_descriptor: File descriptor of the model file, as returned by
+      `os.open`, which is memory-mapped. The descriptor can be closed once the
+      task is created.
+    file_offset: Offset of the model in bytes in the file specified by
+      `file_name` or `file_descriptor`, or in the buffer `file_content`, for
+      models embedded in larger bundle files. Defaults to 0. Not supported with
+      `file_content` as `bytes`, which must hold the model only.
+    file_length: Length of the model in bytes in the file or buffer. Defaults
+      to the rest of the file or buffer.
     num_threads: Number of thread, the default value is -1 which means
       Interpreter will decide what is the most appropriate `num_threads`.
     use_coral: If true, inference will be delegated to a connected Coral Edge
       TPU device.
+    xnnpack_settings: Settings of the XNNPACK delegate. If not set, the TF Lite
+      runtime applies XNNPACK with its default settings. Ignored if
+      `use_coral` is true.
+    share_model: If true, the model file is read and verified once per
+      process, and shared with the other tasks of the same type created from
+      the same file with `share_model`. The model is reloaded when the file
+      changes on disk. See `model_cache` to evict the shared models.
   """
 
   file_name: Optional[str] = None
-  file_content: Optional[bytes] = None
+  file_content: Optional[Any] = None
   num_threads: Optional[int] = -1
   use_coral: Optional[bool] = None
+  xnnpack_settings: Optional[XnnpackSettings] = None
+  share_model: Optional[bool] = None
+  file_descriptor: Optional[int] = None
+  file_offset: Optional[int] = None
+  file_length: Optional[int] = None
 
   @doc_controls.do_not_generate_docs
   def to_pb2(self) -> _BaseOptionsProto:
     """Generates a protobuf object to pass to the C++ layer."""
-    return _BaseOptionsProto(
-        file_name=self.file_name,
-        file_content=self.file_content,
+    return self.to_pb2_and_pin()[0]
+
+  @doc_controls.do_not_generate_docs
+  def to_pb2_and_pin(
+      self) -> Tuple[_BaseOptionsProto, Optional[memoryview]]:
+    """Generates a protobuf object, and the view of the buffer it points to.
+
+    Returns:
+      The protobuf object to pass to the C++ layer, and the view of
+      `file_content` it points to if `file_content` is not `bytes`, None
+      otherwise. The caller must keep the view referenced as long as the C++
+      objects created from the protobuf object are alive.
+    """
+    if self.file_offset is not None and self.file_offset < 0:
+      raise ValueError(
+          f"Expected file_offset >= 0, found: {self.file_offset}.")
+    if self.file_length is not None and self.file_length <= 0:
+      raise ValueError(
+          f"Expected file_length > 0, found: {self.file_length}.")
+    file_name = self.file_name
+    file_content = None
+    file_descriptor = self.file_descriptor
+    file_offset = self.file_offset
+    file_pointer = None
+    file_length = self.file_length
+    pinned_file_content = None
+    if isinstance(self.file_content, bytes):
+      if self.file_offset is not None or self.file_length is not None:
+        raise ValueError(
+            "`file_offset` and `file_length` are not supported with "
+            "`file_content` as bytes, pass a memoryview instead.")
+      file_content = self.file_content
+    elif self.file_content is not None:
+      pinned_file_content, file_pointer = memory_buffer.pin_buffer(
+          self.file_content, self.file_offset, self.file_length)
+      file_length = pinned_file_content.nbytes
+      # The buffer takes precedence over the file, as `file_content` does.
+      file_name = None
+      file_descriptor = None
+      file_offset = None
+    elif ((self.file_offset is not None or self.file_length is not None) and
+          self.file_name is None and self.file_descriptor is None):
+      raise ValueError(
+          "`file_offset` and `file_length` require one of `file_name`, "
+          "`file_content` or `file_descriptor`.")
+    xnnpack_settings = (
+        self.xnnpack_settings.to_pb2()
+        if self.xnnpack_settings is not None else None)
+    base_options = _BaseOptionsProto(
+        file_name=file_name,
+        file_content=file_content,
+        file_descriptor=file_descriptor,
+        file_offset=file_offset,
+        file_length=file_length,
+        file_pointer=file_pointer,
         num_threads=self.num_threads,
-        use_coral=self.use_coral)
+        use_coral=self.use_coral,
+        xnnpack_settings=xnnpack_settings,
+        share_model=self.share_model)
+    return base_options, pinned_file_content
 
   @classmethod
   @doc_controls.do_not_generate_docs
@@ -67,7 +203,17 @@ class BaseOptions:
         file_name=pb2_obj.file_name,
         file_content=pb2_obj.file_content,
         num_threads=pb2_obj.num_threads,
-        use_coral=pb2_obj.use_coral)
+        use_coral=pb2_obj.use_coral,
+        xnnpack_settings=XnnpackSettings.create_from_pb2(
+            pb2_obj.xnnpack_settings)
+        if pb2_obj.HasField("xnnpack_settings") else None,
+        share_model=pb2_obj.share_model,
+        file_descriptor=pb2_obj.file_descriptor
+        if pb2_obj.HasField("file_descriptor") else None,
+        file_offset=pb2_obj.file_offset
+        if pb2_obj.HasField("file_offset") else None,
+        file_length=pb2_obj.file_length
+        if pb2_obj.HasField("file_length") else None)
 
   def __eq__(self, other: Any) -> bool:
     """Checks if this object is equal to the given object.
@@ -82,3 +228,30 @@ class BaseOptions:
       return False
 
     return self.to_pb2().__eq__(other.to_pb2())
+
+
+def to_pb2_and_pin(
+    *options: Any) -> Tuple[Tuple[Any, ...], Tuple[memoryview, ...]]:
+  """Generates the protobuf objects of the options of a task.
+
+  The C++ tasks read the buffers of `BaseOptions.file_content` and
+  `SearchOptions.index_file_content`, unless they are `bytes`, without copying
+  them. The Python task must keep the returned views referenced as long as its
+  C++ task is alive, which it does by taking them in its constructor.
+
+  Args:
+    *options: the options to convert, such as `BaseOptions` and
+      `SearchOptions`, which define `to_pb2_and_pin()`.
+
+  Returns:
+    The protobuf objects of `options`, in the same order, and the views of the
+    buffers they point to.
+  """
+  pb2_objs = []
+  pinned_buffers = []
+  for option in options:
+    pb2_obj, pinned_buffer = option.to_pb2_and_pin()
+    pb2_objs.append(pb2_obj)
+    if pinned_buffer is not None:
+      pinned_buffers.append(pinned_buffer)
+  return tuple(pb2_objs), tuple(pinned_buffers)
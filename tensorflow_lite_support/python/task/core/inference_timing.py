@@ -0,0 +1,443 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Per-stage latency instrumentation and deadlines of the task inferences."""
+
+import dataclasses
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+_CppResult = TypeVar('_CppResult')
+_Result = TypeVar('_Result')
+
+# Stages of an inference, in the order they run.
+STAGES = ('conversion', 'preprocess', 'invoke', 'postprocess',
+          'create_from_pb2', 'total')
+
+# Upper bounds of the histogram buckets, in seconds, doubling from 1 microsecond
+# to about 17 seconds. The last bucket holds the larger durations.
+_BUCKET_UPPER_BOUNDS = tuple(1e-6 * 2**i for i in range(25))
+
+
+class InferenceCancelledError(RuntimeError):
+  """Raised by an inference cancelled with `cancel()`.
+
+  The task can run other inferences afterwards.
+  """
+
+
+class InferenceTimeoutError(InferenceCancelledError, TimeoutError):
+  """Raised by an inference which exceeded its `timeout`.
+
+  The task can run other inferences afterwards.
+  """
+
+
+def _waiting_timeout_error(timeout: float) -> InferenceTimeoutError:
+  return InferenceTimeoutError(
+      'The inference exceeded its timeout of {0}s while waiting for the other '
+      'inferences of the task.'.format(timeout))
+
+
+@dataclasses.dataclass(frozen=True)
+class InferenceTiming:
+  """Time spent in each stage of an inference, in seconds.
+
+  Attributes:
+    conversion: time spent converting the Python inputs to C++ and the C++
+      results to protobuf messages, including the pybind11 call overhead.
+    preprocess: time spent populating the input tensors from the inputs.
+    invoke: time spent running the TensorFlow Lite interpreter.
+    postprocess: time spent creating the C++ results from the output tensors.
+    create_from_pb2: time spent creating the Python results from the protobuf
+      messages.
+  """
+  conversion: float
+  preprocess: float
+  invoke: float
+  postprocess: float
+  create_from_pb2: float
+
+  @property
+  def total(self) -> float:
+    """Total time spent in the inference, in seconds."""
+    return (self.conversion + self.preprocess + self.invoke + self.postprocess +
+            self.create_from_pb2)
+
+
+@dataclasses.dataclass(frozen=True)
+class LoadTiming:
+  """Time spent loading the model of a task, in seconds.
+
+  Attributes:
+    model_read: time spent reading or memory-mapping the model file.
+    model_verification: time spent verifying the model FlatBuffer, and building
+      the model and its metadata extractor.
+    interpreter_build: time spent building the TensorFlow Lite interpreter,
+      applying the delegates and allocating the tensors.
+    first_invoke: time spent running the interpreter for the first time, which
+      lazily prepares some delegates and kernels. None until the first
+      inference or warmup iteration.
+  """
+  model_read: float
+  model_verification: float
+  interpreter_build: float
+  first_invoke: Optional[float] = None
+
+  @property
+  def total(self) -> float:
+    """Total time spent loading the model, in seconds."""
+    return (self.model_read + self.model_verification + self.interpreter_build +
+            (self.first_invoke or 0.0))
+
+
+class StageHistogram(object):
+  """Histogram of the durations of an inference stage.
+
+  The buckets are exponential, so that the histogram is accurate to a factor of
+  two over durations from microseconds to seconds, in constant memory.
+  """
+
+  def __init__(self) -> None:
+    self._bucket_counts = [0] * (len(_BUCKET_UPPER_BOUNDS) + 1)
+    self._count = 0
+    self._sum = 0.0
+    self._min = float('inf')
+    self._max = 0.0
+
+  def record(self, duration: float) -> None:
+    """Adds a duration, in seconds, to the histogram."""
+    bucket = 0
+    while (bucket < len(_BUCKET_UPPER_BOUNDS) and
+           duration > _BUCKET_UPPER_BOUNDS[bucket]):
+      bucket += 1
+    self._bucket_counts[bucket] += 1
+    self._count += 1
+    self._sum += duration
+    self._min = min(self._min, duration)
+    self._max = max(self._max, duration)
+
+  @property
+  def count(self) -> int:
+    return self._count
+
+  @property
+  def sum(self) -> float:
+    return self._sum
+
+  @property
+  def min(self) -> float:
+    return self._min if self._count else 0.0
+
+  @property
+  def max(self) -> float:
+    return self._max
+
+  @property
+  def mean(self) -> float:
+    return self._sum / self._count if self._count else 0.0
+
+  @property
+  def buckets(self) -> List[Tuple[float, int]]:
+    """The cumulative histogram, as (upper bound, count) pairs.
+
+    Each count is the number of recorded durations less than or equal to the
+    upper bound, in seconds. The last upper bound is infinity.
+    """
+    cumulative_count = 0
+    buckets = []
+    for upper_bound, count in zip(_BUCKET_UPPER_BOUNDS + (float('inf'),),
+                                  self._bucket_counts):
+      cumulative_count += count
+      buckets.append((upper_bound, cumulative_count))
+    return buckets
+
+  def percentile(self, percent: float) -> float:
+    """Returns an upper bound of the given percentile of the durations.
+
+    Args:
+      percent: the percentile, between 0 and 100.
+
+    Returns:
+      The upper bound of the bucket holding the percentile, capped to the
+      largest recorded duration, in seconds. 0 if no duration was recorded.
+    """
+    if not self._count:
+      return 0.0
+    rank = percent / 100 * self._count
+    for upper_bound, cumulative_count in self.buckets:
+      if cumulative_count >= rank:
+        return min(upper_bound, self._max)
+    return self._max
+
+
+class InferenceStats(object):
+  """Cumulative histograms of the time spent in each stage of the inferences."""
+
+  def __init__(self) -> None:
+    self._histograms = {stage: StageHistogram() for stage in STAGES}
+
+  def record(self, timing: InferenceTiming) -> None:
+    """Adds the timing of an inference to the histograms."""
+    for stage in STAGES:
+      self._histograms[stage].record(getattr(timing, stage))
+
+  @property
+  def num_inferences(self) -> int:
+    return self._histograms['total'].count
+
+  def __getitem__(self, stage: str) -> StageHistogram:
+    """Returns the histogram of a stage, see `STAGES`."""
+    return self._histograms[stage]
+
+  def to_dict(self) -> Dict[str, Dict[str, Any]]:
+    """Returns the summary of each stage, with durations in seconds."""
+    return {
+        stage: {
+            'count': histogram.count,
+            'mean': histogram.mean,
+            'min': histogram.min,
+            'p50': histogram.percentile(50),
+            'p90': histogram.percentile(90),
+            'p99': histogram.percentile(99),
+            'max': histogram.max,
+        } for stage, histogram in self._histograms.items()
+    }
+
+  def __str__(self) -> str:
+    lines = ['{0:<16}{1:>8}{2:>12}{3:>12}{4:>12}{5:>12}'.format(
+        'Stage', 'Count', 'Mean (ms)', 'P50 (ms)', 'P99 (ms)', 'Max (ms)')]
+    for stage, summary in self.to_dict().items():
+      lines.append('{0:<16}{1:>8}{2:>12.3f}{3:>12.3f}{4:>12.3f}{5:>12.3f}'.format(
+          stage, summary['count'], summary['mean'] * 1e3, summary['p50'] * 1e3,
+          summary['p99'] * 1e3, summary['max'] * 1e3))
+    return '\n'.join(lines)
+
+
+class InferenceTimer(object):
+  """Times the inferences of a task, when enabled.
+
+  The C++ task records the time spent in its preprocess, invoke and postprocess
+  stages, and the timer adds the time spent in Python and pybind11.
+
+  The C++ tasks release the GIL during inference but can't run several
+  inferences at once, so the timer runs the inferences of its task one at a
+  time, except `cancel()` which interrupts the running one.
+  """
+
+  def __init__(self, cpp_task: Any) -> None:
+    """Initializes the timer.
+
+    Args:
+      cpp_task: the pybind11 wrapper of the C++ task, which defines the methods
+        of `inference_timing_utils.h`.
+    """
+    self._cpp_task = cpp_task
+    # Serializes the calls to the C++ task, whose interpreter, deadline and
+    # timings are shared by its inferences.
+    self._lock = threading.Lock()
+    self._enabled = False
+    self._last_timing = None
+    self._stats = InferenceStats()
+
+  def set_enabled(self, enabled: bool, profile_ops: bool = False) -> None:
+    """Enables or disables timing, and resets the recorded timings."""
+    with self._lock:
+      self._cpp_task.set_inference_timing_enabled(enabled, profile_ops)
+      self._enabled = enabled
+      self._last_timing = None
+      self._stats = InferenceStats()
+
+  def run(self,
+          create_result: Callable[[_CppResult], _Result],
+          infer: Callable[..., _CppResult],
+          *args: Any,
+          timeout: Optional[float] = None) -> _Result:
+    """Runs an inference, and records its timing if enabled.
+
+    Args:
+      create_result: creates the Python result from the C++ result.
+      infer: the method of the C++ task running the inference.
+      *args: the arguments of `infer`.
+      timeout: the maximum duration of the inference in seconds, or None. It
+        includes the time spent waiting for the inferences of the other
+        threads sharing the task.
+
+    Returns:
+      The Python result.
+
+    Raises:
+      ValueError: if `timeout` is not positive.
+      InferenceTimeoutError: if the inference exceeded `timeout`.
+      InferenceCancelledError: if the inference was cancelled.
+    """
+    if timeout is not None and timeout <= 0:
+      raise ValueError('Expected timeout > 0, found: {0}.'.format(timeout))
+    if timeout is None:
+      with self._lock:
+        return self._run(create_result, infer, *args)
+
+    deadline = time.monotonic() + timeout
+    if not self._lock.acquire(timeout=timeout):
+      raise _waiting_timeout_error(timeout)
+    try:
+      remaining = deadline - time.monotonic()
+      if remaining <= 0:
+        raise _waiting_timeout_error(timeout)
+      self._cpp_task.set_inference_timeout(remaining)
+      try:
+        return self._run(create_result, infer, *args)
+      finally:
+        self._cpp_task.set_inference_timeout(None)
+    finally:
+      self._lock.release()
+
+  def _run(self, create_result: Callable[[_CppResult], _Result],
+           infer: Callable[..., _CppResult], *args: Any) -> _Result:
+    if not self._enabled:
+      return create_result(infer(*args))
+
+    start = time.perf_counter()
+    cpp_result = infer(*args)
+    infer_end = time.perf_counter()
+    result = create_result(cpp_result)
+    end = time.perf_counter()
+
+    cpp_timing = self._cpp_task.get_last_inference_timing()
+    cpp_time = sum(cpp_timing.values())
+    self._last_timing = InferenceTiming(
+        conversion=max(infer_end - start - cpp_time, 0.0),
+        preprocess=cpp_timing['preprocess'],
+        invoke=cpp_timing['invoke'],
+        postprocess=cpp_timing['postprocess'],
+        create_from_pb2=end - infer_end)
+    self._stats.record(self._last_timing)
+    return result
+
+  @property
+  def last_timing(self) -> Optional[InferenceTiming]:
+    return self._last_timing
+
+  @property
+  def stats(self) -> InferenceStats:
+    return self._stats
+
+  def get_op_profile(self) -> str:
+    with self._lock:
+      return self._cpp_task.get_op_profile()
+
+  def warmup(self, iterations: int) -> None:
+    with self._lock:
+      self._cpp_task.warmup(iterations)
+
+  def cancel(self) -> None:
+    # Not serialized, so that it interrupts the running inference.
+    self._cpp_task.cancel()
+
+  @property
+  def load_timing(self) -> LoadTiming:
+    return LoadTiming(**self._cpp_task.get_load_timing())
+
+
+class InferenceTimingMixin(object):
+  """Adds warmup, cancellation and per-stage latency instrumentation to a task.
+
+  The task must set `self._timer` to an `InferenceTimer` of its C++ task, and
+  run its inferences through `self._timer.run`, such as:
+
+    return self._timer.run(ClassificationResult.create_from_pb2,
+                           self._classifier.classify, text, timeout=timeout)
+
+  A task can be shared by several threads, but runs their inferences one at a
+  time. Create one task per thread to run inferences in parallel.
+  """
+
+  _timer: InferenceTimer
+
+  def set_timing_enabled(self,
+                         enabled: bool = True,
+                         profile_ops: bool = False) -> None:
+    """Enables or disables recording the time spent in each inference stage.
+
+    Timing is disabled by default. Enabling or disabling it resets the recorded
+    timings.
+
+    Args:
+      enabled: whether to record the timing of the inferences, see
+        `last_timing` and `stats()`.
+      profile_ops: whether to also profile the ops run by the TensorFlow Lite
+        interpreter, see `op_profile()`. Profiling the ops slows down the
+        inferences.
+    """
+    self._timer.set_enabled(enabled, profile_ops)
+
+  @property
+  def last_timing(self) -> Optional[InferenceTiming]:
+    """The timing of the last inference, or None if timing is disabled."""
+    return self._timer.last_timing
+
+  def stats(self) -> InferenceStats:
+    """Returns the histograms of the inference timings since timing was enabled."""
+    return self._timer.stats
+
+  def op_profile(self) -> str:
+    """Returns the per-op profile of the inferences since it was enabled.
+
+    Returns:
+      The per-op profile of the invoke stage of all the inferences since
+      timing was enabled with `profile_ops`, as formatted by the TensorFlow
+      Lite profile summarizer, or an empty string if op profiling is disabled.
+    """
+    return self._timer.get_op_profile()
+
+  def warmup(self, iterations: int = 1) -> None:
+    """Runs the model on synthetic inputs, to warm it up before inferences.
+
+    The first inferences of a task are usually slower, as the TensorFlow Lite
+    delegates and kernels are prepared lazily and the caches are cold. Warming
+    up pays this cost ahead of the first real inference. The synthetic inputs
+    are zero-filled tensors shaped from the model's input specs, and the
+    outputs are discarded.
+
+    Args:
+      iterations: the number of times to run the model, at least 1.
+
+    Raises:
+      ValueError: if `iterations` is not positive.
+      RuntimeError: if running the model failed.
+    """
+    self._timer.warmup(iterations)
+
+  @property
+  def load_timing(self) -> LoadTiming:
+    """The time spent loading the model when the task was created.
+
+    `first_invoke` is only set after the first inference or warmup iteration.
+    """
+    return self._timer.load_timing
+
+  def cancel(self) -> None:
+    """Cancels the running inference of the task, from another thread.
+
+    The cancelled inference raises an `InferenceCancelledError`, and the task
+    can run other inferences afterwards. Calling this method while no inference
+    is running has no effect.
+
+    Only the TensorFlow Lite interpreter invocation can be interrupted, and only
+    the parts of the model running on the CPU: an inference is not cancelled
+    while it preprocesses its inputs, postprocesses its outputs, or runs on a
+    delegate.
+    """
+    self._timer.cancel()
@@ -0,0 +1,58 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Zero-copy access to the model and index files held in memory buffers."""
+
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+
+def pin_buffer(buffer: Any,
+               offset: Optional[int] = None,
+               length: Optional[int] = None) -> Tuple[memoryview, int]:
+  """Returns a view of a region of a buffer, and the address of its first byte.
+
+  The C++ layer reads the region at this address without copying it. The
+  returned view keeps the buffer exported as long as it is referenced, so that
+  e.g. an `mmap.mmap` can't be closed or resized meanwhile.
+
+  Args:
+    buffer: a C-contiguous object supporting the buffer protocol, such as
+      `bytes`, `memoryview`, `mmap.mmap` or a NumPy array.
+    offset: the offset of the region in bytes, 0 by default.
+    length: the length of the region in bytes, up to the end of the buffer by
+      default.
+
+  Returns:
+    The view of the region, and its address.
+
+  Raises:
+    ValueError: if the buffer is not contiguous, or if the region is empty or
+      out of the bounds of the buffer.
+  """
+  view = memoryview(buffer)
+  if not view.c_contiguous:
+    raise ValueError('Expected a C-contiguous buffer.')
+  view = view.cast('B')
+  offset = offset or 0
+  if length is None:
+    length = view.nbytes - offset
+  if offset < 0 or length <= 0 or offset + length > view.nbytes:
+    raise ValueError(
+        'Invalid region of a buffer of {0} bytes: offset={1}, length={2}.'
+        .format(view.nbytes, offset, length))
+  view = view[offset:offset + length]
+  address = np.frombuffer(view, dtype=np.uint8).ctypes.data
+  return view, address
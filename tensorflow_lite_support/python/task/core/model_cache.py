@@ -0,0 +1,70 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Management of the models shared by the tasks, see `BaseOptions.share_model`.
+
+Each task type shares its models through the cache of its own C++ extension
+module, so the functions of this module go through the extension modules
+imported so far. The modules not imported yet have no shared models.
+"""
+
+import sys
+from typing import Any, Iterator
+
+# The C++ extension modules of the tasks.
+_PYWRAP_MODULES = (
+    'tensorflow_lite_support.python.task.audio.pybinds._pywrap_audio_classifier',
+    'tensorflow_lite_support.python.task.audio.pybinds._pywrap_audio_embedder',
+    'tensorflow_lite_support.python.task.text.pybinds._pywrap_bert_clu_annotator',
+    'tensorflow_lite_support.python.task.text.pybinds._pywrap_bert_nl_classifier',
+    'tensorflow_lite_support.python.task.text.pybinds._pywrap_bert_question_answerer',
+    'tensorflow_lite_support.python.task.text.pybinds._pywrap_nl_classifier',
+    'tensorflow_lite_support.python.task.text.pybinds._pywrap_text_embedder',
+    'tensorflow_lite_support.python.task.text.pybinds._pywrap_text_searcher',
+    'tensorflow_lite_support.python.task.vision.pybinds._pywrap_image_classifier',
+    'tensorflow_lite_support.python.task.vision.pybinds._pywrap_image_embedder',
+    'tensorflow_lite_support.python.task.vision.pybinds._pywrap_image_searcher',
+    'tensorflow_lite_support.python.task.vision.pybinds._pywrap_image_segmenter',
+    'tensorflow_lite_support.python.task.vision.pybinds._pywrap_object_detector',
+)
+
+
+def _imported_pywrap_modules() -> Iterator[Any]:
+  for module_name in _PYWRAP_MODULES:
+    module = sys.modules.get(module_name)
+    if module is not None:
+      yield module
+
+
+def evict_shared_models(unused_only: bool = False) -> int:
+  """Evicts the shared models from the caches of the tasks.
+
+  The tasks using an evicted model keep it until they are deleted. The next
+  tasks created with `share_model` load the model again.
+
+  Args:
+    unused_only: if true, only evicts the models not used by any task.
+
+  Returns:
+    The number of evicted models.
+  """
+  return sum(
+      module.evict_shared_models(unused_only)
+      for module in _imported_pywrap_modules())
+
+
+def get_shared_model_count() -> int:
+  """Returns the number of models in the caches of the tasks."""
+  return sum(
+      module.get_shared_model_count() for module in _imported_pywrap_modules())
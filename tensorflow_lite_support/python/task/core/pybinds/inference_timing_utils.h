@@ -0,0 +1,152 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_INFERENCE_TIMING_UTILS_H_
+#define TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_INFERENCE_TIMING_UTILS_H_
+
+#include <exception>
+#include <stdexcept>
+#include <string>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/time/clock.h"  // from @com_google_absl
+#include "absl/time/time.h"  // from @com_google_absl
+#include "pybind11/pybind11.h"
+#include "tensorflow_lite_support/cc/task/core/base_task_api.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
+
+namespace tflite {
+namespace task {
+namespace core {
+
+// The Python module defining the exceptions raised by the cancelled
+// inferences.
+constexpr char kInferenceErrorsModule[] =
+    "tensorflow_lite_support.python.task.core.inference_timing";
+
+// Translates the `inference_cancelled_error` and `inference_timeout_error`
+// thrown by `get_value` to the Python `InferenceCancelledError` and
+// `InferenceTimeoutError`. Only registers the translator once per extension
+// module.
+inline void register_inference_error_translator() {
+  static const bool kRegistered = [] {
+    pybind11::register_local_exception_translator([](std::exception_ptr p) {
+      try {
+        if (p) std::rethrow_exception(p);
+      } catch (const inference_timeout_error& e) {
+        pybind11::object error_type =
+            pybind11::module_::import(kInferenceErrorsModule)
+                .attr("InferenceTimeoutError");
+        PyErr_SetString(error_type.ptr(), e.what());
+      } catch (const inference_cancelled_error& e) {
+        pybind11::object error_type =
+            pybind11::module_::import(kInferenceErrorsModule)
+                .attr("InferenceCancelledError");
+        PyErr_SetString(error_type.ptr(), e.what());
+      }
+    });
+    return true;
+  }();
+  (void)kRegistered;
+}
+
+// Adds the methods reporting the time spent in each stage of the inferences,
+// and controlling their duration, to the Python wrapper of a task, which must
+// derive from `BaseUntypedTaskApi`:
+//
+//   * set_inference_timing_enabled(enabled, profile_ops=False)
+//   * get_last_inference_timing(): dict of the `InferenceTiming` stages, in
+//     seconds.
+//   * get_op_profile(): the per-op profile of the inferences.
+//   * warmup(num_iterations=1): runs the interpreter on zero-filled inputs.
+//   * get_load_timing(): dict of the `LoadTiming` stages, in seconds, where
+//     `first_invoke` is None until the first inference or warmup iteration.
+//   * set_inference_timeout(timeout): cancels the invoke stage of the
+//     inferences once `timeout` seconds have passed from this call, or never
+//     if `timeout` is None.
+//   * cancel(): cancels the running inference, from another thread.
+//
+// The inferences interrupted by `set_inference_timeout` or `cancel` raise an
+// `InferenceTimeoutError` or `InferenceCancelledError`, provided that the
+// inference methods release the GIL while they run.
+//
+// Returns `task_class`, so that further methods can be chained.
+template <typename TaskT>
+pybind11::class_<TaskT> define_inference_timing_methods(
+    pybind11::class_<TaskT> task_class) {
+  namespace py = ::pybind11;
+  register_inference_error_translator();
+  task_class
+      .def(
+          "set_inference_timing_enabled",
+          [](TaskT& self, bool enabled, bool profile_ops) {
+            self.SetInferenceTimingEnabled(enabled, profile_ops);
+          },
+          py::arg("enabled"), py::arg("profile_ops") = false)
+      .def("get_last_inference_timing",
+           [](const TaskT& self) {
+             const InferenceTiming& timing = self.GetLastInferenceTiming();
+             py::dict stages;
+             stages["preprocess"] = absl::ToDoubleSeconds(timing.preprocess);
+             stages["invoke"] = absl::ToDoubleSeconds(timing.invoke);
+             stages["postprocess"] = absl::ToDoubleSeconds(timing.postprocess);
+             return stages;
+           })
+      .def("get_op_profile", [](TaskT& self) { return self.GetOpProfile(); })
+      .def(
+          "warmup",
+          [](TaskT& self, int num_iterations) {
+            absl::Status status = self.Warmup(num_iterations);
+            if (absl::IsInvalidArgument(status)) {
+              throw std::invalid_argument(std::string(status.message()));
+            } else if (!status.ok()) {
+              throw std::runtime_error(std::string(status.message()));
+            }
+          },
+          py::arg("num_iterations") = 1,
+          py::call_guard<py::gil_scoped_release>())
+      .def("get_load_timing", [](const TaskT& self) {
+        const LoadTiming& timing = self.GetLoadTiming();
+        py::dict stages;
+        stages["model_read"] = absl::ToDoubleSeconds(timing.model_read);
+        stages["model_verification"] =
+            absl::ToDoubleSeconds(timing.model_verification);
+        stages["interpreter_build"] =
+            absl::ToDoubleSeconds(timing.interpreter_build);
+        stages["first_invoke"] =
+            timing.first_invoke_recorded
+                ? py::object(
+                      py::float_(absl::ToDoubleSeconds(timing.first_invoke)))
+                : py::object(py::none());
+        return stages;
+      })
+      .def(
+          "set_inference_timeout",
+          [](TaskT& self, py::object timeout) {
+            self.SetInferenceDeadline(
+                timeout.is_none()
+                    ? absl::InfiniteFuture()
+                    : absl::Now() + absl::Seconds(timeout.cast<double>()));
+          },
+          py::arg("timeout"))
+      .def("cancel", [](TaskT& self) { self.Cancel(); });
+  return task_class;
+}
+
+}  // namespace core
+}  // namespace task
+}  // namespace tflite
+
+#endif  // TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_INFERENCE_TIMING_UTILS_H_
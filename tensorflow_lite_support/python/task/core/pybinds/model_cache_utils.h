@@ -0,0 +1,50 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_MODEL_CACHE_UTILS_H_
+#define TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_MODEL_CACHE_UTILS_H_
+
+#include "pybind11/pybind11.h"
+#include "tensorflow_lite_support/cc/task/core/model_cache.h"
+
+namespace tflite {
+namespace task {
+namespace core {
+
+// Adds the functions managing the models shared through the default
+// `ModelCache` to the Python module of a task:
+//
+//   * evict_shared_models(unused_only=False): the number of evicted models.
+//   * get_shared_model_count(): the number of cached models.
+//
+// Each Python module links its own copy of the C++ library, and therefore has
+// its own default cache.
+inline void define_model_cache_functions(pybind11::module& m) {
+  namespace py = ::pybind11;
+  m.def(
+      "evict_shared_models",
+      [](bool unused_only) {
+        return ModelCache::GetDefault()->Evict(unused_only);
+      },
+      py::arg("unused_only") = false);
+  m.def("get_shared_model_count",
+        []() { return ModelCache::GetDefault()->size(); });
+}
+
+}  // namespace core
+}  // namespace task
+}  // namespace tflite
+
+#endif  // TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_MODEL_CACHE_UTILS_H_
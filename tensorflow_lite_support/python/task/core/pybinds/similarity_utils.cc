@@ -0,0 +1,143 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "tensorflow_lite_support/python/task/core/pybinds/similarity_utils.h"
+
+#include <algorithm>
+#include <cstdint>
+#include <optional>
+#include <stdexcept>
+#include <string>
+
+#include "pybind11/numpy.h"
+#include "pybind11/pybind11.h"
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/str_format.h"  // from @com_google_absl
+#include "absl/types/span.h"  // from @com_google_absl
+#include "tensorflow_lite_support/cc/task/processor/embedding_similarity.h"
+
+namespace tflite {
+namespace task {
+namespace core {
+
+namespace {
+
+namespace py = ::pybind11;
+using ::tflite::task::processor::CosineSimilarityMatrix;
+using ::tflite::task::processor::TopKCosineSimilarity;
+
+void ThrowIfError(const absl::Status& status) {
+  if (status.ok()) {
+    return;
+  } else if (absl::IsInvalidArgument(status)) {
+    throw std::invalid_argument(std::string(status.message()));
+  } else {
+    throw std::runtime_error(std::string(status.message()));
+  }
+}
+
+template <typename T>
+py::object ComputeSimilarities(const T* a_data, int n, const T* b_data, int m,
+                               int dim, std::optional<int> top_k,
+                               int num_threads) {
+  absl::Span<const T> a(a_data, static_cast<size_t>(n) * dim);
+  absl::Span<const T> b(b_data, static_cast<size_t>(m) * dim);
+  if (!top_k.has_value()) {
+    py::array_t<float> output({n, m});
+    absl::Span<float> output_span(output.mutable_data(),
+                                  static_cast<size_t>(n) * m);
+    absl::Status status;
+    {
+      py::gil_scoped_release release;
+      status = CosineSimilarityMatrix<T>(a, b, dim, num_threads, output_span);
+    }
+    ThrowIfError(status);
+    return std::move(output);
+  }
+  if (*top_k < 1) {
+    throw std::invalid_argument(
+        absl::StrFormat("top_k must be > 0, found %d.", *top_k));
+  }
+  const int k = std::min(*top_k, m);
+  py::array_t<int64_t> indices({n, k});
+  py::array_t<float> scores({n, k});
+  absl::Span<int64_t> indices_span(indices.mutable_data(),
+                                   static_cast<size_t>(n) * k);
+  absl::Span<float> scores_span(scores.mutable_data(),
+                                static_cast<size_t>(n) * k);
+  absl::Status status;
+  {
+    py::gil_scoped_release release;
+    status = TopKCosineSimilarity<T>(a, b, dim, k, num_threads, indices_span,
+                                     scores_span);
+  }
+  ThrowIfError(status);
+  return py::make_tuple(indices, scores);
+}
+
+}  // namespace
+
+py::object similarity_matrix(py::array a, py::array b,
+                             std::optional<int> top_k, int num_threads) {
+  if (a.ndim() != 2 || b.ndim() != 2) {
+    throw std::invalid_argument(absl::StrFormat(
+        "Expected 2-dimensional arrays, found %d and %d dimensions.", a.ndim(),
+        b.ndim()));
+  }
+  if (a.shape(1) != b.shape(1)) {
+    throw std::invalid_argument(absl::StrFormat(
+        "Embedding dimensions don't match (%d vs %d).", a.shape(1),
+        b.shape(1)));
+  }
+  const int n = a.shape(0);
+  const int m = b.shape(0);
+  const int dim = a.shape(1);
+  constexpr int kFlags = py::array::c_style | py::array::forcecast;
+
+  const bool a_quantized = a.dtype().is(py::dtype::of<uint8_t>()) ||
+                           a.dtype().is(py::dtype::of<int8_t>());
+  const bool b_quantized = b.dtype().is(py::dtype::of<uint8_t>()) ||
+                           b.dtype().is(py::dtype::of<int8_t>());
+  if (a_quantized != b_quantized) {
+    throw std::invalid_argument(
+        "Cannot compute cosine similarity between quantized and float "
+        "embeddings.");
+  }
+  if (a_quantized) {
+    // Quantized embeddings are int8 values, possibly stored as uint8 as in
+    // `FeatureVector.value`: in both cases the buffers are reinterpreted
+    // without any copy.
+    auto a_bytes = py::array_t<uint8_t, kFlags>::ensure(
+        a.dtype().is(py::dtype::of<uint8_t>()) ? a : a.view("uint8"));
+    auto b_bytes = py::array_t<uint8_t, kFlags>::ensure(
+        b.dtype().is(py::dtype::of<uint8_t>()) ? b : b.view("uint8"));
+    return ComputeSimilarities(
+        reinterpret_cast<const int8_t*>(a_bytes.data()), n,
+        reinterpret_cast<const int8_t*>(b_bytes.data()), m, dim, top_k,
+        num_threads);
+  }
+  auto a_float = py::array_t<float, kFlags>::ensure(a);
+  auto b_float = py::array_t<float, kFlags>::ensure(b);
+  if (!a_float || !b_float) {
+    throw std::invalid_argument(
+        "Embeddings must be float, uint8 or int8 arrays.");
+  }
+  return ComputeSimilarities(a_float.data(), n, b_float.data(), m, dim, top_k,
+                             num_threads);
+}
+
+}  // namespace core
+}  // namespace task
+}  // namespace tflite
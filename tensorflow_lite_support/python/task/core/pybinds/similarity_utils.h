@@ -0,0 +1,46 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_SIMILARITY_UTILS_H_
+#define TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_SIMILARITY_UTILS_H_
+
+#include <optional>
+
+#include "pybind11/numpy.h"
+#include "pybind11/pybind11.h"
+
+namespace tflite {
+namespace task {
+namespace core {
+
+// Computes the cosine similarities between the rows of the 2-dimensional NumPy
+// arrays `a` ([N, D]) and `b` ([M, D]), with the GIL released. This backs the
+// `similarity_matrix` method of the Python embedders.
+//
+// Both arrays must be either floating-point, or quantized embeddings stored as
+// uint8 or int8 (see `EmbeddingOptions.quantize`). Returns the float32 [N, M]
+// similarity matrix if `top_k` is not set, or a tuple of int64 indices into `b`
+// and float32 scores of shape [N, min(top_k, M)] sorted by decreasing score
+// otherwise, without materializing the full matrix. `num_threads` -1 uses one
+// thread per CPU core. Throws std::invalid_argument (ValueError in Python) for
+// arrays of invalid shapes or types, or embeddings with an L2-norm of 0.
+pybind11::object similarity_matrix(pybind11::array a, pybind11::array b,
+                                   std::optional<int> top_k, int num_threads);
+
+}  // namespace core
+}  // namespace task
+}  // namespace tflite
+
+#endif  // TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_SIMILARITY_UTILS_H_
@@ -15,6 +15,8 @@ limitations under the License.
 
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
+#include "tensorflow_lite_support/cc/port/configuration_proto_inc.h"
+
 namespace tflite {
 namespace task {
 namespace core {
@@ -22,6 +24,32 @@ namespace core {
 namespace {
 using PythonBaseOptions = ::tflite::python::task::core::BaseOptions;
 using CppBaseOptions = ::tflite::task::core::BaseOptions;
+using PythonXnnpackSettings = ::tflite::python::task::core::XnnpackSettings;
+
+void set_xnnpack_settings(const PythonXnnpackSettings& xnnpack_settings,
+                          int num_threads,
+                          tflite::proto::TFLiteSettings* tflite_settings) {
+  if (!xnnpack_settings.enabled()) {
+    // The TF Lite runtime applies XNNPACK by default.
+    tflite_settings->set_disable_default_delegates(true);
+    return;
+  }
+  tflite_settings->set_delegate(tflite::proto::Delegate::XNNPACK);
+  tflite::proto::XNNPackSettings* cpp_xnnpack_settings =
+      tflite_settings->mutable_xnnpack_settings();
+  // -1 lets the TF Lite runtime decide, which XNNPACK doesn't support.
+  if (num_threads > 0) {
+    cpp_xnnpack_settings->set_num_threads(num_threads);
+  }
+  // The flags can't be combined, see `tflite::proto::XNNPackFlags`.
+  if (xnnpack_settings.force_fp16()) {
+    cpp_xnnpack_settings->set_flags(
+        tflite::proto::TFLITE_XNNPACK_DELEGATE_FLAG_FORCE_FP16);
+  } else if (xnnpack_settings.enable_quantized_ops()) {
+    cpp_xnnpack_settings->set_flags(
+        tflite::proto::TFLITE_XNNPACK_DELEGATE_FLAG_QS8_QU8);
+  }
+}
 }  // namespace
 
 std::unique_ptr<CppBaseOptions> convert_to_cpp_base_options(
@@ -34,6 +62,26 @@ std::unique_ptr<CppBaseOptions> convert_to_cpp_base_options(
   if (options.has_file_name()) {
     cpp_options->mutable_model_file()->set_file_name(options.file_name());
   }
+  if (options.has_file_pointer()) {
+    FilePointerMeta* pointer_meta =
+        cpp_options->mutable_model_file()->mutable_file_pointer_meta();
+    pointer_meta->set_pointer(options.file_pointer());
+    pointer_meta->set_length(options.file_length());
+  }
+  // The offset and length of the file descriptor also apply to the file name.
+  if (options.has_file_descriptor() ||
+      (options.has_file_name() &&
+       (options.has_file_offset() || options.has_file_length()))) {
+    FileDescriptorMeta* fd_meta =
+        cpp_options->mutable_model_file()->mutable_file_descriptor_meta();
+    if (options.has_file_descriptor()) {
+      fd_meta->set_fd(options.file_descriptor());
+    }
+    fd_meta->set_offset(options.file_offset());
+    fd_meta->set_length(options.file_length());
+  }
+
+  cpp_options->set_share_model(options.share_model());
 
   cpp_options->mutable_compute_settings()
       ->mutable_tflite_settings()
@@ -44,6 +92,10 @@ std::unique_ptr<CppBaseOptions> convert_to_cpp_base_options(
     cpp_options->mutable_compute_settings()
         ->mutable_tflite_settings()
         ->set_delegate(tflite::proto::Delegate::EDGETPU_CORAL);
+  } else if (options.has_xnnpack_settings()) {
+    set_xnnpack_settings(options.xnnpack_settings(), options.num_threads(),
+                         cpp_options->mutable_compute_settings()
+                             ->mutable_tflite_settings());
   }
   return cpp_options;
 }
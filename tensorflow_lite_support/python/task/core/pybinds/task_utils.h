@@ -17,6 +17,7 @@ limitations under the License.
 #define TENSORFLOW_LITE_SUPPORT_PYTHON_TASK_CORE_PYBINDS_TASK_UTILS_H_
 
 #include <stdexcept>
+#include <string>
 
 #include "tensorflow_lite_support/cc/port/statusor.h"
 #include "tensorflow_lite_support/cc/task/core/proto/base_options_proto_inc.h"
@@ -32,6 +33,20 @@ namespace core {
 std::unique_ptr<::tflite::task::core::BaseOptions> convert_to_cpp_base_options(
     ::tflite::python::task::core::BaseOptions options);
 
+// Thrown when an inference is cancelled, and translated to the Python
+// `InferenceCancelledError`, see inference_timing_utils.h.
+class inference_cancelled_error : public std::runtime_error {
+ public:
+  using std::runtime_error::runtime_error;
+};
+
+// Thrown when an inference exceeds its deadline, and translated to the Python
+// `InferenceTimeoutError`, see inference_timing_utils.h.
+class inference_timeout_error : public inference_cancelled_error {
+ public:
+  using inference_cancelled_error::inference_cancelled_error;
+};
+
 // Returns the object value if the status is ok, otherwise throw the runtime
 // error.
 template <typename T>
@@ -41,6 +56,12 @@ inline T get_value(tflite::support::StatusOr<T>& status_or_object) {
   } else if (absl::IsInvalidArgument(status_or_object.status())) {
     throw std::invalid_argument(
         std::string(status_or_object.status().message()));
+  } else if (absl::IsDeadlineExceeded(status_or_object.status())) {
+    throw inference_timeout_error(
+        std::string(status_or_object.status().message()));
+  } else if (absl::IsCancelled(status_or_object.status())) {
+    throw inference_cancelled_error(
+        std::string(status_or_object.status().message()));
   } else {
     throw std::runtime_error(std::string(status_or_object.status().message()));
   }
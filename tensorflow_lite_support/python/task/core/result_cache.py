@@ -0,0 +1,345 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Size-bounded LRU cache of the results of the deterministic text tasks."""
+
+import collections
+import dataclasses
+import hashlib
+import os
+import sys
+import threading
+import unicodedata
+from typing import Any, Callable, Hashable, Optional, TypeVar
+
+from tensorflow_lite_support.python.task.core import memory_buffer
+
+_CppResult = TypeVar('_CppResult')
+_Result = TypeVar('_Result')
+
+# Fields of the options protobufs holding process-local handles of the model
+# and index files: file descriptors, and addresses of memory buffers.
+_FILE_HANDLE_FIELDS = frozenset(('file_descriptor', 'file_pointer', 'fd',
+                                 'pointer'))
+
+# Fields of the options dataclasses specifying a file by a handle, as
+# (descriptor, content, offset, length) field names.
+_FILE_FIELDS = (
+    ('file_descriptor', 'file_content', 'file_offset', 'file_length'),
+    ('index_file_descriptor', 'index_file_content', 'index_file_offset',
+     'index_file_length'),
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheStats:
+  """Counters of a `ResultCache`.
+
+  Attributes:
+    hits: number of lookups that found a cached result.
+    misses: number of lookups that found no cached result.
+    evictions: number of results evicted to stay within the size bounds.
+    entries: number of cached results.
+    bytes: estimated size of the cached results, in bytes.
+  """
+  hits: int
+  misses: int
+  evictions: int
+  entries: int
+  bytes: int
+
+  @property
+  def hit_rate(self) -> float:
+    """Fraction of the lookups that found a cached result."""
+    lookups = self.hits + self.misses
+    return self.hits / lookups if lookups else 0.0
+
+
+def normalize_text(text: str) -> str:
+  """Normalizes a text input before it is used as a cache key.
+
+  Applies the Unicode NFC normalization, and collapses the leading, trailing
+  and repeated whitespaces, which the tokenizers of the text tasks ignore.
+
+  Args:
+    text: the input text.
+
+  Returns:
+    The normalized text.
+  """
+  return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def _estimate_size(value: Any) -> int:
+  """Estimates the size of a cached value, in bytes."""
+  if hasattr(value, 'ByteSize'):
+    return value.ByteSize()
+  if isinstance(value, (tuple, list)):
+    return sys.getsizeof(value) + sum(_estimate_size(item) for item in value)
+  if isinstance(value, str):
+    return len(value.encode('utf-8'))
+  return sys.getsizeof(value)
+
+
+class ResultCache(object):
+  """Thread-safe LRU cache bounded in number of entries and in bytes.
+
+  A cache can be shared by several tasks, and by several threads: the tasks
+  key their results by a fingerprint of their class and options, see
+  `ResultCacheMixin`.
+  """
+
+  def __init__(self,
+               max_entries: int = 1024,
+               max_bytes: int = 64 * 1024 * 1024) -> None:
+    """Initializes the cache.
+
+    Args:
+      max_entries: the maximum number of cached results.
+      max_bytes: the maximum estimated size of the cached results, in bytes.
+        Larger results are not cached.
+
+    Raises:
+      ValueError: if `max_entries` or `max_bytes` is not positive.
+    """
+    if max_entries <= 0:
+      raise ValueError(
+          'Expected max_entries > 0, found: {0}.'.format(max_entries))
+    if max_bytes <= 0:
+      raise ValueError('Expected max_bytes > 0, found: {0}.'.format(max_bytes))
+    self._max_entries = max_entries
+    self._max_bytes = max_bytes
+    self._lock = threading.Lock()
+    # Maps the keys to the (value, size) pairs, from the least to the most
+    # recently used.
+    self._entries = collections.OrderedDict()
+    self._bytes = 0
+    self._hits = 0
+    self._misses = 0
+    self._evictions = 0
+
+  @property
+  def max_entries(self) -> int:
+    return self._max_entries
+
+  @property
+  def max_bytes(self) -> int:
+    return self._max_bytes
+
+  def get(self, key: Hashable) -> Optional[Any]:
+    """Returns the value cached for `key` and marks it used, or None."""
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None:
+        self._misses += 1
+        return None
+      self._entries.move_to_end(key)
+      self._hits += 1
+      return entry[0]
+
+  def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> None:
+    """Caches `value` for `key`, evicting the least recently used values.
+
+    Args:
+      key: the key of the value.
+      value: the value to cache, which must not be mutated afterwards.
+      size: the size of the value in bytes, estimated if not provided.
+    """
+    if size is None:
+      size = _estimate_size(value)
+    if size > self._max_bytes:
+      return
+    with self._lock:
+      previous_entry = self._entries.pop(key, None)
+      if previous_entry is not None:
+        self._bytes -= previous_entry[1]
+      self._entries[key] = (value, size)
+      self._bytes += size
+      while (len(self._entries) > self._max_entries or
+             self._bytes > self._max_bytes):
+        _, (_, evicted_size) = self._entries.popitem(last=False)
+        self._bytes -= evicted_size
+        self._evictions += 1
+
+  def clear(self) -> None:
+    """Removes all the cached values, and resets the counters."""
+    with self._lock:
+      self._entries.clear()
+      self._bytes = 0
+      self._hits = 0
+      self._misses = 0
+      self._evictions = 0
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  @property
+  def stats(self) -> CacheStats:
+    with self._lock:
+      return CacheStats(
+          hits=self._hits,
+          misses=self._misses,
+          evictions=self._evictions,
+          entries=len(self._entries),
+          bytes=self._bytes)
+
+
+def _clear_file_handles(message: Any) -> None:
+  """Clears the file handle fields of a protobuf and its sub-messages."""
+  for field, value in message.ListFields():
+    if field.name in _FILE_HANDLE_FIELDS:
+      message.ClearField(field.name)
+    elif field.message_type is not None:
+      for sub_message in (value if field.label == field.LABEL_REPEATED else
+                          [value]):
+        _clear_file_handles(sub_message)
+
+
+def _file_identity(options: Any) -> bytes:
+  """Identifies the files of the options given by a descriptor or a buffer.
+
+  Files opened by descriptor are identified by their device, inode, size and
+  modification time, and buffers by a digest of their content, instead of the
+  descriptor numbers and buffer addresses which are reused by other files.
+
+  Args:
+    options: an options dataclass, such as `BaseOptions` or `SearchOptions`.
+
+  Returns:
+    The identity of the files, empty if none is given by a handle.
+  """
+  identity = []
+  for descriptor_field, content_field, offset_field, length_field in (
+      _FILE_FIELDS):
+    content = getattr(options, content_field, None)
+    descriptor = getattr(options, descriptor_field, None)
+    if content is not None and not isinstance(content, bytes):
+      view, _ = memory_buffer.pin_buffer(content,
+                                         getattr(options, offset_field),
+                                         getattr(options, length_field))
+      identity.append(hashlib.sha256(view).digest())
+    elif content is None and descriptor is not None:
+      stat = os.fstat(descriptor)
+      identity.append('{0}:{1}:{2}:{3}'.format(stat.st_dev, stat.st_ino,
+                                                stat.st_size,
+                                                stat.st_mtime_ns).encode())
+  return b''.join(identity)
+
+
+def options_fingerprint(task: Any, options: Any) -> str:
+  """Returns a fingerprint of the class and options of a task.
+
+  Args:
+    task: the task.
+    options: the options dataclass of the task, whose fields all define
+      `to_pb2()`.
+
+  Returns:
+    A hexadecimal digest, which differs between tasks computing different
+    results for the same input.
+  """
+  digest = hashlib.sha256(type(task).__qualname__.encode('utf-8'))
+  for field in dataclasses.fields(options):
+    value = getattr(options, field.name)
+    message = value.to_pb2()
+    _clear_file_handles(message)
+    digest.update(field.name.encode('utf-8'))
+    digest.update(message.SerializeToString(deterministic=True))
+    digest.update(_file_identity(value))
+  return digest.hexdigest()
+
+
+class ResultCacheMixin(object):
+  """Adds an optional result cache to a deterministic text task.
+
+  The task must set `self._options` to its options dataclass and
+  `self._timer` to its `InferenceTimer`, and run its inferences through
+  `self._run_cached`, such as:
+
+    return self._run_cached(ClassificationResult.create_from_pb2,
+                            self._classifier.classify, text)
+
+  The cache holds the results of the C++ task, from which the Python results
+  are created on each call, so that callers never share a result.
+  """
+
+  _result_cache: Optional[ResultCache] = None
+  _result_cache_key_prefix: Optional[str] = None
+  _result_cache_normalizes_inputs: bool = False
+
+  def set_result_cache(self,
+                       cache: Optional[ResultCache],
+                       normalize_inputs: bool = False) -> None:
+    """Sets the cache of the results of the task, or None to disable it.
+
+    The results are keyed by the input text and by a fingerprint of the task
+    options, so the same cache can be shared by several tasks. The cache is
+    disabled by default.
+
+    Args:
+      cache: the result cache, or None.
+      normalize_inputs: if true, the input texts are normalized with
+        `normalize_text` before being used as keys, so that texts differing
+        only by their Unicode normalization form or their whitespaces share
+        their result. Only enable it if the tokenizer of the model ignores
+        these differences.
+    """
+    self._result_cache = cache
+    self._result_cache_normalizes_inputs = normalize_inputs
+    self._result_cache_key_prefix = None
+    if cache is not None:
+      # Tasks keying their results by the normalized and the exact texts don't
+      # share their results.
+      self._result_cache_key_prefix = '{0}:{1}'.format(
+          options_fingerprint(self, self._options), int(normalize_inputs))
+
+  @property
+  def result_cache(self) -> Optional[ResultCache]:
+    """The cache of the results of the task, or None if disabled."""
+    return self._result_cache
+
+  def _run_cached(self,
+                  create_result: Callable[[_CppResult], _Result],
+                  infer: Callable[[str], _CppResult],
+                  text: str,
+                  timeout: Optional[float] = None) -> _Result:
+    """Runs an inference on `text`, unless its result is cached.
+
+    Args:
+      create_result: creates the Python result from the C++ result.
+      infer: the method of the C++ task running the inference.
+      text: the input text.
+      timeout: the maximum duration of the inference in seconds, or None. The
+        cached results are returned regardless of the timeout.
+
+    Returns:
+      The Python result.
+    """
+    cache = self._result_cache
+    if cache is None:
+      return self._timer.run(create_result, infer, text, timeout=timeout)
+
+    key = (self._result_cache_key_prefix,
+           normalize_text(text)
+           if self._result_cache_normalizes_inputs else text)
+    cpp_result = cache.get(key)
+    if cpp_result is not None:
+      return create_result(cpp_result)
+
+    def cache_and_create_result(cpp_result: _CppResult) -> _Result:
+      cache.put(key, cpp_result, len(key[1]) + _estimate_size(cpp_result))
+      return create_result(cpp_result)
+
+    return self._timer.run(
+        cache_and_create_result, infer, text, timeout=timeout)
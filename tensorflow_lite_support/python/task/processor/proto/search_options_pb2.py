@@ -14,61 +14,288 @@
 """Search options protobuf."""
 
 import dataclasses
-from typing import Any, Optional
+import os
+from typing import Any, List, Optional, Tuple
 
 from tensorflow_lite_support.cc.task.core.proto import external_file_pb2
 
 from tensorflow_lite_support.cc.task.processor.proto import search_options_pb2
+from tensorflow_lite_support.python.task.core import memory_buffer
 from tensorflow_lite_support.python.task.core.optional_dependencies import doc_controls
 
 _ExternalFileProto = external_file_pb2.ExternalFile
+_FileDescriptorMetaProto = external_file_pb2.FileDescriptorMeta
+_FilePointerMetaProto = external_file_pb2.FilePointerMeta
+_AttributeFilterProto = search_options_pb2.AttributeFilter
 _SearchOptionsProto = search_options_pb2.SearchOptions
 
 
+@dataclasses.dataclass
+class AttributeFilter:
+  """Filter on the per-embedding attribute values stored in the index.
+
+  The filter is applied while scanning the index, i.e. before the top-k nearest
+  neighbors are selected. An embedding is kept only if its attribute value
+  satisfies all the conditions that are set. Using a filter requires an index
+  built with attributes.
+
+  Attributes:
+    allowed_values: If non-empty, the attribute value must be one of these
+      values. Typically used when attributes are integer tags, e.g. category or
+      tenant IDs.
+    all_of_bits: Bitmask of which all bits must be set in the attribute value.
+    any_of_bits: Bitmask of which at least one bit must be set in the attribute
+      value. Ignored if 0.
+    none_of_bits: Bitmask of which no bit must be set in the attribute value.
+  """
+
+  allowed_values: Optional[List[int]] = None
+  all_of_bits: Optional[int] = None
+  any_of_bits: Optional[int] = None
+  none_of_bits: Optional[int] = None
+
+  @doc_controls.do_not_generate_docs
+  def to_pb2(self) -> _AttributeFilterProto:
+    """Generates a protobuf object to pass to the C++ layer."""
+    return _AttributeFilterProto(
+        allowed_values=self.allowed_values,
+        all_of_bits=self.all_of_bits,
+        any_of_bits=self.any_of_bits,
+        none_of_bits=self.none_of_bits)
+
+  @classmethod
+  @doc_controls.do_not_generate_docs
+  def create_from_pb2(cls, pb2_obj: _AttributeFilterProto) -> "AttributeFilter":
+    """Creates an `AttributeFilter` object from the given protobuf object."""
+    return AttributeFilter(
+        allowed_values=list(pb2_obj.allowed_values) or None,
+        all_of_bits=pb2_obj.all_of_bits
+        if pb2_obj.HasField("all_of_bits") else None,
+        any_of_bits=pb2_obj.any_of_bits
+        if pb2_obj.HasField("any_of_bits") else None,
+        none_of_bits=pb2_obj.none_of_bits
+        if pb2_obj.HasField("none_of_bits") else None)
+
+  def __eq__(self, other: Any) -> bool:
+    """Checks if this object is equal to the given object.
+
+    Args:
+      other: The object to be compared with.
+
+    Returns:
+      True if the objects are equal.
+    """
+    if not isinstance(other, AttributeFilter):
+      return False
+
+    return self.to_pb2().__eq__(other.to_pb2())
+
+
 @dataclasses.dataclass
 class SearchOptions:
   """Options for search processor.
 
   The index file to search into. Mandatory only if the index is not attached
   to the output tensor metadata as an AssociatedFile with type SCANN_INDEX_FILE.
-  The index file can be specified by one of the following two ways:
+  The index file can be specified by one of the following four ways:
 
   (1) file contents loaded in `index_file_content`.
   (2) file path in `index_file_name`.
+  (3) file descriptor in `index_file_descriptor`.
+  (4) file paths of the index shards in `index_shard_file_names`.
 
-  If more than one field of these fields is provided, they are used in this
-  precedence order.
+  Options (1), (2) and (3) can't be used together with option (4). If more than
+  one of (1), (2) and (3) are provided, they are used in this precedence order.
 
   Attributes:
     index_file_name: Path to the index.
-    index_file_content: The index file contents as bytes.
+    index_file_content: The index file contents, as `bytes`, which are copied,
+      or as any other C-contiguous buffer such as a `memoryview`, an
+      `mmap.mmap` or a NumPy array, which is used without being copied. The
+      buffer must not be modified while the tasks created from these options
+      are alive, and it stays exported meanwhile.
     max_results: Maximum number of nearest neighbor results to return.
+    attribute_filter: Optional filter restricting the search to the embeddings
+      whose attribute values satisfy it.
+    index_shard_file_names: Paths to the index shards. All shards are searched
+      in parallel and their results are merged. Shards must share the same
+      embedding dimension and distance measure.
+    num_threads: The maximum number of threads used to search the index shards
+      in parallel. Defaults to one thread per shard.
+    num_leaves_to_search: Overrides the number of partitions (a.k.a. leaves) to
+      search into, which is otherwise derived from the search fraction stored
+      in the index. Searching more leaves increases recall at the expense of
+      latency.
+    lazy_metadata: If true, the searcher returns the indices and distances of
+      the nearest neighbors as NumPy arrays, and their metadata is only fetched
+      from the index on demand. See `search_result_pb2.LazySearchResult`.
+    index_file_descriptor: File descriptor of the index file, as returned by
+      `os.open`, which is memory-mapped. The descriptor can be closed once the
+      task is created.
+    index_file_offset: Offset of the index in bytes in the file specified by
+      `index_file_name` or `index_file_descriptor`, or in the buffer
+      `index_file_content`, for indices embedded in larger bundle files.
+      Defaults to 0. Not supported with `index_file_content` as `bytes`.
+    index_file_length: Length of the index in bytes in the file or buffer.
+      Defaults to the rest of the file or buffer.
   """
 
   index_file_name: Optional[str] = None
-  index_file_content: Optional[bytes] = None
+  index_file_content: Optional[Any] = None
   max_results: Optional[int] = 5
+  attribute_filter: Optional[AttributeFilter] = None
+  index_shard_file_names: Optional[List[str]] = None
+  num_threads: Optional[int] = None
+  num_leaves_to_search: Optional[int] = None
+  lazy_metadata: Optional[bool] = None
+  index_file_descriptor: Optional[int] = None
+  index_file_offset: Optional[int] = None
+  index_file_length: Optional[int] = None
+
+  @classmethod
+  def create_from_shard_manifest(cls, manifest_file_path: str,
+                                 **kwargs) -> "SearchOptions":
+    """Creates a `SearchOptions` object from an index shard manifest.
+
+    The manifest is a text file listing the path of one index shard per line.
+    Relative paths are resolved against the directory containing the manifest.
+    Empty lines and lines starting with `#` are ignored.
+
+    Args:
+      manifest_file_path: Path to the shard manifest.
+      **kwargs: Other `SearchOptions` fields, e.g. `max_results`.
+
+    Returns:
+      `SearchOptions` object searching into the shards listed in the manifest.
+
+    Raises:
+      ValueError: If the manifest doesn't list any shard.
+    """
+    manifest_dir = os.path.dirname(manifest_file_path)
+    shard_file_names = []
+    with open(manifest_file_path, "r") as f:
+      for line in f:
+        line = line.strip()
+        if not line or line.startswith("#"):
+          continue
+        shard_file_names.append(os.path.join(manifest_dir, line))
+    if not shard_file_names:
+      raise ValueError(
+          f"No index shard found in manifest: {manifest_file_path}.")
+    return cls(index_shard_file_names=shard_file_names, **kwargs)
+
+  def _index_file_to_pb2(
+      self) -> Tuple[Optional[_ExternalFileProto], Optional[memoryview]]:
+    """Generates the protobuf object of the index file, if any, and its view."""
+    has_region = (
+        self.index_file_offset is not None or
+        self.index_file_length is not None)
+    if self.index_file_offset is not None and self.index_file_offset < 0:
+      raise ValueError("Expected index_file_offset >= 0, found: "
+                       f"{self.index_file_offset}.")
+    if self.index_file_length is not None and self.index_file_length <= 0:
+      raise ValueError("Expected index_file_length > 0, found: "
+                       f"{self.index_file_length}.")
+    if isinstance(self.index_file_content, bytes) and has_region:
+      raise ValueError(
+          "`index_file_offset` and `index_file_length` are not supported with "
+          "`index_file_content` as bytes, pass a memoryview instead.")
+
+    if (self.index_file_content is not None and
+        not isinstance(self.index_file_content, bytes)):
+      # The buffer takes precedence over the file, as `file_content` does.
+      pinned_index_file_content, pointer = memory_buffer.pin_buffer(
+          self.index_file_content, self.index_file_offset,
+          self.index_file_length)
+      return _ExternalFileProto(
+          file_pointer_meta=_FilePointerMetaProto(
+              pointer=pointer, length=pinned_index_file_content.nbytes)
+      ), pinned_index_file_content
+
+    if (self.index_file_name is None and self.index_file_content is None and
+        self.index_file_descriptor is None):
+      if has_region:
+        raise ValueError(
+            "`index_file_offset` and `index_file_length` require one of "
+            "`index_file_name`, `index_file_content` or "
+            "`index_file_descriptor`.")
+      return None, None
+    file_descriptor_meta = None
+    if self.index_file_descriptor is not None or has_region:
+      # The offset and length also apply to `index_file_name`.
+      file_descriptor_meta = _FileDescriptorMetaProto(
+          fd=self.index_file_descriptor,
+          offset=self.index_file_offset,
+          length=self.index_file_length)
+    return _ExternalFileProto(
+        file_name=self.index_file_name,
+        file_content=self.index_file_content,
+        file_descriptor_meta=file_descriptor_meta), None
 
   @doc_controls.do_not_generate_docs
   def to_pb2(self) -> _SearchOptionsProto:
     """Generates a protobuf object to pass to the C++ layer."""
-    if self.index_file_name is not None or self.index_file_content is not None:
-      return _SearchOptionsProto(
-          index_file=_ExternalFileProto(
-              file_name=self.index_file_name,
-              file_content=self.index_file_content),
-          max_results=self.max_results)
-    else:
-      return _SearchOptionsProto(max_results=self.max_results)
+    return self.to_pb2_and_pin()[0]
+
+  @doc_controls.do_not_generate_docs
+  def to_pb2_and_pin(
+      self) -> Tuple[_SearchOptionsProto, Optional[memoryview]]:
+    """Generates a protobuf object, and the view of the buffer it points to.
+
+    Returns:
+      The protobuf object to pass to the C++ layer, and the view of
+      `index_file_content` it points to if `index_file_content` is not
+      `bytes`, None otherwise. The caller must keep the view referenced as long
+      as the C++ objects created from the protobuf object are alive.
+    """
+    index_file, pinned_index_file_content = self._index_file_to_pb2()
+    index_file_shards = None
+    if self.index_shard_file_names is not None:
+      index_file_shards = [
+          _ExternalFileProto(file_name=file_name)
+          for file_name in self.index_shard_file_names
+      ]
+    attribute_filter = (
+        self.attribute_filter.to_pb2()
+        if self.attribute_filter is not None else None)
+    search_options = _SearchOptionsProto(
+        index_file=index_file,
+        index_file_shards=index_file_shards,
+        max_results=self.max_results,
+        attribute_filter=attribute_filter,
+        num_threads=self.num_threads,
+        num_leaves_to_search=self.num_leaves_to_search,
+        lazy_metadata=self.lazy_metadata)
+    return search_options, pinned_index_file_content
 
   @classmethod
   @doc_controls.do_not_generate_docs
   def create_from_pb2(cls, pb2_obj: _SearchOptionsProto) -> "SearchOptions":
     """Creates a `SearchOptionsProto` object from the given protobuf object."""
     return SearchOptions(
-        index_file_name=pb2_obj.index_file.file_name,
-        index_file_content=pb2_obj.index_file.file_content,
-        max_results=pb2_obj.max_results)
+        index_file_name=pb2_obj.index_file.file_name
+        if pb2_obj.index_file.HasField("file_name") else None,
+        index_file_content=pb2_obj.index_file.file_content
+        if pb2_obj.index_file.HasField("file_content") else None,
+        max_results=pb2_obj.max_results,
+        attribute_filter=AttributeFilter.create_from_pb2(
+            pb2_obj.attribute_filter)
+        if pb2_obj.HasField("attribute_filter") else None,
+        index_shard_file_names=[
+            index_file.file_name for index_file in pb2_obj.index_file_shards
+        ] or None,
+        num_threads=pb2_obj.num_threads
+        if pb2_obj.HasField("num_threads") else None,
+        num_leaves_to_search=pb2_obj.num_leaves_to_search
+        if pb2_obj.HasField("num_leaves_to_search") else None,
+        lazy_metadata=pb2_obj.lazy_metadata
+        if pb2_obj.HasField("lazy_metadata") else None,
+        index_file_descriptor=pb2_obj.index_file.file_descriptor_meta.fd
+        if pb2_obj.index_file.file_descriptor_meta.HasField("fd") else None,
+        index_file_offset=pb2_obj.index_file.file_descriptor_meta.offset
+        if pb2_obj.index_file.file_descriptor_meta.HasField("offset") else None,
+        index_file_length=pb2_obj.index_file.file_descriptor_meta.length
+        if pb2_obj.index_file.file_descriptor_meta.HasField("length") else None)
 
   def __eq__(self, other: Any) -> bool:
     """Checks if this object is equal to the given object.
@@ -16,6 +16,7 @@
 import dataclasses
 from typing import Any, List
 
+import numpy as np
 from tensorflow_lite_support.cc.task.processor.proto import search_result_pb2
 from tensorflow_lite_support.python.task.core.optional_dependencies import doc_controls
 
@@ -105,3 +106,63 @@ class SearchResult:
       return False
 
     return self.to_pb2().__eq__(other.to_pb2())
+
+
+class LazySearchResult(object):
+  """Results from a search, with the neighbors metadata fetched on demand.
+
+  Returned by the searchers if `SearchOptions.lazy_metadata` is true. Instead
+  of looking up the metadata of every nearest neighbor in the index at search
+  time, only the neighbors indices and distances are returned, and the metadata
+  is fetched through the searcher when requested. Fetching metadata is only
+  valid as long as the searcher that produced this result is alive.
+
+  Attributes:
+    indices: Opaque identifiers of the nearest neighbors in the index, as an
+      int64 NumPy array sorted by increasing distance order.
+    distances: The distances of the nearest neighbors, as a float32 NumPy
+      array. Lower is better.
+  """
+
+  def __init__(self, indices: np.ndarray, distances: np.ndarray,
+               searcher: Any) -> None:
+    """Initializes the `LazySearchResult` object.
+
+    Args:
+      indices: Opaque identifiers of the nearest neighbors in the index.
+      distances: The distances of the nearest neighbors.
+      searcher: The searcher that produced this result, providing the
+        `get_metadata` and `get_metadata_batch` methods.
+    """
+    self.indices = indices
+    self.distances = distances
+    self._searcher = searcher
+
+  def __len__(self) -> int:
+    return len(self.indices)
+
+  def get_metadata(self, i: int) -> bytes:
+    """Fetches the metadata of the i-th nearest neighbor.
+
+    Args:
+      i: The rank of the nearest neighbor in this result.
+
+    Returns:
+      The metadata of the i-th nearest neighbor.
+    """
+    return self._searcher.get_metadata(int(self.indices[i]))
+
+  def get_all_metadata(self) -> List[bytes]:
+    """Fetches the metadata of all the nearest neighbors in a single call.
+
+    Returns:
+      The metadata of the nearest neighbors, in the same order as `indices`.
+    """
+    return self._searcher.get_metadata_batch(self.indices.tolist())
+
+  def to_search_result(self) -> SearchResult:
+    """Fetches all metadata and converts this result to a `SearchResult`."""
+    return SearchResult(nearest_neighbors=[
+        NearestNeighbor(metadata=bytearray(metadata), distance=float(distance))
+        for metadata, distance in zip(self.get_all_metadata(), self.distances)
+    ])
@@ -14,8 +14,10 @@
 """Bert CLU Annotator task."""
 
 import dataclasses
+from typing import Optional, Tuple
 
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
 from tensorflow_lite_support.python.task.processor.proto import clu_annotation_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import clu_pb2
 from tensorflow_lite_support.python.task.text.pybinds import _pywrap_bert_clu_annotator
@@ -38,15 +40,18 @@ class BertCluAnnotatorOptions:
   bert_clu_annotation_options: _BertCluAnnotationOptions = _BertCluAnnotationOptions()  # pylint: disable=line-too-long
 
 
-class BertCluAnnotator(object):
+class BertCluAnnotator(inference_timing.InferenceTimingMixin):
   """Class that performs Bert CLU Annotation on text."""
 
   def __init__(self, options: BertCluAnnotatorOptions,
-               cpp_annotator: _CppBertCluAnnotator) -> None:
+               cpp_annotator: _CppBertCluAnnotator,
+               pinned_buffers: Tuple[memoryview, ...] = ()) -> None:
     """Initializes the `BertCluAnnotator` object."""
     # Creates the object of C++ BertCluAnnotator class.
     self._options = options
     self._annotator = cpp_annotator
+    self._timer = inference_timing.InferenceTimer(cpp_annotator)
+    self._pinned_buffers = pinned_buffers
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "BertCluAnnotator":
@@ -81,16 +86,22 @@ class BertCluAnnotator(object):
         `BertCluAnnotatorOptions` such as missing the model.
       RuntimeError: If other types of error occurred.
     """
+    (base_options,), pinned_buffers = base_options_module.to_pb2_and_pin(
+        options.base_options)
     classifier = _CppBertCluAnnotator.create_from_options(
-        options.base_options.to_pb2(),
-        options.bert_clu_annotation_options.to_pb2())
-    return cls(options, classifier)
+        base_options, options.bert_clu_annotation_options.to_pb2())
+    return cls(options, classifier, pinned_buffers)
 
-  def annotate(self, request: clu_pb2.CluRequest) -> clu_pb2.CluResponse:
+  def annotate(self,
+               request: clu_pb2.CluRequest,
+               timeout: Optional[float] = None) -> clu_pb2.CluResponse:
     """Performs actual Bert CLU Annotation on the provided CLU request.
 
     Args:
       request: The input to CLU.
+      timeout: the maximum duration of the inference in seconds, or None for no
+        limit. See `cancel()` for the parts of the inference which can be
+        interrupted.
 
     Returns:
       The output of CLU.
@@ -98,9 +109,12 @@ class BertCluAnnotator(object):
     Raises:
       ValueError: If any of the input arguments is invalid.
       RuntimeError: If failed to calculate the embedding vector.
+      InferenceTimeoutError: If the inference exceeded `timeout`.
+      InferenceCancelledError: If the inference was cancelled with `cancel()`.
     """
-    annotation_result = self._annotator.annotate(request.to_pb2())
-    return clu_pb2.CluResponse.create_from_pb2(annotation_result)
+    return self._timer.run(clu_pb2.CluResponse.create_from_pb2,
+                           self._annotator.annotate, request.to_pb2(),
+                           timeout=timeout)
 
   @property
   def options(self) -> BertCluAnnotatorOptions:
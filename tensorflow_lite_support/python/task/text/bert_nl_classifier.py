@@ -14,8 +14,11 @@
 """Bert NL Classifier task."""
 
 import dataclasses
+from typing import Optional, Tuple
 
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
+from tensorflow_lite_support.python.task.core import result_cache
 from tensorflow_lite_support.python.task.processor.proto import classifications_pb2
 from tensorflow_lite_support.python.task.text.pybinds import _pywrap_bert_nl_classifier
 
@@ -33,15 +36,19 @@ class BertNLClassifierOptions:
   base_options: _BaseOptions
 
 
-class BertNLClassifier(object):
+class BertNLClassifier(inference_timing.InferenceTimingMixin,
+                       result_cache.ResultCacheMixin):
   """Class that performs Bert NL classification on text."""
 
   def __init__(self, options: BertNLClassifierOptions,
-               cpp_classifier: _CppBertNLClassifier) -> None:
+               cpp_classifier: _CppBertNLClassifier,
+               pinned_buffers: Tuple[memoryview, ...] = ()) -> None:
     """Initializes the `BertNLClassifier` object."""
     # Creates the object of C++ BertNLClassifier class.
     self._options = options
     self._classifier = cpp_classifier
+    self._timer = inference_timing.InferenceTimer(cpp_classifier)
+    self._pinned_buffers = pinned_buffers
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "BertNLClassifier":
@@ -76,15 +83,24 @@ class BertNLClassifier(object):
         `BertNLClassifierOptions` such as missing the model.
       RuntimeError: If other types of error occurred.
     """
+    (base_options,), pinned_buffers = base_options_module.to_pb2_and_pin(
+        options.base_options)
     classifier = _CppBertNLClassifier.create_from_options(
-        options.base_options.to_pb2())
-    return cls(options, classifier)
-
-  def classify(self, text: str) -> classifications_pb2.ClassificationResult:
+        base_options)
+    return cls(options, classifier, pinned_buffers)
+
+  def classify(
+      self,
+      text: str,
+      timeout: Optional[float] = None
+  ) -> classifications_pb2.ClassificationResult:
     """Performs actual Bert NL classification on the provided text.
 
     Args:
       text: the input text, used to extract the feature vectors.
+      timeout: the maximum duration of the inference in seconds, or None for no
+        limit. See `cancel()` for the parts of the inference which can be
+        interrupted.
 
     Returns:
       classification result.
@@ -92,10 +108,12 @@ class BertNLClassifier(object):
     Raises:
       ValueError: If any of the input arguments is invalid.
       RuntimeError: If failed to calculate the embedding vector.
+      InferenceTimeoutError: If the inference exceeded `timeout`.
+      InferenceCancelledError: If the inference was cancelled with `cancel()`.
     """
-    classification_result = self._classifier.classify(text)
-    return classifications_pb2.ClassificationResult.create_from_pb2(
-        classification_result)
+    return self._run_cached(
+        classifications_pb2.ClassificationResult.create_from_pb2,
+        self._classifier.classify, text, timeout)
 
   @property
   def options(self) -> BertNLClassifierOptions:
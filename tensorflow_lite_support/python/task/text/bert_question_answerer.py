@@ -14,8 +14,10 @@
 """Bert Question Answerer task."""
 
 import dataclasses
+from typing import Optional, Tuple
 
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
 from tensorflow_lite_support.python.task.processor.proto import qa_answers_pb2
 from tensorflow_lite_support.python.task.text.pybinds import _pywrap_bert_question_answerer
 
@@ -29,15 +31,18 @@ class BertQuestionAnswererOptions:
   base_options: _BaseOptions
 
 
-class BertQuestionAnswerer(object):
+class BertQuestionAnswerer(inference_timing.InferenceTimingMixin):
   """Class that performs Bert question answering on text."""
 
   def __init__(self, options: BertQuestionAnswererOptions,
-               cpp_bert_question_answerer: _CppBertQuestionAnswerer) -> None:
+               cpp_bert_question_answerer: _CppBertQuestionAnswerer,
+               pinned_buffers: Tuple[memoryview, ...] = ()) -> None:
     """Initializes the `BertQuestionAnswerer` object."""
     # Creates the object of C++ QuestionAnswerer class.
     self._options = options
     self._question_answerer = cpp_bert_question_answerer
+    self._timer = inference_timing.InferenceTimer(cpp_bert_question_answerer)
+    self._pinned_buffers = pinned_buffers
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "BertQuestionAnswerer":
@@ -72,12 +77,18 @@ class BertQuestionAnswerer(object):
         `BertQuestionAnswererOptions` such as missing the model.
       RuntimeError: If other types of error occurred.
     """
+    (base_options,), pinned_buffers = base_options_module.to_pb2_and_pin(
+        options.base_options)
     question_answerer = _CppBertQuestionAnswerer.create_from_options(
-        options.base_options.to_pb2())
-    return cls(options, question_answerer)
-
-  def answer(self, context: str,
-             question: str) -> qa_answers_pb2.QuestionAnswererResult:
+        base_options)
+    return cls(options, question_answerer, pinned_buffers)
+
+  def answer(
+      self,
+      context: str,
+      question: str,
+      timeout: Optional[float] = None
+  ) -> qa_answers_pb2.QuestionAnswererResult:
     """Answers question based on the context.
 
     Could be empty if no answer was
@@ -86,6 +97,9 @@ class BertQuestionAnswerer(object):
     Args:
       context: Context the question bases on.
       question: Question to ask.
+      timeout: the maximum duration of the inference in seconds, or None for no
+        limit. See `cancel()` for the parts of the inference which can be
+        interrupted.
 
     Returns:
       Question answerer result.
@@ -93,10 +107,13 @@ class BertQuestionAnswerer(object):
     Raises:
       ValueError: If any of the input arguments is invalid.
       RuntimeError: If failed to calculate the embedding vector.
+      InferenceTimeoutError: If the inference exceeded `timeout`.
+      InferenceCancelledError: If the inference was cancelled with `cancel()`.
     """
-    question_answerer_result = self._question_answerer.answer(context, question)
-    return qa_answers_pb2.QuestionAnswererResult.create_from_pb2(
-        question_answerer_result)
+    return self._timer.run(
+        qa_answers_pb2.QuestionAnswererResult.create_from_pb2,
+        self._question_answerer.answer, context, question,
+        timeout=timeout)
 
   @property
   def options(self) -> BertQuestionAnswererOptions:
@@ -14,8 +14,11 @@
 """NL Classifier task."""
 
 import dataclasses
+from typing import Optional, Tuple
 
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
+from tensorflow_lite_support.python.task.core import result_cache
 from tensorflow_lite_support.python.task.processor.proto import classification_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import classifications_pb2
 from tensorflow_lite_support.python.task.text.pybinds import _pywrap_nl_classifier
@@ -36,15 +39,19 @@ class NLClassifierOptions:
   base_options: _BaseOptions
 
 
-class NLClassifier(object):
+class NLClassifier(inference_timing.InferenceTimingMixin,
+                   result_cache.ResultCacheMixin):
   """Class that performs NL classification on text."""
 
   def __init__(self, options: NLClassifierOptions,
-               cpp_classifier: _CppNLClassifier) -> None:
+               cpp_classifier: _CppNLClassifier,
+               pinned_buffers: Tuple[memoryview, ...] = ()) -> None:
     """Initializes the `NLClassifier` object."""
     # Creates the object of C++ NLClassifier class.
     self._options = options
     self._classifier = cpp_classifier
+    self._timer = inference_timing.InferenceTimer(cpp_classifier)
+    self._pinned_buffers = pinned_buffers
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "NLClassifier":
@@ -79,15 +86,22 @@ class NLClassifier(object):
         classification options is invalid.
       RuntimeError: If other types of error occurred.
     """
+    (base_options,), pinned_buffers = base_options_module.to_pb2_and_pin(
+        options.base_options)
     classifier = _CppNLClassifier.create_from_options(
-        options.base_options.to_pb2())
-    return cls(options, classifier)
+        base_options)
+    return cls(options, classifier, pinned_buffers)
 
-  def classify(self, text: str) -> _ClassificationResult:
+  def classify(self,
+               text: str,
+               timeout: Optional[float] = None) -> _ClassificationResult:
     """Performs actual NL classification on the provided text.
 
     Args:
       text: the input text, used to extract the feature vectors.
+      timeout: the maximum duration of the inference in seconds, or None for no
+        limit. See `cancel()` for the parts of the inference which can be
+        interrupted.
 
     Returns:
       The classification result.
@@ -95,9 +109,11 @@ class NLClassifier(object):
     Raises:
       ValueError: If any of the input arguments is invalid.
       RuntimeError: If failed to perform the classification.
+      InferenceTimeoutError: If the inference exceeded `timeout`.
+      InferenceCancelledError: If the inference was cancelled with `cancel()`.
     """
-    classification_result = self._classifier.classify(text)
-    return _ClassificationResult.create_from_pb2(classification_result)
+    return self._run_cached(_ClassificationResult.create_from_pb2,
+                            self._classifier.classify, text, timeout)
 
   @property
   def options(self) -> NLClassifierOptions:
@@ -18,6 +18,8 @@ limitations under the License.
 #include "tensorflow_lite_support/cc/task/processor/proto/clu.pb.h"
 #include "tensorflow_lite_support/cc/task/processor/proto/clu_annotation_options.pb.h"
 #include "tensorflow_lite_support/cc/task/text/bert_clu_annotator.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/inference_timing_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/model_cache_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -34,8 +36,10 @@ PYBIND11_MODULE(_pywrap_bert_clu_annotator, m) {
   // python wrapper for C++ BertCLUAnnotator class which shouldn't be directly
   // used by the users.
   pybind11_protobuf::ImportNativeProtoCasters();
+  core::define_model_cache_functions(m);
 
-  pybind11::class_<BertCluAnnotator>(m, "BertCluAnnotator")
+  core::define_inference_timing_methods(
+      pybind11::class_<BertCluAnnotator>(m, "BertCluAnnotator"))
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options,
@@ -84,7 +88,8 @@ PYBIND11_MODULE(_pywrap_bert_clu_annotator, m) {
              clu_response.ParseFromString(
                  core::get_value(text_clu_response).SerializeAsString());
              return clu_response;
-           });
+           },
+           pybind11::call_guard<pybind11::gil_scoped_release>());
 }
 
 }  // namespace text
@@ -17,6 +17,8 @@ limitations under the License.
 #include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
 #include "tensorflow_lite_support/cc/task/processor/proto/qa_answers.pb.h"
 #include "tensorflow_lite_support/cc/task/text/bert_question_answerer.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/inference_timing_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/model_cache_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -33,8 +35,10 @@ PYBIND11_MODULE(_pywrap_bert_question_answerer, m) {
   // python wrapper for C++ BertQuestionAnswerer class which shouldn't be
   // directly used by the users.
   pybind11_protobuf::ImportNativeProtoCasters();
+  core::define_model_cache_functions(m);
 
-  pybind11::class_<BertQuestionAnswerer>(m, "BertQuestionAnswerer")
+  core::define_inference_timing_methods(
+      pybind11::class_<BertQuestionAnswerer>(m, "BertQuestionAnswerer"))
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options) {
@@ -51,7 +55,8 @@ PYBIND11_MODULE(_pywrap_bert_question_answerer, m) {
            [](BertQuestionAnswerer& self, const std::string& context,
               const std::string& question)
                -> tflite::task::processor::QuestionAnswererResult {
-             auto results = self.Answer(context, question);
+             auto answer_result = self.AnswerWithStatus(context, question);
+             auto results = core::get_value(answer_result);
 
              tflite::task::processor::QuestionAnswererResult
                  question_answerer_result;
@@ -65,7 +70,8 @@ PYBIND11_MODULE(_pywrap_bert_question_answerer, m) {
              }
 
              return question_answerer_result;
-           });
+           },
+           py::call_guard<py::gil_scoped_release>());
 }
 
 }  // namespace text
@@ -18,6 +18,8 @@ limitations under the License.
 #include "tensorflow_lite_support/cc/task/processor/proto/class.pb.h"
 #include "tensorflow_lite_support/cc/task/processor/proto/classifications.pb.h"
 #include "tensorflow_lite_support/cc/task/text/nlclassifier/nl_classifier.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/inference_timing_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/model_cache_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -35,8 +37,10 @@ PYBIND11_MODULE(_pywrap_nl_classifier, m) {
   // python wrapper for C++ NLClassifier class which shouldn't be directly used
   // by the users.
   pybind11_protobuf::ImportNativeProtoCasters();
+  core::define_model_cache_functions(m);
 
-  pybind11::class_<NLClassifier>(m, "NLClassifier")
+  core::define_inference_timing_methods(
+      pybind11::class_<NLClassifier>(m, "NLClassifier"))
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options) {
@@ -63,7 +67,8 @@ PYBIND11_MODULE(_pywrap_nl_classifier, m) {
                cl->set_score(results[i].score);
              }
              return classification_result;
-           });
+           },
+           pybind11::call_guard<pybind11::gil_scoped_release>());
 }
 
 }  // namespace text
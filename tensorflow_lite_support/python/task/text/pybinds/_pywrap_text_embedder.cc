@@ -14,9 +14,13 @@ limitations under the License.
 ==============================================================================*/
 
 #include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
 #include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
 #include "tensorflow_lite_support/cc/task/text/text_embedder.h"
 #include "tensorflow_lite_support/cc/task/text/utils/text_op_resolver.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/inference_timing_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/model_cache_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/similarity_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -32,8 +36,10 @@ PYBIND11_MODULE(_pywrap_text_embedder, m) {
   // python wrapper for C++ TextEmbeder class which shouldn't be directly used
   // by the users.
   pybind11_protobuf::ImportNativeProtoCasters();
+  core::define_model_cache_functions(m);
 
-  pybind11::class_<TextEmbedder>(m, "TextEmbedder")
+  core::define_inference_timing_methods(
+      pybind11::class_<TextEmbedder>(m, "TextEmbedder"))
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options,
@@ -53,10 +59,15 @@ PYBIND11_MODULE(_pywrap_text_embedder, m) {
               const std::string& text) -> processor::EmbeddingResult {
              auto embedding_result = self.Embed(text);
              return core::get_value(embedding_result);
-           })
+           },
+           pybind11::call_guard<pybind11::gil_scoped_release>())
       .def("get_embedding_dimension", &TextEmbedder::GetEmbeddingDimension)
       .def("get_number_of_output_layers",
            &TextEmbedder::GetNumberOfOutputLayers)
+      .def_static("similarity_matrix", &core::similarity_matrix,
+                  pybind11::arg("a"), pybind11::arg("b"),
+                  pybind11::arg("top_k") = std::nullopt,
+                  pybind11::arg("num_threads") = -1)
       .def_static("cosine_similarity",
                   [](const processor::FeatureVector& u,
                      const processor::FeatureVector& v) -> double {
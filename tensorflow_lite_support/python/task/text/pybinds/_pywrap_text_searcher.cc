@@ -13,10 +13,18 @@ See the License for the specific language governing permissions and
 limitations under the License.
 ==============================================================================*/
 
+#include <cstdint>
+#include <vector>
+
+#include "pybind11/numpy.h"
 #include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
 #include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
+#include "absl/strings/string_view.h"  // from @com_google_absl
 #include "tensorflow_lite_support/cc/task/text/text_searcher.h"
 #include "tensorflow_lite_support/cc/task/text/utils/text_op_resolver.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/inference_timing_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/model_cache_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -29,14 +37,31 @@ using PythonBaseOptions = ::tflite::python::task::core::BaseOptions;
 using CppBaseOptions = ::tflite::task::core::BaseOptions;
 using CppEmbeddingOptions = ::tflite::task::processor::EmbeddingOptions;
 using CppSearchOptions = ::tflite::task::processor::SearchOptions;
+
+// Converts a search result obtained with `SearchOptions.lazy_metadata` into a
+// tuple of (indices, distances) NumPy arrays.
+py::tuple ToIndicesAndDistances(const processor::SearchResult& search_result) {
+  const int num_neighbors = search_result.nearest_neighbors_size();
+  py::array_t<int64_t> indices(num_neighbors);
+  py::array_t<float> distances(num_neighbors);
+  auto indices_data = indices.mutable_unchecked<1>();
+  auto distances_data = distances.mutable_unchecked<1>();
+  for (int i = 0; i < num_neighbors; ++i) {
+    indices_data(i) = search_result.nearest_neighbors(i).index();
+    distances_data(i) = search_result.nearest_neighbors(i).distance();
+  }
+  return py::make_tuple(indices, distances);
+}
 }  // namespace
 
 PYBIND11_MODULE(_pywrap_text_searcher, m) {
   // python wrapper for C++ TextSearcher class which shouldn't be directly used
   // by the users.
   pybind11_protobuf::ImportNativeProtoCasters();
+  core::define_model_cache_functions(m);
 
-  pybind11::class_<TextSearcher>(m, "TextSearcher")
+  core::define_inference_timing_methods(
+      pybind11::class_<TextSearcher>(m, "TextSearcher"))
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options,
@@ -67,6 +92,35 @@ PYBIND11_MODULE(_pywrap_text_searcher, m) {
               const std::string& text) -> processor::SearchResult {
              auto search_result = self.Search(text);
              return core::get_value(search_result);
+           },
+           py::call_guard<py::gil_scoped_release>())
+      .def("search_indices",
+           [](TextSearcher& self, const std::string& text) -> py::tuple {
+             processor::SearchResult search_result;
+             {
+               // The GIL is only needed to create the NumPy arrays.
+               py::gil_scoped_release gil_release;
+               auto status_or_search_result = self.Search(text);
+               search_result = core::get_value(status_or_search_result);
+             }
+             return ToIndicesAndDistances(search_result);
+           })
+      .def("get_metadata",
+           [](TextSearcher& self, int64_t index) -> py::bytes {
+             auto metadata = self.GetMetadata(index);
+             absl::string_view value = core::get_value(metadata);
+             return py::bytes(value.data(), value.size());
+           })
+      .def("get_metadata_batch",
+           [](TextSearcher& self, const std::vector<int64_t>& indices) {
+             py::list metadata_list(indices.size());
+             for (int i = 0; i < indices.size(); ++i) {
+               // Copy right away, as the next lookup invalidates the value.
+               auto metadata = self.GetMetadata(indices[i]);
+               absl::string_view value = core::get_value(metadata);
+               metadata_list[i] = py::bytes(value.data(), value.size());
+             }
+             return metadata_list;
            })
       .def("get_user_info", [](TextSearcher& self) -> py::str {
         return py::str(self.GetUserInfo()->data());
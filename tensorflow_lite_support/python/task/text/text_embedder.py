@@ -14,8 +14,13 @@
 """Text embedder task."""
 
 import dataclasses
+from typing import Optional, Tuple, Union
+
+import numpy as np
 
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
+from tensorflow_lite_support.python.task.core import result_cache
 from tensorflow_lite_support.python.task.processor.proto import embedding_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import embedding_pb2
 from tensorflow_lite_support.python.task.text.pybinds import _pywrap_text_embedder
@@ -37,15 +42,19 @@ class TextEmbedderOptions:
   embedding_options: _EmbeddingOptions = _EmbeddingOptions()
 
 
-class TextEmbedder(object):
+class TextEmbedder(inference_timing.InferenceTimingMixin,
+                   result_cache.ResultCacheMixin):
   """Class that performs dense feature vector extraction on text."""
 
   def __init__(self, options: TextEmbedderOptions,
-               cpp_embedder: _CppTextEmbedder) -> None:
+               cpp_embedder: _CppTextEmbedder,
+               pinned_buffers: Tuple[memoryview, ...] = ()) -> None:
     """Initializes the `TextEmbedder` object."""
     # Creates the object of C++ TextEmbedder class.
     self._options = options
     self._embedder = cpp_embedder
+    self._timer = inference_timing.InferenceTimer(cpp_embedder)
+    self._pinned_buffers = pinned_buffers
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "TextEmbedder":
@@ -79,15 +88,22 @@ class TextEmbedder(object):
         `TextEmbedderOptions` such as missing the model.
       RuntimeError: If other types of error occurred.
     """
+    (base_options,), pinned_buffers = base_options_module.to_pb2_and_pin(
+        options.base_options)
     embedder = _CppTextEmbedder.create_from_options(
-        options.base_options.to_pb2(), options.embedding_options.to_pb2())
-    return cls(options, embedder)
+        base_options, options.embedding_options.to_pb2())
+    return cls(options, embedder, pinned_buffers)
 
-  def embed(self, text: str) -> embedding_pb2.EmbeddingResult:
+  def embed(self,
+            text: str,
+            timeout: Optional[float] = None) -> embedding_pb2.EmbeddingResult:
     """Performs actual feature vector extraction on the provided text.
 
     Args:
       text: the input text, used to extract the feature vectors.
+      timeout: the maximum duration of the inference in seconds, or None for no
+        limit. See `cancel()` for the parts of the inference which can be
+        interrupted.
 
     Returns:
       embedding result.
@@ -95,15 +111,47 @@ class TextEmbedder(object):
     Raises:
       ValueError: If any of the input arguments is invalid.
       RuntimeError: If failed to calculate the embedding vector.
+      InferenceTimeoutError: If the inference exceeded `timeout`.
+      InferenceCancelledError: If the inference was cancelled with `cancel()`.
     """
-    embedding_result = self._embedder.embed(text)
-    return embedding_pb2.EmbeddingResult.create_from_pb2(embedding_result)
+    return self._run_cached(embedding_pb2.EmbeddingResult.create_from_pb2,
+                            self._embedder.embed, text, timeout)
 
   def cosine_similarity(self, u: embedding_pb2.FeatureVector,
                         v: embedding_pb2.FeatureVector) -> float:
     """Computes cosine similarity [1] between two feature vectors."""
     return self._embedder.cosine_similarity(u.to_pb2(), v.to_pb2())
 
+  def similarity_matrix(
+      self,
+      a: np.ndarray,
+      b: np.ndarray,
+      top_k: Optional[int] = None,
+      num_threads: int = -1
+  ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """Computes cosine similarities [1] between two batches of embeddings.
+
+    Args:
+      a: [N, D] array of embeddings, either float or quantized (uint8 or int8,
+        see `EmbeddingOptions.quantize`).
+      b: [M, D] array of embeddings, of the same kind as `a`.
+      top_k: If set, only the `top_k` rows of `b` most similar to each row of
+        `a` are returned, without computing the full [N, M] matrix.
+      num_threads: Number of threads used for the computation, or -1 to use
+        one thread per CPU core.
+
+    Returns:
+      The [N, M] float32 similarity matrix if `top_k` is None. Otherwise, a
+      tuple of the [N, K] int64 indices into `b` and the [N, K] float32
+      similarities, sorted by decreasing similarity, where K is
+      min(`top_k`, M).
+
+    Raises:
+      ValueError: If the arrays have incompatible shapes or types, if `top_k` is
+        not positive, or if an embedding has a L2-norm of 0.
+    """
+    return self._embedder.similarity_matrix(a, b, top_k, num_threads)
+
   def get_embedding_dimension(self, output_index: int) -> int:
     """Gets the dimensionality of the embedding output.
 
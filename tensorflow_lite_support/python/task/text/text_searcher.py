@@ -14,9 +14,11 @@
 """Text searcher task."""
 
 import dataclasses
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple, Union
 
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
+from tensorflow_lite_support.python.task.core import result_cache
 from tensorflow_lite_support.python.task.processor.proto import embedding_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import search_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import search_result_pb2
@@ -42,7 +44,8 @@ class TextSearcherOptions:
   search_options: _SearchOptions = _SearchOptions()
 
 
-class TextSearcher(object):
+class TextSearcher(inference_timing.InferenceTimingMixin,
+                   result_cache.ResultCacheMixin):
   """Class to performs text search.
 
   It works by performing embedding extraction on text, followed by
@@ -50,11 +53,14 @@ class TextSearcher(object):
   """
 
   def __init__(self, options: TextSearcherOptions,
-               cpp_searcher: _CppTextSearcher) -> None:
+               cpp_searcher: _CppTextSearcher,
+               pinned_buffers: Tuple[memoryview, ...] = ()) -> None:
     """Initializes the `TextSearcher` object."""
     # Creates the object of C++ TextSearcher class.
     self._options = options
     self._searcher = cpp_searcher
+    self._timer = inference_timing.InferenceTimer(cpp_searcher)
+    self._pinned_buffers = pinned_buffers
 
   @classmethod
   def create_from_file(cls,
@@ -95,12 +101,18 @@ class TextSearcher(object):
         `TextSearcherOptions` such as missing the model.
       RuntimeError: If other types of error occurred.
     """
+    (base_options, search_options), pinned_buffers = (
+        base_options_module.to_pb2_and_pin(options.base_options,
+                                           options.search_options))
     searcher = _CppTextSearcher.create_from_options(
-        options.base_options.to_pb2(), options.embedding_options.to_pb2(),
-        options.search_options.to_pb2())
-    return cls(options, searcher)
-
-  def search(self, text: str) -> search_result_pb2.SearchResult:
+        base_options, options.embedding_options.to_pb2(), search_options)
+    return cls(options, searcher, pinned_buffers)
+
+  def search(
+      self,
+      text: str,
+      timeout: Optional[float] = None
+  ) -> Union[search_result_pb2.SearchResult, search_result_pb2.LazySearchResult]:
     """Search for text with similar semantic meaning.
 
     This method performs actual feature extraction on the provided text input,
@@ -108,16 +120,64 @@ class TextSearcher(object):
 
     Args:
       text: the input text, used to extract the feature vectors.
+      timeout: the maximum duration of the inference in seconds, or None for no
+        limit. See `cancel()` for the parts of the inference which can be
+        interrupted.
 
     Returns:
-      search result.
+      search result, or a `LazySearchResult` if `search_options.lazy_metadata`
+      is true.
 
     Raises:
       ValueError: If any of the input arguments is invalid.
       RuntimeError: If failed to perform nearest-neighbor search.
+      InferenceTimeoutError: If the inference exceeded `timeout`.
+      InferenceCancelledError: If the inference was cancelled with `cancel()`.
+    """
+    if self._options.search_options.lazy_metadata:
+      return self._run_cached(self._create_lazy_search_result,
+                              self._searcher.search_indices, text, timeout)
+    return self._run_cached(search_result_pb2.SearchResult.create_from_pb2,
+                            self._searcher.search, text, timeout)
+
+  def _create_lazy_search_result(
+      self, indices_and_distances: Tuple[Sequence[int], Sequence[float]]
+  ) -> search_result_pb2.LazySearchResult:
+    indices, distances = indices_and_distances
+    return search_result_pb2.LazySearchResult(indices, distances,
+                                              self._searcher)
+
+  def get_metadata(self, index: int) -> bytes:
+    """Fetches the metadata of a nearest neighbor from the index.
+
+    Args:
+      index: Opaque identifier of the nearest neighbor, as returned in
+        `LazySearchResult.indices`.
+
+    Returns:
+      The metadata of the nearest neighbor.
+
+    Raises:
+      ValueError: If the index is invalid.
+      RuntimeError: If failed to fetch the metadata.
+    """
+    return self._searcher.get_metadata(index)
+
+  def get_metadata_batch(self, indices: Sequence[int]) -> List[bytes]:
+    """Fetches the metadata of several nearest neighbors from the index.
+
+    Args:
+      indices: Opaque identifiers of the nearest neighbors, as returned in
+        `LazySearchResult.indices`.
+
+    Returns:
+      The metadata of the nearest neighbors, in the same order as `indices`.
+
+    Raises:
+      ValueError: If any of the indices is invalid.
+      RuntimeError: If failed to fetch the metadata.
     """
-    search_result = self._searcher.search(text)
-    return search_result_pb2.SearchResult.create_from_pb2(search_result)
+    return self._searcher.get_metadata_batch(list(indices))
 
   def get_user_info(self) -> str:
     """Gets the user info stored in the index file.
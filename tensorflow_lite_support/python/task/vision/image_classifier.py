@@ -14,9 +14,10 @@
 """Image classifier task."""
 
 import dataclasses
-from typing import Optional
+from typing import Optional, Tuple
 
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
 from tensorflow_lite_support.python.task.processor.proto import bounding_box_pb2
 from tensorflow_lite_support.python.task.processor.proto import classification_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import classifications_pb2
@@ -42,15 +43,18 @@ class ImageClassifierOptions:
   classification_options: _ClassificationOptions = _ClassificationOptions()
 
 
-class ImageClassifier(object):
+class ImageClassifier(inference_timing.InferenceTimingMixin):
   """Class that performs classification on images."""
 
   def __init__(self, options: ImageClassifierOptions,
-               classifier: _CppImageClassifier) -> None:
+               classifier: _CppImageClassifier,
+               pinned_buffers: Tuple[memoryview, ...] = ()) -> None:
     """Initializes the `ImageClassifier` object."""
     # Creates the object of C++ ImageClassifier class.
     self._options = options
     self._classifier = classifier
+    self._timer = inference_timing.InferenceTimer(classifier)
+    self._pinned_buffers = pinned_buffers
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "ImageClassifier":
@@ -85,14 +89,17 @@ class ImageClassifier(object):
         `ImageClassifierOptions` such as missing the model.
       RuntimeError: If other types of error occurred.
     """
+    (base_options,), pinned_buffers = base_options_module.to_pb2_and_pin(
+        options.base_options)
     classifier = _CppImageClassifier.create_from_options(
-        options.base_options.to_pb2(), options.classification_options.to_pb2())
-    return cls(options, classifier)
+        base_options, options.classification_options.to_pb2())
+    return cls(options, classifier, pinned_buffers)
 
   def classify(
       self,
       image: tensor_image.TensorImage,
-      bounding_box: Optional[bounding_box_pb2.BoundingBox] = None
+      bounding_box: Optional[bounding_box_pb2.BoundingBox] = None,
+      timeout: Optional[float] = None
   ) -> classifications_pb2.ClassificationResult:
     """Performs classification on the provided TensorImage.
 
@@ -102,6 +109,9 @@ class ImageClassifier(object):
         extraction only on the provided region of interest. Note that the region
         of interest is not clamped, so this method will fail if the region is
         out of bounds of the input image.
+      timeout: the maximum duration of the inference in seconds, or None for no
+        limit. See `cancel()` for the parts of the inference which can be
+        interrupted.
 
     Returns:
       classification result.
@@ -109,15 +119,19 @@ class ImageClassifier(object):
     Raises:
       ValueError: If any of the input arguments is invalid.
       RuntimeError: If failed to run classification.
+      InferenceTimeoutError: If the inference exceeded `timeout`.
+      InferenceCancelledError: If the inference was cancelled with `cancel()`.
     """
     image_data = image_utils.ImageData(image.buffer)
     if bounding_box is None:
-      classification_result = self._classifier.classify(image_data)
+      args = (image_data,)
     else:
-      classification_result = self._classifier.classify(image_data,
-                                                        bounding_box.to_pb2())
-    return classifications_pb2.ClassificationResult.create_from_pb2(
-        classification_result)
+      args = (image_data, bounding_box.to_pb2())
+    return self._timer.run(
+        classifications_pb2.ClassificationResult.create_from_pb2,
+        self._classifier.classify,
+        *args,
+        timeout=timeout)
 
   @property
   def options(self) -> ImageClassifierOptions:
@@ -14,9 +14,10 @@
 """Image searcher task."""
 
 import dataclasses
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple, Union
 
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
 from tensorflow_lite_support.python.task.processor.proto import bounding_box_pb2
 from tensorflow_lite_support.python.task.processor.proto import embedding_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import search_options_pb2
@@ -45,7 +46,7 @@ class ImageSearcherOptions:
   search_options: _SearchOptions = _SearchOptions()
 
 
-class ImageSearcher(object):
+class ImageSearcher(inference_timing.InferenceTimingMixin):
   """Class to performs image search.
 
   It works by performing embedding extraction on images, followed by
@@ -53,11 +54,14 @@ class ImageSearcher(object):
   """
 
   def __init__(self, options: ImageSearcherOptions,
-               cpp_searcher: _CppImageSearcher) -> None:
+               cpp_searcher: _CppImageSearcher,
+               pinned_buffers: Tuple[memoryview, ...] = ()) -> None:
     """Initializes the `ImageSearcher` object."""
     # Creates the object of C++ ImageSearcher class.
     self._options = options
     self._searcher = cpp_searcher
+    self._timer = inference_timing.InferenceTimer(cpp_searcher)
+    self._pinned_buffers = pinned_buffers
 
   @classmethod
   def create_from_file(
@@ -100,16 +104,19 @@ class ImageSearcher(object):
         `ImageSearcherOptions` such as missing the model.
       RuntimeError: If other types of error occurred.
     """
+    (base_options, search_options), pinned_buffers = (
+        base_options_module.to_pb2_and_pin(options.base_options,
+                                           options.search_options))
     searcher = _CppImageSearcher.create_from_options(
-        options.base_options.to_pb2(), options.embedding_options.to_pb2(),
-        options.search_options.to_pb2())
-    return cls(options, searcher)
+        base_options, options.embedding_options.to_pb2(), search_options)
+    return cls(options, searcher, pinned_buffers)
 
   def search(
       self,
       image: tensor_image.TensorImage,
-      bounding_box: Optional[bounding_box_pb2.BoundingBox] = None
-  ) -> search_result_pb2.SearchResult:
+      bounding_box: Optional[bounding_box_pb2.BoundingBox] = None,
+      timeout: Optional[float] = None
+  ) -> Union[search_result_pb2.SearchResult, search_result_pb2.LazySearchResult]:
     """Search for image with similar semantic meaning.
 
     This method performs actual feature extraction on the provided image input,
@@ -121,20 +128,75 @@ class ImageSearcher(object):
         extraction only on the provided region of interest. Note that the region
         of interest is not clamped, so this method will fail if the region is
         out of bounds of the input image.
+      timeout: the maximum duration of the inference in seconds, or None for no
+        limit. See `cancel()` for the parts of the inference which can be
+        interrupted.
 
     Returns:
-      Search result.
+      Search result, or a `LazySearchResult` if `search_options.lazy_metadata`
+      is true.
 
     Raises:
       ValueError: If any of the input arguments is invalid.
       RuntimeError: If failed to perform nearest-neighbor search.
+      InferenceTimeoutError: If the inference exceeded `timeout`.
+      InferenceCancelledError: If the inference was cancelled with `cancel()`.
     """
     image_data = image_utils.ImageData(image.buffer)
     if bounding_box is None:
-      search_result = self._searcher.search(image_data)
+      args = (image_data,)
     else:
-      search_result = self._searcher.search(image_data, bounding_box.to_pb2())
-    return search_result_pb2.SearchResult.create_from_pb2(search_result)
+      args = (image_data, bounding_box.to_pb2())
+    if self._options.search_options.lazy_metadata:
+      return self._timer.run(
+          self._create_lazy_search_result,
+          self._searcher.search_indices,
+          *args,
+          timeout=timeout)
+    return self._timer.run(
+        search_result_pb2.SearchResult.create_from_pb2,
+        self._searcher.search,
+        *args,
+        timeout=timeout)
+
+  def _create_lazy_search_result(
+      self, indices_and_distances: Tuple[Sequence[int], Sequence[float]]
+  ) -> search_result_pb2.LazySearchResult:
+    indices, distances = indices_and_distances
+    return search_result_pb2.LazySearchResult(indices, distances,
+                                              self._searcher)
+
+  def get_metadata(self, index: int) -> bytes:
+    """Fetches the metadata of a nearest neighbor from the index.
+
+    Args:
+      index: Opaque identifier of the nearest neighbor, as returned in
+        `LazySearchResult.indices`.
+
+    Returns:
+      The metadata of the nearest neighbor.
+
+    Raises:
+      ValueError: If the index is invalid.
+      RuntimeError: If failed to fetch the metadata.
+    """
+    return self._searcher.get_metadata(index)
+
+  def get_metadata_batch(self, indices: Sequence[int]) -> List[bytes]:
+    """Fetches the metadata of several nearest neighbors from the index.
+
+    Args:
+      indices: Opaque identifiers of the nearest neighbors, as returned in
+        `LazySearchResult.indices`.
+
+    Returns:
+      The metadata of the nearest neighbors, in the same order as `indices`.
+
+    Raises:
+      ValueError: If any of the indices is invalid.
+      RuntimeError: If failed to fetch the metadata.
+    """
+    return self._searcher.get_metadata_batch(list(indices))
 
   def get_user_info(self) -> str:
     """Gets the user info stored in the index file.
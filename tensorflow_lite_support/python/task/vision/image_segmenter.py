@@ -14,8 +14,10 @@
 """Image segmenter task."""
 
 import dataclasses
+from typing import Optional, Tuple
 
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
 from tensorflow_lite_support.python.task.processor.proto import segmentation_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import segmentations_pb2
 from tensorflow_lite_support.python.task.vision.core import tensor_image
@@ -39,15 +41,18 @@ class ImageSegmenterOptions:
   segmentation_options: _SegmentationOptions = _SegmentationOptions()
 
 
-class ImageSegmenter(object):
+class ImageSegmenter(inference_timing.InferenceTimingMixin):
   """Class that performs segmentation on images."""
 
   def __init__(self, options: ImageSegmenterOptions,
-               segmenter: _CppImageSegmenter) -> None:
+               segmenter: _CppImageSegmenter,
+               pinned_buffers: Tuple[memoryview, ...] = ()) -> None:
     """Initializes the `ImageSegmenter` object."""
     # Creates the object of C++ ImageSegmenter class.
     self._options = options
     self._segmenter = segmenter
+    self._timer = inference_timing.InferenceTimer(segmenter)
+    self._pinned_buffers = pinned_buffers
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "ImageSegmenter":
@@ -80,25 +85,33 @@ class ImageSegmenter(object):
         `ImageSegmenterOptions` such as missing the model.
       RuntimeError: If other types of error occurred.
     """
+    (base_options,), pinned_buffers = base_options_module.to_pb2_and_pin(
+        options.base_options)
     segmenter = _CppImageSegmenter.create_from_options(
-        options.base_options.to_pb2(), options.segmentation_options.to_pb2())
-    return cls(options, segmenter)
+        base_options, options.segmentation_options.to_pb2())
+    return cls(options, segmenter, pinned_buffers)
 
   def segment(
       self,
-      image: tensor_image.TensorImage
+      image: tensor_image.TensorImage,
+      timeout: Optional[float] = None
   ) -> segmentations_pb2.SegmentationResult:
     """Performs segmentation on the provided TensorImage.
 
     Args:
       image: Tensor image, used to extract the feature vectors.
+      timeout: the maximum duration of the inference in seconds, or None for no
+        limit. See `cancel()` for the parts of the inference which can be
+        interrupted.
     Returns:
       segmentation result.
     Raises:
       ValueError: If any of the input arguments is invalid.
       RuntimeError: If failed to run segmentation.
+      InferenceTimeoutError: If the inference exceeded `timeout`.
+      InferenceCancelledError: If the inference was cancelled with `cancel()`.
     """
     image_data = image_utils.ImageData(image.buffer)
-    segmentation_result = self._segmenter.segment(image_data)
-    return segmentations_pb2.SegmentationResult.create_from_pb2(
-        segmentation_result)
+    return self._timer.run(segmentations_pb2.SegmentationResult.create_from_pb2,
+                           self._segmenter.segment, image_data,
+                           timeout=timeout)
@@ -14,8 +14,10 @@
 """Object detector task."""
 
 import dataclasses
+from typing import Optional, Tuple
 
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
 from tensorflow_lite_support.python.task.processor.proto import detection_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import detections_pb2
 from tensorflow_lite_support.python.task.vision.core import tensor_image
@@ -39,15 +41,18 @@ class ObjectDetectorOptions:
   detection_options: _DetectionOptions = _DetectionOptions()
 
 
-class ObjectDetector(object):
+class ObjectDetector(inference_timing.InferenceTimingMixin):
   """Class that performs object detection on images."""
 
   def __init__(self, options: ObjectDetectorOptions,
-               detector: _CppObjectDetector) -> None:
+               detector: _CppObjectDetector,
+               pinned_buffers: Tuple[memoryview, ...] = ()) -> None:
     """Initializes the `ObjectDetector` object."""
     # Creates the object of C++ ObjectDetector class.
     self._options = options
     self._detector = detector
+    self._timer = inference_timing.InferenceTimer(detector)
+    self._pinned_buffers = pinned_buffers
 
   @classmethod
   def create_from_file(cls, file_path: str) -> "ObjectDetector":
@@ -84,16 +89,22 @@ class ObjectDetector(object):
         `ObjectDetectorOptions` such as missing the model.
       RuntimeError: If other types of error occurred.
     """
+    (base_options,), pinned_buffers = base_options_module.to_pb2_and_pin(
+        options.base_options)
     detector = _CppObjectDetector.create_from_options(
-        options.base_options.to_pb2(), options.detection_options.to_pb2())
-    return cls(options, detector)
+        base_options, options.detection_options.to_pb2())
+    return cls(options, detector, pinned_buffers)
 
   def detect(self,
-             image: tensor_image.TensorImage) -> detections_pb2.DetectionResult:
+             image: tensor_image.TensorImage,
+             timeout: Optional[float] = None) -> detections_pb2.DetectionResult:
     """Performs object detection on the provided TensorImage.
 
     Args:
       image: Tensor image, used to extract the feature vectors.
+      timeout: the maximum duration of the inference in seconds, or None for no
+        limit. See `cancel()` for the parts of the inference which can be
+        interrupted.
 
     Returns:
       detection result.
@@ -101,7 +112,10 @@ class ObjectDetector(object):
     Raises:
       ValueError: If any of the input arguments is invalid.
       RuntimeError: If object detection failed to run.
+      InferenceTimeoutError: If the inference exceeded `timeout`.
+      InferenceCancelledError: If the inference was cancelled with `cancel()`.
     """
     image_data = image_utils.ImageData(image.buffer)
-    detection_result = self._detector.detect(image_data)
-    return detections_pb2.DetectionResult.create_from_pb2(detection_result)
+    return self._timer.run(detections_pb2.DetectionResult.create_from_pb2,
+                           self._detector.detect, image_data,
+                           timeout=timeout)
@@ -20,6 +20,8 @@ limitations under the License.
 #include "tensorflow_lite_support/cc/task/processor/proto/classifications.pb.h"
 #include "tensorflow_lite_support/cc/task/vision/image_classifier.h"
 #include "tensorflow_lite_support/cc/task/vision/utils/image_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/inference_timing_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/model_cache_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -36,8 +38,10 @@ PYBIND11_MODULE(_pywrap_image_classifier, m) {
   // python wrapper for C++ ImageClassifier class which shouldn't be directly
   // used by the users.
   pybind11_protobuf::ImportNativeProtoCasters();
+  core::define_model_cache_functions(m);
 
-  py::class_<ImageClassifier>(m, "ImageClassifier")
+  core::define_inference_timing_methods(
+      py::class_<ImageClassifier>(m, "ImageClassifier"))
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options,
@@ -79,7 +83,8 @@ PYBIND11_MODULE(_pywrap_image_classifier, m) {
                  core::get_value(vision_classification_result)
                  .SerializeAsString());
              return classification_result;
-           })
+           },
+           py::call_guard<py::gil_scoped_release>())
       .def("classify",
            [](ImageClassifier& self, const ImageData& image_data,
               const processor::BoundingBox& bounding_box)
@@ -100,7 +105,8 @@ PYBIND11_MODULE(_pywrap_image_classifier, m) {
                  core::get_value(vision_classification_result)
                  .SerializeAsString());
              return classification_result;
-           });
+           },
+           py::call_guard<py::gil_scoped_release>());
 }
 
 }  // namespace vision
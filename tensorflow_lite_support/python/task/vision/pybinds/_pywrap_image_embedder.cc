@@ -16,11 +16,15 @@ limitations under the License.
 #include <stdexcept>
 
 #include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
 #include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
 #include "tensorflow_lite_support/cc/task/processor/proto/bounding_box.pb.h"
 #include "tensorflow_lite_support/cc/task/processor/proto/embedding.pb.h"
 #include "tensorflow_lite_support/cc/task/vision/image_embedder.h"
 #include "tensorflow_lite_support/cc/task/vision/utils/image_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/inference_timing_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/model_cache_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/similarity_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -37,8 +41,10 @@ PYBIND11_MODULE(_pywrap_image_embedder, m) {
   // python wrapper for C++ ImageEmbeder class which shouldn't be directly used
   // by the users.
   pybind11_protobuf::ImportNativeProtoCasters();
+  core::define_model_cache_functions(m);
 
-  py::class_<ImageEmbedder>(m, "ImageEmbedder")
+  core::define_inference_timing_methods(
+      py::class_<ImageEmbedder>(m, "ImageEmbedder"))
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options,
@@ -81,7 +87,8 @@ PYBIND11_MODULE(_pywrap_image_embedder, m) {
              embedding_result.ParseFromString(
                  core::get_value(vision_embedding_result).SerializeAsString());
              return embedding_result;
-           })
+           },
+           py::call_guard<py::gil_scoped_release>())
       .def("embed",
            [](ImageEmbedder& self, const ImageData& image_data,
               const processor::BoundingBox& bounding_box)
@@ -101,7 +108,8 @@ PYBIND11_MODULE(_pywrap_image_embedder, m) {
              embedding_result.ParseFromString(
                  core::get_value(vision_embedding_result).SerializeAsString());
              return embedding_result;
-           })
+           },
+           py::call_guard<py::gil_scoped_release>())
       .def("get_embedding_by_index",
            [](ImageEmbedder& self,
               const processor::EmbeddingResult& embedding_result,
@@ -123,6 +131,10 @@ PYBIND11_MODULE(_pywrap_image_embedder, m) {
       .def("get_number_of_output_layers",
            &ImageEmbedder::GetNumberOfOutputLayers)
       .def("get_embedding_dimension", &ImageEmbedder::GetEmbeddingDimension)
+      .def_static("similarity_matrix", &core::similarity_matrix,
+                  pybind11::arg("a"), pybind11::arg("b"),
+                  pybind11::arg("top_k") = std::nullopt,
+                  pybind11::arg("num_threads") = -1)
       .def_static(
           "cosine_similarity",
           [](const processor::FeatureVector& u,
@@ -10,11 +10,19 @@ See the License for the specific language governing permissions and
 limitations under the License.
 ==============================================================================*/
 
+#include <cstdint>
+#include <vector>
+
+#include "pybind11/numpy.h"
 #include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
 #include "pybind11_protobuf/native_proto_caster.h"  // from @pybind11_protobuf
+#include "absl/strings/string_view.h"  // from @com_google_absl
 #include "tensorflow_lite_support/cc/task/processor/proto/bounding_box.pb.h"
 #include "tensorflow_lite_support/cc/task/vision/image_searcher.h"
 #include "tensorflow_lite_support/cc/task/vision/utils/image_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/inference_timing_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/model_cache_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -27,14 +35,31 @@ using PythonBaseOptions = ::tflite::python::task::core::BaseOptions;
 using CppBaseOptions = ::tflite::task::core::BaseOptions;
 using CppEmbeddingOptions = ::tflite::task::processor::EmbeddingOptions;
 using CppSearchOptions = ::tflite::task::processor::SearchOptions;
+
+// Converts a search result obtained with `SearchOptions.lazy_metadata` into a
+// tuple of (indices, distances) NumPy arrays.
+py::tuple ToIndicesAndDistances(const processor::SearchResult& search_result) {
+  const int num_neighbors = search_result.nearest_neighbors_size();
+  py::array_t<int64_t> indices(num_neighbors);
+  py::array_t<float> distances(num_neighbors);
+  auto indices_data = indices.mutable_unchecked<1>();
+  auto distances_data = distances.mutable_unchecked<1>();
+  for (int i = 0; i < num_neighbors; ++i) {
+    indices_data(i) = search_result.nearest_neighbors(i).index();
+    distances_data(i) = search_result.nearest_neighbors(i).distance();
+  }
+  return py::make_tuple(indices, distances);
+}
 }  // namespace
 
 PYBIND11_MODULE(_pywrap_image_searcher, m) {
   // python wrapper for C++ ImageSearcher class which shouldn't be directly used
   // by the users.
   pybind11_protobuf::ImportNativeProtoCasters();
+  core::define_model_cache_functions(m);
 
-  pybind11::class_<ImageSearcher>(m, "ImageSearcher")
+  core::define_inference_timing_methods(
+      pybind11::class_<ImageSearcher>(m, "ImageSearcher"))
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options,
@@ -65,7 +90,8 @@ PYBIND11_MODULE(_pywrap_image_searcher, m) {
              auto frame_buffer = CreateFrameBufferFromImageData(image_data);
              auto search_result = self.Search(*core::get_value(frame_buffer));
              return core::get_value(search_result);
-           })
+           },
+           py::call_guard<py::gil_scoped_release>())
       .def("search",
            [](ImageSearcher& self, const ImageData& image_data,
               const processor::BoundingBox& bounding_box)
@@ -80,6 +106,55 @@ PYBIND11_MODULE(_pywrap_image_searcher, m) {
              auto search_result = self.Search(*core::get_value(frame_buffer),
                                               vision_bounding_box);
              return core::get_value(search_result);
+           },
+           py::call_guard<py::gil_scoped_release>())
+      .def("search_indices",
+           [](ImageSearcher& self, const ImageData& image_data) -> py::tuple {
+             processor::SearchResult search_result;
+             {
+               // The GIL is only needed to create the NumPy arrays.
+               py::gil_scoped_release gil_release;
+               auto frame_buffer = CreateFrameBufferFromImageData(image_data);
+               auto status_or_search_result =
+                   self.Search(*core::get_value(frame_buffer));
+               search_result = core::get_value(status_or_search_result);
+             }
+             return ToIndicesAndDistances(search_result);
+           })
+      .def("search_indices",
+           [](ImageSearcher& self, const ImageData& image_data,
+              const processor::BoundingBox& bounding_box) -> py::tuple {
+             BoundingBox vision_bounding_box;
+             vision_bounding_box.ParseFromString(
+                 bounding_box.SerializeAsString());
+
+             processor::SearchResult search_result;
+             {
+               // The GIL is only needed to create the NumPy arrays.
+               py::gil_scoped_release gil_release;
+               auto frame_buffer = CreateFrameBufferFromImageData(image_data);
+               auto status_or_search_result = self.Search(
+                   *core::get_value(frame_buffer), vision_bounding_box);
+               search_result = core::get_value(status_or_search_result);
+             }
+             return ToIndicesAndDistances(search_result);
+           })
+      .def("get_metadata",
+           [](ImageSearcher& self, int64_t index) -> py::bytes {
+             auto metadata = self.GetMetadata(index);
+             absl::string_view value = core::get_value(metadata);
+             return py::bytes(value.data(), value.size());
+           })
+      .def("get_metadata_batch",
+           [](ImageSearcher& self, const std::vector<int64_t>& indices) {
+             py::list metadata_list(indices.size());
+             for (int i = 0; i < indices.size(); ++i) {
+               // Copy right away, as the next lookup invalidates the value.
+               auto metadata = self.GetMetadata(indices[i]);
+               absl::string_view value = core::get_value(metadata);
+               metadata_list[i] = py::bytes(value.data(), value.size());
+             }
+             return metadata_list;
            })
       .def("get_user_info", [](ImageSearcher& self) -> py::str {
         return py::str(self.GetUserInfo()->data());
@@ -18,6 +18,8 @@ limitations under the License.
 #include "tensorflow_lite_support/cc/task/processor/proto/segmentation_options.pb.h"
 #include "tensorflow_lite_support/cc/task/vision/image_segmenter.h"
 #include "tensorflow_lite_support/cc/task/vision/utils/image_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/inference_timing_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/model_cache_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -34,8 +36,10 @@ PYBIND11_MODULE(_pywrap_image_segmenter, m) {
   // python wrapper for C++ ImageSegmenter class which shouldn't be directly
   // used by the users.
   pybind11_protobuf::ImportNativeProtoCasters();
+  core::define_model_cache_functions(m);
 
-  py::class_<ImageSegmenter>(m, "ImageSegmenter")
+  core::define_inference_timing_methods(
+      py::class_<ImageSegmenter>(m, "ImageSegmenter"))
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options,
@@ -65,7 +69,8 @@ PYBIND11_MODULE(_pywrap_image_segmenter, m) {
              auto vision_segmentation_result = self.Segment(
                      *core::get_value(frame_buffer));
              return core::get_value(vision_segmentation_result);
-           });
+           },
+           py::call_guard<py::gil_scoped_release>());
 }
 
 }  // namespace vision
@@ -19,6 +19,8 @@ limitations under the License.
 #include "tensorflow_lite_support/cc/task/processor/proto/detections.pb.h"
 #include "tensorflow_lite_support/cc/task/vision/object_detector.h"
 #include "tensorflow_lite_support/cc/task/vision/utils/image_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/inference_timing_utils.h"
+#include "tensorflow_lite_support/python/task/core/pybinds/model_cache_utils.h"
 #include "tensorflow_lite_support/python/task/core/pybinds/task_utils.h"
 
 namespace tflite {
@@ -35,8 +37,10 @@ PYBIND11_MODULE(_pywrap_object_detector, m) {
   // python wrapper for C++ ObjectDetector class which shouldn't be directly
   // used by the users.
   pybind11_protobuf::ImportNativeProtoCasters();
+  core::define_model_cache_functions(m);
 
-  py::class_<ObjectDetector>(m, "ObjectDetector")
+  core::define_inference_timing_methods(
+      py::class_<ObjectDetector>(m, "ObjectDetector"))
       .def_static(
           "create_from_options",
           [](const PythonBaseOptions& base_options,
@@ -77,7 +81,8 @@ PYBIND11_MODULE(_pywrap_object_detector, m) {
                  core::get_value(vision_detection_result)
                  .SerializeAsString());
              return detection_result;
-           });
+           },
+           py::call_guard<py::gil_scoped_release>());
 }
 
 }  // namespace vision
@@ -0,0 +1,88 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for task_benchmark."""
+
+from absl import flags
+import tensorflow as tf
+
+from tensorflow_lite_support.python.benchmark import task_benchmark
+from tensorflow_lite_support.python.test import test_util
+
+_NUM_RUNS = 5
+
+
+class TaskBenchmarkTest(tf.test.TestCase):
+
+  def _check_result(self, result, task_name, num_threads):
+    self.assertEqual(result.task, task_name)
+    self.assertEqual(result.num_threads, num_threads)
+    self.assertEqual(result.num_runs, _NUM_RUNS)
+    self.assertGreater(result.load_time_ms, 0)
+    self.assertGreater(result.qps, 0)
+    self.assertGreater(result.peak_rss_mb, 0)
+    latency_ms = result.latency_ms
+    self.assertLessEqual(latency_ms['min'], latency_ms['p50'])
+    self.assertLessEqual(latency_ms['p50'], latency_ms['p90'])
+    self.assertLessEqual(latency_ms['p90'], latency_ms['p99'])
+    self.assertLessEqual(latency_ms['p99'], latency_ms['max'])
+
+  def test_run_benchmark(self):
+    result = task_benchmark.run_benchmark(
+        'nl_classifier',
+        test_util.test_srcdir(),
+        num_threads=2,
+        num_warmup_runs=1,
+        num_runs=_NUM_RUNS)
+
+    self._check_result(result, 'nl_classifier', 2)
+
+  def test_run_isolated_benchmarks(self):
+    results = task_benchmark.run_benchmarks(['nl_classifier'],
+                                            test_util.test_srcdir(),
+                                            num_threads=[1, 2],
+                                            num_warmup_runs=1,
+                                            num_runs=_NUM_RUNS,
+                                            isolate=True)
+
+    self.assertLen(results, 2)
+    self._check_result(results[0], 'nl_classifier', 1)
+    self._check_result(results[1], 'nl_classifier', 2)
+
+  def test_run_benchmark_fails_with_unknown_task(self):
+    with self.assertRaisesRegex(ValueError, 'Unknown task'):
+      task_benchmark.run_benchmark(
+          'unknown',
+          test_util.test_srcdir(),
+          num_threads=1,
+          num_warmup_runs=0,
+          num_runs=1)
+
+  def test_import_does_not_define_flags(self):
+    # The flags are defined by `task_benchmark_main`, so that the library can
+    # be imported by apps defining flags of the same names.
+    for name in ('testdata_dir', 'tasks', 'num_threads', 'num_runs'):
+      self.assertNotIn(name, flags.FLAGS)
+
+  def test_all_tasks_are_benchmarked(self):
+    self.assertCountEqual(task_benchmark.TASK_NAMES, [
+        'image_classifier', 'object_detector', 'image_segmenter',
+        'image_embedder', 'image_searcher', 'nl_classifier',
+        'bert_nl_classifier', 'bert_question_answerer', 'bert_clu_annotator',
+        'text_embedder', 'text_searcher', 'audio_classifier', 'audio_embedder'
+    ])
+
+
+if __name__ == '__main__':
+  tf.test.main()
@@ -0,0 +1,173 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for lazy_loader."""
+
+import importlib
+import os
+import subprocess
+import sys
+
+import tensorflow as tf
+
+from tensorflow.python.platform import resource_loader
+from tensorflow_lite_support.python import lazy_loader
+
+_PACKAGE_NAME = 'lazy_loader_test_package'
+_PACKAGE_INIT = """
+from tensorflow_lite_support.python import lazy_loader
+
+__getattr__, __dir__, __all__ = lazy_loader.attach(__name__, {
+    'submodule': '.submodule',
+    'Greeter': '.submodule:Greeter',
+})
+"""
+_SUBMODULE = """
+class Greeter:
+  pass
+"""
+
+# Package directories of the pip package and their `__init__.py` files in
+# tools/pip_package, as copied by build_pip_package.sh.
+_PIP_PACKAGE_INIT_FILES = {
+    'tflite_support': 'tflite_support.__init__.py',
+    'tflite_support/metadata_writers': 'metadata_writers.__init__.py',
+    'tflite_support/task': 'task.__init__.py',
+    'tflite_support/task/core': 'task_core.__init__.py',
+    'tflite_support/task/vision': 'task_vision.__init__.py',
+    'tflite_support/task/text': 'task_text.__init__.py',
+    'tflite_support/task/audio': 'task_audio.__init__.py',
+    'tflite_support/task/processor': 'task_processor.__init__.py',
+    'tflite_support/serving': 'serving.__init__.py',
+}
+
+# Upper bound of the time to import the vision API of the pip package, which
+# is an order of magnitude larger than the time to import the lazy package.
+_MAX_VISION_IMPORT_TIME_US = 200000
+
+
+class LazyLoaderTest(tf.test.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    package_dir = self.create_tempdir(_PACKAGE_NAME)
+    package_dir.create_file('__init__.py', _PACKAGE_INIT)
+    package_dir.create_file('submodule.py', _SUBMODULE)
+    sys.path.insert(0, os.path.dirname(package_dir.full_path))
+    self.addCleanup(sys.path.remove, os.path.dirname(package_dir.full_path))
+    for name in (_PACKAGE_NAME, f'{_PACKAGE_NAME}.submodule'):
+      self.addCleanup(sys.modules.pop, name, None)
+    self._package = importlib.import_module(_PACKAGE_NAME)
+
+  def test_names_are_loaded_on_first_access(self):
+    self.assertNotIn(f'{_PACKAGE_NAME}.submodule', sys.modules)
+
+    greeter = self._package.Greeter
+
+    self.assertIs(greeter, sys.modules[f'{_PACKAGE_NAME}.submodule'].Greeter)
+    self.assertIs(self._package.submodule,
+                  sys.modules[f'{_PACKAGE_NAME}.submodule'])
+
+  def test_loaded_names_are_cached_in_the_package(self):
+    greeter = self._package.Greeter
+
+    self.assertIs(vars(self._package)['Greeter'], greeter)
+
+  def test_from_import(self):
+    namespace = {}
+    exec(f'from {_PACKAGE_NAME} import Greeter', namespace)  # pylint: disable=exec-used
+
+    self.assertIs(namespace['Greeter'], self._package.Greeter)
+
+  def test_unknown_name_raises_attribute_error(self):
+    with self.assertRaisesRegex(AttributeError, 'has no attribute .Unknown.'):
+      _ = self._package.Unknown
+
+  def test_dir_and_all_list_names_before_loading(self):
+    self.assertEqual(self._package.__all__, ['Greeter', 'submodule'])
+    self.assertContainsSubset(['Greeter', 'submodule'], dir(self._package))
+    self.assertNotIn(f'{_PACKAGE_NAME}.submodule', sys.modules)
+
+  def test_import_does_not_load_the_names(self):
+    # Runs in a new process, as the package is already imported by setUp().
+    code = f'import sys; import {_PACKAGE_NAME}; print("\\n".join(sys.modules))'
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        stdout=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+
+    modules = result.stdout.splitlines()
+    self.assertIn(_PACKAGE_NAME, modules)
+    self.assertNotIn(f'{_PACKAGE_NAME}.submodule', modules)
+
+  def test_attach_returns_all_sorted(self):
+    _, _, names = lazy_loader.attach('unused', {'b': 'b', 'a': 'a'})
+
+    self.assertEqual(names, ['a', 'b'])
+
+
+class PipPackageImportTest(tf.test.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    # Assembles the `tflite_support` package the way build_pip_package.sh
+    # does, on top of the `tensorflow_lite_support` sources of the tree.
+    init_files_dir = resource_loader.get_path_to_datafile(
+        '../../tools/pip_package')
+    package_root = self.create_tempdir()
+    for package_dir, init_file in _PIP_PACKAGE_INIT_FILES.items():
+      with open(os.path.join(init_files_dir, init_file)) as f:
+        package_root.create_file(
+            os.path.join(package_dir, '__init__.py'), f.read())
+    self._python_path = os.pathsep.join([package_root.full_path] + sys.path)
+
+  def test_import_vision_is_lazy_and_fast(self):
+    result = subprocess.run(
+        [
+            sys.executable, '-X', 'importtime', '-c',
+            'import sys; from tflite_support.task import vision; '
+            'print("\\n".join(sys.modules))'
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+        env=dict(os.environ, PYTHONPATH=self._python_path))
+
+    # Modules imported by `importlib.import_module` are not reported by
+    # `-X importtime`, so the loaded modules are listed by the subprocess.
+    modules = result.stdout.splitlines()
+    self.assertIn('tflite_support.task.vision', modules)
+    for module in modules:
+      for unexpected_module in ('_pywrap_', 'sounddevice', 'flatbuffers',
+                                'vision.image_'):
+        self.assertNotIn(unexpected_module, module)
+
+    # Lines are formatted as "import time: <self> | <cumulative> | <name>", in
+    # microseconds, where the name is indented by the import depth.
+    total_import_time = 0
+    for line in result.stderr.splitlines():
+      if not line.startswith('import time:') or 'cumulative' in line:
+        continue
+      _, cumulative, name = line[len('import time:'):].split('|')
+      if name.startswith(' tflite_support'):
+        total_import_time += int(cumulative)
+    self.assertGreater(total_import_time, 0)
+    self.assertLess(total_import_time, _MAX_VISION_IMPORT_TIME_US)
+
+
+if __name__ == '__main__':
+  tf.test.main()
@@ -0,0 +1,220 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for batching."""
+
+import asyncio
+import time
+
+import tensorflow as tf
+
+from tensorflow_lite_support.python.serving import batching
+
+
+class _FakeTask(object):
+  """Fake of a task instance, recording its inputs."""
+
+  def __init__(self, latency=0.0):
+    self.latency = latency
+    self.inputs = []
+
+  def infer(self, text):
+    if self.latency:
+      time.sleep(self.latency)
+    if text == 'error':
+      raise ValueError('Invalid input.')
+    self.inputs.append(text)
+    return text.upper()
+
+
+def _infer(task, text):
+  return task.infer(text)
+
+
+def _run(coroutine):
+  return asyncio.run(coroutine)
+
+
+class DynamicBatcherTest(tf.test.TestCase):
+
+  def test_coalesces_concurrent_requests(self):
+    task = _FakeTask()
+    options = batching.BatchingOptions(max_batch_size=8, max_wait_ms=50)
+
+    async def run():
+      async with batching.DynamicBatcher([task], _infer, options) as batcher:
+        results = await asyncio.gather(
+            *[batcher.submit(f'text{i}') for i in range(8)])
+        return results, batcher.stats
+
+    results, stats = _run(run())
+
+    self.assertEqual(results, [f'TEXT{i}' for i in range(8)])
+    self.assertEqual(stats.num_batches, 1)
+    self.assertEqual(stats.num_requests, 8)
+    self.assertEqual(stats.mean_batch_size, 8)
+
+  def test_splits_batches_at_max_batch_size(self):
+    options = batching.BatchingOptions(max_batch_size=3, max_wait_ms=50)
+
+    async def run():
+      async with batching.DynamicBatcher([_FakeTask()], _infer,
+                                         options) as batcher:
+        await asyncio.gather(*[batcher.submit('text') for _ in range(7)])
+        return batcher.stats
+
+    stats = _run(run())
+
+    self.assertEqual(stats.num_batches, 3)
+    self.assertEqual(stats.num_requests, 7)
+
+  def test_runs_batch_after_max_wait(self):
+    options = batching.BatchingOptions(max_batch_size=8, max_wait_ms=10)
+
+    async def run():
+      async with batching.DynamicBatcher([_FakeTask()], _infer,
+                                         options) as batcher:
+        start = time.monotonic()
+        result = await batcher.submit('text')
+        return result, time.monotonic() - start
+
+    result, latency = _run(run())
+
+    self.assertEqual(result, 'TEXT')
+    self.assertGreaterEqual(latency, 0.01)
+    self.assertLess(latency, 1.0)
+
+  def test_fails_only_the_failed_requests(self):
+
+    async def run():
+      async with batching.DynamicBatcher([_FakeTask()], _infer) as batcher:
+        return await asyncio.gather(
+            batcher.submit('a'),
+            batcher.submit('error'),
+            batcher.submit('b'),
+            return_exceptions=True), batcher.stats
+
+    (a, error, b), stats = _run(run())
+
+    self.assertEqual((a, b), ('A', 'B'))
+    self.assertIsInstance(error, ValueError)
+    self.assertEqual(stats.num_errors, 1)
+    self.assertEqual(stats.num_requests, 3)
+
+  def test_runs_batches_on_all_task_instances(self):
+    tasks = [_FakeTask(latency=0.05) for _ in range(3)]
+    options = batching.BatchingOptions(max_batch_size=1, max_wait_ms=0)
+
+    async def run():
+      async with batching.DynamicBatcher(tasks, _infer, options) as batcher:
+        await asyncio.gather(*[batcher.submit('text') for _ in range(6)])
+
+    start = time.monotonic()
+    _run(run())
+    elapsed = time.monotonic() - start
+
+    self.assertEqual(sum(len(task.inputs) for task in tasks), 6)
+    for task in tasks:
+      self.assertNotEmpty(task.inputs)
+    # The 3 task instances run their batches in parallel.
+    self.assertLess(elapsed, 6 * 0.05)
+
+  def test_skips_cancelled_requests(self):
+    task = _FakeTask()
+    options = batching.BatchingOptions(max_wait_ms=50)
+
+    async def run():
+      async with batching.DynamicBatcher([task], _infer, options) as batcher:
+        cancelled = asyncio.ensure_future(batcher.submit('cancelled'))
+        kept = asyncio.ensure_future(batcher.submit('kept'))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await kept
+
+    self.assertEqual(_run(run()), 'KEPT')
+    self.assertEqual(task.inputs, ['kept'])
+
+  def test_rejects_requests_when_queue_is_full(self):
+    options = batching.BatchingOptions(max_queue_size=2)
+
+    async def run():
+      async with batching.DynamicBatcher([_FakeTask()], _infer,
+                                         options) as batcher:
+        results = await asyncio.gather(
+            *[batcher.submit('text') for _ in range(3)],
+            return_exceptions=True)
+        return results, batcher.stats
+
+    results, stats = _run(run())
+
+    self.assertEqual(results[:2], ['TEXT', 'TEXT'])
+    self.assertIsInstance(results[2], batching.QueueFullError)
+    self.assertEqual(stats.num_rejected, 1)
+
+  def test_close_fails_pending_requests(self):
+    options = batching.BatchingOptions(max_batch_size=1, max_wait_ms=0)
+
+    async def run():
+      batcher = batching.DynamicBatcher([_FakeTask(latency=0.05)], _infer,
+                                        options)
+      await batcher.start()
+      requests = [asyncio.ensure_future(batcher.submit('text'))]
+      requests.append(asyncio.ensure_future(batcher.submit('text')))
+      await asyncio.sleep(0.01)
+      await batcher.close()
+      return await asyncio.gather(*requests, return_exceptions=True)
+
+    for result in _run(run()):
+      self.assertIsInstance(result, RuntimeError)
+      self.assertRegex(str(result), 'closed')
+
+  def test_close_fails_requests_waiting_for_their_batch(self):
+    task = _FakeTask()
+    options = batching.BatchingOptions(max_batch_size=8, max_wait_ms=1000)
+
+    async def run():
+      batcher = batching.DynamicBatcher([task], _infer, options)
+      await batcher.start()
+      request = asyncio.ensure_future(batcher.submit('text'))
+      # The worker dequeued the request, and waits for more requests.
+      await asyncio.sleep(0.05)
+      await batcher.close()
+      return await asyncio.wait_for(
+          asyncio.gather(request, return_exceptions=True), 1.0)
+
+    (result,) = _run(run())
+
+    self.assertIsInstance(result, RuntimeError)
+    self.assertRegex(str(result), 'closed')
+    self.assertEmpty(task.inputs)
+
+  def test_fails_with_invalid_options(self):
+    with self.assertRaisesRegex(ValueError, 'task instance'):
+      batching.DynamicBatcher([], _infer)
+    with self.assertRaisesRegex(ValueError, 'max_batch_size'):
+      batching.DynamicBatcher([_FakeTask()], _infer,
+                              batching.BatchingOptions(max_batch_size=0))
+    with self.assertRaisesRegex(ValueError, 'max_wait_ms'):
+      batching.DynamicBatcher([_FakeTask()], _infer,
+                              batching.BatchingOptions(max_wait_ms=-1))
+
+  def test_submit_fails_if_not_started(self):
+    batcher = batching.DynamicBatcher([_FakeTask()], _infer)
+
+    with self.assertRaisesRegex(RuntimeError, 'not running'):
+      _run(batcher.submit('text'))
+
+
+if __name__ == '__main__':
+  tf.test.main()
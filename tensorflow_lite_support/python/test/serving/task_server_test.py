@@ -0,0 +1,252 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for task_server."""
+
+import asyncio
+import base64
+import concurrent.futures
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+
+import tensorflow as tf
+
+from tensorflow_lite_support.python.serving import batching
+from tensorflow_lite_support.python.serving import task_server
+from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.processor.proto import search_options_pb2
+from tensorflow_lite_support.python.task.text import text_embedder
+from tensorflow_lite_support.python.test import test_util
+
+_BaseOptions = base_options_module.BaseOptions
+_ModelConfig = task_server.ModelConfig
+_SearchOptions = search_options_pb2.SearchOptions
+
+_IMAGE_CLASSIFIER_MODEL = 'mobilenet_v2_1.0_224.tflite'
+_TEXT_EMBEDDER_MODEL = 'regex_one_embedding_with_metadata.tflite'
+_TEXT_SEARCHER_MODEL = 'regex_searcher.tflite'
+_TEXT_INDEX = 'regex_index.ldb'
+_IMAGE_FILE = 'burger.jpg'
+_TEXT = "it's a charming and often affecting journey"
+
+
+class TaskServerTest(tf.test.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.text_embedder_path = test_util.get_test_data_path(_TEXT_EMBEDDER_MODEL)
+    models = [
+        _ModelConfig(
+            name='classifier',
+            task='image_classifier',
+            base_options=_BaseOptions(
+                file_name=test_util.get_test_data_path(
+                    _IMAGE_CLASSIFIER_MODEL))),
+        _ModelConfig(
+            name='embedder',
+            task='text_embedder',
+            base_options=_BaseOptions(file_name=self.text_embedder_path),
+            num_instances=2,
+            batching_options=batching.BatchingOptions(
+                max_batch_size=8, max_wait_ms=50)),
+        _ModelConfig(
+            name='searcher',
+            task='text_searcher',
+            base_options=_BaseOptions(
+                file_name=test_util.get_test_data_path(_TEXT_SEARCHER_MODEL))),
+        _ModelConfig(
+            name='index_searcher',
+            task='text_searcher',
+            base_options=_BaseOptions(file_name=self.text_embedder_path),
+            search_options=_SearchOptions(
+                index_file_name=test_util.get_test_data_path(_TEXT_INDEX),
+                max_results=2)),
+    ]
+    # The server runs in its own event loop, as the clients block.
+    self._loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+    thread.start()
+    self.server = task_server.TaskServer(models, binary_port=0)
+    self._run_in_loop(self.server.start())
+    self.addCleanup(thread.join)
+    self.addCleanup(self._loop.call_soon_threadsafe, self._loop.stop)
+    self.addCleanup(self._run_in_loop, self.server.stop())
+
+  def _run_in_loop(self, coroutine):
+    return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+  def _get(self, path):
+    url = f'http://127.0.0.1:{self.server.port}{path}'
+    try:
+      with urllib.request.urlopen(url) as response:
+        return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+      return e.code, json.loads(e.read())
+
+  def _infer(self, model, request):
+    url = f'http://127.0.0.1:{self.server.port}/v1/models/{model}:infer'
+    http_request = urllib.request.Request(
+        url,
+        data=json.dumps(request).encode('utf-8'),
+        headers={'Content-Type': 'application/json'})
+    try:
+      with urllib.request.urlopen(http_request) as response:
+        return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+      return e.code, json.loads(e.read())
+
+  def test_healthz(self):
+    self.assertEqual(self._get('/healthz'), (200, {'status': 'serving'}))
+
+  def test_list_models(self):
+    status, response = self._get('/v1/models')
+
+    self.assertEqual(status, 200)
+    self.assertEqual([model['name'] for model in response['models']],
+                     ['classifier', 'embedder', 'searcher', 'index_searcher'])
+    self.assertEqual(response['models'][1]['num_instances'], 2)
+
+  def test_classify_image_over_http(self):
+    with open(test_util.get_test_data_path(_IMAGE_FILE), 'rb') as f:
+      image = base64.b64encode(f.read()).decode('ascii')
+
+    status, response = self._infer('classifier', {'image': image})
+
+    self.assertEqual(status, 200)
+    top_class = response['classifications'][0]['classes'][0]
+    self.assertEqual(top_class['index'], 934)
+    self.assertEqual(top_class['class_name'], 'cheeseburger')
+
+  def test_search_text_over_http(self):
+    status, response = self._infer('searcher', {'text': _TEXT})
+
+    self.assertEqual(status, 200)
+    self.assertNotEmpty(response['nearest_neighbors'])
+
+  def test_search_text_in_index_file(self):
+    status, response = self._infer('index_searcher', {'text': _TEXT})
+
+    self.assertEqual(status, 200)
+    self.assertLen(response['nearest_neighbors'], 2)
+
+  def test_embed_text_over_binary_protocol(self):
+    embedder = text_embedder.TextEmbedder.create_from_file(
+        self.text_embedder_path)
+    expected_result = embedder.embed(_TEXT).to_pb2()
+    name = b'embedder'
+    text = _TEXT.encode('utf-8')
+
+    with socket.create_connection(('127.0.0.1', self.server.binary_port)) as s:
+      s.sendall(
+          task_server.FRAME_HEADER.pack(7, len(name), len(text)) + name + text)
+      reader = s.makefile('rb')
+      request_id, status, length = task_server.FRAME_HEADER.unpack(
+          reader.read(task_server.FRAME_HEADER.size))
+      output = reader.read(length)
+
+    self.assertEqual((request_id, status), (7, 200))
+    self.assertProtoEquals(expected_result,
+                           type(expected_result).FromString(output))
+
+  def test_binary_protocol_rejects_oversized_requests(self):
+    name = b'embedder'
+
+    with socket.create_connection(('127.0.0.1', self.server.binary_port)) as s:
+      # The input is not sent, as the server closes the connection first.
+      s.sendall(task_server.FRAME_HEADER.pack(7, len(name), 2**31) + name)
+      reader = s.makefile('rb')
+      request_id, status, length = task_server.FRAME_HEADER.unpack(
+          reader.read(task_server.FRAME_HEADER.size))
+      output = reader.read(length)
+      remaining = reader.read()
+
+    self.assertEqual((request_id, status), (7, 413))
+    self.assertIn(b'Expected at most', output)
+    self.assertEmpty(remaining)
+
+  def test_batches_concurrent_requests(self):
+    num_requests = 16
+    with concurrent.futures.ThreadPoolExecutor(num_requests) as executor:
+      responses = list(
+          executor.map(lambda i: self._infer('embedder', {'text': f'{i}'}),
+                       range(num_requests)))
+
+    for status, _ in responses:
+      self.assertEqual(status, 200)
+    status, metrics = self._get('/metrics')
+    self.assertEqual(status, 200)
+    stats = metrics['models']['embedder']
+    self.assertEqual(stats['num_requests'], num_requests)
+    self.assertEqual(stats['num_errors'], 0)
+    self.assertLess(stats['num_batches'], num_requests)
+    self.assertGreater(stats['mean_batch_size'], 1)
+
+  def test_infer_fails_with_invalid_requests(self):
+    self.assertEqual(self._infer('unknown', {'text': _TEXT})[0], 404)
+    self.assertEqual(self._infer('embedder', {'image': _TEXT})[0], 400)
+    self.assertEqual(self._infer('classifier', {'image': 'not base64!'})[0],
+                     400)
+    self.assertEqual(self._get('/v1/models/embedder:infer')[0], 405)
+    self.assertEqual(self._get('/unknown')[0], 404)
+
+  def test_create_fails_with_invalid_models(self):
+    base_options = _BaseOptions(file_name=self.text_embedder_path)
+    with self.assertRaisesRegex(ValueError, 'Unknown task'):
+      task_server.TaskServer(
+          [_ModelConfig(name='a', task='unknown', base_options=base_options)])
+    with self.assertRaisesRegex(ValueError, 'Duplicate model name'):
+      task_server.TaskServer([
+          _ModelConfig(
+              name='a', task='text_embedder', base_options=base_options),
+          _ModelConfig(
+              name='a', task='text_embedder', base_options=base_options)
+      ])
+    with self.assertRaisesRegex(ValueError, 'Unexpected search_options'):
+      task_server.TaskServer([
+          _ModelConfig(
+              name='a',
+              task='text_embedder',
+              base_options=base_options,
+              search_options=_SearchOptions())
+      ])
+    with self.assertRaisesRegex(ValueError, 'lazy_metadata'):
+      task_server.TaskServer([
+          _ModelConfig(
+              name='a',
+              task='text_searcher',
+              base_options=base_options,
+              search_options=_SearchOptions(lazy_metadata=True))
+      ])
+
+  def test_parse_model_flag(self):
+    config = task_server.parse_model_flag(
+        'embedder:text_embedder:/tmp/model.tflite',
+        _BaseOptions(num_threads=2),
+        num_instances=3)
+
+    self.assertEqual(config.name, 'embedder')
+    self.assertEqual(config.task, 'text_embedder')
+    self.assertEqual(config.base_options.file_name, '/tmp/model.tflite')
+    self.assertEqual(config.base_options.num_threads, 2)
+    self.assertEqual(config.num_instances, 3)
+    with self.assertRaisesRegex(ValueError, '<name>:<task>:<model file>'):
+      task_server.parse_model_flag('embedder:/tmp/model.tflite',
+                                   _BaseOptions())
+
+
+if __name__ == '__main__':
+  tf.test.main()
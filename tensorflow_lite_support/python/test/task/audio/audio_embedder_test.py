@@ -62,7 +62,7 @@ class AudioEmbedderTest(parameterized.TestCase, tf.test.TestCase):
     with self.assertRaisesRegex(
         ValueError,
         r"ExternalFile must specify at least one of 'file_content', "
-        r"'file_name' or 'file_descriptor_meta'."):
+        r"'file_name', 'file_descriptor_meta' or 'file_pointer_meta'."):
       options = _AudioEmbedderOptions(_BaseOptions(file_name=""))
       _AudioEmbedder.create_from_options(options)
 
@@ -0,0 +1,322 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for inference_timing."""
+
+import math
+import threading
+import time
+
+import tensorflow as tf
+
+from tensorflow_lite_support.python.task.core import inference_timing
+
+_CPP_TIMING = {'preprocess': 1e-3, 'invoke': 5e-3, 'postprocess': 2e-3}
+_CPP_LOAD_TIMING = {
+    'model_read': 1e-3,
+    'model_verification': 2e-3,
+    'interpreter_build': 3e-3,
+}
+
+
+class _FakeCppTask(object):
+  """Fake of the pybind11 wrapper of a C++ task."""
+
+  def __init__(self):
+    self.timing_enabled = False
+    self.op_profiling_enabled = False
+    self.first_invoke = None
+    self.inference_timeout = None
+    self.cancelled = False
+    self.num_running_inferences = 0
+    self.max_running_inferences = 0
+    self.inference_started = threading.Event()
+
+  def set_inference_timing_enabled(self, enabled, profile_ops):
+    self.timing_enabled = enabled
+    self.op_profiling_enabled = profile_ops
+
+  def get_last_inference_timing(self):
+    return _CPP_TIMING
+
+  def get_op_profile(self):
+    return 'op profile' if self.op_profiling_enabled else ''
+
+  def warmup(self, num_iterations):
+    if num_iterations < 1:
+      raise ValueError('Expected num_iterations > 0')
+    self.first_invoke = self.first_invoke or 4e-3
+
+  def get_load_timing(self):
+    return dict(_CPP_LOAD_TIMING, first_invoke=self.first_invoke)
+
+  def set_inference_timeout(self, timeout):
+    self.inference_timeout = timeout
+
+  def cancel(self):
+    self.cancelled = True
+
+  def classify(self, text):
+    if text == 'slow' and self.inference_timeout is not None:
+      raise inference_timing.InferenceTimeoutError(
+          'Invoke() exceeded its deadline.')
+    self.num_running_inferences += 1
+    self.max_running_inferences = max(self.max_running_inferences,
+                                      self.num_running_inferences)
+    self.inference_started.set()
+    # Releases the GIL, as the C++ tasks do during inference.
+    time.sleep(0.2 if text == 'long' else 1e-3)
+    self.num_running_inferences -= 1
+    if self.inference_timeout is None:
+      return text.upper()
+    # The remaining budget of the inference, at most its whole timeout.
+    return text.upper() + str(math.ceil(self.inference_timeout))
+
+
+class _FakeTask(inference_timing.InferenceTimingMixin):
+
+  def __init__(self):
+    self.cpp_task = _FakeCppTask()
+    self._timer = inference_timing.InferenceTimer(self.cpp_task)
+
+  def classify(self, text, timeout=None):
+    return self._timer.run(
+        lambda result: result + '!',
+        self.cpp_task.classify,
+        text,
+        timeout=timeout)
+
+
+class StageHistogramTest(tf.test.TestCase):
+
+  def test_empty_histogram(self):
+    histogram = inference_timing.StageHistogram()
+
+    self.assertEqual(histogram.count, 0)
+    self.assertEqual(histogram.min, 0)
+    self.assertEqual(histogram.mean, 0)
+    self.assertEqual(histogram.percentile(50), 0)
+
+  def test_summary(self):
+    histogram = inference_timing.StageHistogram()
+    for duration in (1e-3, 2e-3, 3e-3, 1.0):
+      histogram.record(duration)
+
+    self.assertEqual(histogram.count, 4)
+    self.assertAlmostEqual(histogram.sum, 1.006)
+    self.assertEqual(histogram.min, 1e-3)
+    self.assertEqual(histogram.max, 1.0)
+    self.assertAlmostEqual(histogram.mean, 0.2515)
+
+  def test_percentiles_are_accurate_to_a_factor_of_two(self):
+    histogram = inference_timing.StageHistogram()
+    for duration in (1e-3, 2e-3, 3e-3, 1.0):
+      histogram.record(duration)
+
+    self.assertBetween(histogram.percentile(50), 2e-3, 4e-3)
+    self.assertEqual(histogram.percentile(100), 1.0)
+
+  def test_cumulative_buckets(self):
+    histogram = inference_timing.StageHistogram()
+    histogram.record(1e-6)
+    histogram.record(100.0)
+
+    buckets = histogram.buckets
+    self.assertEqual(buckets[0], (1e-6, 1))
+    self.assertEqual(buckets[-2][1], 1)
+    self.assertEqual(buckets[-1], (float('inf'), 2))
+
+
+class InferenceTimingMixinTest(tf.test.TestCase):
+
+  def test_timing_is_disabled_by_default(self):
+    task = _FakeTask()
+
+    self.assertEqual(task.classify('a'), 'A!')
+    self.assertIsNone(task.last_timing)
+    self.assertEqual(task.stats().num_inferences, 0)
+    self.assertFalse(task.cpp_task.timing_enabled)
+
+  def test_records_timing_when_enabled(self):
+    task = _FakeTask()
+    task.set_timing_enabled()
+
+    self.assertEqual(task.classify('a'), 'A!')
+    task.classify('b')
+
+    self.assertTrue(task.cpp_task.timing_enabled)
+    timing = task.last_timing
+    self.assertEqual(timing.preprocess, _CPP_TIMING['preprocess'])
+    self.assertEqual(timing.invoke, _CPP_TIMING['invoke'])
+    self.assertEqual(timing.postprocess, _CPP_TIMING['postprocess'])
+    self.assertGreaterEqual(timing.conversion, 0)
+    self.assertGreaterEqual(timing.create_from_pb2, 0)
+    self.assertGreaterEqual(timing.total, sum(_CPP_TIMING.values()))
+    stats = task.stats()
+    self.assertEqual(stats.num_inferences, 2)
+    self.assertEqual(stats['invoke'].count, 2)
+    self.assertEqual(stats.to_dict()['invoke']['max'], _CPP_TIMING['invoke'])
+    self.assertIn('invoke', str(stats))
+
+  def test_enabling_timing_resets_stats(self):
+    task = _FakeTask()
+    task.set_timing_enabled()
+    task.classify('a')
+
+    task.set_timing_enabled()
+
+    self.assertIsNone(task.last_timing)
+    self.assertEqual(task.stats().num_inferences, 0)
+
+  def test_op_profile(self):
+    task = _FakeTask()
+    self.assertEqual(task.op_profile(), '')
+
+    task.set_timing_enabled(profile_ops=True)
+
+    self.assertEqual(task.op_profile(), 'op profile')
+
+  def test_load_timing(self):
+    task = _FakeTask()
+
+    timing = task.load_timing
+
+    self.assertEqual(timing.model_read, _CPP_LOAD_TIMING['model_read'])
+    self.assertEqual(timing.model_verification,
+                     _CPP_LOAD_TIMING['model_verification'])
+    self.assertEqual(timing.interpreter_build,
+                     _CPP_LOAD_TIMING['interpreter_build'])
+    self.assertIsNone(timing.first_invoke)
+    self.assertAlmostEqual(timing.total, 6e-3)
+
+  def test_warmup_records_first_invoke(self):
+    task = _FakeTask()
+
+    task.warmup(iterations=3)
+
+    self.assertEqual(task.load_timing.first_invoke, 4e-3)
+    self.assertAlmostEqual(task.load_timing.total, 10e-3)
+
+  def test_warmup_fails_with_invalid_iterations(self):
+    task = _FakeTask()
+
+    with self.assertRaisesRegex(ValueError, 'num_iterations'):
+      task.warmup(iterations=0)
+
+
+class InferenceDeadlineTest(tf.test.TestCase):
+
+  def test_timeout_only_applies_to_its_inference(self):
+    task = _FakeTask()
+
+    self.assertEqual(task.classify('a', timeout=2), 'A2!')
+    self.assertEqual(task.classify('a'), 'A!')
+    self.assertIsNone(task.cpp_task.inference_timeout)
+
+  def test_timeout_error(self):
+    task = _FakeTask()
+
+    with self.assertRaises(TimeoutError):
+      task.classify('slow', timeout=1)
+
+    self.assertIsNone(task.cpp_task.inference_timeout)
+    self.assertEqual(task.classify('slow'), 'SLOW!')
+
+  def test_timeout_error_is_a_cancelled_error(self):
+    self.assertTrue(
+        issubclass(inference_timing.InferenceTimeoutError,
+                   inference_timing.InferenceCancelledError))
+    self.assertTrue(
+        issubclass(inference_timing.InferenceCancelledError, RuntimeError))
+
+  def test_fails_with_invalid_timeout(self):
+    task = _FakeTask()
+
+    with self.assertRaisesRegex(ValueError, 'timeout'):
+      task.classify('a', timeout=0)
+
+  def test_cancel(self):
+    task = _FakeTask()
+
+    task.cancel()
+
+    self.assertTrue(task.cpp_task.cancelled)
+
+
+class ConcurrentInferenceTest(tf.test.TestCase):
+
+  def test_inferences_of_a_shared_task_run_one_at_a_time(self):
+    task = _FakeTask()
+    task.set_timing_enabled()
+    results = {}
+
+    def run(thread_index):
+      results[thread_index] = [
+          task.classify('a', timeout=thread_index + 1) for _ in range(20)
+      ]
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    self.assertEqual(task.cpp_task.max_running_inferences, 1)
+    # Each inference ran with its own deadline.
+    self.assertEqual(results, {0: ['A1!'] * 20, 1: ['A2!'] * 20})
+    self.assertEqual(task.stats().num_inferences, 40)
+    self.assertIsNone(task.cpp_task.inference_timeout)
+
+  def _start_long_inference(self, task):
+    thread = threading.Thread(target=task.classify, args=('long',))
+    thread.start()
+    self.assertTrue(task.cpp_task.inference_started.wait(timeout=10))
+    return thread
+
+  def test_timeout_includes_waiting_for_other_threads(self):
+    task = _FakeTask()
+    thread = self._start_long_inference(task)
+
+    start = time.monotonic()
+    with self.assertRaises(inference_timing.InferenceTimeoutError):
+      task.classify('a', timeout=0.05)
+    elapsed = time.monotonic() - start
+    thread.join()
+
+    self.assertLess(elapsed, 0.2)
+    self.assertEqual(task.cpp_task.max_running_inferences, 1)
+    self.assertEqual(task.classify('a', timeout=1), 'A1!')
+
+  def test_deadline_is_the_remaining_timeout(self):
+    task = _FakeTask()
+    timeouts = []
+    set_inference_timeout = task.cpp_task.set_inference_timeout
+
+    def record_timeout(timeout):
+      timeouts.append(timeout)
+      set_inference_timeout(timeout)
+
+    task.cpp_task.set_inference_timeout = record_timeout
+    thread = self._start_long_inference(task)
+
+    self.assertEqual(task.classify('a', timeout=5), 'A5!')
+    thread.join()
+
+    # The C++ deadline excludes the time spent waiting for the long inference.
+    self.assertLess(timeouts[0], 5 - 0.1)
+    self.assertIsNone(timeouts[-1])
+
+
+if __name__ == '__main__':
+  tf.test.main()
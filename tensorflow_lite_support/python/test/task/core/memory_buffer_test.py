@@ -0,0 +1,89 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for memory_buffer."""
+
+import ctypes
+import mmap
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_lite_support.python.task.core import memory_buffer
+
+
+def _read(address, length):
+  return ctypes.string_at(address, length)
+
+
+class MemoryBufferTest(tf.test.TestCase):
+
+  def test_pins_whole_buffer(self):
+    data = bytearray(b'model content')
+
+    view, address = memory_buffer.pin_buffer(data)
+
+    self.assertEqual(view.nbytes, len(data))
+    self.assertEqual(_read(address, view.nbytes), b'model content')
+
+  def test_pins_region_without_copy(self):
+    data = bytearray(b'header model content')
+
+    view, address = memory_buffer.pin_buffer(data, offset=7, length=5)
+    data[7:12] = b'MODEL'
+
+    self.assertEqual(view.tobytes(), b'MODEL')
+    self.assertEqual(_read(address, 5), b'MODEL')
+
+  def test_pins_read_only_buffers(self):
+    view, address = memory_buffer.pin_buffer(b'model content', offset=6)
+
+    self.assertEqual(_read(address, view.nbytes), b'content')
+
+  def test_pins_numpy_arrays_as_bytes(self):
+    array = np.arange(4, dtype=np.int32)
+
+    view, address = memory_buffer.pin_buffer(array)
+
+    self.assertEqual(view.nbytes, 16)
+    self.assertEqual(_read(address, 16), array.tobytes())
+
+  def test_keeps_mmap_exported(self):
+    path = self.create_tempfile(content=b'model content').full_path
+    with open(path, 'r+b') as f:
+      mapped = mmap.mmap(f.fileno(), 0)
+
+    view, address = memory_buffer.pin_buffer(mapped)
+
+    self.assertEqual(_read(address, view.nbytes), b'model content')
+    with self.assertRaises(BufferError):
+      mapped.close()
+    view.release()
+    mapped.close()
+
+  def test_fails_with_non_contiguous_buffer(self):
+    array = np.arange(8, dtype=np.uint8)[::2]
+
+    with self.assertRaisesRegex(ValueError, 'C-contiguous'):
+      memory_buffer.pin_buffer(array)
+
+  def test_fails_with_invalid_region(self):
+    for offset, length in ((-1, None), (0, 0), (10, None), (4, 8)):
+      with self.subTest(offset=offset, length=length):
+        with self.assertRaisesRegex(ValueError, 'Invalid region'):
+          memory_buffer.pin_buffer(b'12345678', offset, length)
+
+
+if __name__ == '__main__':
+  tf.test.main()
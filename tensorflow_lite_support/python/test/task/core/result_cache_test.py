@@ -0,0 +1,301 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for result_cache."""
+
+import dataclasses
+import os
+import threading
+
+import tensorflow as tf
+
+from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
+from tensorflow_lite_support.python.task.core import result_cache
+
+
+class _FakeProto(object):
+  """Fake of a protobuf message."""
+
+  def __init__(self, value):
+    self.value = value
+
+  def ByteSize(self):
+    return len(self.value)
+
+  def SerializeToString(self, deterministic=False):
+    del deterministic
+    return self.value.encode('utf-8')
+
+  def ListFields(self):
+    return []
+
+
+@dataclasses.dataclass
+class _FakeOptions:
+  model: str
+
+  def to_pb2(self):
+    return _FakeProto(self.model)
+
+
+@dataclasses.dataclass
+class _FakeTaskOptions:
+  base_options: _FakeOptions
+
+
+@dataclasses.dataclass
+class _TaskOptions:
+  base_options: base_options_module.BaseOptions
+
+
+class _FakeCppTask(object):
+  """Fake of the pybind11 wrapper of a C++ task."""
+
+  def __init__(self):
+    self.num_inferences = 0
+
+  def set_inference_timing_enabled(self, enabled, profile_ops):
+    del enabled, profile_ops
+
+  def classify(self, text):
+    self.num_inferences += 1
+    return _FakeProto(text.upper())
+
+
+class _FakeTask(inference_timing.InferenceTimingMixin,
+                result_cache.ResultCacheMixin):
+
+  def __init__(self, model='model'):
+    self._options = _FakeTaskOptions(base_options=_FakeOptions(model))
+    self.cpp_task = _FakeCppTask()
+    self._timer = inference_timing.InferenceTimer(self.cpp_task)
+
+  def classify(self, text):
+    return self._run_cached(lambda result: result.value + '!',
+                            self.cpp_task.classify, text)
+
+
+class ResultCacheTest(tf.test.TestCase):
+
+  def test_evicts_least_recently_used_entries(self):
+    cache = result_cache.ResultCache(max_entries=2)
+    cache.put('a', 1, size=1)
+    cache.put('b', 2, size=1)
+    self.assertEqual(cache.get('a'), 1)
+
+    cache.put('c', 3, size=1)
+
+    self.assertIsNone(cache.get('b'))
+    self.assertEqual(cache.get('a'), 1)
+    self.assertEqual(cache.get('c'), 3)
+    self.assertEqual(
+        cache.stats,
+        result_cache.CacheStats(
+            hits=3, misses=1, evictions=1, entries=2, bytes=2))
+
+  def test_evicts_entries_to_stay_within_max_bytes(self):
+    cache = result_cache.ResultCache(max_bytes=10)
+    cache.put('a', 1, size=4)
+    cache.put('b', 2, size=4)
+
+    cache.put('c', 3, size=4)
+
+    self.assertIsNone(cache.get('a'))
+    self.assertLen(cache, 2)
+    self.assertEqual(cache.stats.bytes, 8)
+
+  def test_does_not_cache_values_larger_than_max_bytes(self):
+    cache = result_cache.ResultCache(max_bytes=10)
+    cache.put('a', 1, size=4)
+
+    cache.put('b', 2, size=11)
+
+    self.assertIsNone(cache.get('b'))
+    self.assertEqual(cache.get('a'), 1)
+    self.assertEqual(cache.stats.evictions, 0)
+
+  def test_replaces_entries(self):
+    cache = result_cache.ResultCache()
+    cache.put('a', 1, size=4)
+
+    cache.put('a', 2, size=6)
+
+    self.assertEqual(cache.get('a'), 2)
+    self.assertEqual(cache.stats.bytes, 6)
+
+  def test_estimates_sizes(self):
+    cache = result_cache.ResultCache()
+
+    cache.put('a', _FakeProto('value'))
+
+    self.assertEqual(cache.stats.bytes, 5)
+
+  def test_clear(self):
+    cache = result_cache.ResultCache()
+    cache.put('a', 1, size=1)
+    cache.get('a')
+
+    cache.clear()
+
+    self.assertEqual(
+        cache.stats,
+        result_cache.CacheStats(
+            hits=0, misses=0, evictions=0, entries=0, bytes=0))
+
+  def test_fails_with_invalid_bounds(self):
+    with self.assertRaisesRegex(ValueError, 'max_entries'):
+      result_cache.ResultCache(max_entries=0)
+    with self.assertRaisesRegex(ValueError, 'max_bytes'):
+      result_cache.ResultCache(max_bytes=0)
+
+  def test_concurrent_access(self):
+    cache = result_cache.ResultCache(max_entries=16)
+
+    def run():
+      for i in range(1000):
+        cache.put(i % 32, i, size=1)
+        cache.get((i + 1) % 32)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    stats = cache.stats
+    self.assertEqual(stats.hits + stats.misses, 4000)
+    self.assertEqual(stats.entries, 16)
+    self.assertEqual(stats.bytes, 16)
+
+  def test_normalize_text(self):
+    self.assertEqual(
+        result_cache.normalize_text('  Café \t au\n lait '),
+        'Café au lait')
+
+
+class ResultCacheMixinTest(tf.test.TestCase):
+
+  def test_cache_is_disabled_by_default(self):
+    task = _FakeTask()
+
+    self.assertEqual(task.classify('a'), 'A!')
+    self.assertEqual(task.classify('a'), 'A!')
+
+    self.assertIsNone(task.result_cache)
+    self.assertEqual(task.cpp_task.num_inferences, 2)
+
+  def test_caches_results_by_exact_text(self):
+    task = _FakeTask()
+    cache = result_cache.ResultCache()
+    task.set_result_cache(cache)
+
+    self.assertEqual(task.classify('a b'), 'A B!')
+    self.assertEqual(task.classify('a b'), 'A B!')
+    self.assertEqual(task.classify(' a  b '), ' A  B !')
+
+    self.assertEqual(task.cpp_task.num_inferences, 2)
+    self.assertEqual(cache.stats.hits, 1)
+    self.assertEqual(cache.stats.misses, 2)
+
+  def test_caches_results_by_normalized_text(self):
+    task = _FakeTask()
+    cache = result_cache.ResultCache()
+    task.set_result_cache(cache, normalize_inputs=True)
+
+    self.assertEqual(task.classify('a b'), 'A B!')
+    self.assertEqual(task.classify(' a  b '), 'A B!')
+
+    self.assertEqual(task.cpp_task.num_inferences, 1)
+    self.assertEqual(cache.stats.hits, 1)
+    self.assertEqual(cache.stats.misses, 1)
+
+  def test_shared_cache_keys_results_by_normalization(self):
+    cache = result_cache.ResultCache()
+    task = _FakeTask()
+    normalizing_task = _FakeTask()
+    task.set_result_cache(cache)
+    normalizing_task.set_result_cache(cache, normalize_inputs=True)
+
+    normalizing_task.classify(' a ')
+    task.classify('a')
+
+    self.assertEqual(task.cpp_task.num_inferences, 1)
+
+  def test_shared_cache_keys_results_by_options(self):
+    cache = result_cache.ResultCache()
+    task = _FakeTask('model')
+    same_task = _FakeTask('model')
+    other_task = _FakeTask('other_model')
+    for t in (task, same_task, other_task):
+      t.set_result_cache(cache)
+
+    task.classify('a')
+    same_task.classify('a')
+    other_task.classify('a')
+
+    self.assertEqual(same_task.cpp_task.num_inferences, 0)
+    self.assertEqual(other_task.cpp_task.num_inferences, 1)
+    self.assertEqual(cache.stats.entries, 2)
+
+  def test_disabling_the_cache(self):
+    task = _FakeTask()
+    task.set_result_cache(result_cache.ResultCache())
+    task.classify('a')
+
+    task.set_result_cache(None)
+    task.classify('a')
+
+    self.assertEqual(task.cpp_task.num_inferences, 2)
+
+
+class OptionsFingerprintTest(tf.test.TestCase):
+
+  def _fingerprint(self, **kwargs):
+    options = _TaskOptions(base_options_module.BaseOptions(**kwargs))
+    return result_cache.options_fingerprint(_FakeTask(), options)
+
+  def _open(self, content):
+    fd = os.open(self.create_tempfile(content=content).full_path, os.O_RDONLY)
+    self.addCleanup(os.close, fd)
+    return fd
+
+  def test_identifies_files_by_content_not_descriptor(self):
+    model_file = self.create_tempfile(content='model').full_path
+    fd = os.open(model_file, os.O_RDONLY)
+    self.addCleanup(os.close, fd)
+    other_fd = os.open(model_file, os.O_RDONLY)
+    self.addCleanup(os.close, other_fd)
+
+    self.assertEqual(
+        self._fingerprint(file_descriptor=fd),
+        self._fingerprint(file_descriptor=other_fd))
+    self.assertNotEqual(
+        self._fingerprint(file_descriptor=fd),
+        self._fingerprint(file_descriptor=self._open('other model')))
+
+  def test_identifies_buffers_by_content_not_address(self):
+    self.assertEqual(
+        self._fingerprint(file_content=bytearray(b'model')),
+        self._fingerprint(file_content=bytearray(b'model')))
+    self.assertNotEqual(
+        self._fingerprint(file_content=bytearray(b'model')),
+        self._fingerprint(file_content=bytearray(b'other model')))
+    self.assertNotEqual(
+        self._fingerprint(file_content=memoryview(b'model'), file_length=2),
+        self._fingerprint(file_content=memoryview(b'model')))
+
+
+if __name__ == '__main__':
+  tf.test.main()
@@ -103,7 +103,7 @@ class BertCLUAnnotatorTest(parameterized.TestCase, tf.test.TestCase):
     with self.assertRaisesRegex(
         ValueError,
         r"ExternalFile must specify at least one of 'file_content', "
-        r"'file_name' or 'file_descriptor_meta'."):
+        r"'file_name', 'file_descriptor_meta' or 'file_pointer_meta'."):
       base_options = _BaseOptions(file_name='')
       options = _BertCluAnnotatorOptions(base_options=base_options)
       _BertCluAnnotator.create_from_options(options)
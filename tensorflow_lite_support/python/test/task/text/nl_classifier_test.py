@@ -19,6 +19,7 @@ from absl.testing import parameterized
 import tensorflow as tf
 
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import result_cache
 from tensorflow_lite_support.python.task.processor.proto import class_pb2
 from tensorflow_lite_support.python.task.processor.proto import classification_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import classifications_pb2
@@ -102,7 +103,7 @@ class NLClassifierTest(parameterized.TestCase, tf.test.TestCase):
     with self.assertRaisesRegex(
         ValueError,
         r"ExternalFile must specify at least one of 'file_content', "
-        r"'file_name' or 'file_descriptor_meta'."):
+        r"'file_name', 'file_descriptor_meta' or 'file_pointer_meta'."):
       base_options = _BaseOptions(file_name='')
       options = _NLClassifierOptions(base_options=base_options)
       _NLClassifier.create_from_options(options)
@@ -146,6 +147,26 @@ class NLClassifierTest(parameterized.TestCase, tf.test.TestCase):
     self.assertProtoEquals(text_classification_result.to_pb2(),
                            expected_classification_result.to_pb2())
 
+  def test_classify_with_result_cache(self):
+    classifier = _NLClassifier.create_from_file(self.model_path)
+    cache = result_cache.ResultCache(max_entries=1)
+    classifier.set_result_cache(cache, normalize_inputs=True)
+
+    first_result = classifier.classify(_POSITIVE_INPUT)
+    # Equal after normalizing the whitespaces, so the result is cached.
+    second_result = classifier.classify('  ' + _POSITIVE_INPUT + '\n')
+    classifier.classify(_NEGATIVE_INPUT)
+
+    self.assertProtoEquals(first_result.to_pb2(),
+                           _EXPECTED_RESULTS_OF_POSITIVE_INPUT.to_pb2())
+    self.assertEqual(second_result, first_result)
+    self.assertIsNot(second_result, first_result)
+    stats = cache.stats
+    self.assertEqual(stats.hits, 1)
+    self.assertEqual(stats.misses, 2)
+    self.assertEqual(stats.evictions, 1)
+    self.assertEqual(stats.entries, 1)
+
 
 if __name__ == '__main__':
   tf.test.main()
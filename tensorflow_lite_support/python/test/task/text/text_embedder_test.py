@@ -59,7 +59,7 @@ class TextEmbedderTest(parameterized.TestCase, tf.test.TestCase):
     with self.assertRaisesRegex(
         ValueError,
         r"ExternalFile must specify at least one of 'file_content', "
-        r"'file_name' or 'file_descriptor_meta'."):
+        r"'file_name', 'file_descriptor_meta' or 'file_pointer_meta'."):
       options = _TextEmbedderOptions(_BaseOptions(file_name=""))
       _TextEmbedder.create_from_options(options)
 
@@ -129,6 +129,21 @@ class TextEmbedderTest(parameterized.TestCase, tf.test.TestCase):
         result1.embeddings[0].feature_vector)
     self.assertAlmostEqual(similarity, expected_similarity, places=4)
 
+    # Checks batch similarities.
+    embeddings = np.stack(
+        [result0_feature_vector.value, result1_feature_vector.value])
+    similarity_matrix = embedder.similarity_matrix(embeddings, embeddings)
+    self.assertEqual(similarity_matrix.shape, (2, 2))
+    self.assertEqual(similarity_matrix.dtype, np.float32)
+    self.assertAlmostEqual(
+        similarity_matrix[0, 1], expected_similarity, places=4)
+    self.assertAlmostEqual(
+        similarity_matrix[1, 0], expected_similarity, places=4)
+    indices, scores = embedder.similarity_matrix(
+        embeddings, embeddings, top_k=1)
+    np.testing.assert_array_equal(indices, [[0], [1]])
+    np.testing.assert_allclose(scores, [[1.0], [1.0]], rtol=1e-5)
+
   def test_get_embedding_dimension(self):
     options = _TextEmbedderOptions(_BaseOptions(file_name=self.model_path))
     embedder = _TextEmbedder.create_from_options(options)
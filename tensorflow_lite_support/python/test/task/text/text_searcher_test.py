@@ -13,20 +13,27 @@
 # limitations under the License.
 """Tests for text_searcher."""
 
+import dataclasses
 import enum
+import os
 
 from absl.testing import parameterized
+import numpy as np
 
 import tensorflow as tf
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
 from tensorflow_lite_support.python.task.processor.proto import embedding_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import search_options_pb2
 from tensorflow_lite_support.python.task.processor.proto import search_result_pb2
+from tensorflow_lite_support.python.task.text import text_embedder
 from tensorflow_lite_support.python.task.text import text_searcher
 from tensorflow_lite_support.python.test import test_util
+from tensorflow_lite_support.scann_ondevice.cc.core import serialized_searcher_pb2
+from tensorflow_lite_support.scann_ondevice.cc.python import index_builder
 
 _BaseOptions = base_options_module.BaseOptions
 _EmbeddingOptions = embedding_options_pb2.EmbeddingOptions
+_AttributeFilter = search_options_pb2.AttributeFilter
 _SearchOptions = search_options_pb2.SearchOptions
 _SearchResult = search_result_pb2.SearchResult
 _NearestNeighbor = search_result_pb2.NearestNeighbor
@@ -110,6 +117,16 @@ _EXPECTED_USE_SEARCH_RESULT = _SearchResult(nearest_neighbors=[
 
 _MAX_RESULTS = 2
 
+# The texts of the indices built by the tests. Their attribute is their position
+# in the list.
+_INDEX_TEXTS = [
+    'The weather was excellent.',
+    'It was a sunny day.',
+    'The sun was shining on that day.',
+    'The cat is chasing after the mouse.',
+    'He was very happy with his newly bought car.',
+]
+
 
 class ModelFileType(enum.Enum):
   FILE_CONTENT = 1
@@ -201,7 +218,7 @@ class TextSearcherTest(parameterized.TestCase, tf.test.TestCase):
     with self.assertRaisesRegex(
         ValueError,
         r"ExternalFile must specify at least one of 'file_content', "
-        r"'file_name' or 'file_descriptor_meta'."):
+        r"'file_name', 'file_descriptor_meta' or 'file_pointer_meta'."):
       options = _TextSearcherOptions(
           base_options=_BaseOptions(file_name=''),
           search_options=_SearchOptions(index_file_name=self.index_path))
@@ -341,6 +358,153 @@ class TextSearcherTest(parameterized.TestCase, tf.test.TestCase):
     self.assertLessEqual(
         len(nearest_neighbors), _MAX_RESULTS, 'Too many results returned.')
 
+  def test_lazy_metadata_option(self):
+    # Create searcher.
+    base_options = _BaseOptions(file_name=self.embedder_model_path)
+    search_options = _SearchOptions(
+        index_file_name=self.index_path, lazy_metadata=True)
+    options = _TextSearcherOptions(
+        base_options, _EmbeddingOptions(l2_normalize=True, quantize=False),
+        search_options)
+    searcher = _TextSearcher.create_from_options(options)
+
+    # Perform text search.
+    lazy_search_result = searcher.search('The weather was excellent.')
+    self.assertIsInstance(lazy_search_result, search_result_pb2.LazySearchResult)
+    self.assertLen(lazy_search_result, 5)
+
+    # Fetch metadata individually and in bulk, and compare results.
+    self.assertEqual(
+        lazy_search_result.get_metadata(0),
+        bytes(_EXPECTED_REGEX_SEARCH_RESULT.nearest_neighbors[0].metadata))
+    self.assertEqual(
+        searcher.get_metadata_batch(lazy_search_result.indices),
+        lazy_search_result.get_all_metadata())
+    self.assertProtoEquals(lazy_search_result.to_search_result().to_pb2(),
+                           _EXPECTED_REGEX_SEARCH_RESULT.to_pb2())
+
+  def _create_index(self, indices):
+    """Returns the content of an index of the `_INDEX_TEXTS` at `indices`."""
+    embedder = text_embedder.TextEmbedder.create_from_options(
+        text_embedder.TextEmbedderOptions(
+            _BaseOptions(file_name=self.embedder_model_path),
+            _EmbeddingOptions(l2_normalize=True)))
+    embeddings = [
+        embedder.embed(_INDEX_TEXTS[i]).embeddings[0].feature_vector.value
+        for i in indices
+    ]
+    config = serialized_searcher_pb2.ScannOnDeviceConfig(
+        query_distance=serialized_searcher_pb2.SQUARED_L2_DISTANCE)
+    return index_builder.create_serialized_index_file(
+        embedding_dim=len(embeddings[0]),
+        serialized_config=config.SerializeToString(),
+        userinfo='',
+        partition_assignment=[],
+        metadata=[_INDEX_TEXTS[i] for i in indices],
+        compression=False,
+        float_database=np.concatenate(embeddings).astype(np.float32).tolist(),
+        attributes=list(indices))
+
+  def _search(self, search_options):
+    options = _TextSearcherOptions(
+        _BaseOptions(file_name=self.embedder_model_path),
+        _EmbeddingOptions(l2_normalize=True), search_options)
+    searcher = _TextSearcher.create_from_options(options)
+    return searcher.search('The weather was excellent.')
+
+  @parameterized.parameters(
+      (_AttributeFilter(allowed_values=[1, 3]), [1, 3]),
+      (_AttributeFilter(none_of_bits=1), [0, 2, 4]),
+      (_AttributeFilter(all_of_bits=2, any_of_bits=1), [3]),
+  )
+  def test_search_with_attribute_filter(self, attribute_filter,
+                                        expected_indices):
+    text_search_result = self._search(
+        _SearchOptions(
+            index_file_content=self._create_index(range(len(_INDEX_TEXTS))),
+            attribute_filter=attribute_filter))
+
+    self.assertCountEqual(
+        [bytes(neighbor.metadata)
+         for neighbor in text_search_result.nearest_neighbors],
+        [_INDEX_TEXTS[i].encode('utf-8') for i in expected_indices])
+
+  @parameterized.parameters(
+      (_AttributeFilter(),),
+      (_AttributeFilter(allowed_values=[1, 2]),),
+      (_AttributeFilter(all_of_bits=0, none_of_bits=4),),
+      (_AttributeFilter(any_of_bits=3),),
+  )
+  def test_attribute_filter_round_trip(self, attribute_filter):
+    round_trip = _AttributeFilter.create_from_pb2(attribute_filter.to_pb2())
+
+    self.assertEqual(
+        dataclasses.astuple(round_trip), dataclasses.astuple(attribute_filter))
+
+  @parameterized.parameters((None,), (1,), (2,))
+  def test_search_with_index_shard_file_names(self, num_threads):
+    # Even texts go in the first shard, odd texts in the second one.
+    shard_file_names = []
+    for name, indices in (('even.ldb', range(0, len(_INDEX_TEXTS), 2)),
+                          ('odd.ldb', range(1, len(_INDEX_TEXTS), 2))):
+      shard_file_names.append(
+          self.create_tempfile(
+              name, content=self._create_index(indices)).full_path)
+
+    text_search_result = self._search(
+        _SearchOptions(
+            index_shard_file_names=shard_file_names, num_threads=num_threads))
+
+    # The results of the shards are merged.
+    expected_search_result = self._search(
+        _SearchOptions(
+            index_file_content=self._create_index(range(len(_INDEX_TEXTS)))))
+    self.assertProtoEquals(text_search_result.to_pb2(),
+                           expected_search_result.to_pb2())
+
+  def test_create_from_shard_manifest(self):
+    temp_dir = self.create_tempdir()
+    temp_dir.create_file('index_1.ldb', content=self._create_index([0, 1, 2]))
+    temp_dir.create_file('index_2.ldb', content=self._create_index([3, 4]))
+    manifest = temp_dir.create_file(
+        'manifest.txt', content='# Index shards.\nindex_1.ldb\n\nindex_2.ldb\n')
+
+    search_options = _SearchOptions.create_from_shard_manifest(
+        manifest.full_path, max_results=3)
+
+    self.assertEqual(search_options.index_shard_file_names, [
+        os.path.join(temp_dir.full_path, 'index_1.ldb'),
+        os.path.join(temp_dir.full_path, 'index_2.ldb')
+    ])
+    self.assertEqual(search_options.max_results, 3)
+    self.assertLen(self._search(search_options).nearest_neighbors, 3)
+
+  def test_create_from_shard_manifest_fails_without_shards(self):
+    manifest = self.create_tempfile('manifest.txt', content='# No shard.\n')
+
+    with self.assertRaisesRegex(ValueError, 'No index shard found'):
+      _SearchOptions.create_from_shard_manifest(manifest.full_path)
+
+  @parameterized.parameters(
+      (_SearchOptions(),),
+      (_SearchOptions(
+          index_shard_file_names=['a.ldb', 'b.ldb'],
+          num_threads=2,
+          num_leaves_to_search=4,
+          lazy_metadata=True,
+          attribute_filter=_AttributeFilter(allowed_values=[1])),),
+  )
+  def test_search_options_round_trip(self, search_options):
+    round_trip = _SearchOptions.create_from_pb2(search_options.to_pb2())
+
+    self.assertEqual(round_trip.index_shard_file_names,
+                     search_options.index_shard_file_names)
+    self.assertEqual(round_trip.num_threads, search_options.num_threads)
+    self.assertEqual(round_trip.num_leaves_to_search,
+                     search_options.num_leaves_to_search)
+    self.assertEqual(round_trip.lazy_metadata, search_options.lazy_metadata)
+    self.assertEqual(round_trip, search_options)
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -14,11 +14,15 @@
 """Tests for image_classifier."""
 
 import enum
+import mmap
+import os
 
 from absl.testing import parameterized
 import tensorflow as tf
 
 from tensorflow_lite_support.python.task.core import base_options as base_options_module
+from tensorflow_lite_support.python.task.core import inference_timing
+from tensorflow_lite_support.python.task.core import model_cache
 from tensorflow_lite_support.python.task.processor.proto import bounding_box_pb2
 from tensorflow_lite_support.python.task.processor.proto import class_pb2
 from tensorflow_lite_support.python.task.processor.proto import classification_options_pb2
@@ -102,7 +106,7 @@ class ImageClassifierTest(parameterized.TestCase, tf.test.TestCase):
     with self.assertRaisesRegex(
         ValueError,
         r"ExternalFile must specify at least one of 'file_content', "
-        r"'file_name' or 'file_descriptor_meta'."):
+        r"'file_name', 'file_descriptor_meta' or 'file_pointer_meta'."):
       base_options = _BaseOptions(file_name='')
       options = _ImageClassifierOptions(base_options=base_options)
       _ImageClassifier.create_from_options(options)
@@ -144,6 +148,91 @@ class ImageClassifierTest(parameterized.TestCase, tf.test.TestCase):
     self.assertProtoEquals(image_result.to_pb2(),
                            expected_classification_result.to_pb2())
 
+  @parameterized.parameters(('memoryview',), ('mmap',))
+  def test_classify_model_from_memory_buffer(self, buffer_type):
+    with open(self.model_path, 'rb') as f:
+      if buffer_type == 'memoryview':
+        model_buffer = memoryview(bytearray(f.read()))
+      else:
+        model_buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    base_options = _BaseOptions(file_content=model_buffer)
+    classifier = _create_classifier_from_options(base_options, max_results=3)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    image_result = classifier.classify(image)
+
+    self.assertProtoEquals(image_result.to_pb2(),
+                           _EXPECTED_CLASSIFICATION_RESULT.to_pb2())
+    # The classifier reads the model from the buffer, which can't be closed.
+    if buffer_type == 'mmap':
+      with self.assertRaises(BufferError):
+        model_buffer.close()
+
+  def test_classifiers_sharing_options_pin_their_own_model_buffer(self):
+    with open(self.model_path, 'rb') as f:
+      model_buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    base_options = _BaseOptions(file_content=model_buffer)
+    classifier = _create_classifier_from_options(base_options, max_results=3)
+    # Creating and deleting another classifier from the same options doesn't
+    # release the buffer of the first one.
+    other_classifier = _create_classifier_from_options(
+        base_options, max_results=3)
+    del other_classifier
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    image_result = classifier.classify(image)
+
+    self.assertProtoEquals(image_result.to_pb2(),
+                           _EXPECTED_CLASSIFICATION_RESULT.to_pb2())
+    with self.assertRaises(BufferError):
+      model_buffer.close()
+    # The buffer is released with the classifier.
+    del classifier
+    model_buffer.close()
+
+  @parameterized.parameters(('file_name',), ('file_descriptor',),
+                            ('file_content',))
+  def test_classify_model_embedded_in_bundle_file(self, source):
+    with open(self.model_path, 'rb') as f:
+      model_content = f.read()
+    # Keeps the model 16-byte aligned, as required by the FlatBuffer verifier.
+    header = b'bundle header'.ljust(64, b'\0')
+    bundle_path = self.create_tempfile(
+        content=header + model_content + b'footer').full_path
+    if source == 'file_name':
+      base_options = _BaseOptions(file_name=bundle_path)
+    elif source == 'file_descriptor':
+      fd = os.open(bundle_path, os.O_RDONLY)
+      self.addCleanup(os.close, fd)
+      base_options = _BaseOptions(file_descriptor=fd)
+    else:
+      with open(bundle_path, 'rb') as f:
+        base_options = _BaseOptions(file_content=memoryview(f.read()))
+    base_options.file_offset = len(header)
+    base_options.file_length = len(model_content)
+    classifier = _create_classifier_from_options(base_options, max_results=3)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    image_result = classifier.classify(image)
+
+    self.assertProtoEquals(image_result.to_pb2(),
+                           _EXPECTED_CLASSIFICATION_RESULT.to_pb2())
+
+  def test_create_from_options_fails_with_invalid_model_region(self):
+    with open(self.model_path, 'rb') as f:
+      model_content = f.read()
+    with self.assertRaisesRegex(ValueError, 'not supported'):
+      _create_classifier_from_options(
+          _BaseOptions(file_content=model_content, file_offset=0))
+    with self.assertRaisesRegex(ValueError, 'file_length'):
+      _create_classifier_from_options(
+          _BaseOptions(file_name=self.model_path, file_length=0))
+    with self.assertRaisesRegex(ValueError, 'Invalid region'):
+      _create_classifier_from_options(
+          _BaseOptions(
+              file_content=memoryview(model_content),
+              file_length=len(model_content) + 1))
+
   def test_classify_model_with_bounding_box(self):
     # Creates classifier.
     base_options = _BaseOptions(file_name=self.model_path)
@@ -276,6 +365,117 @@ class ImageClassifierTest(parameterized.TestCase, tf.test.TestCase):
           classification_options=classification_options)
       _ImageClassifier.create_from_options(options)
 
+  @parameterized.parameters(
+      (base_options_module.XnnpackSettings(),),
+      (base_options_module.XnnpackSettings(enabled=False),),
+      (base_options_module.XnnpackSettings(force_fp16=True),),
+      (base_options_module.XnnpackSettings(enable_quantized_ops=True),))
+  def test_classify_with_xnnpack_settings(self, xnnpack_settings):
+    base_options = _BaseOptions(
+        file_name=self.model_path,
+        num_threads=2,
+        xnnpack_settings=xnnpack_settings)
+    classifier = _create_classifier_from_options(base_options, max_results=1)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    image_result = classifier.classify(image)
+
+    self.assertEqual(
+        image_result.classifications[0].categories[0].category_name,
+        'cheeseburger')
+
+  def test_xnnpack_settings_fails_with_combined_flags(self):
+    with self.assertRaisesRegex(ValueError, 'mutually exclusive'):
+      base_options = _BaseOptions(
+          file_name=self.model_path,
+          xnnpack_settings=base_options_module.XnnpackSettings(
+              force_fp16=True, enable_quantized_ops=True))
+      _create_classifier_from_options(base_options)
+
+  def test_inference_timing(self):
+    classifier = _ImageClassifier.create_from_file(self.model_path)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    # Timing is disabled by default.
+    classifier.classify(image)
+    self.assertIsNone(classifier.last_timing)
+
+    classifier.set_timing_enabled(profile_ops=True)
+    image_result = classifier.classify(image)
+    classifier.classify(image)
+
+    self.assertEqual(
+        image_result.classifications[0].categories[0].category_name,
+        'cheeseburger')
+    timing = classifier.last_timing
+    self.assertGreater(timing.invoke, 0)
+    self.assertGreaterEqual(timing.total, timing.preprocess + timing.invoke)
+    self.assertEqual(classifier.stats().num_inferences, 2)
+    self.assertIn('CONV_2D', classifier.op_profile())
+
+    classifier.set_timing_enabled(False)
+    self.assertEqual(classifier.stats().num_inferences, 0)
+    self.assertEqual(classifier.op_profile(), '')
+
+  def test_warmup_and_load_timing(self):
+    classifier = _ImageClassifier.create_from_file(self.model_path)
+
+    load_timing = classifier.load_timing
+    self.assertGreater(load_timing.model_read, 0)
+    self.assertGreater(load_timing.model_verification, 0)
+    self.assertGreater(load_timing.interpreter_build, 0)
+    self.assertIsNone(load_timing.first_invoke)
+
+    classifier.warmup(iterations=2)
+
+    self.assertGreater(classifier.load_timing.first_invoke, 0)
+    # Warming up does not change the results.
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+    image_result = classifier.classify(image)
+    self.assertEqual(
+        image_result.classifications[0].categories[0].category_name,
+        'cheeseburger')
+
+  def test_share_model(self):
+    model_cache.evict_shared_models()
+    options = _ImageClassifierOptions(
+        base_options=_BaseOptions(file_name=self.model_path, share_model=True))
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    classifier = _ImageClassifier.create_from_options(options)
+    other_classifier = _ImageClassifier.create_from_options(options)
+
+    self.assertEqual(model_cache.get_shared_model_count(), 1)
+    self.assertEqual(
+        other_classifier.classify(image).to_pb2(),
+        classifier.classify(image).to_pb2())
+    # The model is used by the classifiers.
+    self.assertEqual(model_cache.evict_shared_models(unused_only=True), 0)
+
+    del classifier, other_classifier
+    self.assertEqual(model_cache.evict_shared_models(unused_only=True), 1)
+    self.assertEqual(model_cache.get_shared_model_count(), 0)
+
+  def test_warmup_fails_with_invalid_iterations(self):
+    classifier = _ImageClassifier.create_from_file(self.model_path)
+
+    with self.assertRaisesRegex(ValueError, 'num_iterations'):
+      classifier.warmup(iterations=0)
+
+  def test_classify_fails_after_timeout(self):
+    classifier = _ImageClassifier.create_from_file(self.model_path)
+    image = tensor_image.TensorImage.create_from_file(self.test_image_path)
+
+    # The deadline passes before the first op is run.
+    with self.assertRaises(inference_timing.InferenceTimeoutError):
+      classifier.classify(image, timeout=1e-9)
+
+    # The classifier can be used again, and the timeout no longer applies.
+    image_result = classifier.classify(image)
+    self.assertEqual(
+        image_result.classifications[0].categories[0].category_name,
+        'cheeseburger')
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -62,7 +62,7 @@ class ImageEmbedderTest(parameterized.TestCase, tf.test.TestCase):
     with self.assertRaisesRegex(
         ValueError,
         r"ExternalFile must specify at least one of 'file_content', "
-        r"'file_name' or 'file_descriptor_meta'."):
+        r"'file_name', 'file_descriptor_meta' or 'file_pointer_meta'."):
       base_options = _BaseOptions(file_name="")
       options = _ImageEmbedderOptions(base_options=base_options)
       _ImageEmbedder.create_from_options(options)
@@ -138,6 +138,16 @@ class ImageEmbedderTest(parameterized.TestCase, tf.test.TestCase):
                                             crop_feature_vector)
     self.assertAlmostEqual(similarity, expected_similarity, places=6)
 
+    # Checks the similarity matrix of the embeddings against each other.
+    embeddings = np.stack(
+        [image_feature_vector.value, crop_feature_vector.value])
+    similarity_matrix = embedder.similarity_matrix(embeddings, embeddings)
+    self.assertEqual(similarity_matrix.shape, (2, 2))
+    self.assertAlmostEqual(
+        similarity_matrix[0, 1], expected_similarity, places=4)
+    self.assertAlmostEqual(
+        similarity_matrix[1, 0], expected_similarity, places=4)
+
   def test_get_embedding_by_index(self):
     base_options = _BaseOptions(file_name=self.model_path)
     options = _ImageEmbedderOptions(base_options=base_options)
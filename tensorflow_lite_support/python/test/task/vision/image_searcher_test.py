@@ -142,7 +142,7 @@ class ImageSearcherTest(parameterized.TestCase, tf.test.TestCase):
     with self.assertRaisesRegex(
         ValueError,
         r"ExternalFile must specify at least one of 'file_content', "
-        r"'file_name' or 'file_descriptor_meta'."):
+        r"'file_name', 'file_descriptor_meta' or 'file_pointer_meta'."):
       options = _ImageSearcherOptions(
           base_options=_BaseOptions(file_name=''),
           search_options=_SearchOptions(index_file_name=self.index_path))
@@ -106,7 +106,7 @@ class ImageSegmenterTest(parameterized.TestCase, tf.test.TestCase):
     with self.assertRaisesRegex(
         ValueError,
         r"ExternalFile must specify at least one of 'file_content', "
-        r"'file_name' or 'file_descriptor_meta'."):
+        r"'file_name', 'file_descriptor_meta' or 'file_pointer_meta'."):
       base_options = _BaseOptions(file_name='')
       options = _ImageSegmenterOptions(base_options=base_options)
       _ImageSegmenter.create_from_options(options)
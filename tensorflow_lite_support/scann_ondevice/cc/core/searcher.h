@@ -43,11 +43,22 @@ void ComputeAHDistance(const QueryInfo& query_info,
                        Eigen::Ref<const Matrix8u> database,
                        Eigen::Ref<Eigen::MatrixXf> output);
 
-}
-template <class T>
-bool AsymmetricHashFindNeighbors(const QueryInfo& query_info,
-                                 Eigen::Ref<const Matrix8u> database,
-                                 size_t global_offset, absl::Span<T> topn) {
+// Filter accepting all database points.
+struct AcceptAllFilter {
+  bool operator()(int) const { return true; }
+};
+
+}  // namespace internal
+
+// Same as `AsymmetricHashFindNeighbors` below, but only database points for
+// which `filter(i)` returns true are considered, where `i` is the (local) index
+// of the point in `database`. Rejected points never reach the `topn` heaps.
+template <class T, class Filter>
+bool AsymmetricHashFindNeighborsWithFilter(const QueryInfo& query_info,
+                                           Eigen::Ref<const Matrix8u> database,
+                                           size_t global_offset,
+                                           const Filter& filter,
+                                           absl::Span<T> topn) {
   const int batch_size = query_info.query_lut->cols();
   if (topn.size() != batch_size) {
     return false;
@@ -57,6 +68,9 @@ bool AsymmetricHashFindNeighbors(const QueryInfo& query_info,
   internal::ComputeAHDistance(query_info, database, output);
 
   for (int i = 0; i < database_size; i++) {
+    if (!filter(i)) {
+      continue;
+    }
     for (int j = 0; j < topn.size(); ++j) {
       topn[j].emplace(output(j, i), i + global_offset);
     }
@@ -64,6 +78,13 @@ bool AsymmetricHashFindNeighbors(const QueryInfo& query_info,
   return true;
 }
 template <class T>
+bool AsymmetricHashFindNeighbors(const QueryInfo& query_info,
+                                 Eigen::Ref<const Matrix8u> database,
+                                 size_t global_offset, absl::Span<T> topn) {
+  return AsymmetricHashFindNeighborsWithFilter<T>(
+      query_info, database, global_offset, internal::AcceptAllFilter(), topn);
+}
+template <class T>
 bool AsymmetricHashFindNeighbors(Eigen::Ref<const Eigen::MatrixXf> queries,
                                  const PreProcessorInterface& preprocessor,
                                  Eigen::Ref<const Matrix8u> database,
@@ -75,12 +96,15 @@ bool AsymmetricHashFindNeighbors(Eigen::Ref<const Eigen::MatrixXf> queries,
   return preprocessor.Process(queries, &query_info) &&
          AsymmetricHashFindNeighbors(query_info, database, global_offset, topn);
 }
-template <class T>
-bool FloatFindNeighbors(Eigen::Ref<const Eigen::MatrixXf> queries,
-                        Eigen::Ref<const Eigen::MatrixXf> database,
-                        const size_t global_offset,
-                        const DistanceMeasure distance_measure,
-                        absl::Span<T> topn) {
+// Same as `FloatFindNeighbors` below, but only database points for which
+// `filter(i)` returns true are considered, where `i` is the (local) index of
+// the point in `database`. Rejected points never reach the `topn` heaps.
+template <class T, class Filter>
+bool FloatFindNeighborsWithFilter(Eigen::Ref<const Eigen::MatrixXf> queries,
+                                  Eigen::Ref<const Eigen::MatrixXf> database,
+                                  const size_t global_offset,
+                                  const DistanceMeasure distance_measure,
+                                  const Filter& filter, absl::Span<T> topn) {
   int query_size = queries.cols();
   int database_size = database.cols();
   Eigen::MatrixXf pairwise_distances(query_size, database_size);
@@ -98,6 +122,9 @@ bool FloatFindNeighbors(Eigen::Ref<const Eigen::MatrixXf> queries,
   }
 
   for (int i = 0; i < database_size; ++i) {
+    if (!filter(i)) {
+      continue;
+    }
     for (int j = 0; j < query_size; ++j) {
       topn[j].emplace(pairwise_distances(j, i), i + global_offset);
     }
@@ -105,6 +132,16 @@ bool FloatFindNeighbors(Eigen::Ref<const Eigen::MatrixXf> queries,
   return true;
 }
 template <class T>
+bool FloatFindNeighbors(Eigen::Ref<const Eigen::MatrixXf> queries,
+                        Eigen::Ref<const Eigen::MatrixXf> database,
+                        const size_t global_offset,
+                        const DistanceMeasure distance_measure,
+                        absl::Span<T> topn) {
+  return FloatFindNeighborsWithFilter<T>(queries, database, global_offset,
+                                         distance_measure,
+                                         internal::AcceptAllFilter(), topn);
+}
+template <class T>
 class SearcherInterfaceT {
  public:
   virtual ~SearcherInterfaceT() {}
@@ -99,6 +99,12 @@ absl::StatusOr<absl::string_view> Index::GetMetadataAtIndex(uint32_t i) const {
   return GetValueForKey(metadata_iterator_.get(), key);
 }
 
+absl::StatusOr<absl::string_view> Index::GetAttributesAtIndex(
+    uint32_t i) const {
+  std::string key(GetAttributesKey(i));
+  return GetValueForKey(attributes_iterator_.get(), key);
+}
+
 absl::Status Index::InitFromBuffer(const char* buffer_data,
                                    size_t buffer_size) {
   // Sanity check.
@@ -130,6 +136,8 @@ absl::Status Index::InitFromBuffer(const char* buffer_data,
       absl::WrapUnique(table_->NewIterator(leveldb::ReadOptions()));
   metadata_iterator_ =
       absl::WrapUnique(table_->NewIterator(leveldb::ReadOptions()));
+  attributes_iterator_ =
+      absl::WrapUnique(table_->NewIterator(leveldb::ReadOptions()));
   return absl::OkStatus();
 }
 
@@ -67,6 +67,15 @@ class Index {
   // the returned string view is only valid until next call to this method.
   absl::StatusOr<absl::string_view> GetMetadataAtIndex(uint32_t i) const;
 
+  // Provides access to the attributes corresponding to the i-th leaf in the
+  // order specified in the `IndexConfig`, in raw binary form: one uint64 value
+  // per embedding in the partition. Returns a NotFound error if the index
+  // doesn't contain attributes.
+  //
+  // Warning: In order to avoid unnecessary copies, the underlying pointer for
+  // the returned string view is only valid until next call to this method.
+  absl::StatusOr<absl::string_view> GetAttributesAtIndex(uint32_t i) const;
+
  private:
   // Private default constructor, called from CreateFromBuffer().
   Index() = default;
@@ -82,6 +91,7 @@ class Index {
   std::unique_ptr<leveldb::Iterator> info_iterator_;
   std::unique_ptr<leveldb::Iterator> embedding_iterator_;
   std::unique_ptr<leveldb::Iterator> metadata_iterator_;
+  std::unique_ptr<leveldb::Iterator> attributes_iterator_;
 };
 
 }  // namespace scann_ondevice
@@ -56,8 +56,9 @@ template <typename T>
 absl::StatusOr<std::string> CreateIndexBufferImpl(
     absl::Span<const T> database,
     absl::optional<absl::Span<const uint32_t>> partition_assignment,
-    absl::Span<const std::string> metadata, const std::string& userinfo,
-    IndexConfig index_config, bool compression) {
+    absl::Span<const std::string> metadata,
+    absl::optional<absl::Span<const uint64_t>> attributes,
+    const std::string& userinfo, IndexConfig index_config, bool compression) {
   size_t num_partitions = 1;
   if (partition_assignment) {
     if (partition_assignment->size() != metadata.size()) {
@@ -72,8 +73,18 @@ absl::StatusOr<std::string> CreateIndexBufferImpl(
         "Number of embeddings differs from number of metadata");
   }
 
+  if (attributes) {
+    if (attributes->size() != metadata.size()) {
+      return absl::InvalidArgumentError(
+          "Size of attributes and metadata mismatch");
+    }
+    index_config.set_has_attributes(true);
+  }
+
   std::vector<std::vector<char>> partition_bytes(num_partitions);
   std::vector<std::vector<std::string>> partition_metadata(num_partitions);
+  std::vector<std::vector<uint64_t>> partition_attributes(
+      attributes ? num_partitions : 0);
 
   const size_t per_embedding_bytes = sizeof(T) * index_config.embedding_dim();
   const char* database_bytes = reinterpret_cast<const char*>(database.data());
@@ -90,6 +101,9 @@ absl::StatusOr<std::string> CreateIndexBufferImpl(
         database_bytes + i * per_embedding_bytes,
         database_bytes + (i + 1) * per_embedding_bytes);
     partition_metadata[partition_idx].push_back(metadata[i]);
+    if (attributes) {
+      partition_attributes[partition_idx].push_back((*attributes)[i]);
+    }
   }
 
   std::vector<std::string> flatten_metadata;
@@ -113,7 +127,18 @@ absl::StatusOr<std::string> CreateIndexBufferImpl(
 
   // Keys must be added in ascending *lexical* order, e.g:
   // E_0, E_1, E_10, E_11, [...], E_18, E_19, E_2, E_20, E_21, [...]
-  // We're using btree_map to reorder partition and metadata keys.
+  // We're using btree_map to reorder attributes, partition and metadata keys.
+  absl::btree_map<std::string, size_t> ordered_attributes_key_to_index;
+  for (size_t i = 0; i < partition_attributes.size(); ++i) {
+    ordered_attributes_key_to_index[GetAttributesKey(i)] = i;
+  }
+  for (auto [key, index] : ordered_attributes_key_to_index) {
+    table_builder.Add(
+        leveldb::Slice(key),
+        leveldb::Slice(
+            reinterpret_cast<const char*>(partition_attributes[index].data()),
+            partition_attributes[index].size() * sizeof(uint64_t)));
+  }
   absl::btree_map<std::string, size_t> ordered_partition_key_to_index;
   for (size_t i = 0; i < partition_bytes.size(); ++i) {
     ordered_partition_key_to_index[GetPartitionKey(i)] = i;
@@ -160,14 +185,16 @@ absl::StatusOr<std::string> CreateIndexBuffer(
     index_config.set_embedding_type(index_config.UINT8);
     return CreateIndexBufferImpl(artifacts.hashed_database.value(),
                                  artifacts.partition_assignment,
-                                 artifacts.metadata, artifacts.userinfo,
-                                 std::move(index_config), compression);
+                                 artifacts.metadata, artifacts.attributes,
+                                 artifacts.userinfo, std::move(index_config),
+                                 compression);
   } else if (artifacts.float_database.has_value()) {
     index_config.set_embedding_type(index_config.FLOAT);
     return CreateIndexBufferImpl(artifacts.float_database.value(),
                                  artifacts.partition_assignment,
-                                 artifacts.metadata, artifacts.userinfo,
-                                 std::move(index_config), compression);
+                                 artifacts.metadata, artifacts.attributes,
+                                 artifacts.userinfo, std::move(index_config),
+                                 compression);
   } else {
     return absl::InvalidArgumentError(
         "Need either hashed_database or float_database");
@@ -55,6 +55,11 @@ struct IndexedArtifacts {
 
   // An arbitrary user supplied string for storing custom information.
   std::string userinfo;
+
+  // Optional attribute value (e.g. an integer tag or a bitset) for each
+  // database point, used to filter search results at query time. The size
+  // should be the same as how many database points there are.
+  absl::optional<absl::Span<const uint64_t>> attributes;
 };
 
 // Creates a byte buffer for the index file from the artifacts. Returns errors
@@ -37,7 +37,8 @@ PYBIND11_MODULE(index_builder, m) {
          absl::Span<const uint32_t> partition_assignment,
          absl::Span<const std::string> metadata, bool compression,
          absl::optional<absl::Span<const uint8_t>> hashed_database,
-         absl::optional<absl::Span<const float>> float_database)
+         absl::optional<absl::Span<const float>> float_database,
+         absl::optional<absl::Span<const uint64_t>> attributes)
           -> absl::StatusOr<bytes> {
         tflite::scann_ondevice::core::ScannOnDeviceConfig config;
         config.ParseFromString(serialized_config);
@@ -48,7 +49,8 @@ PYBIND11_MODULE(index_builder, m) {
              .float_database = float_database,
              .partition_assignment = partition_assignment,
              .metadata = metadata,
-             .userinfo = userinfo},
+             .userinfo = userinfo,
+             .attributes = attributes},
             compression);
         if (!status_or_bytes.ok()) {
           return status_or_bytes.status();
@@ -58,7 +60,8 @@ PYBIND11_MODULE(index_builder, m) {
       arg("embedding_dim"), arg("serialized_config"), arg("userinfo"),
       arg("partition_assignment"), arg("metadata"), arg("compression") = true,
       arg("hashed_database") = absl::nullopt,
-      arg("float_database") = absl::nullopt);
+      arg("float_database") = absl::nullopt,
+      arg("attributes") = absl::nullopt);
 }
 
 }  // namespace pybind11
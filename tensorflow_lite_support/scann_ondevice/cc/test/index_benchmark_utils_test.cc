@@ -0,0 +1,136 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "tensorflow_lite_support/scann_ondevice/cc/tools/index_benchmark_utils.h"
+
+#include <cstring>
+#include <string>
+#include <vector>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/strings/str_format.h"  // from @com_google_absl
+#include "absl/strings/string_view.h"  // from @com_google_absl
+#include "tensorflow_lite_support/cc/port/gmock.h"
+#include "tensorflow_lite_support/cc/port/gtest.h"
+#include "tensorflow_lite_support/cc/port/status_matchers.h"
+
+namespace tflite {
+namespace scann_ondevice {
+namespace {
+
+using ::testing::ElementsAre;
+using ::testing::HasSubstr;
+
+// Returns the content of a version 1.0 '.npy' file with the provided header
+// dictionary and data.
+std::string CreateNpy(absl::string_view dictionary,
+                      const std::vector<float>& data) {
+  // The header is padded with spaces and ends with a newline, so that the data
+  // is 64-byte aligned.
+  std::string header = std::string(dictionary);
+  const size_t unpadded_size = 10 + header.size() + 1;
+  header.append((64 - unpadded_size % 64) % 64, ' ');
+  header.push_back('\n');
+  std::string content("\x93NUMPY\x01\x00", 8);
+  content.push_back(static_cast<char>(header.size() & 0xFF));
+  content.push_back(static_cast<char>(header.size() >> 8));
+  content += header;
+  content.append(reinterpret_cast<const char*>(data.data()),
+                 data.size() * sizeof(float));
+  return content;
+}
+
+std::string CreateHeader(absl::string_view descr, absl::string_view shape) {
+  return absl::StrFormat(
+      "{'descr': '%s', 'fortran_order': False, 'shape': %s, }", descr, shape);
+}
+
+TEST(ParseNpyTest, Succeeds) {
+  const std::string content =
+      CreateNpy(CreateHeader("<f4", "(2, 3)"), {1, 2, 3, 4, 5, 6});
+
+  SUPPORT_ASSERT_OK_AND_ASSIGN(Queries queries, ParseNpy(content));
+
+  EXPECT_EQ(queries.num_queries, 2);
+  EXPECT_EQ(queries.dim, 3);
+  EXPECT_THAT(queries.values, ElementsAre(1, 2, 3, 4, 5, 6));
+}
+
+TEST(ParseNpyTest, SucceedsWithVersion2) {
+  std::string content = CreateNpy(CreateHeader("<f4", "(1, 2)"), {1, 2});
+  // Version 2.0 stores the header length on 4 bytes instead of 2.
+  content[6] = '\x02';
+  content.insert(10, std::string(2, '\0'));
+
+  SUPPORT_ASSERT_OK_AND_ASSIGN(Queries queries, ParseNpy(content));
+
+  EXPECT_EQ(queries.num_queries, 1);
+  EXPECT_THAT(queries.values, ElementsAre(1, 2));
+}
+
+TEST(ParseNpyTest, FailsWithInvalidMagic) {
+  EXPECT_THAT(ParseNpy("not a npy file").status().message(),
+              HasSubstr("Not a '.npy' file"));
+}
+
+TEST(ParseNpyTest, FailsWithTruncatedHeader) {
+  const std::string content = CreateNpy(CreateHeader("<f4", "(1, 2)"), {1, 2});
+
+  EXPECT_THAT(ParseNpy(content.substr(0, 20)).status().message(),
+              HasSubstr("Truncated '.npy' header"));
+}
+
+TEST(ParseNpyTest, FailsWithUnsupportedType) {
+  const std::string content = CreateNpy(CreateHeader("<f8", "(1, 1)"), {1, 2});
+
+  EXPECT_THAT(ParseNpy(content).status().message(),
+              HasSubstr("Only little-endian float32"));
+}
+
+TEST(ParseNpyTest, FailsWithFortranOrder) {
+  const std::string content = CreateNpy(
+      "{'descr': '<f4', 'fortran_order': True, 'shape': (1, 2), }", {1, 2});
+
+  EXPECT_THAT(ParseNpy(content).status().message(),
+              HasSubstr("Only C-ordered"));
+}
+
+TEST(ParseNpyTest, FailsWithInvalidShape) {
+  for (absl::string_view shape : {"(2,)", "(1, 2, 1)", "(0, 2)", "(a, 2)"}) {
+    const std::string content = CreateNpy(CreateHeader("<f4", shape), {1, 2});
+
+    EXPECT_THAT(ParseNpy(content).status().message(),
+                HasSubstr("2-dimensional array"))
+        << shape;
+  }
+}
+
+TEST(ParseNpyTest, FailsWithMismatchingDataSize) {
+  const std::string content =
+      CreateNpy(CreateHeader("<f4", "(2, 2)"), {1, 2, 3});
+
+  EXPECT_THAT(ParseNpy(content).status().message(),
+              HasSubstr("data size doesn't match its shape"));
+}
+
+TEST(EscapeJsonStringTest, Succeeds) {
+  EXPECT_EQ(EscapeJsonString("/tmp/index.ldb"), "/tmp/index.ldb");
+  EXPECT_EQ(EscapeJsonString("C:\\a \"b\"\n\x01"),
+            "C:\\\\a \\\"b\\\"\\n\\u0001");
+}
+
+}  // namespace
+}  // namespace scann_ondevice
+}  // namespace tflite
@@ -16,6 +16,7 @@ limitations under the License.
 #include "tensorflow_lite_support/scann_ondevice/cc/index_builder.h"
 
 #include <cstdint>
+#include <cstring>
 #include <string>
 
 #include "absl/flags/flag.h"  // from @com_google_absl
@@ -545,6 +546,130 @@ TEST_P(PopulateIndexFileTest, WritesFloatDatabaseWithoutPartitioner) {
   }
 }
 
+TEST_P(PopulateIndexFileTest, WritesAttributesWithPartitioner) {
+  const std::string db_path =
+      tflite::task::JoinPath(getenv("TEST_TMPDIR"), "attributes");
+  const bool compression = GetParam();
+
+  {
+    tflite::scann_ondevice::core::ScannOnDeviceConfig config =
+        ParseTextProtoOrDie<tflite::scann_ondevice::core::ScannOnDeviceConfig>(R"pb(
+          partitioner: {
+            leaf { dimension: 0 dimension: 0 }
+            leaf { dimension: 1 dimension: 1 }
+            leaf { dimension: 2 dimension: 2 }
+            leaf { dimension: 3 dimension: 3 }
+            leaf { dimension: 4 dimension: 4 }
+            leaf { dimension: 5 dimension: 5 }
+            leaf { dimension: 6 dimension: 6 }
+            leaf { dimension: 7 dimension: 7 }
+            leaf { dimension: 8 dimension: 8 }
+            leaf { dimension: 9 dimension: 9 }
+            leaf { dimension: 10 dimension: 10 }
+            leaf { dimension: 11 dimension: 11 }
+          }
+        )pb");
+    std::vector<float> float_database;
+    float_database.reserve(kNumEmbeddings * kDimensions);
+    for (int i = 0; i < kNumEmbeddings; ++i) {
+      for (int j = 0; j < kDimensions; ++j) {
+        float_database.push_back(i);
+      }
+    }
+    std::vector<uint32_t> partition_assignment;
+    partition_assignment.reserve(kNumEmbeddings);
+    for (int i = 0; i < kNumEmbeddings; ++i) {
+      partition_assignment.push_back(i % kNumPartitions);
+    }
+    std::vector<std::string> metadata;
+    std::vector<uint64_t> attributes;
+    metadata.reserve(kNumEmbeddings);
+    attributes.reserve(kNumEmbeddings);
+    for (int i = 0; i < kNumEmbeddings; ++i) {
+      metadata.push_back(absl::StrFormat("%d", i));
+      attributes.push_back(1000 + i);
+    }
+    SUPPORT_ASSERT_OK_AND_ASSIGN(
+        const std::string buffer,
+        CreateIndexBuffer(
+            {.config = config,
+             .embedding_dim = kDimensions,
+             .float_database = absl::Span<float>(float_database),
+             .partition_assignment = absl::Span<uint32_t>(partition_assignment),
+             .metadata = absl::Span<std::string>(metadata),
+             .userinfo = "float_userinfo",
+             .attributes = absl::Span<uint64_t>(attributes)},
+            compression));
+    SUPPORT_ASSERT_OK(SetContents(db_path, buffer));
+  }
+
+  auto* env = leveldb::Env::Default();
+  leveldb::RandomAccessFile* float_file;
+  size_t float_file_size;
+  ASSERT_TRUE(env->NewRandomAccessFile(db_path, &float_file).ok());
+  auto float_file_unique = absl::WrapUnique(float_file);
+  ASSERT_TRUE(env->GetFileSize(db_path, &float_file_size).ok());
+
+  leveldb::Options options;
+  options.compression =
+      compression ? leveldb::kSnappyCompression : leveldb::kNoCompression;
+
+  leveldb::Table* float_table;
+  ASSERT_TRUE(
+      leveldb::Table::Open(options, float_file, float_file_size, &float_table)
+          .ok());
+  auto float_table_unique = absl::WrapUnique(float_table);
+  auto float_table_iterator =
+      absl::WrapUnique(float_table->NewIterator(leveldb::ReadOptions()));
+
+  SUPPORT_ASSERT_OK_AND_ASSIGN(std::string serialized_config,
+                       LookupKey(float_table_iterator.get(), "INDEX_CONFIG"));
+  IndexConfig index_config;
+  EXPECT_TRUE(index_config.ParseFromString(serialized_config));
+  IndexConfig expected_config =
+      CreateExpectedConfigWithPartitioner(IndexConfig::FLOAT);
+  expected_config.set_has_attributes(true);
+  EXPECT_THAT(index_config, EqualsProto(expected_config));
+
+  // Attributes follow the same partition assignment as embeddings, so:
+  // * partition 0 contains attributes 1000 and 1012,
+  // * partition 1 contains attributes 1001 and 1013,
+  // * etc
+  for (int i = 0; i < kNumPartitions; ++i) {
+    SUPPORT_ASSERT_OK_AND_ASSIGN(
+        std::string raw_attributes,
+        LookupKey(float_table_iterator.get(), absl::StrFormat("A_%d", i)));
+    std::vector<uint64_t> partition_attributes(raw_attributes.size() /
+                                               sizeof(uint64_t));
+    memcpy(partition_attributes.data(), raw_attributes.data(),
+           raw_attributes.size());
+    std::vector<uint64_t> expected = {
+        static_cast<uint64_t>(1000 + i),
+        static_cast<uint64_t>(1000 + i + kNumPartitions)};
+    EXPECT_THAT(partition_attributes, ElementsAreArray(expected));
+  }
+}
+
+TEST(CreateIndexBufferTest, FailsWithAttributesSizeMismatch) {
+  std::vector<float> float_database(kNumEmbeddings * kDimensions);
+  std::vector<std::string> metadata(kNumEmbeddings);
+  std::vector<uint64_t> attributes(kNumEmbeddings - 1);
+
+  auto status_or_buffer = CreateIndexBuffer(
+      {.config = ParseTextProtoOrDie<
+           tflite::scann_ondevice::core::ScannOnDeviceConfig>(R"pb(
+         query_distance: SQUARED_L2_DISTANCE
+       )pb"),
+       .embedding_dim = kDimensions,
+       .float_database = absl::Span<float>(float_database),
+       .metadata = absl::Span<std::string>(metadata),
+       .attributes = absl::Span<uint64_t>(attributes)},
+      /*compression=*/false);
+
+  EXPECT_EQ(status_or_buffer.status().code(),
+            absl::StatusCode::kInvalidArgument);
+}
+
 INSTANTIATE_TEST_SUITE_P(PopulateIndexFileTest, PopulateIndexFileTest, Bool());
 
 }  // namespace
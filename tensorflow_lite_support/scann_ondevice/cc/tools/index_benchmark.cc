@@ -0,0 +1,398 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+// Benchmarks recall and latency of nearest-neighbor search on a ScaNN
+// on-device index, across a sweep of leaves-to-search and thread counts.
+//
+// Ground truth is computed by searching all the leaves of
+// `ground_truth_index_path`, which defaults to `index_path`. By default, recall
+// thus only measures the loss due to partition pruning: if `index_path` is
+// quantized, its ground truth is quantized as well. Use a FLOAT index built
+// from the same embeddings as `ground_truth_index_path` to also account for the
+// loss due to quantization. Neighbors are matched by metadata, which is
+// expected to be unique.
+//
+// Example usage:
+// bazel run -c opt \
+//  tensorflow_lite_support/scann_ondevice/cc/tools:index_benchmark \
+//  -- \
+//  --index_path=/path/to/index.ldb \
+//  --queries_path=/path/to/queries.npy \
+//  --num_leaves_to_search=1,2,4,8 \
+//  --num_threads=1,4 \
+//  --output_path=/path/to/results.json
+
+#include <algorithm>
+#include <chrono>  // NOLINT(build/c++11)
+#include <cstdint>
+#include <fstream>
+#include <iostream>
+#include <memory>
+#include <string>
+#include <thread>  // NOLINT(build/c++11)
+#include <vector>
+
+#include "absl/container/flat_hash_set.h"  // from @com_google_absl
+#include "absl/flags/flag.h"  // from @com_google_absl
+#include "absl/flags/parse.h"  // from @com_google_absl
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/status/statusor.h"  // from @com_google_absl
+#include "absl/strings/numbers.h"  // from @com_google_absl
+#include "absl/strings/str_format.h"  // from @com_google_absl
+#include "absl/strings/str_join.h"  // from @com_google_absl
+#include "absl/strings/str_split.h"  // from @com_google_absl
+#include "absl/strings/string_view.h"  // from @com_google_absl
+#include "tensorflow_lite_support/cc/port/status_macros.h"
+#include "tensorflow_lite_support/cc/task/processor/embedding_searcher.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/embedding.pb.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/search_options.pb.h"
+#include "tensorflow_lite_support/cc/task/processor/proto/search_result.pb.h"
+#include "tensorflow_lite_support/scann_ondevice/cc/index.h"
+#include "tensorflow_lite_support/scann_ondevice/cc/tools/index_benchmark_utils.h"
+#include "tensorflow_lite_support/scann_ondevice/proto/index_config.pb.h"
+
+ABSL_FLAG(std::string, index_path, "",
+          "Absolute path to the index to benchmark.");
+ABSL_FLAG(std::string, queries_path, "",
+          "Absolute path to the held-out queries, as a 2-dimensional float32 "
+          "'.npy' file of shape [num_queries, embedding_dim].");
+ABSL_FLAG(std::string, ground_truth_index_path, "",
+          "Absolute path to the index used to compute ground truth, by "
+          "searching all its leaves. Defaults to `index_path`, in which case "
+          "recall doesn't account for quantization.");
+ABSL_FLAG(int32, k, 10, "Number of nearest-neighbors to retrieve per query.");
+ABSL_FLAG(std::string, num_leaves_to_search, "",
+          "Comma-separated list of numbers of leaves to search into. Defaults "
+          "to the number of leaves derived from the index config.");
+ABSL_FLAG(std::string, num_threads, "1",
+          "Comma-separated list of numbers of threads issuing queries "
+          "concurrently, each with its own searcher.");
+ABSL_FLAG(int32, num_warmup_queries, 10,
+          "Number of queries run before each measurement and not accounted "
+          "for.");
+ABSL_FLAG(std::string, output_path, "",
+          "Path to write the JSON results to. Defaults to stdout.");
+
+namespace tflite {
+namespace scann_ondevice {
+
+namespace {
+
+using ::tflite::task::processor::Embedding;
+using ::tflite::task::processor::EmbeddingSearcher;
+using ::tflite::task::processor::SearchOptions;
+using ::tflite::task::processor::SearchResult;
+using std::chrono::duration;
+using std::chrono::steady_clock;
+
+// Per-configuration benchmark results.
+struct BenchmarkResult {
+  int num_leaves_to_search;
+  int num_threads;
+  double recall;
+  double latency_mean_ms;
+  double latency_p50_ms;
+  double latency_p95_ms;
+  double latency_p99_ms;
+  double qps;
+};
+
+absl::StatusOr<std::string> ReadFile(const std::string& path) {
+  std::ifstream file(path, std::ios::binary);
+  if (!file) {
+    return absl::NotFoundError(absl::StrFormat("Unable to open %s", path));
+  }
+  return std::string(std::istreambuf_iterator<char>(file),
+                     std::istreambuf_iterator<char>());
+}
+
+absl::StatusOr<std::vector<int>> ParseIntList(absl::string_view list) {
+  std::vector<int> values;
+  for (absl::string_view item :
+       absl::StrSplit(list, ',', absl::SkipWhitespace())) {
+    int value;
+    if (!absl::SimpleAtoi(item, &value) || value < 1) {
+      return absl::InvalidArgumentError(
+          absl::StrFormat("Expected a positive integer, found '%s'.", item));
+    }
+    values.push_back(value);
+  }
+  return values;
+}
+
+Embedding GetQueryEmbedding(const Queries& queries, int i) {
+  Embedding embedding;
+  auto* value_float = embedding.mutable_feature_vector()->mutable_value_float();
+  value_float->Add(queries.values.begin() + i * queries.dim,
+                   queries.values.begin() + (i + 1) * queries.dim);
+  return embedding;
+}
+
+absl::StatusOr<std::unique_ptr<EmbeddingSearcher>> CreateSearcher(
+    absl::string_view index_content, int max_results,
+    int num_leaves_to_search) {
+  auto options = std::make_unique<SearchOptions>();
+  options->set_max_results(max_results);
+  if (num_leaves_to_search > 0) {
+    options->set_num_leaves_to_search(num_leaves_to_search);
+  }
+  return EmbeddingSearcher::Create(std::move(options), index_content);
+}
+
+absl::StatusOr<IndexConfig> GetIndexConfig(absl::string_view index_content) {
+  ASSIGN_OR_RETURN(auto index, Index::CreateFromIndexBuffer(
+                                   index_content.data(), index_content.size()));
+  return index->GetIndexConfig();
+}
+
+// Returns the number of leaves in the provided index.
+absl::StatusOr<int> GetNumLeaves(absl::string_view index_content) {
+  ASSIGN_OR_RETURN(IndexConfig config, GetIndexConfig(index_content));
+  return std::max(config.scann_config().partitioner().leaf_size(), 1);
+}
+
+// Checks that the queries have the embedding dimension of the provided index.
+absl::Status CheckQueriesDimension(absl::string_view index_content,
+                                   absl::string_view index_path,
+                                   const Queries& queries) {
+  ASSIGN_OR_RETURN(IndexConfig config, GetIndexConfig(index_content));
+  if (config.embedding_dim() != queries.dim) {
+    return absl::InvalidArgumentError(absl::StrFormat(
+        "The queries have dimension %d, but the index %s has dimension %d.",
+        queries.dim, index_path, config.embedding_dim()));
+  }
+  return absl::OkStatus();
+}
+
+// Computes the ground truth metadata for each query, by searching all the
+// leaves of the provided index.
+absl::StatusOr<std::vector<absl::flat_hash_set<std::string>>>
+ComputeGroundTruth(absl::string_view index_content, const Queries& queries,
+                   int k) {
+  ASSIGN_OR_RETURN(int num_leaves, GetNumLeaves(index_content));
+  ASSIGN_OR_RETURN(auto searcher, CreateSearcher(index_content, k, num_leaves));
+  std::vector<absl::flat_hash_set<std::string>> ground_truth(
+      queries.num_queries);
+  for (int i = 0; i < queries.num_queries; ++i) {
+    ASSIGN_OR_RETURN(SearchResult result,
+                     searcher->Search(GetQueryEmbedding(queries, i)));
+    for (const auto& neighbor : result.nearest_neighbors()) {
+      ground_truth[i].insert(neighbor.metadata());
+    }
+  }
+  return ground_truth;
+}
+
+double Percentile(const std::vector<double>& sorted_values, double p) {
+  if (sorted_values.empty()) {
+    return 0;
+  }
+  size_t rank = static_cast<size_t>(p / 100.0 * (sorted_values.size() - 1));
+  return sorted_values[rank];
+}
+
+absl::StatusOr<BenchmarkResult> RunBenchmark(
+    absl::string_view index_content, const Queries& queries,
+    const std::vector<absl::flat_hash_set<std::string>>& ground_truth, int k,
+    int num_leaves_to_search, int num_threads) {
+  // One searcher per thread, as searchers are not thread-safe.
+  std::vector<std::unique_ptr<EmbeddingSearcher>> searchers;
+  for (int t = 0; t < num_threads; ++t) {
+    ASSIGN_OR_RETURN(auto searcher,
+                     CreateSearcher(index_content, k, num_leaves_to_search));
+    searchers.push_back(std::move(searcher));
+  }
+
+  // Warmup.
+  const int num_warmup_queries =
+      std::min(absl::GetFlag(FLAGS_num_warmup_queries), queries.num_queries);
+  for (auto& searcher : searchers) {
+    for (int i = 0; i < num_warmup_queries; ++i) {
+      RETURN_IF_ERROR(
+          searcher->Search(GetQueryEmbedding(queries, i)).status());
+    }
+  }
+
+  // Queries are distributed round-robin over the threads.
+  std::vector<double> latencies_ms(queries.num_queries);
+  std::vector<int> num_hits(queries.num_queries);
+  std::vector<absl::Status> statuses(num_threads);
+  auto run_queries = [&](int t) {
+    for (int i = t; i < queries.num_queries; i += num_threads) {
+      Embedding embedding = GetQueryEmbedding(queries, i);
+      auto start = steady_clock::now();
+      auto result = searchers[t]->Search(embedding);
+      auto end = steady_clock::now();
+      if (!result.ok()) {
+        statuses[t] = result.status();
+        return;
+      }
+      latencies_ms[i] = duration<double, std::milli>(end - start).count();
+      for (const auto& neighbor : result->nearest_neighbors()) {
+        num_hits[i] += ground_truth[i].contains(neighbor.metadata());
+      }
+    }
+  };
+  auto start = steady_clock::now();
+  std::vector<std::thread> threads;
+  for (int t = 1; t < num_threads; ++t) {
+    threads.emplace_back(run_queries, t);
+  }
+  run_queries(0);
+  for (auto& thread : threads) {
+    thread.join();
+  }
+  auto end = steady_clock::now();
+  for (const auto& status : statuses) {
+    RETURN_IF_ERROR(status);
+  }
+
+  BenchmarkResult result;
+  result.num_leaves_to_search = num_leaves_to_search;
+  result.num_threads = num_threads;
+  double total_hits = 0;
+  double total_expected = 0;
+  for (int i = 0; i < queries.num_queries; ++i) {
+    total_hits += num_hits[i];
+    total_expected += ground_truth[i].size();
+  }
+  result.recall = total_expected > 0 ? total_hits / total_expected : 0;
+  std::sort(latencies_ms.begin(), latencies_ms.end());
+  double total_latency_ms = 0;
+  for (double latency_ms : latencies_ms) {
+    total_latency_ms += latency_ms;
+  }
+  result.latency_mean_ms = total_latency_ms / queries.num_queries;
+  result.latency_p50_ms = Percentile(latencies_ms, 50);
+  result.latency_p95_ms = Percentile(latencies_ms, 95);
+  result.latency_p99_ms = Percentile(latencies_ms, 99);
+  result.qps = queries.num_queries / duration<double>(end - start).count();
+  return result;
+}
+
+std::string ToJson(const std::vector<BenchmarkResult>& results,
+                   const Queries& queries, int k, int num_leaves) {
+  std::vector<std::string> json_results;
+  for (const auto& result : results) {
+    json_results.push_back(absl::StrFormat(
+        "    {\"num_leaves_to_search\": %d, \"num_threads\": %d, "
+        "\"recall_at_k\": %.6f, \"latency_ms\": {\"mean\": %.6f, "
+        "\"p50\": %.6f, \"p95\": %.6f, \"p99\": %.6f}, \"qps\": %.3f}",
+        result.num_leaves_to_search, result.num_threads, result.recall,
+        result.latency_mean_ms, result.latency_p50_ms, result.latency_p95_ms,
+        result.latency_p99_ms, result.qps));
+  }
+  return absl::StrFormat(
+      "{\n  \"index_path\": \"%s\",\n  \"num_leaves\": %d,\n"
+      "  \"num_queries\": %d,\n  \"embedding_dim\": %d,\n  \"k\": %d,\n"
+      "  \"results\": [\n%s\n  ]\n}\n",
+      EscapeJsonString(absl::GetFlag(FLAGS_index_path)), num_leaves,
+      queries.num_queries,
+      queries.dim, k, absl::StrJoin(json_results, ",\n"));
+}
+
+absl::Status Benchmark() {
+  const int k = absl::GetFlag(FLAGS_k);
+  ASSIGN_OR_RETURN(std::string index_content,
+                   ReadFile(absl::GetFlag(FLAGS_index_path)));
+  std::string ground_truth_index_content = index_content;
+  if (!absl::GetFlag(FLAGS_ground_truth_index_path).empty()) {
+    ASSIGN_OR_RETURN(ground_truth_index_content,
+                     ReadFile(absl::GetFlag(FLAGS_ground_truth_index_path)));
+  }
+  ASSIGN_OR_RETURN(std::string queries_content,
+                   ReadFile(absl::GetFlag(FLAGS_queries_path)));
+  ASSIGN_OR_RETURN(Queries queries, ParseNpy(queries_content));
+  RETURN_IF_ERROR(CheckQueriesDimension(
+      index_content, absl::GetFlag(FLAGS_index_path), queries));
+  if (!absl::GetFlag(FLAGS_ground_truth_index_path).empty()) {
+    RETURN_IF_ERROR(CheckQueriesDimension(
+        ground_truth_index_content,
+        absl::GetFlag(FLAGS_ground_truth_index_path), queries));
+  }
+  ASSIGN_OR_RETURN(std::vector<int> leaves_sweep,
+                   ParseIntList(absl::GetFlag(FLAGS_num_leaves_to_search)));
+  if (leaves_sweep.empty()) {
+    // Use the number of leaves derived from the index config.
+    leaves_sweep.push_back(0);
+  }
+  ASSIGN_OR_RETURN(std::vector<int> threads_sweep,
+                   ParseIntList(absl::GetFlag(FLAGS_num_threads)));
+  ASSIGN_OR_RETURN(int num_leaves, GetNumLeaves(index_content));
+
+  std::cerr << "Computing ground truth..." << std::endl;
+  ASSIGN_OR_RETURN(
+      auto ground_truth,
+      ComputeGroundTruth(ground_truth_index_content, queries, k));
+
+  std::vector<BenchmarkResult> results;
+  for (int num_leaves_to_search : leaves_sweep) {
+    for (int num_threads : threads_sweep) {
+      std::cerr << absl::StrFormat(
+                       "Running num_leaves_to_search=%d num_threads=%d...",
+                       num_leaves_to_search, num_threads)
+                << std::endl;
+      ASSIGN_OR_RETURN(
+          BenchmarkResult result,
+          RunBenchmark(index_content, queries, ground_truth, k,
+                       num_leaves_to_search, num_threads));
+      results.push_back(result);
+    }
+  }
+
+  const std::string json = ToJson(results, queries, k, num_leaves);
+  if (absl::GetFlag(FLAGS_output_path).empty()) {
+    std::cout << json;
+  } else {
+    std::ofstream output(absl::GetFlag(FLAGS_output_path));
+    output << json;
+    if (!output) {
+      return absl::InternalError(absl::StrFormat(
+          "Unable to write %s", absl::GetFlag(FLAGS_output_path)));
+    }
+  }
+  return absl::OkStatus();
+}
+
+}  // namespace
+
+}  // namespace scann_ondevice
+}  // namespace tflite
+
+int main(int argc, char** argv) {
+  // Parse command line and perform sanity checks.
+  absl::ParseCommandLine(argc, argv);
+  if (absl::GetFlag(FLAGS_index_path).empty()) {
+    std::cerr << "Missing mandatory 'index_path' argument.\n";
+    return 1;
+  }
+  if (absl::GetFlag(FLAGS_queries_path).empty()) {
+    std::cerr << "Missing mandatory 'queries_path' argument.\n";
+    return 1;
+  }
+  if (absl::GetFlag(FLAGS_k) < 1) {
+    std::cerr << "'k' must be > 0.\n";
+    return 1;
+  }
+
+  // Run benchmark.
+  absl::Status status = tflite::scann_ondevice::Benchmark();
+  if (status.ok()) {
+    return 0;
+  } else {
+    std::cerr << "Benchmark failed: " << status.message() << "\n";
+    return 1;
+  }
+}
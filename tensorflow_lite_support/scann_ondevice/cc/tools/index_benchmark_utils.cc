@@ -0,0 +1,135 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "tensorflow_lite_support/scann_ondevice/cc/tools/index_benchmark_utils.h"
+
+#include <cstdint>
+#include <cstring>
+#include <string>
+#include <vector>
+
+#include "absl/status/status.h"  // from @com_google_absl
+#include "absl/status/statusor.h"  // from @com_google_absl
+#include "absl/strings/match.h"  // from @com_google_absl
+#include "absl/strings/numbers.h"  // from @com_google_absl
+#include "absl/strings/str_format.h"  // from @com_google_absl
+#include "absl/strings/str_split.h"  // from @com_google_absl
+#include "absl/strings/string_view.h"  // from @com_google_absl
+
+namespace tflite {
+namespace scann_ondevice {
+
+absl::StatusOr<Queries> ParseNpy(absl::string_view content) {
+  constexpr char kMagic[] = "\x93NUMPY";
+  constexpr int kMagicSize = 6;
+  if (content.size() < kMagicSize + 4 ||
+      content.substr(0, kMagicSize) != absl::string_view(kMagic, kMagicSize)) {
+    return absl::InvalidArgumentError("Not a '.npy' file.");
+  }
+  const uint8_t major_version = content[kMagicSize];
+  size_t header_len;
+  size_t header_start;
+  if (major_version == 1) {
+    header_len = static_cast<uint8_t>(content[8]) |
+                 (static_cast<uint8_t>(content[9]) << 8);
+    header_start = 10;
+  } else {
+    if (content.size() < 12) {
+      return absl::InvalidArgumentError("Truncated '.npy' header.");
+    }
+    header_len = 0;
+    for (int i = 3; i >= 0; --i) {
+      header_len = (header_len << 8) | static_cast<uint8_t>(content[8 + i]);
+    }
+    header_start = 12;
+  }
+  if (content.size() < header_start + header_len) {
+    return absl::InvalidArgumentError("Truncated '.npy' header.");
+  }
+  absl::string_view header = content.substr(header_start, header_len);
+  if (!absl::StrContains(header, "'descr': '<f4'")) {
+    return absl::InvalidArgumentError(
+        "Only little-endian float32 '.npy' files are supported.");
+  }
+  if (!absl::StrContains(header, "'fortran_order': False")) {
+    return absl::InvalidArgumentError(
+        "Only C-ordered '.npy' files are supported.");
+  }
+  size_t shape_start = header.find("'shape': (");
+  size_t shape_end = header.find(')', shape_start);
+  if (shape_start == absl::string_view::npos ||
+      shape_end == absl::string_view::npos) {
+    return absl::InvalidArgumentError("Unable to find shape in '.npy' header.");
+  }
+  shape_start += strlen("'shape': (");
+  std::vector<absl::string_view> dims =
+      absl::StrSplit(header.substr(shape_start, shape_end - shape_start), ',',
+                     absl::SkipWhitespace());
+  Queries queries;
+  if (dims.size() != 2 ||
+      !absl::SimpleAtoi(dims[0], &queries.num_queries) ||
+      !absl::SimpleAtoi(dims[1], &queries.dim) || queries.num_queries < 1 ||
+      queries.dim < 1) {
+    return absl::InvalidArgumentError(
+        "Queries must be a 2-dimensional array of shape [num_queries, "
+        "embedding_dim].");
+  }
+  const size_t data_start = header_start + header_len;
+  const size_t data_size =
+      static_cast<size_t>(queries.num_queries) * queries.dim * sizeof(float);
+  if (content.size() - data_start != data_size) {
+    return absl::InvalidArgumentError(
+        "'.npy' data size doesn't match its shape.");
+  }
+  queries.values.resize(static_cast<size_t>(queries.num_queries) *
+                        queries.dim);
+  memcpy(queries.values.data(), content.data() + data_start, data_size);
+  return queries;
+}
+
+std::string EscapeJsonString(absl::string_view value) {
+  std::string escaped;
+  escaped.reserve(value.size());
+  for (char c : value) {
+    switch (c) {
+      case '"':
+        escaped += "\\\"";
+        break;
+      case '\\':
+        escaped += "\\\\";
+        break;
+      case '\n':
+        escaped += "\\n";
+        break;
+      case '\r':
+        escaped += "\\r";
+        break;
+      case '\t':
+        escaped += "\\t";
+        break;
+      default:
+        if (static_cast<unsigned char>(c) < 0x20) {
+          absl::StrAppendFormat(&escaped, "\\u%04x",
+                                static_cast<unsigned char>(c));
+        } else {
+          escaped += c;
+        }
+    }
+  }
+  return escaped;
+}
+
+}  // namespace scann_ondevice
+}  // namespace tflite
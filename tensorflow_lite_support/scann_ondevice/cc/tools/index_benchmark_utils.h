@@ -0,0 +1,44 @@
+/* Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef TENSORFLOW_LITE_SUPPORT_SCANN_ONDEVICE_CC_TOOLS_INDEX_BENCHMARK_UTILS_H_
+#define TENSORFLOW_LITE_SUPPORT_SCANN_ONDEVICE_CC_TOOLS_INDEX_BENCHMARK_UTILS_H_
+
+#include <string>
+#include <vector>
+
+#include "absl/status/statusor.h"  // from @com_google_absl
+#include "absl/strings/string_view.h"  // from @com_google_absl
+
+namespace tflite {
+namespace scann_ondevice {
+
+// A set of queries, stored row-major.
+struct Queries {
+  int num_queries;
+  int dim;
+  std::vector<float> values;
+};
+
+// Parses a 2-dimensional, C-ordered, little-endian float32 '.npy' file.
+absl::StatusOr<Queries> ParseNpy(absl::string_view content);
+
+// Escapes the provided string to be used in a JSON string literal.
+std::string EscapeJsonString(absl::string_view value);
+
+}  // namespace scann_ondevice
+}  // namespace tflite
+
+#endif  // TENSORFLOW_LITE_SUPPORT_SCANN_ONDEVICE_CC_TOOLS_INDEX_BENCHMARK_UTILS_H_
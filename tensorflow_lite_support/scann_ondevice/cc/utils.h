@@ -34,6 +34,11 @@ inline std::string GetPartitionKey(uint32_t partition_index) {
   return absl::StrFormat("E_%lu", partition_index);
 }
 
+// Returns the attributes key for a given partition index
+inline std::string GetAttributesKey(uint32_t partition_index) {
+  return absl::StrFormat("A_%lu", partition_index);
+}
+
 // Returns the metadata for the given global offset of the data point.
 inline std::string GetMetadataKey(uint32_t datapoint_index) {
   return absl::StrFormat("M_%lu", datapoint_index);
@@ -79,13 +79,13 @@ def main(_):
       f'{_CODE_PREFIX.value}/metadata/python/metadata_writers',
       f'{_CODE_PREFIX.value}/python/task']
 
-  # schema_py_generated is a generated API, so we can't use annotations to
-  # suppress doc generation.
-  del tflite_support.schema_py_generated
-
   doc_generator = generate_lib.DocGenerator(
       root_title='TensorFlow Lite Support',
       py_modules=[('tflite_support', tflite_support)],
+      # schema_py_generated is a generated API, so we can't use annotations to
+      # suppress doc generation. It is loaded lazily, so it can't be deleted
+      # from the module either.
+      private_map={'tflite_support': ['schema_py_generated']},
       base_dir=base_dirs,
       code_url_prefix=code_prefixes,
       search_hints=_SEARCH_HINTS.value,
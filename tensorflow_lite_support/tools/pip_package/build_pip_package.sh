@@ -108,6 +108,8 @@ function prepare_src() {
     cp tensorflow_lite_support/tools/pip_package/task_audio.__init__.py ${TMPDIR}/tflite_support/task/audio/__init__.py
     mkdir ${TMPDIR}/tflite_support/task/processor
     cp tensorflow_lite_support/tools/pip_package/task_processor.__init__.py ${TMPDIR}/tflite_support/task/processor/__init__.py
+    mkdir ${TMPDIR}/tflite_support/serving
+    cp tensorflow_lite_support/tools/pip_package/serving.__init__.py ${TMPDIR}/tflite_support/serving/__init__.py
   fi
 }
 
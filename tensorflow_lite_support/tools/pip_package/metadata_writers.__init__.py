@@ -33,11 +33,18 @@ Learn more about this API in the [metadata writer
 tutorial](https://www.tensorflow.org/lite/convert/metadata_writer_tutorial).
 """
 
-from tensorflow_lite_support.metadata.python.metadata_writers import audio_classifier
-from tensorflow_lite_support.metadata.python.metadata_writers import bert_nl_classifier
-from tensorflow_lite_support.metadata.python.metadata_writers import image_classifier
-from tensorflow_lite_support.metadata.python.metadata_writers import image_segmenter
-from tensorflow_lite_support.metadata.python.metadata_writers import metadata_info
-from tensorflow_lite_support.metadata.python.metadata_writers import nl_classifier
-from tensorflow_lite_support.metadata.python.metadata_writers import object_detector
-from tensorflow_lite_support.metadata.python.metadata_writers import writer_utils
+from tensorflow_lite_support.python import lazy_loader
+
+_METADATA_WRITERS = 'tensorflow_lite_support.metadata.python.metadata_writers'
+
+# The metadata writers are only loaded when first accessed.
+__getattr__, __dir__, __all__ = lazy_loader.attach(__name__, {
+    'audio_classifier': f'{_METADATA_WRITERS}.audio_classifier',
+    'bert_nl_classifier': f'{_METADATA_WRITERS}.bert_nl_classifier',
+    'image_classifier': f'{_METADATA_WRITERS}.image_classifier',
+    'image_segmenter': f'{_METADATA_WRITERS}.image_segmenter',
+    'metadata_info': f'{_METADATA_WRITERS}.metadata_info',
+    'nl_classifier': f'{_METADATA_WRITERS}.nl_classifier',
+    'object_detector': f'{_METADATA_WRITERS}.object_detector',
+    'writer_utils': f'{_METADATA_WRITERS}.writer_utils',
+})
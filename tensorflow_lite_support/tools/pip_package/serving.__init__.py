@@ -0,0 +1,30 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""TensorFlow Lite Task Library Serving APIs.
+
+This module provides a server running the inferences of Task Library models
+with dynamic batching. The `tflite_task_server` command runs it from the
+command line.
+"""
+
+from tensorflow_lite_support.python import lazy_loader
+
+_SERVING = 'tensorflow_lite_support.python.serving'
+
+__getattr__, __dir__, __all__ = lazy_loader.attach(__name__, {
+    'TaskServer': f'{_SERVING}.task_server:TaskServer',
+    'ModelConfig': f'{_SERVING}.task_server:ModelConfig',
+    'batching': f'{_SERVING}.batching',
+})
@@ -79,6 +79,14 @@ DOCLINES = __doc__.split('\n')
 CONSOLE_SCRIPTS = [
     'tflite_codegen = tensorflow_lite_support.codegen.python.codegen:main',
 ]
+if sys.platform != 'win32':
+  # Task Library is not supported on Windows yet.
+  CONSOLE_SCRIPTS.append('tflite_task_benchmark = '
+                         'tensorflow_lite_support.python.benchmark.'
+                         'task_benchmark_main:main')
+  CONSOLE_SCRIPTS.append('tflite_task_server = '
+                         'tensorflow_lite_support.python.serving.'
+                         'task_server_main:main')
 
 
 class BinaryDistribution(Distribution):
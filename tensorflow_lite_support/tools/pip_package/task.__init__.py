@@ -25,8 +25,13 @@ Read more in the [Task Library Guide](
 https://tensorflow.org/lite/inference_with_metadata/task_library/overview).
 """
 
-from . import audio
-from . import core
-from . import processor
-from . import text
-from . import vision
+from tensorflow_lite_support.python import lazy_loader
+
+# The task modules are only loaded when first accessed.
+__getattr__, __dir__, __all__ = lazy_loader.attach(__name__, {
+    'audio': '.audio',
+    'core': '.core',
+    'processor': '.processor',
+    'text': '.text',
+    'vision': '.vision',
+})
@@ -17,21 +17,19 @@
 This module provides interface to run TensorFlow Lite audio models.
 """
 
-from tensorflow_lite_support.python.task.audio import audio_classifier
-from tensorflow_lite_support.python.task.audio import audio_embedder
-from tensorflow_lite_support.python.task.audio.core import audio_record
-from tensorflow_lite_support.python.task.audio.core import tensor_audio
+from tensorflow_lite_support.python import lazy_loader
 
-AudioClassifier = audio_classifier.AudioClassifier
-AudioClassifierOptions = audio_classifier.AudioClassifierOptions
-AudioEmbedder = audio_embedder.AudioEmbedder
-AudioEmbedderOptions = audio_embedder.AudioEmbedderOptions
-AudioRecord = audio_record.AudioRecord
-AudioFormat = tensor_audio.AudioFormat
-TensorAudio = tensor_audio.TensorAudio
+_AUDIO = 'tensorflow_lite_support.python.task.audio'
 
-# Remove unnecessary modules to avoid duplication in API docs.
-del audio_classifier
-del audio_embedder
-del audio_record
-del tensor_audio
\ No newline at end of file
+# The modules, their native extensions and sounddevice are only loaded when
+# first accessed.
+__getattr__, __dir__, __all__ = lazy_loader.attach(__name__, {
+    'AudioClassifier': f'{_AUDIO}.audio_classifier:AudioClassifier',
+    'AudioClassifierOptions':
+        f'{_AUDIO}.audio_classifier:AudioClassifierOptions',
+    'AudioEmbedder': f'{_AUDIO}.audio_embedder:AudioEmbedder',
+    'AudioEmbedderOptions': f'{_AUDIO}.audio_embedder:AudioEmbedderOptions',
+    'AudioRecord': f'{_AUDIO}.core.audio_record:AudioRecord',
+    'AudioFormat': f'{_AUDIO}.core.tensor_audio:AudioFormat',
+    'TensorAudio': f'{_AUDIO}.core.tensor_audio:TensorAudio',
+})
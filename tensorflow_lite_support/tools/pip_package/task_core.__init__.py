@@ -16,9 +16,22 @@
 
 This module contains classes used across multiple tasks in the Task Library."""
 
-from tensorflow_lite_support.python.task.core import base_options
+from tensorflow_lite_support.python import lazy_loader
 
-BaseOptions = base_options.BaseOptions
-
-# Remove unnecessary modules to avoid duplication in API docs.
-del base_options
+# The module is only loaded when first accessed.
+__getattr__, __dir__, __all__ = lazy_loader.attach(__name__, {
+    'BaseOptions':
+        'tensorflow_lite_support.python.task.core.base_options:BaseOptions',
+    'evict_shared_models':
+        'tensorflow_lite_support.python.task.core.model_cache:evict_shared_models',
+    'InferenceCancelledError':
+        'tensorflow_lite_support.python.task.core.inference_timing:InferenceCancelledError',
+    'InferenceTimeoutError':
+        'tensorflow_lite_support.python.task.core.inference_timing:InferenceTimeoutError',
+    'get_shared_model_count':
+        'tensorflow_lite_support.python.task.core.model_cache:get_shared_model_count',
+    'ResultCache':
+        'tensorflow_lite_support.python.task.core.result_cache:ResultCache',
+    'XnnpackSettings':
+        'tensorflow_lite_support.python.task.core.base_options:XnnpackSettings',
+})
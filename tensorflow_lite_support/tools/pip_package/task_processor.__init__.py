@@ -18,66 +18,46 @@ This module contains classes related to the pre-processing and post-processing
 steps of the Task Library.
 """
 
-from tensorflow_lite_support.python.task.processor.proto import bounding_box_pb2
-from tensorflow_lite_support.python.task.processor.proto import class_pb2
-from tensorflow_lite_support.python.task.processor.proto import classification_options_pb2
-from tensorflow_lite_support.python.task.processor.proto import classifications_pb2
-from tensorflow_lite_support.python.task.processor.proto import detection_options_pb2
-from tensorflow_lite_support.python.task.processor.proto import detections_pb2
-from tensorflow_lite_support.python.task.processor.proto import embedding_options_pb2
-from tensorflow_lite_support.python.task.processor.proto import embedding_pb2
-from tensorflow_lite_support.python.task.processor.proto import search_options_pb2
-from tensorflow_lite_support.python.task.processor.proto import search_result_pb2
-from tensorflow_lite_support.python.task.processor.proto import segmentation_options_pb2
-from tensorflow_lite_support.python.task.processor.proto import segmentations_pb2
-from tensorflow_lite_support.python.task.processor.proto import qa_answers_pb2
-from tensorflow_lite_support.python.task.processor.proto import clu_pb2
-from tensorflow_lite_support.python.task.processor.proto import clu_annotation_options_pb2
+from tensorflow_lite_support.python import lazy_loader
 
-BoundingBox = bounding_box_pb2.BoundingBox
-Category = class_pb2.Category
-ClassificationOptions = classification_options_pb2.ClassificationOptions
-Classifications = classifications_pb2.Classifications
-ClassificationResult = classifications_pb2.ClassificationResult
-DetectionOptions = detection_options_pb2.DetectionOptions
-Detection = detections_pb2.Detection
-DetectionResult = detections_pb2.DetectionResult
-EmbeddingOptions = embedding_options_pb2.EmbeddingOptions
-FeatureVector = embedding_pb2.FeatureVector
-Embedding = embedding_pb2.Embedding
-EmbeddingResult = embedding_pb2.EmbeddingResult
-SearchOptions = search_options_pb2.SearchOptions
-SearchResult = search_result_pb2.SearchResult
-NearestNeighbor = search_result_pb2.NearestNeighbor
-OutputType = segmentation_options_pb2.OutputType
-SegmentationOptions = segmentation_options_pb2.SegmentationOptions
-ColoredLabel = segmentations_pb2.ColoredLabel
-ConfidenceMask = segmentations_pb2.ConfidenceMask
-Segmentation = segmentations_pb2.Segmentation
-SegmentationResult = segmentations_pb2.SegmentationResult
-Pos = qa_answers_pb2.Pos
-QaAnswer = qa_answers_pb2.QaAnswer
-QuestionAnswererResult = qa_answers_pb2.QuestionAnswererResult
-CluRequest = clu_pb2.CluRequest
-CluResponse = clu_pb2.CluResponse
-Mention = clu_pb2.Mention
-CategoricalSlot = clu_pb2.CategoricalSlot
-MentionedSlot = clu_pb2.MentionedSlot
-BertCluAnnotationOptions = clu_annotation_options_pb2.BertCluAnnotationOptions
+_PROTO = 'tensorflow_lite_support.python.task.processor.proto'
 
-# Remove unnecessary modules to avoid duplication in API docs.
-del bounding_box_pb2
-del class_pb2
-del classification_options_pb2
-del classifications_pb2
-del detection_options_pb2
-del detections_pb2
-del embedding_options_pb2
-del embedding_pb2
-del segmentation_options_pb2
-del segmentations_pb2
-del search_options_pb2
-del search_result_pb2
-del qa_answers_pb2
-del clu_pb2
-del clu_annotation_options_pb2
+# The protobuf modules are only loaded when first accessed.
+__getattr__, __dir__, __all__ = lazy_loader.attach(__name__, {
+    'BoundingBox': f'{_PROTO}.bounding_box_pb2:BoundingBox',
+    'Category': f'{_PROTO}.class_pb2:Category',
+    'ClassificationOptions':
+        f'{_PROTO}.classification_options_pb2:ClassificationOptions',
+    'Classifications': f'{_PROTO}.classifications_pb2:Classifications',
+    'ClassificationResult':
+        f'{_PROTO}.classifications_pb2:ClassificationResult',
+    'DetectionOptions': f'{_PROTO}.detection_options_pb2:DetectionOptions',
+    'Detection': f'{_PROTO}.detections_pb2:Detection',
+    'DetectionResult': f'{_PROTO}.detections_pb2:DetectionResult',
+    'EmbeddingOptions': f'{_PROTO}.embedding_options_pb2:EmbeddingOptions',
+    'FeatureVector': f'{_PROTO}.embedding_pb2:FeatureVector',
+    'Embedding': f'{_PROTO}.embedding_pb2:Embedding',
+    'EmbeddingResult': f'{_PROTO}.embedding_pb2:EmbeddingResult',
+    'SearchOptions': f'{_PROTO}.search_options_pb2:SearchOptions',
+    'AttributeFilter': f'{_PROTO}.search_options_pb2:AttributeFilter',
+    'SearchResult': f'{_PROTO}.search_result_pb2:SearchResult',
+    'NearestNeighbor': f'{_PROTO}.search_result_pb2:NearestNeighbor',
+    'LazySearchResult': f'{_PROTO}.search_result_pb2:LazySearchResult',
+    'OutputType': f'{_PROTO}.segmentation_options_pb2:OutputType',
+    'SegmentationOptions':
+        f'{_PROTO}.segmentation_options_pb2:SegmentationOptions',
+    'ColoredLabel': f'{_PROTO}.segmentations_pb2:ColoredLabel',
+    'ConfidenceMask': f'{_PROTO}.segmentations_pb2:ConfidenceMask',
+    'Segmentation': f'{_PROTO}.segmentations_pb2:Segmentation',
+    'SegmentationResult': f'{_PROTO}.segmentations_pb2:SegmentationResult',
+    'Pos': f'{_PROTO}.qa_answers_pb2:Pos',
+    'QaAnswer': f'{_PROTO}.qa_answers_pb2:QaAnswer',
+    'QuestionAnswererResult': f'{_PROTO}.qa_answers_pb2:QuestionAnswererResult',
+    'CluRequest': f'{_PROTO}.clu_pb2:CluRequest',
+    'CluResponse': f'{_PROTO}.clu_pb2:CluResponse',
+    'Mention': f'{_PROTO}.clu_pb2:Mention',
+    'CategoricalSlot': f'{_PROTO}.clu_pb2:CategoricalSlot',
+    'MentionedSlot': f'{_PROTO}.clu_pb2:MentionedSlot',
+    'BertCluAnnotationOptions':
+        f'{_PROTO}.clu_annotation_options_pb2:BertCluAnnotationOptions',
+})
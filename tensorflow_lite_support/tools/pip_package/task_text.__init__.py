@@ -18,30 +18,26 @@ This module provides interface to run TensorFlow Lite natural language
 processing models.
 """
 
-from tensorflow_lite_support.python.task.text import text_embedder
-from tensorflow_lite_support.python.task.text import text_searcher
-from tensorflow_lite_support.python.task.text import nl_classifier
-from tensorflow_lite_support.python.task.text import bert_nl_classifier
-from tensorflow_lite_support.python.task.text import bert_question_answerer
-from tensorflow_lite_support.python.task.text import bert_clu_annotator
+from tensorflow_lite_support.python import lazy_loader
 
-TextEmbedder = text_embedder.TextEmbedder
-TextEmbedderOptions = text_embedder.TextEmbedderOptions
-TextSearcher = text_searcher.TextSearcher
-TextSearcherOptions = text_searcher.TextSearcherOptions
-NLClassifier = nl_classifier.NLClassifier
-NLClassifierOptions = nl_classifier.NLClassifierOptions
-BertNLClassifier = bert_nl_classifier.BertNLClassifier
-BertNLClassifierOptions = bert_nl_classifier.BertNLClassifierOptions
-BertQuestionAnswerer = bert_question_answerer.BertQuestionAnswerer
-BertQuestionAnswererOptions = bert_question_answerer.BertQuestionAnswererOptions
-BertCluAnnotator = bert_clu_annotator.BertCluAnnotator
-BertCluAnnotatorOptions = bert_clu_annotator.BertCluAnnotatorOptions
+_TEXT = 'tensorflow_lite_support.python.task.text'
 
-# Remove unnecessary modules to avoid duplication in API docs.
-del text_embedder
-del text_searcher
-del nl_classifier
-del bert_nl_classifier
-del bert_question_answerer
-del bert_clu_annotator
+# The modules and their native extensions are only loaded when first accessed.
+__getattr__, __dir__, __all__ = lazy_loader.attach(__name__, {
+    'TextEmbedder': f'{_TEXT}.text_embedder:TextEmbedder',
+    'TextEmbedderOptions': f'{_TEXT}.text_embedder:TextEmbedderOptions',
+    'TextSearcher': f'{_TEXT}.text_searcher:TextSearcher',
+    'TextSearcherOptions': f'{_TEXT}.text_searcher:TextSearcherOptions',
+    'NLClassifier': f'{_TEXT}.nl_classifier:NLClassifier',
+    'NLClassifierOptions': f'{_TEXT}.nl_classifier:NLClassifierOptions',
+    'BertNLClassifier': f'{_TEXT}.bert_nl_classifier:BertNLClassifier',
+    'BertNLClassifierOptions':
+        f'{_TEXT}.bert_nl_classifier:BertNLClassifierOptions',
+    'BertQuestionAnswerer':
+        f'{_TEXT}.bert_question_answerer:BertQuestionAnswerer',
+    'BertQuestionAnswererOptions':
+        f'{_TEXT}.bert_question_answerer:BertQuestionAnswererOptions',
+    'BertCluAnnotator': f'{_TEXT}.bert_clu_annotator:BertCluAnnotator',
+    'BertCluAnnotatorOptions':
+        f'{_TEXT}.bert_clu_annotator:BertCluAnnotatorOptions',
+})
@@ -17,29 +17,22 @@
 This module provides interface to run TensorFlow Lite computer vision models.
 """
 
-from tensorflow_lite_support.python.task.vision import image_classifier
-from tensorflow_lite_support.python.task.vision import image_embedder
-from tensorflow_lite_support.python.task.vision import image_segmenter
-from tensorflow_lite_support.python.task.vision import image_searcher
-from tensorflow_lite_support.python.task.vision import object_detector
-from tensorflow_lite_support.python.task.vision.core import tensor_image
+from tensorflow_lite_support.python import lazy_loader
 
-ImageClassifier = image_classifier.ImageClassifier
-ImageClassifierOptions = image_classifier.ImageClassifierOptions
-ObjectDetector = object_detector.ObjectDetector
-ObjectDetectorOptions = object_detector.ObjectDetectorOptions
-ImageEmbedder = image_embedder.ImageEmbedder
-ImageEmbedderOptions = image_embedder.ImageEmbedderOptions
-ImageSegmenter = image_segmenter.ImageSegmenter
-ImageSegmenterOptions = image_segmenter.ImageSegmenterOptions
-ImageSearcher = image_searcher.ImageSearcher
-ImageSearcherOptions = image_searcher.ImageSearcherOptions
-TensorImage = tensor_image.TensorImage
+_VISION = 'tensorflow_lite_support.python.task.vision'
 
-# Remove unnecessary modules to avoid duplication in API docs.
-del image_classifier
-del image_embedder
-del image_segmenter
-del image_searcher
-del object_detector
-del tensor_image
+# The modules and their native extensions are only loaded when first accessed.
+__getattr__, __dir__, __all__ = lazy_loader.attach(__name__, {
+    'ImageClassifier': f'{_VISION}.image_classifier:ImageClassifier',
+    'ImageClassifierOptions':
+        f'{_VISION}.image_classifier:ImageClassifierOptions',
+    'ObjectDetector': f'{_VISION}.object_detector:ObjectDetector',
+    'ObjectDetectorOptions': f'{_VISION}.object_detector:ObjectDetectorOptions',
+    'ImageEmbedder': f'{_VISION}.image_embedder:ImageEmbedder',
+    'ImageEmbedderOptions': f'{_VISION}.image_embedder:ImageEmbedderOptions',
+    'ImageSegmenter': f'{_VISION}.image_segmenter:ImageSegmenter',
+    'ImageSegmenterOptions': f'{_VISION}.image_segmenter:ImageSegmenterOptions',
+    'ImageSearcher': f'{_VISION}.image_searcher:ImageSearcher',
+    'ImageSearcherOptions': f'{_VISION}.image_searcher:ImageSearcherOptions',
+    'TensorImage': f'{_VISION}.core.tensor_image:TensorImage',
+})
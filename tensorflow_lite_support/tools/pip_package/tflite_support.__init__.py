@@ -40,14 +40,27 @@ on the TensorFlow Lite website.
 
 # In pip build, this file will be renamed as tflite_support/__init__.py.
 
-import flatbuffers
 import platform
 
-from tensorflow_lite_support.metadata import metadata_schema_py_generated
-from tensorflow_lite_support.metadata import schema_py_generated
-from tensorflow_lite_support.metadata.python import metadata
-from tflite_support import metadata_writers
+from tensorflow_lite_support.python import lazy_loader
 
+# Importing flatbuffers, the schemas and the Task Library is slow, so they are
+# only loaded when first accessed.
+_targets = {
+    'flatbuffers': 'flatbuffers',
+    'metadata_schema_py_generated':
+        'tensorflow_lite_support.metadata.metadata_schema_py_generated',
+    'schema_py_generated':
+        'tensorflow_lite_support.metadata.schema_py_generated',
+    'metadata': 'tensorflow_lite_support.metadata.python.metadata',
+    'metadata_writers': '.metadata_writers',
+}
 if platform.system() != 'Windows':
   # Task Library is not supported on Windows yet.
-  from tflite_support import task
+  _targets['task'] = '.task'
+  _targets['benchmark'] = (
+      'tensorflow_lite_support.python.benchmark.task_benchmark')
+  _targets['serving'] = '.serving'
+
+__getattr__, __dir__, __all__ = lazy_loader.attach(__name__, _targets)
+del _targets